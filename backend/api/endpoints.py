@@ -176,18 +176,21 @@ async def get_task_source(
 
 
 @router.get("/tasks/{task_id}/download")
-async def download_task_output(task_id: str, format: str = 'json', optional_fields: str = ''):
+async def download_task_output(
+    task_id: str, format: str = 'json', optional_fields: str = '', resolve_context: bool = True
+):
     """下载任务输出文件
     
     Args:
         task_id: 任务ID
         format: 下载格式，'json' 或 'csv'
         optional_fields: 可选字段，逗号分隔（仅对 CSV 有效）
+        resolve_context: 紧凑输出是否拼回上下文字段（仅对 JSON 有效）
     """
     # 解析可选字段
     fields_list = [f.strip() for f in optional_fields.split(',') if f.strip()] if optional_fields else []
     
-    result = task_service.get_task_output(task_id, format, fields_list)
+    result = task_service.get_task_output(task_id, format, fields_list, resolve_context)
     
     if not result.get("success"):
         raise HTTPException(status_code=404, detail=result.get("error", "文件不存在"))
@@ -258,10 +261,15 @@ async def get_llm_defaults(current_user: User = Depends(get_current_user)):
 @router.get("/reviews/{task_id}/data", response_model=TaskResponse)
 async def get_review_data(
     task_id: str,
+    resolve_context: bool = True,
     current_user: User = Depends(require_admin_or_reviewer)
 ):
-    """获取任务的审核数据（管理员和审核员）"""
-    result = review_service.load_task_data(task_id)
+    """获取任务的审核数据（管理员和审核员）
+    
+    Args:
+        resolve_context: 紧凑输出是否拼回上下文字段，列表视图不需要时可传 false
+    """
+    result = review_service.load_task_data(task_id, resolve_context)
     return result
 
 
@@ -16,6 +16,7 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../.
 from graphgen.graphgen import GraphGen
 from graphgen.models import OpenAIClient, Tokenizer
 from graphgen.models.llm.limitter import RPM, TPM
+from graphgen.operators.generate import context_table_path
 from graphgen.utils import set_logger, logger
 from webui.task_manager import task_manager, TaskStatus
 from webui.utils import setup_workspace
@@ -217,29 +218,11 @@ class TaskProcessor:
             else:
                 # SFT任务：生成训练数据
                 logger.info("[TaskProcessor] SFT任务：开始生成训练数据")
-                # 添加进度回调来实时更新任务状态
-                def update_progress(current_count, total_batches):
-                    if total_batches > 0:
-                        # 定期更新进度（每处理10%更新一次）
-                        if current_count % max(1, total_batches // 10) == 0:
-                            # 尝试从临时文件读取当前已生成的问答对数量
-                            temp_file = os.path.join(working_dir, "temp_output.json")
-                            if os.path.exists(temp_file):
-                                try:
-                                    with open(temp_file, "r", encoding="utf-8") as f:
-                                        temp_data = json.load(f)
-                                        temp_count = len(temp_data) if isinstance(temp_data, list) else 0
-                                        # 更新任务状态但不改变状态
-                                        if temp_count > 0:
-                                            task_manager.update_task_status(
-                                                task_id,
-                                                TaskStatus.PROCESSING,
-                                                qa_count=temp_count
-                                            )
-                                except:
-                                    pass
+                # 生成结果逐批次写入 JSONL，已写入的问答对数量实时同步到任务进度
+                graph_gen.on_qa_progress = lambda counts: task_manager.update_task_progress(
+                    task_id, sum(counts.values())
+                )
                 
-                # 在生成过程中定期保存临时输出
                 await graph_gen.generate.__wrapped__(
                     graph_gen,
                     partition_config=graphgen_config["partition"],
@@ -259,6 +242,9 @@ class TaskProcessor:
                 
                 with open(output_file, 'w', encoding='utf-8') as f:
                     json.dump(output_data, f, ensure_ascii=False, indent=2)
+                # 紧凑输出的上下文附表随输出文件一起保存，工作目录稍后会被清理
+                if os.path.exists(graph_gen.qa_context_path):
+                    shutil.copyfile(graph_gen.qa_context_path, context_table_path(output_file))
                 
                 logger.info(f"[TaskProcessor] 输出文件已保存到永久位置: {output_file}")
                 
@@ -385,11 +371,19 @@ class TaskProcessor:
             partition_params = {"max_units_per_community": config.dfs_max_units}
         elif method == "bfs":
             partition_params = {"max_units_per_community": config.bfs_max_units}
+        elif method == "coverage":
+            # 目标批次数由 GraphGen.generate 按 qa_pair_limit 估算后传入
+            partition_params = {
+                "max_units_per_community": config.bfs_max_units,
+                "max_rounds": getattr(config, "coverage_max_rounds", 8),
+            }
         elif method == "leiden":
             partition_params = {
                 "max_size": config.leiden_max_size,
                 "use_lcc": config.leiden_use_lcc,
                 "random_seed": config.leiden_random_seed,
+                "resolution": getattr(config, "leiden_resolution", None),
+                "n_iterations": getattr(config, "leiden_n_iterations", 2),
             }
         elif method == "hierarchical":
             partition_params = {
@@ -475,6 +469,7 @@ class TaskProcessor:
                 "chunk_overlap": config.chunk_overlap,
                 # 优化配置
                 "dynamic_chunk_size": getattr(config, "dynamic_chunk_size", False),
+                "chunk_workers": getattr(config, "chunk_workers", 1),
                 "enable_extraction_cache": getattr(config, "enable_extraction_cache", True),
                 "enable_batch_requests": getattr(config, "enable_batch_requests", True),
                 "batch_size": getattr(config, "batch_size", 10),
@@ -492,6 +487,7 @@ class TaskProcessor:
             "partition": {
                 "method": config.partition_method,
                 "method_params": partition_params,
+                "num_workers": getattr(config, "partition_workers", 1),
             },
             "generate": {
                 "mode": mode,
@@ -516,6 +512,7 @@ class TaskProcessor:
                 # Hierarchical 配置
                 "structure_format": getattr(config, "structure_format", "markdown"),
                 "hierarchical_relations": getattr(config, "hierarchical_relations", ["is_a", "subclass_of", "part_of", "includes", "type_of"]),
+                "output_schema": getattr(config, "output_schema", "inline"),
             },
             "evaluation": {
                 "enabled": getattr(config, "evaluation_enabled", False),
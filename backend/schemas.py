@@ -29,10 +29,14 @@ class TaskConfig(BaseModel):
     leiden_max_size: int = 20
     leiden_use_lcc: bool = False
     leiden_random_seed: int = 42
+    leiden_resolution: Optional[float] = None  # RB 模型分辨率，None 时优化模块度
+    leiden_n_iterations: int = 2  # 每次运行的迭代次数，负数表示迭代到稳定
     ece_max_units: int = 20
     ece_min_units: int = 3
     ece_max_tokens: int = 10240
     ece_unit_sampling: str = "random"
+    coverage_max_rounds: int = 8  # coverage 分区的最大轮数（按目标数量补充重叠社区）
+    partition_workers: int = 1  # 分区进程数（>1 时按连通分量分片并行分区）
     mode: str | List[str] = "aggregated"  # 支持单个模式或多个模式
     data_format: str = "Alpaca"
     rpm: int = 1000
@@ -40,6 +44,7 @@ class TaskConfig(BaseModel):
     # 优化配置
     enable_extraction_cache: bool = True  # 启用提取缓存（默认开启）
     dynamic_chunk_size: bool = False  # 动态chunk大小调整（默认关闭）
+    chunk_workers: int = 1  # 切分进程数（>1 时大批量文档使用进程池并行切分）
     use_multi_template: bool = True  # 多模板采样（默认开启）
     template_seed: Optional[int] = None  # 模板随机种子（可选）
     # 批量请求配置（知识抽取阶段）
@@ -68,6 +73,7 @@ class TaskConfig(BaseModel):
     # 去重优化
     persistent_deduplication: bool = True  # 默认启用持久化去重
     question_first: bool = True  # 默认启用"先问后答"流程（在不支持的模式下会被忽略）
+    output_schema: str = "inline"  # 输出格式：inline（每条 QA 内联上下文）或 compact（上下文存附表，QA 只存 id）
     # 语言控制
     chinese_only: bool = False  # 只生成中文问答（默认不限制）
     # 评测配置
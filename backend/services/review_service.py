@@ -10,6 +10,7 @@ from datetime import datetime
 from typing import Dict, Any, List, Optional
 from backend.schemas import DataItem, ReviewStatus, ReviewRequest, BatchReviewRequest, AutoReviewRequest
 from backend.config import settings
+from graphgen.operators.generate import QAContextResolver
 
 
 class ReviewService:
@@ -47,8 +48,22 @@ class ReviewService:
         except Exception as e:
             print(f"保存审核数据失败: {e}")
     
-    def load_task_data(self, task_id: str) -> Dict[str, Any]:
-        """加载任务生成的数据"""
+    def _context_resolver(self, task_id: str) -> Optional[QAContextResolver]:
+        """任务输出的上下文解析器（紧凑输出的附表在第一次用到时才加载）"""
+        from webui.task_manager import task_manager
+        task = task_manager.get_task(task_id)
+        if not task or not task.output_file:
+            return None
+        return QAContextResolver.for_output(task.output_file)
+    
+    def load_task_data(self, task_id: str, resolve_context: bool = True) -> Dict[str, Any]:
+        """加载任务生成的数据
+        
+        Args:
+            task_id: 任务ID
+            resolve_context: 紧凑输出是否拼回上下文字段；只需要审核状态时传 False，
+                审核记录中也只保存紧凑内容
+        """
         try:
             # 首先尝试从 task_manager 获取任务信息
             from webui.task_manager import task_manager
@@ -94,6 +109,7 @@ class ReviewService:
             
             # 加载现有审核数据
             reviews = self._load_reviews(task_id)
+            resolver = QAContextResolver.for_output(output_file) if resolve_context else None
             
             # 转换为 DataItem
             data_items = []
@@ -105,12 +121,15 @@ class ReviewService:
                     item_id = f"{task_id}_{idx}"
                 
                 if item_id in reviews:
-                    data_items.append(reviews[item_id])
+                    data_item = reviews[item_id]
+                    if resolver is not None:
+                        data_item.content = resolver.resolve(data_item.content)
+                    data_items.append(data_item)
                 else:
                     data_item = DataItem(
                         item_id=item_id,
                         task_id=task_id,
-                        content=item,
+                        content=resolver.resolve(item) if resolver is not None else item,
                         review_status=ReviewStatus.PENDING
                     )
                     data_items.append(data_item)
@@ -134,7 +153,7 @@ class ReviewService:
             task_id = request.task_id if hasattr(request, 'task_id') and request.task_id else "_".join(request.item_id.split("_")[:-1])
             
             # 加载任务数据以获取原始内容
-            task_data_result = self.load_task_data(task_id)
+            task_data_result = self.load_task_data(task_id, resolve_context=False)
             if not task_data_result["success"]:
                 return task_data_result
             
@@ -185,7 +204,7 @@ class ReviewService:
             errors = []
             
             # 【优化1】只加载一次任务数据
-            task_data_result = self.load_task_data(request.task_id)
+            task_data_result = self.load_task_data(request.task_id, resolve_context=False)
             if not task_data_result["success"]:
                 return task_data_result
             
@@ -243,7 +262,7 @@ class ReviewService:
     def get_review_stats(self, task_id: str) -> Dict[str, Any]:
         """获取审核统计"""
         try:
-            result = self.load_task_data(task_id)
+            result = self.load_task_data(task_id, resolve_context=False)
             if not result["success"]:
                 return result
             
@@ -364,7 +383,7 @@ class ReviewService:
             
             # 只导出为 JSON 格式（CSV 在下载时即时转换）
             export_file = os.path.join(self.review_dir, f"{task_id}_all_data.json")
-            self._export_to_json(items, export_file)
+            self._export_to_json(items, export_file, self._context_resolver(task_id))
             
             return {
                 "success": True,
@@ -385,11 +404,14 @@ class ReviewService:
                 "error": f"导出失败: {str(e)}"
             }
     
-    def _export_to_json(self, items: List, export_file: str):
+    def _export_to_json(
+        self, items: List, export_file: str, resolver: Optional[QAContextResolver] = None
+    ):
         """导出为 JSON 格式，包含审核状态
         
         Args:
             items: DataItem 列表或字典列表
+            resolver: 紧凑输出的上下文解析器，导出时拼回上下文字段
         """
         exported_data = []
         for item in items:
@@ -401,6 +423,8 @@ class ReviewService:
             
             # 获取内容（优先使用修改后的内容）
             content = item_dict.get("modified_content") or item_dict.get("content", {})
+            if resolver is not None:
+                content = resolver.resolve(content)
             
             # 构建导出项
             export_item = {
@@ -13,6 +13,7 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../.
 from webui.task_manager import task_manager, TaskStatus
 from webui.base import WebuiParams
 from backend.core.task_processor import TaskProcessor
+from graphgen.operators.generate import QAContextResolver, context_table_path
 from backend.schemas import TaskConfig
 
 
@@ -215,13 +216,20 @@ class TaskService:
                 "error": str(e)
             }
     
-    def get_task_output(self, task_id: str, format: str = 'json', optional_fields: List[str] = []) -> Dict[str, Any]:
+    def get_task_output(
+        self,
+        task_id: str,
+        format: str = 'json',
+        optional_fields: List[str] = [],
+        resolve_context: bool = True,
+    ) -> Dict[str, Any]:
         """获取任务输出文件信息
         
         Args:
             task_id: 任务ID
             format: 输出格式，'json' 或 'csv'
             optional_fields: 可选字段列表（仅对 CSV 有效）
+            resolve_context: 紧凑输出是否拼回上下文字段（仅对 JSON 有效）
         """
         try:
             task = task_manager.get_task(task_id)
@@ -257,10 +265,13 @@ class TaskService:
                     "filename": f"{task.filename}_output.csv"
                 }
             
-            # 默认返回 JSON
+            # 默认返回 JSON；紧凑输出按需拼回上下文
+            output_file = task.output_file
+            if resolve_context:
+                output_file = self._resolve_output_context(output_file)
             return {
                 "success": True,
-                "output_file": task.output_file,
+                "output_file": output_file,
                 "filename": f"{task.filename}_output.json"
             }
         except Exception as e:
@@ -269,6 +280,28 @@ class TaskService:
                 "error": str(e)
             }
     
+    def _resolve_output_context(self, output_file: str) -> str:
+        """紧凑输出拼回上下文后的文件路径；没有附表（内联输出）时返回原文件
+        
+        拼接结果缓存为 <output>.resolved.json，输出文件和附表未变化时直接复用
+        """
+        import json
+        
+        table_path = context_table_path(output_file)
+        if not os.path.exists(table_path):
+            return output_file
+        resolved_file = os.path.splitext(output_file)[0] + ".resolved.json"
+        if os.path.exists(resolved_file) and os.path.getmtime(resolved_file) >= max(
+            os.path.getmtime(output_file), os.path.getmtime(table_path)
+        ):
+            return resolved_file
+        with open(output_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        resolver = QAContextResolver(table_path)
+        with open(resolved_file, 'w', encoding='utf-8') as f:
+            json.dump(resolver.resolve_all(data), f, ensure_ascii=False, indent=2)
+        return resolved_file
+    
     def _convert_output_to_csv(self, task_id: str, json_file: str, optional_fields: List[str] = []) -> Optional[str]:
         """将 JSON 输出转换为 CSV 格式
         
@@ -287,6 +320,9 @@ class TaskService:
             # 读取 JSON 文件
             with open(json_file, 'r', encoding='utf-8') as f:
                 data = json.load(f)
+            # 紧凑输出只在导出上下文字段时才拼回
+            if set(optional_fields) & {'context', 'graph', 'source_chunks', 'source_documents'}:
+                data = QAContextResolver.for_output(json_file).resolve_all(data)
             
             # 生成 CSV 文件路径（保存在 tasks/outputs 目录）
             csv_file = json_file.replace('.json', '.csv').replace('.jsonl', '.csv')
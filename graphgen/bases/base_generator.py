@@ -1,8 +1,13 @@
 from abc import ABC, abstractmethod
-from typing import Any
+from typing import TYPE_CHECKING, Any, Callable, Optional, TypeVar
 
 from graphgen.bases.base_llm_client import BaseLLMClient
 
+if TYPE_CHECKING:
+    from graphgen.utils.context_cache import ContextCache
+
+T = TypeVar("T")
+
 
 async def _add_context_and_source_info(
     qa_pairs: dict,
@@ -136,6 +141,15 @@ async def _add_context_and_source_info(
             }
 
 
+def hierarchy_context_kind(
+    hierarchical_relations, structure_format: str, require_hierarchy: bool
+) -> str:
+    """层级序列化结果的缓存格式标识，序列化参数不同的结果互不复用"""
+    return "hierarchy:{}:{}:{}".format(
+        structure_format, int(require_hierarchy), ",".join(hierarchical_relations)
+    )
+
+
 class BaseGenerator(ABC):
     """
     Generate QAs based on given prompts.
@@ -143,6 +157,57 @@ class BaseGenerator(ABC):
 
     def __init__(self, llm_client: BaseLLMClient):
         self.llm_client = llm_client
+        # 由 generate_qas 设置，同一次运行的各生成器共享
+        self.context_cache: Optional["ContextCache"] = None
+
+    def cached_context(self, batch, kind: str, build: Callable[[], T]) -> T:
+        """按批次与格式缓存上下文序列化结果；未设置 context_cache 时直接构建"""
+        if self.context_cache is None:
+            return build()
+        return self.context_cache.get(batch, kind, build)
+
+    def format_entities_relations(self, batch) -> tuple[str, str, str]:
+        """带序号的实体/关系列表及检测出的语言：(entities_str, relationships_str, language)"""
+
+        def build():
+            nodes, edges = batch
+            entities_str = "\n".join(
+                f"{index + 1}. {node[0]}: {node[1]['description']}"
+                for index, node in enumerate(nodes)
+            )
+            relationships_str = "\n".join(
+                f"{index + 1}. {edge[0]} -- {edge[1]}: {edge[2]['description']}"
+                for index, edge in enumerate(edges)
+            )
+            from graphgen.utils import detect_main_language
+
+            return (
+                entities_str,
+                relationships_str,
+                detect_main_language(entities_str + relationships_str),
+            )
+
+        return self.cached_context(batch, "entities_relations", build)
+
+    def serialize_hierarchy(
+        self, batch, structure_format: str = "markdown", require_hierarchy: bool = False
+    ) -> str:
+        """用生成器的 hierarchy_serializer 序列化层级结构（带缓存）"""
+        serializer = self.hierarchy_serializer
+        kind = hierarchy_context_kind(
+            serializer.hierarchical_relations, structure_format, require_hierarchy
+        )
+        nodes, edges = batch
+        return self.cached_context(
+            batch,
+            kind,
+            lambda: serializer.serialize(
+                nodes,
+                edges,
+                structure_format=structure_format,
+                require_hierarchy=require_hierarchy,
+            ),
+        )
 
     @abstractmethod
     def build_prompt(
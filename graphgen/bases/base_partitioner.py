@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Any, List
+from typing import Any, AsyncIterator, Iterable, List
 
 from graphgen.bases.base_storage import BaseGraphStorage
 from graphgen.bases.datatypes import Community
@@ -33,26 +33,54 @@ class BasePartitioner(ABC):
         :param g: Graph storage instance
         :return: List of batches, each batch is a tuple of (nodes, edges)
         """
-        batches = []
+        return [
+            batch async for batch in BasePartitioner.iter_batches(communities, g)
+        ]
+
+    @staticmethod
+    async def iter_batches(
+        communities: Iterable[Community], g: BaseGraphStorage
+    ) -> AsyncIterator[
+        tuple[
+            list[tuple[str, dict]], list[tuple[Any, Any, dict] | tuple[Any, Any, Any]]
+        ]
+    ]:
+        """
+        Lazily convert communities to batches, one community at a time.
+        :param communities
+        :param g: Graph storage instance
+        :return: async generator of (nodes, edges) batches
+        """
         for comm in communities:
-            nodes = comm.nodes
-            edges = comm.edges
-            nodes_data = []
-            for node in nodes:
-                node_data = await g.get_node(node)
-                if node_data:
-                    nodes_data.append((node, node_data))
-            edges_data = []
-            for u, v in edges:
-                edge_data = await g.get_edge(u, v)
+            yield await BasePartitioner.community_to_batch(comm, g)
+
+    @staticmethod
+    async def community_to_batch(
+        comm: Community, g: BaseGraphStorage
+    ) -> tuple[
+        list[tuple[str, dict]], list[tuple[Any, Any, dict] | tuple[Any, Any, Any]]
+    ]:
+        """
+        Fetch node and edge data of a single community.
+        :param comm
+        :param g: Graph storage instance
+        :return: (nodes, edges)
+        """
+        nodes_data = []
+        for node in comm.nodes:
+            node_data = await g.get_node(node)
+            if node_data:
+                nodes_data.append((node, node_data))
+        edges_data = []
+        for u, v in comm.edges:
+            edge_data = await g.get_edge(u, v)
+            if edge_data:
+                edges_data.append((u, v, edge_data))
+            else:
+                edge_data = await g.get_edge(v, u)
                 if edge_data:
-                    edges_data.append((u, v, edge_data))
-                else:
-                    edge_data = await g.get_edge(v, u)
-                    if edge_data:
-                        edges_data.append((v, u, edge_data))
-            batches.append((nodes_data, edges_data))
-        return batches
+                    edges_data.append((v, u, edge_data))
+        return nodes_data, edges_data
 
     @staticmethod
     def _build_adjacency_list(
@@ -52,6 +52,13 @@ class BaseKVStorage(Generic[T], StorageNameSpace):
     async def upsert(self, data: dict[str, T]):
         raise NotImplementedError
 
+    async def update(self, data: dict[str, T]):
+        """insert or overwrite"""
+        raise NotImplementedError
+
+    async def delete(self, ids: list[str]):
+        raise NotImplementedError
+
     async def drop(self):
         raise NotImplementedError
 
@@ -104,5 +111,32 @@ class BaseGraphStorage(StorageNameSpace):
     ):
         raise NotImplementedError
 
+    async def update_nodes(self, node_updates: dict[str, dict]):
+        """批量更新节点属性；默认逐个调用 update_node，存储可覆盖为批量写入"""
+        for node_id, node_data in node_updates.items():
+            await self.update_node(node_id, node_data)
+
+    async def update_edges(self, edge_updates: list[tuple[str, str, dict]]):
+        """批量更新边属性；默认逐个调用 update_edge，存储可覆盖为批量写入"""
+        for source_node_id, target_node_id, edge_data in edge_updates:
+            await self.update_edge(source_node_id, target_node_id, edge_data)
+
     async def delete_node(self, node_id: str):
         raise NotImplementedError
+
+    async def delete_edge(self, source_node_id: str, target_node_id: str):
+        raise NotImplementedError
+
+    async def fingerprint(self) -> str:
+        """
+        图内容指纹：节点与边（含属性）完全相同则指纹相同，与存储顺序无关。
+        默认全量扫描计算，支持增量维护的存储应覆盖此方法
+        """
+        from graphgen.utils.hash import compute_unit_hash
+
+        digest = 0
+        for node_id, data in await self.get_all_nodes() or []:
+            digest += compute_unit_hash(["n", node_id], data)
+        for src, tgt, data in await self.get_all_edges() or []:
+            digest += compute_unit_hash(["e", src, tgt], data)
+        return f"{digest % (1 << 128):032x}"
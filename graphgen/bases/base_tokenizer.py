@@ -21,6 +21,10 @@ class BaseTokenizer(ABC):
     def count_tokens(self, text: str) -> int:
         return len(self.encode(text))
 
+    def count_tokens_batch(self, texts: List[str]) -> List[int]:
+        """Token counts of many texts; implementations with a native batch encoder override this."""
+        return [self.count_tokens(text) for text in texts]
+
     def chunk_by_token_size(
         self,
         content: str,
@@ -48,3 +48,18 @@ class Community:
     nodes: List[str] = field(default_factory=list)
     edges: List[tuple] = field(default_factory=list)
     metadata: dict = field(default_factory=dict)
+
+
+class CompletionText(str):
+    """
+    LLM completion text that also carries the API ``finish_reason``.
+    Behaves exactly like ``str`` so callers that only need the text are unaffected;
+    callers that care about truncation can check ``finish_reason == "length"``.
+    """
+
+    finish_reason: Union[str, None]
+
+    def __new__(cls, text: str, finish_reason: Union[str, None] = None):
+        obj = super().__new__(cls, text)
+        obj.finish_reason = finish_reason
+        return obj
@@ -18,6 +18,8 @@
         model: ${TRAINEE_MODEL}
         base_url: ${TRAINEE_BASE_URL}
         api_key: ${TRAINEE_API_KEY}
+      question:                            # 可选：atomic 问题阶段使用的较便宜模型
+        model: deepseek-chat               # 未配置 model 时不创建，问题与答案都用 synthesizer
       tokenizer:
         model: cl100k_base
     apis:                                  # 其他 API（写入 os.environ，供搜索等模块使用）
@@ -67,6 +69,18 @@ _DEFAULTS = {
         "top_p": 0.95,
         "request_params": {"thinking": {"type": "disabled"}},
     },
+    # 问题阶段模型：未配置 model 时不启用；base_url / api_key 未配置时沿用 synthesizer
+    "question": {
+        "model": "",
+        "base_url": "",
+        "api_key": "",
+        "rpm": 1000,
+        "tpm": 50000,
+        "temperature": 0.0,
+        "max_tokens": 4096,
+        "top_p": 0.95,
+        "request_params": {"thinking": {"type": "disabled"}},
+    },
     "tokenizer": {"model": "cl100k_base"},
 }
 
@@ -86,6 +100,13 @@ _ENV_FALLBACK = {
         "rpm": "RPM",
         "tpm": "TPM",
     },
+    "question": {
+        "model": "QUESTION_MODEL",
+        "base_url": "QUESTION_BASE_URL",
+        "api_key": "QUESTION_API_KEY",
+        "rpm": "RPM",
+        "tpm": "TPM",
+    },
     "tokenizer": {"model": "TOKENIZER_MODEL"},
 }
 
@@ -173,6 +194,7 @@ class LLMConfig:
 
     synthesizer: LLMClientConfig = field(default_factory=LLMClientConfig)
     trainee: LLMClientConfig = field(default_factory=LLMClientConfig)
+    question: LLMClientConfig = field(default_factory=LLMClientConfig)
     tokenizer_model: str = "cl100k_base"
     apis: Dict[str, Dict[str, str]] = field(default_factory=dict)
 
@@ -250,6 +272,7 @@ def load_llm_config(config: Optional[dict] = None, load_env_file: bool = True) -
     cfg = LLMConfig(
         synthesizer=_resolve_client_section("synthesizer", llm_section.get("synthesizer")),
         trainee=_resolve_client_section("trainee", llm_section.get("trainee")),
+        question=_resolve_client_section("question", llm_section.get("question")),
         tokenizer_model=str(
             expand_env_vars((llm_section.get("tokenizer") or {}).get("model"))
             or os.environ.get("TOKENIZER_MODEL")
@@ -257,6 +280,9 @@ def load_llm_config(config: Optional[dict] = None, load_env_file: bool = True) -
         ),
         apis=apis_section,
     )
+    if cfg.question.model:
+        cfg.question.base_url = cfg.question.base_url or cfg.synthesizer.base_url
+        cfg.question.api_key = cfg.question.api_key or cfg.synthesizer.api_key
     return cfg
 
 
@@ -327,3 +353,26 @@ def build_llm_clients(llm_config: LLMConfig):
         )
 
     return tokenizer_instance, synthesizer_client, trainee_client
+
+
+def build_question_client(llm_config: LLMConfig, tokenizer_instance):
+    """构建 atomic 问题阶段使用的客户端；question 未配置 model 或未启用时返回 None。"""
+    from graphgen.models import OpenAIClient
+    from graphgen.models.llm.limitter import RPM, TPM
+
+    question = llm_config.question
+    if not (question.enabled and question.is_ready()):
+        return None
+    return OpenAIClient(
+        model_name=question.model,
+        base_url=question.base_url,
+        api_key=question.api_key,
+        temperature=question.temperature,
+        max_tokens=question.max_tokens,
+        top_p=question.top_p,
+        request_limit=True,
+        rpm=RPM(question.rpm),
+        tpm=TPM(question.tpm),
+        tokenizer=tokenizer_instance,
+        extra_request_params=question.request_params,
+    )
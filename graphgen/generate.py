@@ -70,16 +70,19 @@ def main():
     from graphgen.configs.llm_config import (
         apply_apis_to_environ,
         build_llm_clients,
+        build_question_client,
         load_llm_config,
     )
 
     llm_config = load_llm_config(config)
     apply_apis_to_environ(llm_config.apis)
     tokenizer_instance, synthesizer_client, trainee_client = build_llm_clients(llm_config)
+    question_client = build_question_client(llm_config, tokenizer_instance)
     logger.info(
-        "LLM config: synthesizer=%s, trainee=%s, tokenizer=%s",
+        "LLM config: synthesizer=%s, trainee=%s, question=%s, tokenizer=%s",
         llm_config.synthesizer.redacted(),
         llm_config.trainee.redacted() if trainee_client else None,
+        llm_config.question.redacted() if question_client else None,
         llm_config.tokenizer_model,
     )
 
@@ -89,6 +92,7 @@ def main():
         tokenizer_instance=tokenizer_instance,
         synthesizer_llm_client=synthesizer_client,
         trainee_llm_client=trainee_client,
+        question_llm_client=question_client,
     )
 
     graph_gen.insert(read_config=config["read"], split_config=config["split"])
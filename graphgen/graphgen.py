@@ -2,22 +2,26 @@ import asyncio
 import os
 import time
 from dataclasses import dataclass
-from typing import Dict, Optional, Any, cast
+from typing import Callable, Dict, List, Optional, Any, cast
 
 from graphgen.bases.base_storage import StorageNameSpace
 from graphgen.bases.datatypes import Chunk
 from graphgen.models import (
     JsonKVStorage,
     JsonListStorage,
+    LightRAGKGBuilder,
     NetworkXStorage,
     OpenAIClient,
     Tokenizer,
 )
 from graphgen.operators import (
+    QAContextTable,
+    QAResultSink,
     build_mm_kg,
     build_text_kg,
     build_text_kg_with_prompt_merging,
     chunk_documents,
+    estimate_required_batches,
     generate_qas,
     judge_statement,
     partition_kg,
@@ -25,6 +29,7 @@ from graphgen.operators import (
     read_files,
     search_all,
 )
+from graphgen.operators.build_kg.provenance import retract_chunks
 from graphgen.utils import async_to_sync_method, compute_mm_hash, logger
 
 sys_path = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
@@ -39,9 +44,13 @@ class GraphGen:
     tokenizer_instance: Tokenizer = None
     synthesizer_llm_client: OpenAIClient = None
     trainee_llm_client: OpenAIClient = None
+    # atomic 问题阶段使用的较便宜模型（可选），答案仍由 synthesizer 生成
+    question_llm_client: Optional[OpenAIClient] = None
 
     # webui
     progress_bar: Optional[Any] = None
+    # 生成过程中已写入的 QA 计数（模式 -> 条目数），供后端进度接口实时展示
+    on_qa_progress: Optional[Callable[[Dict[str, int]], None]] = None
 
     def __post_init__(self):
         # 默认附加请求参数（如关闭混合推理模型的思考），与 llm_config 服务端默认一致
@@ -72,6 +81,15 @@ class GraphGen:
             extra_request_params=_default_request_params,
         )
 
+        if self.question_llm_client is None and os.getenv("QUESTION_MODEL"):
+            self.question_llm_client = OpenAIClient(
+                model_name=os.getenv("QUESTION_MODEL"),
+                api_key=os.getenv("QUESTION_API_KEY") or os.getenv("SYNTHESIZER_API_KEY"),
+                base_url=os.getenv("QUESTION_BASE_URL") or os.getenv("SYNTHESIZER_BASE_URL"),
+                tokenizer=self.tokenizer_instance,
+                extra_request_params=_default_request_params,
+            )
+
         self.full_docs_storage: JsonKVStorage = JsonKVStorage(
             self.working_dir, namespace="full_docs"
         )
@@ -91,10 +109,38 @@ class GraphGen:
             os.path.join(self.working_dir, "data", "graphgen", f"{self.unique_id}"),
             namespace="qa",
         )
+        # 紧凑输出（output_schema: compact）时 QA 引用的上下文附表
+        self.qa_context_path = os.path.join(
+            self.working_dir, "data", "graphgen", f"{self.unique_id}", "qa_context.jsonl"
+        )
+        # 已生成过的批次指纹（批次 + 模式 + 模板配置），重复运行时跳过这些批次
+        self.batch_fingerprint_storage: JsonKVStorage = JsonKVStorage(
+            os.path.join(self.working_dir, "data", "graphgen", f"{self.unique_id}"),
+            namespace="batch_fingerprints",
+        )
+        # 生成中的 QA 逐批次追加到 JSONL，生成结束后再提交到 qa_storage
+        self.qa_sink_path = os.path.join(
+            self.working_dir, "data", "graphgen", f"{self.unique_id}", "qa.jsonl"
+        )
         # Cache storage for extraction results (optimization)
         self.extraction_cache_storage: JsonKVStorage = JsonKVStorage(
             self.working_dir, namespace="extraction_cache"
         )
+        # Provenance index: chunk_id -> extracted records, doc_id -> chunk_ids
+        self.chunk_provenance_storage: JsonKVStorage = JsonKVStorage(
+            self.working_dir, namespace="chunk_provenance"
+        )
+        self.doc_provenance_storage: JsonKVStorage = JsonKVStorage(
+            self.working_dir, namespace="doc_provenance"
+        )
+        # Partition cache keyed by graph fingerprint + partition config
+        self.partition_cache_storage: JsonKVStorage = JsonKVStorage(
+            self.working_dir, namespace="partition_cache"
+        )
+        # Token lengths of node/edge descriptions, keyed by tokenizer + description hash
+        self.token_length_storage: JsonKVStorage = JsonKVStorage(
+            self.working_dir, namespace="token_length_cache"
+        )
 
     @async_to_sync_method
     async def insert(self, read_config: Dict, split_config: Dict):
@@ -112,12 +158,19 @@ class GraphGen:
         # TODO: configurable whether to use coreference resolution
 
         new_docs = {compute_mm_hash(doc, prefix="doc-"): doc for doc in data}
+        await self._insert_documents(new_docs, split_config)
+
+    async def _insert_documents(self, new_docs: Dict[str, dict], split_config: Dict):
+        """
+        insert documents (doc_id -> doc) that are not yet in the storage
+        """
         _add_doc_keys = await self.full_docs_storage.filter_keys(list(new_docs.keys()))
         new_docs = {k: v for k, v in new_docs.items() if k in _add_doc_keys}
         new_text_docs = {k: v for k, v in new_docs.items() if v.get("type") == "text"}
         new_mm_docs = {k: v for k, v in new_docs.items() if v.get("type") != "text"}
 
         await self.full_docs_storage.upsert(new_docs)
+        doc_chunk_index: Dict[str, List[str]] = {}
 
         async def _insert_text_docs(text_docs):
             if len(text_docs) == 0:
@@ -132,6 +185,8 @@ class GraphGen:
                 self.tokenizer_instance,
                 self.progress_bar,
                 dynamic_chunk_size=split_config.get("dynamic_chunk_size", False),
+                doc_chunk_index=doc_chunk_index,
+                num_workers=split_config.get("chunk_workers", 1),
             )
 
             _add_chunk_keys = await self.chunks_storage.filter_keys(
@@ -159,8 +214,7 @@ class GraphGen:
                     llm_client=self.synthesizer_llm_client,
                     kg_instance=self.graph_storage,
                     chunks=[
-                        Chunk(id=k, content=v["content"], type="text")
-                        for k, v in inserting_chunks.items()
+                        Chunk.from_dict(k, v) for k, v in inserting_chunks.items()
                     ],
                     progress_bar=self.progress_bar,
                     cache_storage=self.extraction_cache_storage,
@@ -170,6 +224,7 @@ class GraphGen:
                     max_wait_time=split_config.get("max_wait_time", 1.0),
                     enable_prompt_merging=True,
                     prompt_merge_size=split_config.get("prompt_merge_size", 5),
+                    provenance_storage=self.chunk_provenance_storage,
                 )
             else:
                 # 使用原始版本
@@ -177,8 +232,7 @@ class GraphGen:
                     llm_client=self.synthesizer_llm_client,
                     kg_instance=self.graph_storage,
                     chunks=[
-                        Chunk(id=k, content=v["content"], type="text")
-                        for k, v in inserting_chunks.items()
+                        Chunk.from_dict(k, v) for k, v in inserting_chunks.items()
                 ],
                 progress_bar=self.progress_bar,
                 cache_storage=self.extraction_cache_storage,
@@ -186,6 +240,7 @@ class GraphGen:
                 enable_batch_requests=split_config.get("enable_batch_requests", True),
                 batch_size=split_config.get("batch_size", 10),
                 max_wait_time=split_config.get("max_wait_time", 0.5),
+                provenance_storage=self.chunk_provenance_storage,
             )
             if not _add_entities_and_relations:
                 logger.warning("No entities or relations extracted from text chunks")
@@ -209,6 +264,8 @@ class GraphGen:
                 self.tokenizer_instance,
                 self.progress_bar,
                 dynamic_chunk_size=split_config.get("dynamic_chunk_size", False),
+                doc_chunk_index=doc_chunk_index,
+                num_workers=split_config.get("chunk_workers", 1),
             )
 
             _add_chunk_keys = await self.chunks_storage.filter_keys(
@@ -239,6 +296,7 @@ class GraphGen:
                 enable_batch_requests=split_config.get("enable_batch_requests", True),
                 batch_size=split_config.get("batch_size", 10),
                 max_wait_time=split_config.get("max_wait_time", 0.5),
+                provenance_storage=self.chunk_provenance_storage,
             )
             if not _add_entities_and_relations:
                 logger.warning(
@@ -253,6 +311,93 @@ class GraphGen:
         # Step 3: Insert multi-modal documents
         await _insert_multi_modal_docs(new_mm_docs)
 
+        # doc_id -> chunk_ids，包括已存在于存储中的共享 chunk
+        await self.doc_provenance_storage.update(
+            {k: {"chunk_ids": v} for k, v in doc_chunk_index.items()}
+        )
+        await self.doc_provenance_storage.index_done_callback()
+
+    @async_to_sync_method
+    async def delete_documents(self, doc_ids: List[str]):
+        """
+        delete documents and retract their mentions from the graph
+
+        只撤回不再被其他文档引用的 chunk；受影响的实体/关系按剩余提及重新合并，
+        无需 clear() 后全量重建。
+        """
+        return await self._retract_documents(doc_ids)
+
+    @async_to_sync_method
+    async def update_documents(self, updates: Dict[str, dict], split_config: Dict):
+        """
+        replace documents in place: {old_doc_id: new_doc}
+
+        新文档先按常规流程插入（与旧文档相同的 chunk 内容哈希一致，会被 filter_keys 过滤，
+        不会重复抽取），再撤回旧文档中不再被引用的 chunk。
+        """
+        new_docs = {}
+        stale_doc_ids = []
+        for old_doc_id, doc in updates.items():
+            new_doc_id = compute_mm_hash(doc, prefix="doc-")
+            if new_doc_id == old_doc_id:
+                continue
+            new_docs[new_doc_id] = doc
+            stale_doc_ids.append(old_doc_id)
+        if not new_docs:
+            logger.info("[Update Docs] No document content changed")
+            return None
+
+        logger.info("[Update Docs] updating %d docs", len(new_docs))
+        await self._insert_documents(new_docs, split_config)
+        return await self._retract_documents(stale_doc_ids)
+
+    async def _retract_documents(self, doc_ids: List[str]):
+        doc_ids = list(doc_ids)
+        entries = await self.doc_provenance_storage.get_by_ids(doc_ids)
+        candidate_chunks = set()
+        legacy_docs = set()
+        for doc_id, entry in zip(doc_ids, entries):
+            if entry is None:
+                legacy_docs.add(doc_id)
+            else:
+                candidate_chunks.update(entry["chunk_ids"])
+        if legacy_docs:
+            # 旧缓存没有 doc 溯源：按 chunk 的 full_doc_id 回查
+            logger.warning(
+                "[Delete Docs] %d docs have no provenance record, scanning chunks",
+                len(legacy_docs),
+            )
+            for chunk_id, chunk in self.chunks_storage.data.items():
+                if chunk.get("full_doc_id") in legacy_docs:
+                    candidate_chunks.add(chunk_id)
+
+        # 仍被其他文档引用的 chunk 保留
+        removing = set(doc_ids)
+        for doc_id, entry in self.doc_provenance_storage.data.items():
+            if doc_id not in removing:
+                candidate_chunks.difference_update(entry["chunk_ids"])
+        stale_chunks = sorted(candidate_chunks)
+
+        kg_builder = LightRAGKGBuilder(
+            llm_client=self.synthesizer_llm_client,
+            enable_cache=False,
+            enable_batch_requests=False,
+        )
+        stats = await retract_chunks(
+            stale_chunks,
+            self.graph_storage,
+            self.chunk_provenance_storage,
+            kg_builder,
+        )
+        await self.chunks_storage.delete(stale_chunks)
+        await self.full_docs_storage.delete(doc_ids)
+        await self.doc_provenance_storage.delete(doc_ids)
+        await self._insert_done()
+        logger.info(
+            "[Delete Docs] removed %d docs, %d chunks", len(doc_ids), len(stale_chunks)
+        )
+        return stats
+
     async def _insert_done(self):
         tasks = []
         for storage_instance in [
@@ -260,6 +405,8 @@ class GraphGen:
             self.chunks_storage,
             self.graph_storage,
             self.search_storage,
+            self.chunk_provenance_storage,
+            self.doc_provenance_storage,
         ]:
             if storage_instance is None:
                 continue
@@ -336,31 +483,70 @@ class GraphGen:
     @async_to_sync_method
     async def generate(self, partition_config: Dict, generate_config: Dict):
         # Step 1: partition the graph
+        # 按目标 QA 数与模式产出估算所需批次数，coverage 分区据此生成足够的社区
+        try:
+            target_qa_pairs = int(generate_config.get("target_qa_pairs") or 0)
+        except (TypeError, ValueError):
+            target_qa_pairs = 0
+        target_batches = None
+        if target_qa_pairs > 0:
+            target_batches = estimate_required_batches(
+                generate_config["mode"], target_qa_pairs
+            )[0]
         batches = await partition_kg(
             self.graph_storage,
             self.chunks_storage,
             self.tokenizer_instance,
             partition_config,
+            partition_cache=self.partition_cache_storage,
+            length_cache=self.token_length_storage,
+            target_batches=target_batches,
         )
+        await self.partition_cache_storage.index_done_callback()
 
         # Step 2： generate QA pairs
-        results = await generate_qas(
-            self.synthesizer_llm_client,
-            batches,
-            generate_config,
-            progress_bar=self.progress_bar,
-            chunks_storage=self.chunks_storage,
-            full_docs_storage=self.full_docs_storage,
-            qa_storage=self.qa_storage,
+        # 上次运行中断时留在 JSONL 中的结果先提交，之后的去重也会把它们计入
+        sink = QAResultSink(self.qa_sink_path, on_progress=self.on_qa_progress)
+        recovered = await self._commit_qa_sink(sink)
+        if recovered:
+            logger.info("Recovered %d QA pairs from an interrupted run", recovered)
+
+        context_table = (
+            QAContextTable(self.qa_context_path)
+            if generate_config.get("output_schema", "inline") == "compact"
+            else None
         )
+        try:
+            await generate_qas(
+                self.synthesizer_llm_client,
+                batches,
+                generate_config,
+                progress_bar=self.progress_bar,
+                chunks_storage=self.chunks_storage,
+                full_docs_storage=self.full_docs_storage,
+                qa_storage=self.qa_storage,
+                sink=sink,
+                fingerprint_storage=self.batch_fingerprint_storage,
+                context_table=context_table,
+                question_llm_client=self.question_llm_client,
+            )
+        finally:
+            sink.close()
+            if context_table is not None:
+                context_table.close()
 
-        if not results:
+        # Step 3: store the generated QA pairs
+        if not await self._commit_qa_sink(sink):
             logger.warning("No QA pairs generated")
-            return
 
-        # Step 3: store the generated QA pairs
-        await self.qa_storage.upsert(results)
-        await self.qa_storage.index_done_callback()
+    async def _commit_qa_sink(self, sink: QAResultSink) -> int:
+        """把 sink 文件中的 QA 写入 qa_storage 并删除文件，返回提交的条数"""
+        results = list(sink.iter_items())
+        if results:
+            await self.qa_storage.upsert(results)
+            await self.qa_storage.index_done_callback()
+        sink.clear()
+        return len(results)
 
     @async_to_sync_method
     async def generate_evaluation(self, partition_config: Dict, evaluation_config: Dict):
@@ -385,11 +571,15 @@ class GraphGen:
             self.chunks_storage,
             self.tokenizer_instance,
             partition_config,
+            partition_cache=self.partition_cache_storage,
+            length_cache=self.token_length_storage,
         )
+        await self.partition_cache_storage.index_done_callback()
         
         if not batches:
             logger.warning("No batches generated for evaluation")
             return
+        batches = await batches.to_list()
         
         logger.info(f"Generated {len(batches)} batches for evaluation")
         
@@ -448,6 +638,12 @@ class GraphGen:
         await self.graph_storage.clear()
         await self.rephrase_storage.drop()
         await self.qa_storage.drop()
+        QAResultSink(self.qa_sink_path).clear()
+        QAContextTable(self.qa_context_path).clear()
+        await self.batch_fingerprint_storage.drop()
+        await self.batch_fingerprint_storage.index_done_callback()
         await self.extraction_cache_storage.drop()
+        await self.chunk_provenance_storage.drop()
+        await self.doc_provenance_storage.drop()
 
         logger.info("All caches are cleared")
@@ -13,12 +13,16 @@ from .graph_adapter import IntentGraphLinker, NetworkXGraphAdapter
 from .kg_builder import LightRAGKGBuilder, MMKGBuilder
 from .llm.batch_llm_wrapper import BatchLLMWrapper
 from .llm.openai_client import OpenAIClient
+from .llm.packed_llm_wrapper import PackedLLMWrapper
 from .llm.topk_token_model import TopkTokenModel
 from .partitioner import (
     AnchorBFSPartitioner,
     BFSPartitioner,
+    ComponentShardedPartitioner,
+    CoveragePartitioner,
     DFSPartitioner,
     ECEPartitioner,
+    GraphSnapshot,
     HierarchicalPartitioner,
     LeidenPartitioner,
 )
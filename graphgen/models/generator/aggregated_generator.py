@@ -46,27 +46,15 @@ class AggregatedGenerator(BaseGenerator):
         :param batch
         :return:
         """
-        nodes, edges = batch
-        entities_str = "\n".join(
-            [
-                f"{index + 1}. {node[0]}: {node[1]['description']}"
-                for index, node in enumerate(nodes)
-            ]
-        )
-        relations_str = "\n".join(
-            [
-                f"{index + 1}. {edge[0]} -- {edge[1]}: {edge[2]['description']}"
-                for index, edge in enumerate(edges)
-            ]
-        )
+        entities_str, relations_str, detected_language = self.format_entities_relations(batch)
         # 如果 chinese_only=True，强制使用中文
         if self.chinese_only:
             language = "zh"
         else:
-            language = detect_main_language(entities_str + relations_str)
+            language = detected_language
 
         # Serialize hierarchical context
-        hierarchical_context = self.hierarchy_serializer.serialize(nodes, edges, structure_format="markdown", require_hierarchy=True)
+        hierarchical_context = self.serialize_hierarchy(batch, require_hierarchy=True)
 
         # TODO: configure add_context
         #     if add_context:
@@ -134,23 +122,10 @@ class AggregatedGenerator(BaseGenerator):
         """
         构建合并模式的提示词（一次性生成重述文本和问题）
         """
-        nodes, edges = batch
-        entities_str = "\n".join(
-            [
-                f"{index + 1}. {node[0]}: {node[1]['description']}"
-                for index, node in enumerate(nodes)
-            ]
-        )
-        relations_str = "\n".join(
-            [
-                f"{index + 1}. {edge[0]} -- {edge[1]}: {edge[2]['description']}"
-                for index, edge in enumerate(edges)
-            ]
-        )
-        language = detect_main_language(entities_str + relations_str)
+        entities_str, relations_str, language = self.format_entities_relations(batch)
         
         # Serialize hierarchical context
-        hierarchical_context = self.hierarchy_serializer.serialize(nodes, edges, structure_format="markdown", require_hierarchy=True)
+        hierarchical_context = self.serialize_hierarchy(batch, require_hierarchy=True)
         
         try:
             prompt = AGGREGATED_GENERATION_PROMPT[language]["AGGREGATED_COMBINED"].format(
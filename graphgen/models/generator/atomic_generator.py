@@ -221,11 +221,10 @@ class AtomicGenerator(BaseGenerator):
         Build prompt for LLM based on the given batch.
         Supports multi-template sampling for diversity and Chinese-only mode.
         """
-        context, language = self._build_context(batch)
+        context, language = self.cached_context(batch, "atomic", lambda: self._build_context(batch))
         
         # Serialize hierarchical context
-        nodes, edges = batch
-        hierarchical_context = self.hierarchy_serializer.serialize(nodes, edges, structure_format="markdown", require_hierarchy=True)
+        hierarchical_context = self.serialize_hierarchy(batch, require_hierarchy=True)
 
         # Use Chinese-only templates if enabled
         if self.chinese_only:
@@ -398,13 +397,11 @@ class AtomicQuestionGenerator(AtomicGenerator):
         self,
         batch: tuple[list[tuple[str, dict]], list[tuple[Any, Any, dict]]]
     ) -> str:
-        context, language = self._build_context(batch)
+        # 与答案阶段共享同一份缓存的上下文
+        context, language = self.cached_context(batch, "atomic", lambda: self._build_context(batch))
 
         # Serialize hierarchical context (inherited from AtomicGenerator)
-        nodes, edges = batch
-        hierarchical_context = self.hierarchy_serializer.serialize(
-            nodes, edges, structure_format="markdown", require_hierarchy=True
-        )
+        hierarchical_context = self.serialize_hierarchy(batch, require_hierarchy=True)
 
         # Use Chinese-only templates if enabled
         if self.chinese_only:
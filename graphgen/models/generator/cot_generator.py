@@ -2,7 +2,7 @@ from typing import Any, Optional
 
 from graphgen.bases import BaseGenerator
 from graphgen.templates import COT_GENERATION_PROMPT
-from graphgen.utils import compute_content_hash, detect_main_language, logger
+from graphgen.utils import compute_content_hash, logger
 from graphgen.utils.hierarchy_utils import HierarchySerializer
 
 
@@ -37,27 +37,15 @@ class CoTGenerator(BaseGenerator):
         :param batch:
         :return:
         """
-        nodes, edges = batch
-        entities_str = "\n".join(
-            [
-                f"{index + 1}. {node[0]}: {node[1]['description']}"
-                for index, node in enumerate(nodes)
-            ]
-        )
-        relationships_str = "\n".join(
-            [
-                f"{index + 1}. {edge[0]} -- {edge[1]}: {edge[2]['description']}"
-                for index, edge in enumerate(edges)
-            ]
-        )
+        entities_str, relationships_str, detected_language = self.format_entities_relations(batch)
         # 如果 chinese_only=True，强制使用中文
         if self.chinese_only:
             language = "zh"
         else:
-            language = detect_main_language(entities_str + relationships_str)
+            language = detected_language
             
         # Serialize hierarchical context
-        hierarchical_context = self.hierarchy_serializer.serialize(nodes, edges, structure_format="markdown", require_hierarchy=True)
+        hierarchical_context = self.serialize_hierarchy(batch, require_hierarchy=True)
         
         try:
             prompt = COT_GENERATION_PROMPT[language]["COT_TEMPLATE_DESIGN"].format(
@@ -77,27 +65,15 @@ class CoTGenerator(BaseGenerator):
         """
         构建合并模式的提示词（一次性生成问题和答案）
         """
-        nodes, edges = batch
-        entities_str = "\n".join(
-            [
-                f"{index + 1}. {node[0]}: {node[1]['description']}"
-                for index, node in enumerate(nodes)
-            ]
-        )
-        relationships_str = "\n".join(
-            [
-                f"{index + 1}. {edge[0]} -- {edge[1]}: {edge[2]['description']}"
-                for index, edge in enumerate(edges)
-            ]
-        )
+        entities_str, relationships_str, detected_language = self.format_entities_relations(batch)
         # 如果 chinese_only=True，强制使用中文
         if self.chinese_only:
             language = "zh"
         else:
-            language = detect_main_language(entities_str + relationships_str)
+            language = detected_language
             
         # Serialize hierarchical context
-        hierarchical_context = self.hierarchy_serializer.serialize(nodes, edges, structure_format="markdown", require_hierarchy=True)
+        hierarchical_context = self.serialize_hierarchy(batch, require_hierarchy=True)
         
         try:
             prompt = COT_GENERATION_PROMPT[language]["COT_COMBINED"].format(
@@ -308,27 +284,15 @@ class CoTGenerator(BaseGenerator):
         """
         Build prompts for COT Generation.
         """
-        nodes, edges = batch
-        entities_str = "\n".join(
-            [
-                f"{index + 1}. {node[0]}: {node[1]['description']}"
-                for index, node in enumerate(nodes)
-            ]
-        )
-        relationships_str = "\n".join(
-            [
-                f"{index + 1}. {edge[0]} -- {edge[1]}: {edge[2]['description']}"
-                for index, edge in enumerate(edges)
-            ]
-        )
+        entities_str, relationships_str, detected_language = self.format_entities_relations(batch)
         # 如果 chinese_only=True，强制使用中文
         if self.chinese_only:
             language = "zh"
         else:
-            language = detect_main_language(entities_str + relationships_str)
+            language = detected_language
             
         # Serialize hierarchical context
-        hierarchical_context = self.hierarchy_serializer.serialize(nodes, edges, structure_format="markdown", require_hierarchy=True)
+        hierarchical_context = self.serialize_hierarchy(batch, require_hierarchy=True)
         
         try:
             prompt = COT_GENERATION_PROMPT[language]["COT_GENERATION"].format(
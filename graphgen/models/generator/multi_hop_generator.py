@@ -3,7 +3,7 @@ from typing import Any
 
 from graphgen.bases import BaseGenerator
 from graphgen.templates import MULTI_HOP_GENERATION_PROMPT
-from graphgen.utils import compute_content_hash, detect_main_language, logger
+from graphgen.utils import compute_content_hash, logger
 
 
 class MultiHopGenerator(BaseGenerator):
@@ -18,32 +18,6 @@ class MultiHopGenerator(BaseGenerator):
         self.chinese_only = chinese_only
         self._generation_mode = "multi_hop"
     
-    @staticmethod
-    def _format_batch_data(
-        batch: tuple[list[tuple[str, dict]], list[tuple[Any, Any, dict]]]
-    ) -> tuple[str, str, str]:
-        """
-        格式化批次数据为实体和关系字符串，并检测语言
-        
-        :param batch: 包含节点和边的批次数据
-        :return: (entities_str, relationships_str, language)
-        """
-        nodes, edges = batch
-        entities_str = "\n".join(
-            [
-                f"{index + 1}. {node[0]}: {node[1]['description']}"
-                for index, node in enumerate(nodes)
-            ]
-        )
-        relationships_str = "\n".join(
-            [
-                f"{index + 1}. {edge[0]} -- {edge[1]}: {edge[2]['description']}"
-                for index, edge in enumerate(edges)
-            ]
-        )
-        language = detect_main_language(entities_str + relationships_str)
-        return entities_str, relationships_str, language
-    
     def build_prompt(
         self,
         batch: tuple[list[tuple[str, dict]], list[tuple[Any, Any, dict]]]
@@ -53,7 +27,7 @@ class MultiHopGenerator(BaseGenerator):
         :param batch: tuple of (nodes, edges)
         :return: formatted prompt string
         """
-        entities_str, relationships_str, language = self._format_batch_data(batch)
+        entities_str, relationships_str, language = self.format_entities_relations(batch)
         # 如果 chinese_only=True，强制使用中文
         if self.chinese_only:
             language = "zh"
@@ -60,12 +60,7 @@ class TreeStructureGenerator(BaseGenerator):
         :return: Formatted prompt string
         """
         # Build hierarchical structure using shared serializer
-        nodes, edges = batch
-        hierarchy_text = self.hierarchy_serializer.serialize(
-            nodes, 
-            edges, 
-            structure_format=self.structure_format
-        )
+        hierarchy_text = self.serialize_hierarchy(batch, structure_format=self.structure_format)
 
         # Detect language
         language = "zh" if self.chinese_only else detect_main_language(hierarchy_text)
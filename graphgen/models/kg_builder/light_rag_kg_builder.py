@@ -1,20 +1,21 @@
-import re
-from collections import Counter, defaultdict
+from collections import Counter
 from typing import Dict, List, Optional, Tuple
 
 from graphgen.bases import BaseGraphStorage, BaseKGBuilder, BaseKVStorage, BaseLLMClient, Chunk
 from graphgen.templates import KG_EXTRACTION_PROMPT, KG_SUMMARIZATION_PROMPT
 from graphgen.utils import (
+    KGRecordParser,
+    chunk_language,
     compute_content_hash,
     detect_main_language,
-    handle_single_entity_extraction,
-    handle_single_relationship_extraction,
     logger,
     pack_history_conversations,
     split_string_by_multi_markers,
 )
 from graphgen.utils.batch_request_manager import BatchRequestManager
 
+_KG_RECORD_PARSER = KGRecordParser.from_format(KG_EXTRACTION_PROMPT["FORMAT"])
+
 
 class LightRAGKGBuilder(BaseKGBuilder):
     def __init__(
@@ -62,7 +63,7 @@ class LightRAGKGBuilder(BaseKGBuilder):
                 return cached_result["nodes"], cached_result["edges"]
 
         # step 1: language_detection
-        language = detect_main_language(content)
+        language = chunk_language(chunk)
 
         hint_prompt = KG_EXTRACTION_PROMPT[language]["TEMPLATE"].format(
             **KG_EXTRACTION_PROMPT["FORMAT"], input_text=content
@@ -109,40 +110,9 @@ class LightRAGKGBuilder(BaseKGBuilder):
             len(final_result), len(repaired_result)
         )
         
-        records = split_string_by_multi_markers(
-            repaired_result,
-            [
-                KG_EXTRACTION_PROMPT["FORMAT"]["record_delimiter"],
-                KG_EXTRACTION_PROMPT["FORMAT"]["completion_delimiter"],
-            ],
-        )
-
-        nodes = defaultdict(list)
-        edges = defaultdict(list)
-
-        for record in records:
-            # 非贪婪匹配：贪婪的 \((.*)\) 在描述里含多个括号时会
-            # 从第一个 "(" 吃到最后一个 ")"，导致解析错位
-            match = re.search(r"\((.*?)\)", record, re.DOTALL)
-            if not match:
-                continue
-            inner = match.group(1)
-
-            attributes = split_string_by_multi_markers(
-                inner, [KG_EXTRACTION_PROMPT["FORMAT"]["tuple_delimiter"]]
-            )
-
-            entity = await handle_single_entity_extraction(attributes, chunk_id)
-            if entity is not None:
-                nodes[entity["entity_name"]].append(entity)
-                continue
-
-            relation = await handle_single_relationship_extraction(attributes, chunk_id)
-            if relation is not None:
-                key = (relation["src_id"], relation["tgt_id"])
-                edges[key].append(relation)
-
-        result = (dict(nodes), dict(edges))
+        records = _KG_RECORD_PARSER.split_records(repaired_result)
+        nodes, edges = _KG_RECORD_PARSER.parse_records(records, chunk_id)
+        result = (nodes, edges)
 
         # Cache the result if enabled — 但空结果不缓存：
         # 解析失败产生的空结果一旦入缓存，重跑也只会拿到空结果（缓存投毒）
@@ -1,19 +1,14 @@
-import re
 from collections import defaultdict
 from typing import Dict, List, Tuple
 
 from graphgen.bases import Chunk
 from graphgen.templates import MMKG_EXTRACTION_PROMPT
-from graphgen.utils import (
-    detect_main_language,
-    handle_single_entity_extraction,
-    handle_single_relationship_extraction,
-    logger,
-    split_string_by_multi_markers,
-)
+from graphgen.utils import KGRecordParser, detect_main_language, logger
 
 from .light_rag_kg_builder import LightRAGKGBuilder
 
+_MMKG_RECORD_PARSER = KGRecordParser.from_format(MMKG_EXTRACTION_PROMPT["FORMAT"])
+
 
 class MMKGBuilder(LightRAGKGBuilder):
     async def extract(
@@ -51,40 +46,7 @@ class MMKGBuilder(LightRAGKGBuilder):
             logger.debug("Image chunk extraction result: %s", result)
 
             # parse the result
-            records = split_string_by_multi_markers(
-                result,
-                [
-                    MMKG_EXTRACTION_PROMPT["FORMAT"]["record_delimiter"],
-                    MMKG_EXTRACTION_PROMPT["FORMAT"]["completion_delimiter"],
-                ],
-            )
-
-            nodes = defaultdict(list)
-            edges = defaultdict(list)
-
-            for record in records:
-                match = re.search(r"\((.*)\)", record)
-                if not match:
-                    continue
-                inner = match.group(1)
-
-                attributes = split_string_by_multi_markers(
-                    inner, [MMKG_EXTRACTION_PROMPT["FORMAT"]["tuple_delimiter"]]
-                )
-
-                entity = await handle_single_entity_extraction(attributes, chunk_id)
-                if entity is not None:
-                    nodes[entity["entity_name"]].append(entity)
-                    continue
-
-                relation = await handle_single_relationship_extraction(
-                    attributes, chunk_id
-                )
-                if relation is not None:
-                    key = (relation["src_id"], relation["tgt_id"])
-                    edges[key].append(relation)
-
-            return dict(nodes), dict(edges)
+            return _MMKG_RECORD_PARSER.parse(result, chunk_id)
 
         if chunk_type == "table":
             pass  # TODO: implement table-based entity and relationship extraction
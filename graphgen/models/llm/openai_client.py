@@ -11,7 +11,7 @@ from tenacity import (
 )
 
 from graphgen.bases.base_llm_client import BaseLLMClient
-from graphgen.bases.datatypes import Token
+from graphgen.bases.datatypes import CompletionText, Token
 from graphgen.models.llm.limitter import RPM, TPM
 
 
@@ -231,7 +231,12 @@ class OpenAIClient(BaseLLMClient):
                     "total_tokens": completion.usage.total_tokens,
                 }
             )
-        return self.filter_think_tags(completion.choices[0].message.content)
+        # 携带 finish_reason（"length" 表示输出被 max_tokens 截断），供抽取等调用方检测截断
+        choice = completion.choices[0]
+        return CompletionText(
+            self.filter_think_tags(choice.message.content),
+            finish_reason=getattr(choice, "finish_reason", None),
+        )
 
     # 输出 token 预留估算的初始值与样本数阈值
     _DEFAULT_OUTPUT_RESERVE = 2048
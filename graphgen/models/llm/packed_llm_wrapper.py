@@ -0,0 +1,199 @@
+"""
+打包生成的LLM客户端包装器
+把并发到达的多个独立小 prompt 打包进一次请求，按任务标记拆回各自的结果
+"""
+
+import asyncio
+import re
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from graphgen.bases.base_llm_client import BaseLLMClient
+from graphgen.bases.datatypes import Token
+from graphgen.templates import PACKED_GENERATION_PROMPT
+from graphgen.utils import detect_main_language, logger
+
+_SECTION_RE = re.compile(r"<<<TASK\s*(\d+)\s*>>>(.*?)<<<END\s*\1\s*>>>", re.DOTALL)
+
+
+@dataclass
+class _PackedRequest:
+    prompt: str
+    tokens: int
+    future: asyncio.Future
+
+
+class PackedLLMWrapper(BaseLLMClient):
+    """
+    打包生成包装器
+
+    生成阶段的每个 prompt 只对应一个小社区，请求数随社区数线性增长。本包装器收集
+    max_wait_time 内到达的同语言 prompt，在 max_pack_size 条和 max_pack_tokens 的 prompt
+    token 预算内打包为一次请求；响应按任务标记拆回各自的调用方。某个任务的输出缺失或
+    不完整（如响应被截断）时只对该任务单独重试，整个打包请求失败时全部单独重试。
+    带 history 或额外参数的请求不参与打包。
+    """
+
+    def __init__(
+        self,
+        llm_client: BaseLLMClient,
+        max_pack_size: int = 4,
+        max_pack_tokens: int = 6000,
+        max_wait_time: float = 0.2,
+    ):
+        """
+        :param llm_client: 原始LLM客户端
+        :param max_pack_size: 每次请求最多打包的任务数
+        :param max_pack_tokens: 打包后各任务 prompt 的 token 总数上限；单个 prompt 超过时直接发送
+        :param max_wait_time: 等待凑满一包的最长时间（秒）
+        """
+        super().__init__(
+            system_prompt=llm_client.system_prompt,
+            temperature=llm_client.temperature,
+            max_tokens=llm_client.max_tokens,
+            repetition_penalty=llm_client.repetition_penalty,
+            top_p=llm_client.top_p,
+            top_k=llm_client.top_k,
+            tokenizer=llm_client.tokenizer,
+            extra_request_params=getattr(llm_client, "extra_request_params", None),
+        )
+        self.llm_client = llm_client
+        self.max_pack_size = max_pack_size
+        self.max_pack_tokens = max_pack_tokens
+        self.max_wait_time = max_wait_time
+        self.stats = {"requests": 0, "calls": 0, "packed_calls": 0, "retried": 0}
+        self._queues: Dict[str, List[_PackedRequest]] = defaultdict(list)
+        self._sending: set[asyncio.Task] = set()
+
+    async def generate_answer(
+        self, text: str, history: Optional[List[str]] = None, **extra: Any
+    ) -> str:
+        self.stats["requests"] += 1
+        tokens = self._count_tokens(text)
+        if history or extra or self.max_pack_size <= 1 or tokens >= self.max_pack_tokens:
+            self.stats["calls"] += 1
+            return await self.llm_client.generate_answer(text, history, **extra)
+
+        language = detect_main_language(text)
+        queue = self._queues[language]
+        # 加入后会超出 token 预算时，先把已排队的请求发出
+        if queue and sum(request.tokens for request in queue) + tokens > self.max_pack_tokens:
+            self._dispatch(language)
+            queue = self._queues[language]
+        future = asyncio.get_running_loop().create_future()
+        queue.append(_PackedRequest(prompt=text, tokens=tokens, future=future))
+        if len(queue) >= self.max_pack_size:
+            self._dispatch(language)
+        elif len(queue) == 1:
+            self._track(asyncio.create_task(self._timer(language, queue)))
+        return await future
+
+    @staticmethod
+    def build_packed_prompt(prompts: List[str], language: str = "en") -> str:
+        template = PACKED_GENERATION_PROMPT.get(language, PACKED_GENERATION_PROMPT["en"])
+        parts = [template["HEADER"].format(count=len(prompts))]
+        parts.extend(
+            template["TASK"].format(index=index, prompt=prompt)
+            for index, prompt in enumerate(prompts, start=1)
+        )
+        return "".join(parts)
+
+    @staticmethod
+    def split_packed_response(response: str, count: int) -> List[str]:
+        """按任务标记拆分响应；缺失或没有结束标记（被截断）的任务为空字符串"""
+        sections = [""] * count
+        for match in _SECTION_RE.finditer(response or ""):
+            index = int(match.group(1)) - 1
+            if 0 <= index < count and not sections[index]:
+                sections[index] = match.group(2).strip()
+        return sections
+
+    async def flush(self):
+        """发出所有排队中的请求并等待完成"""
+        for language in list(self._queues):
+            self._dispatch(language)
+        while self._sending:
+            await asyncio.gather(*list(self._sending), return_exceptions=True)
+        if hasattr(self.llm_client, "flush"):
+            await self.llm_client.flush()
+
+    def _count_tokens(self, text: str) -> int:
+        if self.tokenizer is not None:
+            try:
+                return self.tokenizer.count_tokens(text)
+            except Exception:  # pylint: disable=broad-except
+                pass
+        # 没有 tokenizer 时按字符数保守估计
+        return len(text)
+
+    def _track(self, task: asyncio.Task) -> None:
+        self._sending.add(task)
+        task.add_done_callback(self._sending.discard)
+
+    def _dispatch(self, language: str) -> None:
+        pack = self._queues.pop(language, None)
+        if pack:
+            self._track(asyncio.create_task(self._send(pack, language)))
+
+    async def _timer(self, language: str, queue: List[_PackedRequest]) -> None:
+        await asyncio.sleep(self.max_wait_time)
+        # 队列在等待期间已被发出（凑满或超出预算）时不再处理
+        if self._queues.get(language) is queue:
+            self._dispatch(language)
+
+    async def _send(self, pack: List[_PackedRequest], language: str) -> None:
+        if len(pack) == 1:
+            await self._send_single(pack[0])
+            return
+        self.stats["calls"] += 1
+        self.stats["packed_calls"] += 1
+        prompt = self.build_packed_prompt([request.prompt for request in pack], language)
+        try:
+            response = await self.llm_client.generate_answer(prompt)
+        except Exception as exc:  # pylint: disable=broad-except
+            logger.warning(
+                "Packed request of %d tasks failed, retrying individually: %s", len(pack), exc
+            )
+            response = ""
+        retries = []
+        for request, section in zip(pack, self.split_packed_response(response, len(pack))):
+            if not section:
+                retries.append(request)
+            elif not request.future.done():
+                request.future.set_result(section)
+        if retries:
+            self.stats["retried"] += len(retries)
+            logger.debug(
+                "Packed response missing %d of %d tasks, retrying them individually",
+                len(retries), len(pack),
+            )
+            await asyncio.gather(*(self._send_single(request) for request in retries))
+
+    async def _send_single(self, request: _PackedRequest) -> None:
+        self.stats["calls"] += 1
+        try:
+            result = await self.llm_client.generate_answer(request.prompt)
+        except Exception as exc:  # pylint: disable=broad-except
+            if not request.future.done():
+                request.future.set_exception(exc)
+            return
+        if not request.future.done():
+            request.future.set_result(result)
+
+    async def generate_topk_per_token(
+        self, text: str, history: Optional[List[str]] = None, **extra: Any
+    ) -> List[Token]:
+        """生成top-k tokens（不打包，直接调用）"""
+        return await self.llm_client.generate_topk_per_token(text, history, **extra)
+
+    async def generate_inputs_prob(
+        self, text: str, history: Optional[List[str]] = None, **extra: Any
+    ) -> List[Token]:
+        """生成输入概率（不打包，直接调用）"""
+        return await self.llm_client.generate_inputs_prob(text, history, **extra)
+
+    @property
+    def token_usage(self):
+        """访问原始客户端的token使用量"""
+        return self.llm_client.token_usage
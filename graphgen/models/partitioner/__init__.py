@@ -1,6 +1,9 @@
 from .anchor_bfs_partitioner import AnchorBFSPartitioner
 from .bfs_partitioner import BFSPartitioner
+from .component_partitioner import ComponentShardedPartitioner
+from .coverage_partitioner import CoveragePartitioner
 from .dfs_partitioner import DFSPartitioner
 from .ece_partitioner import ECEPartitioner
+from .graph_snapshot import GraphSnapshot
 from .hierarchical_partitioner import HierarchicalPartitioner
 from .leiden_partitioner import LeidenPartitioner
@@ -1,14 +1,12 @@
 import random
 from collections import deque
-from typing import Any, List, Literal, Set, Tuple
+from typing import Any, List, Literal, Optional, Set
 
 from graphgen.bases import BaseGraphStorage
 from graphgen.bases.datatypes import Community
 
 from .bfs_partitioner import BFSPartitioner
-
-NODE_UNIT: str = "n"
-EDGE_UNIT: str = "e"
+from .graph_snapshot import GraphSnapshot, get_snapshot
 
 
 class AnchorBFSPartitioner(BFSPartitioner):
@@ -34,34 +32,32 @@ class AnchorBFSPartitioner(BFSPartitioner):
         self,
         g: BaseGraphStorage,
         max_units_per_community: int = 1,
+        snapshot: Optional[GraphSnapshot] = None,
         **kwargs: Any,
     ) -> List[Community]:
-        nodes = await g.get_all_nodes()  # List[tuple[id, meta]]
-        edges = await g.get_all_edges()  # List[tuple[u, v, meta]]
-
-        adj, _ = self._build_adjacency_list(nodes, edges)
+        snap = await get_snapshot(g, snapshot)
+        if self.anchor_ids is not None:
+            anchors = self.anchor_ids
+        else:
+            anchors = await self._pick_anchor_ids(await g.get_all_nodes())
 
-        anchors: Set[str] = await self._pick_anchor_ids(nodes)
-        if not anchors:
+        # 按节点顺序排列后再打乱，保证同一随机种子下结果可复现；不在图中的锚点直接忽略
+        seeds = sorted(snap.node_index[a] for a in anchors if a in snap.node_index)
+        if not seeds:
             return []  # if no anchors, return empty list
+        random.shuffle(seeds)
 
-        used_n: set[str] = set()
-        used_e: set[frozenset[str]] = set()
+        used = bytearray(snap.num_units)
         communities: List[Community] = []
 
-        seeds = list(anchors)
-        random.shuffle(seeds)
-
         for seed_node in seeds:
-            if seed_node in used_n:
+            if used[seed_node]:
                 continue
-            comm_n, comm_e = await self._grow_community(
-                seed_node, adj, max_units_per_community, used_n, used_e
+            comm = self._grow_community(
+                seed_node, snap, max_units_per_community, used
             )
-            if comm_n or comm_e:
-                communities.append(
-                    Community(id=len(communities), nodes=comm_n, edges=comm_e)
-                )
+            if comm:
+                communities.append(snap.to_community(len(communities), comm))
 
         return communities
 
@@ -80,49 +76,41 @@ class AnchorBFSPartitioner(BFSPartitioner):
         return anchor_ids
 
     @staticmethod
-    async def _grow_community(
-        seed: str,
-        adj: dict[str, List[str]],
+    def _grow_community(
+        seed: int,
+        snap: GraphSnapshot,
         max_units: int,
-        used_n: set[str],
-        used_e: set[frozenset[str]],
-    ) -> Tuple[List[str], List[Tuple[str, str]]]:
+        used: bytearray,
+    ) -> List[int]:
         """
         Grow a community from the seed node using BFS.
-        :param seed: seed node id
-        :param adj: adjacency list
+        :param seed: seed node index in the snapshot
+        :param snap: graph snapshot
         :param max_units: maximum number of units (nodes + edges) in the community
-        :param used_n: set of used node ids
-        :param used_e: set of used edge keys
-        :return: (list of node ids, list of edge tuples)
+        :param used: visited map over units, updated in place
+        :return: list of unit ids
         """
-        comm_n: List[str] = []
-        comm_e: List[Tuple[str, str]] = []
-        queue: deque[tuple[str, Any]] = deque([(NODE_UNIT, seed)])
-        cnt = 0
-
-        while queue and cnt < max_units:
-            k, it = queue.popleft()
-
-            if k == NODE_UNIT:
-                if it in used_n:
-                    continue
-                used_n.add(it)
-                comm_n.append(it)
-                cnt += 1
-                for nei in adj[it]:
-                    e_key = frozenset((it, nei))
-                    if e_key not in used_e:
-                        queue.append((EDGE_UNIT, e_key))
-            else:  # EDGE_UNIT
-                if it in used_e:
-                    continue
-                used_e.add(it)
-                u, v = it
-                comm_e.append((u, v))
-                cnt += 1
-                for n in it:
-                    if n not in used_n:
-                        queue.append((NODE_UNIT, n))
-
-        return comm_n, comm_e
+        n = snap.num_nodes
+        indptr, _, edge_ids, edge_src, edge_dst = snap.traversal_views()
+        comm: List[int] = []
+        queue: deque[int] = deque([seed])
+
+        while queue and len(comm) < max_units:
+            it = queue.popleft()
+            if used[it]:
+                continue
+            used[it] = 1
+            comm.append(it)
+
+            if it < n:
+                for slot in range(indptr[it], indptr[it + 1]):
+                    e_unit = n + edge_ids[slot]
+                    if not used[e_unit]:
+                        queue.append(e_unit)
+            else:  # edge unit
+                e = it - n
+                for node in (edge_src[e], edge_dst[e]):
+                    if not used[node]:
+                        queue.append(node)
+
+        return comm
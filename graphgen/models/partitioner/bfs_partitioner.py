@@ -1,12 +1,11 @@
 import random
 from collections import deque
-from typing import Any, List
+from typing import Any, List, Optional
 
 from graphgen.bases import BaseGraphStorage, BasePartitioner
 from graphgen.bases.datatypes import Community
 
-NODE_UNIT: str = "n"
-EDGE_UNIT: str = "e"
+from .graph_snapshot import GraphSnapshot, get_snapshot
 
 
 class BFSPartitioner(BasePartitioner):
@@ -21,61 +20,46 @@ class BFSPartitioner(BasePartitioner):
         self,
         g: BaseGraphStorage,
         max_units_per_community: int = 1,
+        snapshot: Optional[GraphSnapshot] = None,
         **kwargs: Any,
     ) -> List[Community]:
-        nodes = await g.get_all_nodes()
-        edges = await g.get_all_edges()
+        snap = await get_snapshot(g, snapshot)
+        n = snap.num_nodes
+        indptr, _, edge_ids, edge_src, edge_dst = snap.traversal_views()
 
-        adj, _ = self._build_adjacency_list(nodes, edges)
-
-        used_n: set[str] = set()
-        used_e: set[frozenset[str]] = set()
+        # unit 编号：节点 i -> i，边 j -> n + j
+        used = bytearray(snap.num_units)
         communities: List[Community] = []
 
-        units = [(NODE_UNIT, n[0]) for n in nodes] + [
-            (EDGE_UNIT, frozenset((u, v))) for u, v, _ in edges
-        ]
+        units = list(range(snap.num_units))
         random.shuffle(units)
 
-        for kind, seed in units:
-            if (kind == NODE_UNIT and seed in used_n) or (
-                kind == EDGE_UNIT and seed in used_e
-            ):
+        for seed in units:
+            if used[seed]:
                 continue
 
-            comm_n: List[str] = []
-            comm_e: List[tuple[str, str]] = []
-            queue: deque[tuple[str, Any]] = deque([(kind, seed)])
-            cnt = 0
+            comm: List[int] = []
+            queue: deque[int] = deque([seed])
 
-            while queue and cnt < max_units_per_community:
-                k, it = queue.popleft()
-                if k == NODE_UNIT:
-                    if it in used_n:
-                        continue
-                    used_n.add(it)
-                    comm_n.append(it)
-                    cnt += 1
-                    for nei in adj[it]:
-                        e_key = frozenset((it, nei))
-                        if e_key not in used_e:
-                            queue.append((EDGE_UNIT, e_key))
+            while queue and len(comm) < max_units_per_community:
+                it = queue.popleft()
+                if used[it]:
+                    continue
+                used[it] = 1
+                comm.append(it)
+                if it < n:
+                    for slot in range(indptr[it], indptr[it + 1]):
+                        e_unit = n + edge_ids[slot]
+                        if not used[e_unit]:
+                            queue.append(e_unit)
                 else:
-                    if it in used_e:
-                        continue
-                    used_e.add(it)
-
-                    u, v = it
-                    comm_e.append((u, v))
-                    cnt += 1
                     # push nodes that are not visited
-                    for n in it:
-                        if n not in used_n:
-                            queue.append((NODE_UNIT, n))
+                    e = it - n
+                    for node in (edge_src[e], edge_dst[e]):
+                        if not used[node]:
+                            queue.append(node)
 
-            if comm_n or comm_e:
-                communities.append(
-                    Community(id=len(communities), nodes=comm_n, edges=comm_e)
-                )
+            if comm:
+                communities.append(snap.to_community(len(communities), comm))
 
         return communities
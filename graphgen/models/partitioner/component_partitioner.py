@@ -0,0 +1,161 @@
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, List, Optional, Tuple
+
+import numpy as np
+
+from graphgen.bases import BaseGraphStorage, BasePartitioner
+from graphgen.bases.datatypes import Community
+from graphgen.utils import logger
+
+from .graph_snapshot import GraphSnapshot
+
+
+class _ShardGraph:
+    """子进程内的只读分片图，只实现分区器用到的读接口"""
+
+    def __init__(
+        self, nodes: List[Tuple[str, dict]], edges: List[Tuple[str, str, dict]]
+    ):
+        self._nodes = nodes
+        self._edges = edges
+
+    async def get_all_nodes(self) -> List[Tuple[str, dict]]:
+        return self._nodes
+
+    async def get_all_edges(self) -> List[Tuple[str, str, dict]]:
+        return self._edges
+
+
+def _partition_shard(
+    partitioner: BasePartitioner,
+    nodes: List[Tuple[str, dict]],
+    edges: List[Tuple[str, str, dict]],
+    params: dict,
+) -> List[Community]:
+    """在子进程中对单个分片运行被包装的分区器"""
+    return asyncio.run(partitioner.partition(_ShardGraph(nodes, edges), **params))
+
+
+class ComponentShardedPartitioner(BasePartitioner):
+    """
+    Component-sharded partition driver that runs another partitioner in a process pool.
+    1. Compute the connected components of the graph once.
+    2. Pack small components into shards; a large component forms its own shard.
+    3. Run the wrapped partitioner (BFS/DFS/ECE/Leiden/...) on every shard in parallel.
+    4. Merge the communities in shard order and renumber them with global ids.
+    Communities never span components, so sharding does not change what a community can contain.
+    Partitioners that keep only the largest connected component (use_lcc) are run unsharded:
+    per shard they would keep the largest component of every shard instead.
+    """
+
+    def __init__(
+        self,
+        partitioner: BasePartitioner,
+        num_workers: Optional[int] = None,
+        min_shard_units: int = 10000,
+    ):
+        """
+        :param partitioner: partitioner to run on every shard
+        :param num_workers: process count, defaults to os.cpu_count(); <=1 runs the wrapped partitioner directly
+        :param min_shard_units: small components are packed until a shard holds at least this many units
+        """
+        self.partitioner = partitioner
+        self.num_workers = num_workers or os.cpu_count() or 1
+        self.min_shard_units = min_shard_units
+
+    async def partition(
+        self,
+        g: BaseGraphStorage,
+        **kwargs: Any,
+    ) -> List[Community]:
+        # use_lcc 只保留全图最大连通分量，分片后会变成每个分片各保留一个，且该分量无法再并行
+        if self.num_workers <= 1 or kwargs.get("use_lcc"):
+            return await self.partitioner.partition(g, **kwargs)
+
+        nodes = await g.get_all_nodes() or []
+        edges = await g.get_all_edges() or []
+        snap = GraphSnapshot(nodes, edges)
+        shards = self._build_shards(snap, nodes, edges)
+        if len(shards) <= 1:
+            return await self.partitioner.partition(g, snapshot=snap, **kwargs)
+
+        logger.info(
+            "Partitioning %d shards with %d workers",
+            len(shards),
+            min(self.num_workers, len(shards)),
+        )
+        loop = asyncio.get_running_loop()
+        with ProcessPoolExecutor(
+            max_workers=min(self.num_workers, len(shards))
+        ) as executor:
+            # 大分片先提交，减少尾部等待
+            submit_order = sorted(
+                range(len(shards)),
+                key=lambda i: len(shards[i][0]) + len(shards[i][1]),
+                reverse=True,
+            )
+            futures = {
+                idx: loop.run_in_executor(
+                    executor,
+                    _partition_shard,
+                    self.partitioner,
+                    shards[idx][0],
+                    shards[idx][1],
+                    kwargs,
+                )
+                for idx in submit_order
+            }
+            await asyncio.gather(*futures.values())
+
+        # 按分片顺序合并，社区 id 全局重新编号
+        communities: List[Community] = []
+        for idx in range(len(shards)):
+            for comm in futures[idx].result():
+                comm.id = len(communities)
+                communities.append(comm)
+        return communities
+
+    def _build_shards(
+        self,
+        snap: GraphSnapshot,
+        nodes: List[Tuple[str, dict]],
+        edges: List[Tuple[str, str, dict]],
+    ) -> List[Tuple[List[Tuple[str, dict]], List[Tuple[str, str, dict]]]]:
+        """
+        按连通分量切分节点与边；小分量依次打包，直到分片达到目标 unit 数
+
+        :return: [(nodes, edges)]，分片内节点与边保持原始顺序
+        """
+        num_components, labels = snap.connected_components()
+        edge_labels = labels[snap.edge_src]
+        sizes = np.bincount(labels, minlength=num_components) + np.bincount(
+            edge_labels, minlength=num_components
+        )
+        # 每个 worker 约分到 4 个分片以平衡负载，但分片不小于 min_shard_units
+        target = max(
+            self.min_shard_units, -(-snap.num_units // (self.num_workers * 4))
+        )
+
+        component_shard = np.empty(num_components, dtype=np.int64)
+        shard, filled = 0, 0
+        for comp, size in enumerate(sizes.tolist()):
+            if filled >= target:
+                shard, filled = shard + 1, 0
+            component_shard[comp] = shard
+            filled += size
+        num_shards = shard + 1 if num_components else 0
+
+        # 快照为缺失端点补充的节点不下发，子进程重建快照时会再次补充
+        node_shard = component_shard[labels[: len(nodes)]]
+        edge_shard = component_shard[edge_labels]
+        shard_nodes: List[List[Tuple[str, dict]]] = [[] for _ in range(num_shards)]
+        shard_edges: List[List[Tuple[str, str, dict]]] = [
+            [] for _ in range(num_shards)
+        ]
+        for node, s in zip(nodes, node_shard.tolist()):
+            shard_nodes[s].append(node)
+        for edge, s in zip(edges, edge_shard.tolist()):
+            shard_edges[s].append(edge)
+        return list(zip(shard_nodes, shard_edges))
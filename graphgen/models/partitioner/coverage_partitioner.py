@@ -0,0 +1,124 @@
+import random
+from array import array
+from collections import deque
+from typing import Any, List, Optional, Set
+
+from graphgen.bases import BaseGraphStorage, BasePartitioner
+from graphgen.bases.datatypes import Community
+
+from .graph_snapshot import GraphSnapshot, get_snapshot
+
+
+class CoveragePartitioner(BasePartitioner):
+    """
+    Coverage-aware BFS partitioner that produces as many distinct communities as a target asks for.
+    1. Round 0 is a plain BFS partition: disjoint communities that cover every unit once.
+    2. While fewer than target_communities exist, run another round: seeds are taken in
+       order of how rarely their unit has been covered, and each window expands by BFS
+       through the whole graph (neighbours in random order). Only the half of a window
+       nearest to its seed is closed to later seeds of the round, so windows slide with a
+       stride of half a window and overlap earlier communities without repeating them.
+    3. A window identical to an existing community is dropped; a round that adds nothing stops.
+    (A unit is a node or an edge.)
+    """
+
+    async def partition(
+        self,
+        g: BaseGraphStorage,
+        max_units_per_community: int = 10,
+        target_communities: Optional[int] = None,
+        max_rounds: int = 8,
+        seed: Optional[int] = None,
+        snapshot: Optional[GraphSnapshot] = None,
+        **kwargs: Any,
+    ) -> List[Community]:
+        """
+        :param target_communities: number of communities wanted (e.g. batches needed for a
+            target QA count); None returns the round-0 partition only
+        :param max_rounds: upper bound on the number of rounds
+        :param seed: random seed for seed order and neighbour order
+        """
+        snap = await get_snapshot(g, snapshot)
+        views = snap.traversal_views()
+        rng = random.Random(seed)
+        num_units = snap.num_units
+        coverage = array("I", bytes(4 * num_units))
+        seen: Set[tuple] = set()
+        communities: List[Community] = []
+        units = list(range(num_units))
+
+        for rnd in range(max(max_rounds, 1)):
+            if rnd and (target_communities is None or len(communities) >= target_communities):
+                break
+            rng.shuffle(units)
+            # 稳定排序：覆盖次数少的种子优先，次数相同时保持随机顺序
+            order = sorted(units, key=coverage.__getitem__) if rnd else units
+            in_round = bytearray(num_units)
+            added = 0
+            for seed_unit in order:
+                if in_round[seed_unit]:
+                    continue
+                if rnd and len(communities) >= target_communities:
+                    break
+                window = self._window(
+                    snap.num_nodes,
+                    views,
+                    seed_unit,
+                    max_units_per_community,
+                    in_round if rnd == 0 else None,
+                    rng,
+                )
+                # 第 0 轮整个社区不再作种子；之后的轮次只占用窗口前一半（离种子最近的 unit），
+                # 相邻窗口以半个窗口为步长滑动，彼此重叠
+                for unit in window if rnd == 0 else window[: max(1, len(window) // 2)]:
+                    in_round[unit] = 1
+                key = tuple(sorted(window))
+                if key in seen:
+                    continue
+                seen.add(key)
+                for unit in window:
+                    coverage[unit] += 1
+                community = snap.to_community(len(communities), window)
+                community.metadata["round"] = rnd
+                communities.append(community)
+                added += 1
+            if not added:
+                break
+
+        return communities
+
+    @staticmethod
+    def _window(
+        n: int,
+        views: tuple,
+        seed_unit: int,
+        max_units: int,
+        blocked: Optional[bytearray],
+        rng: random.Random,
+    ) -> List[int]:
+        """
+        从 seed_unit 出发 BFS，取至多 max_units 个 unit
+
+        :param blocked: 第 0 轮传入本轮已用 unit（社区互不相交，即普通 BFS 分区）；
+            之后的轮次为 None，窗口可以跨过其他社区，邻居按随机顺序入队
+        """
+        indptr, _, edge_ids, edge_src, edge_dst = views
+        window: List[int] = []
+        visited = {seed_unit}
+        queue: deque[int] = deque([seed_unit])
+        while queue and len(window) < max_units:
+            it = queue.popleft()
+            if blocked is not None and blocked[it]:
+                continue
+            window.append(it)
+            if it < n:
+                neighbours = [n + edge_ids[slot] for slot in range(indptr[it], indptr[it + 1])]
+            else:
+                neighbours = [edge_src[it - n], edge_dst[it - n]]
+            if blocked is None:
+                rng.shuffle(neighbours)
+            for unit in neighbours:
+                if unit not in visited and (blocked is None or not blocked[unit]):
+                    visited.add(unit)
+                    queue.append(unit)
+        return window
@@ -1,15 +1,17 @@
 import asyncio
+import heapq
 import random
-from typing import Any, Dict, List, Optional, Set, Tuple
+from functools import partial
+from typing import Any, List, Optional
 
-from tqdm.asyncio import tqdm as tqdm_async
+import numpy as np
+from tqdm import tqdm
 
 from graphgen.bases import BaseGraphStorage
 from graphgen.bases.datatypes import Community
 from graphgen.models.partitioner.bfs_partitioner import BFSPartitioner
 
-NODE_UNIT: str = "n"
-EDGE_UNIT: str = "e"
+from .graph_snapshot import GraphSnapshot, get_snapshot
 
 
 class ECEPartitioner(BFSPartitioner):
@@ -19,37 +21,102 @@ class ECEPartitioner(BFSPartitioner):
     and group units with similar ECE values into the same community.
     1. Select a sampling strategy.
     2. Choose a unit based on the sampling strategy.
-    2. Expand the community using BFS.
-    3. When expending, prefer to add units with the sampling strategy.
+    2. Expand the community from its frontier.
+    3. When expending, always add the frontier unit ranked first by the sampling strategy.
     4. Stop when the max unit size is reached or the max input length is reached.
     (A unit is a node or an edge.)
     """
 
     @staticmethod
-    def _sort_units(units: list, edge_sampling: str) -> list:
+    def _unit_order(
+        snap: GraphSnapshot, unit_sampling: str, rng: random.Random
+    ) -> np.ndarray:
         """
-        Sort units with edge sampling strategy
+        全部 unit 的全局顺序，只计算一次；社区扩展时按该顺序的名次选择前沿 unit
 
-        :param units: total units
-        :param edge_sampling: edge sampling strategy (random, min_loss, max_loss)
-        :return: sorted units
+        :param snap: graph snapshot
+        :param unit_sampling: unit sampling strategy (random, min_loss, max_loss)
+        :param rng: random generator used by the random strategy
+        :return: unit ids, best first
         """
-        if edge_sampling == "random":
-            random.shuffle(units)
-        elif edge_sampling == "min_loss":
-            units = sorted(
-                units,
-                key=lambda x: x[-1]["loss"],
+        if unit_sampling == "random":
+            units = list(range(snap.num_units))
+            rng.shuffle(units)
+            return np.asarray(units, dtype=np.int64)
+        if unit_sampling not in ("min_loss", "max_loss"):
+            raise ValueError(f"Invalid edge sampling: {unit_sampling}")
+        if np.isnan(snap.unit_loss).any():
+            raise ValueError(
+                f"unit_sampling={unit_sampling} requires 'loss' on every node and edge; "
+                "run quiz and judge first or use unit_sampling=random"
             )
-        elif edge_sampling == "max_loss":
-            units = sorted(
-                units,
-                key=lambda x: x[-1]["loss"],
-                reverse=True,
-            )
-        else:
-            raise ValueError(f"Invalid edge sampling: {edge_sampling}")
-        return units
+        # 稳定排序：loss 相同的 unit 保持节点在前、边在后的原始顺序
+        key = snap.unit_loss if unit_sampling == "min_loss" else -snap.unit_loss
+        return np.argsort(key, kind="stable")
+
+    @staticmethod
+    def _partition_units(
+        snap: GraphSnapshot,
+        order: np.ndarray,
+        max_units_per_community: int,
+        min_units_per_community: int,
+        max_tokens_per_community: int,
+    ) -> List[List[int]]:
+        """
+        同步分区核心：每个社区维护一个以全局名次为键的小顶堆作为前沿，
+        每次取出名次最靠前且未被使用的 unit 加入社区
+
+        :return: 每个社区的 unit id 列表
+        """
+        n = snap.num_nodes
+        indptr, _, edge_ids, edge_src, edge_dst = snap.traversal_views()
+        length = memoryview(snap.unit_length)
+        rank_arr = np.empty(snap.num_units, dtype=np.int64)
+        rank_arr[order] = np.arange(snap.num_units, dtype=np.int64)
+        rank = memoryview(rank_arr)
+        order_view = memoryview(order)
+        used = bytearray(snap.num_units)
+        heappush, heappop = heapq.heappush, heapq.heappop
+        result: List[List[int]] = []
+
+        for seed in tqdm(order_view, desc="ECE partition"):
+            if used[seed]:
+                continue
+            used[seed] = 1
+            community = [seed]
+            token_sum = length[seed]
+            frontier: List[int] = []
+            cur = seed
+
+            while (
+                len(community) < max_units_per_community
+                and token_sum < max_tokens_per_community
+            ):
+                if cur < n:
+                    for slot in range(indptr[cur], indptr[cur + 1]):
+                        e_unit = n + edge_ids[slot]
+                        if not used[e_unit]:
+                            heappush(frontier, rank[e_unit])
+                else:
+                    e = cur - n
+                    for node in (edge_src[e], edge_dst[e]):
+                        if not used[node]:
+                            heappush(frontier, rank[node])
+
+                # 惰性删除：已被其他路径加入的 unit 在出堆时跳过
+                while frontier and used[order_view[frontier[0]]]:
+                    heappop(frontier)
+                if not frontier:
+                    break
+                cur = order_view[heappop(frontier)]
+                used[cur] = 1
+                community.append(cur)
+                token_sum += length[cur]
+
+            if len(community) >= min_units_per_community:
+                result.append(community)
+
+        return result
 
     async def partition(
         self,
@@ -58,104 +125,29 @@ class ECEPartitioner(BFSPartitioner):
         min_units_per_community: int = 1,
         max_tokens_per_community: int = 10240,
         unit_sampling: str = "random",
+        seed: Optional[int] = None,
+        snapshot: Optional[GraphSnapshot] = None,
         **kwargs: Any,
     ) -> List[Community]:
-        nodes: List[Tuple[str, dict]] = await g.get_all_nodes()
-        edges: List[Tuple[str, str, dict]] = await g.get_all_edges()
-
-        adj, _ = self._build_adjacency_list(nodes, edges)
-        node_dict = dict(nodes)
-        edge_dict = {frozenset((u, v)): d for u, v, d in edges}
-
-        all_units: List[Tuple[str, Any, dict]] = [
-            (NODE_UNIT, nid, d) for nid, d in nodes
-        ] + [(EDGE_UNIT, frozenset((u, v)), d) for u, v, d in edges]
-
-        used_n: Set[str] = set()
-        used_e: Set[frozenset[str]] = set()
-        communities: List = []
-
-        all_units = self._sort_units(all_units, unit_sampling)
-
-        async def _grow_community(
-            seed_unit: Tuple[str, Any, dict]
-        ) -> Optional[Community]:
-            nonlocal used_n, used_e
-
-            community_nodes: Dict[str, dict] = {}
-            community_edges: Dict[frozenset[str], dict] = {}
-            queue: asyncio.Queue = asyncio.Queue()
-            token_sum = 0
-
-            async def _add_unit(u):
-                nonlocal token_sum
-                t, i, d = u
-                if t == NODE_UNIT:  # node
-                    if i in used_n or i in community_nodes:
-                        return False
-                    community_nodes[i] = d
-                    used_n.add(i)
-                else:  # edge
-                    if i in used_e or i in community_edges:
-                        return False
-                    community_edges[i] = d
-                    used_e.add(i)
-                token_sum += d.get("length", 0)
-                return True
-
-            await _add_unit(seed_unit)
-            await queue.put(seed_unit)
-
-            # BFS
-            while not queue.empty():
-                if (
-                    len(community_nodes) + len(community_edges)
-                    >= max_units_per_community
-                    or token_sum >= max_tokens_per_community
-                ):
-                    break
-
-                cur_type, cur_id, _ = await queue.get()
-
-                neighbors: List[Tuple[str, Any, dict]] = []
-                if cur_type == NODE_UNIT:
-                    for nb_id in adj.get(cur_id, []):
-                        e_key = frozenset((cur_id, nb_id))
-                        if e_key not in used_e and e_key not in community_edges:
-                            neighbors.append((EDGE_UNIT, e_key, edge_dict[e_key]))
-                else:
-                    for n_id in cur_id:
-                        if n_id not in used_n and n_id not in community_nodes:
-                            neighbors.append((NODE_UNIT, n_id, node_dict[n_id]))
-
-                neighbors = self._sort_units(neighbors, unit_sampling)
-                for nb in neighbors:
-                    if (
-                        len(community_nodes) + len(community_edges)
-                        >= max_units_per_community
-                        or token_sum >= max_tokens_per_community
-                    ):
-                        break
-                    if await _add_unit(nb):
-                        await queue.put(nb)
-
-            if len(community_nodes) + len(community_edges) < min_units_per_community:
-                return None
-
-            return Community(
-                id=len(communities),
-                nodes=list(community_nodes.keys()),
-                edges=[(u, v) for (u, v), _ in community_edges.items()],
-            )
-
-        async for unit in tqdm_async(all_units, desc="ECE partition"):
-            utype, uid, _ = unit
-            if (utype == NODE_UNIT and uid in used_n) or (
-                utype == EDGE_UNIT and uid in used_e
-            ):
-                continue
-            comm = await _grow_community(unit)
-            if comm is not None:
-                communities.append(comm)
-
-        return communities
+        """
+        :param seed: random seed for unit_sampling=random; None uses the global random state
+        :param snapshot: prebuilt graph snapshot, built from g if omitted
+        """
+        snap = await get_snapshot(g, snapshot)
+        rng = random.Random(seed) if seed is not None else random
+        order = self._unit_order(snap, unit_sampling, rng)
+
+        # 纯 CPU 计算放到线程池执行，避免阻塞事件循环
+        loop = asyncio.get_running_loop()
+        unit_lists = await loop.run_in_executor(
+            None,
+            partial(
+                self._partition_units,
+                snap,
+                order,
+                max_units_per_community,
+                min_units_per_community,
+                max_tokens_per_community,
+            ),
+        )
+        return [snap.to_community(i, units) for i, units in enumerate(unit_lists)]
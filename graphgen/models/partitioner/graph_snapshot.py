@@ -0,0 +1,148 @@
+"""
+分区用的只读整数图快照
+
+节点 id 驻留为 int32，邻接关系以 CSR（indptr/indices/edge_ids）存放在 NumPy 数组中，
+节点与边的 length/loss 也是定长数组。分区器统一以整数 "unit" 遍历：
+节点 i 的 unit 为 i，边 j 的 unit 为 num_nodes + j，访问状态用 bytearray 位图记录，
+取代 dict[str, list[str]] 邻接表、frozenset 边键和字符串集合。
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from graphgen.bases import BaseGraphStorage
+from graphgen.bases.datatypes import Community
+
+
+class GraphSnapshot:
+    def __init__(
+        self,
+        nodes: List[Tuple[str, dict]],
+        edges: List[Tuple[str, str, dict]],
+    ):
+        self.node_ids: List[str] = [node_id for node_id, _ in nodes]
+        self.node_index: Dict[str, int] = {
+            node_id: i for i, node_id in enumerate(self.node_ids)
+        }
+        node_data = [data for _, data in nodes]
+        for u, v, _ in edges:
+            # 边引用了不在节点列表中的端点时补充空节点，与 _build_adjacency_list 的容错一致
+            for endpoint in (u, v):
+                if endpoint not in self.node_index:
+                    self.node_index[endpoint] = len(self.node_ids)
+                    self.node_ids.append(endpoint)
+                    node_data.append({})
+
+        n, m = len(self.node_ids), len(edges)
+        self.num_nodes = n
+        self.num_edges = m
+        index = self.node_index
+        self.edge_src = np.fromiter((index[u] for u, _, _ in edges), np.int32, m)
+        self.edge_dst = np.fromiter((index[v] for _, v, _ in edges), np.int32, m)
+        # 按下标取 memoryview 得到 int，比 NumPy 标量索引快一个数量级
+        self._endpoint_views = (memoryview(self.edge_src), memoryview(self.edge_dst))
+
+        # CSR：每条边在两个端点下各占一个槽位，同一节点内按边的原始顺序排列
+        heads = np.concatenate([self.edge_src, self.edge_dst])
+        slot_edges = np.concatenate([np.arange(m, dtype=np.int32)] * 2)
+        tails = np.concatenate([self.edge_dst, self.edge_src])
+        order = np.lexsort((slot_edges, heads))
+        self.indices = tails[order]
+        self.edge_ids = slot_edges[order]
+        self.indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(heads, minlength=n), out=self.indptr[1:])
+
+        # 按 unit 编号排列的 length/loss（缺失的 loss 记为 NaN）
+        self.unit_length = np.fromiter(
+            (
+                d.get("length", 0) or 0
+                for d in (*node_data, *(data for _, _, data in edges))
+            ),
+            np.int64,
+            n + m,
+        )
+        self.unit_loss = np.fromiter(
+            (
+                np.nan if d.get("loss") is None else d["loss"]
+                for d in (*node_data, *(data for _, _, data in edges))
+            ),
+            np.float64,
+            n + m,
+        )
+
+    @classmethod
+    async def from_storage(cls, g: BaseGraphStorage) -> "GraphSnapshot":
+        nodes = await g.get_all_nodes()
+        edges = await g.get_all_edges()
+        return cls(nodes or [], edges or [])
+
+    @property
+    def num_units(self) -> int:
+        return self.num_nodes + self.num_edges
+
+    def traversal_views(
+        self,
+    ) -> Tuple[memoryview, memoryview, memoryview, memoryview, memoryview]:
+        """
+        纯 Python 遍历用的 memoryview（按下标取值直接得到 int，不产生 NumPy 标量）
+
+        :return: (indptr, indices, edge_ids, edge_src, edge_dst)
+        """
+        return (
+            memoryview(self.indptr),
+            memoryview(self.indices),
+            memoryview(self.edge_ids),
+            memoryview(self.edge_src),
+            memoryview(self.edge_dst),
+        )
+
+    def connected_components(self) -> Tuple[int, np.ndarray]:
+        """
+        连通分量标注：沿 CSR 做一次迭代 DFS，O(N + M)
+
+        :return: (分量数, 每个节点的分量编号)；编号按分量中最小节点下标的顺序分配
+        """
+        n = self.num_nodes
+        labels = np.full(n, -1, dtype=np.int32)
+        label = memoryview(labels)
+        indptr, indices = memoryview(self.indptr), memoryview(self.indices)
+        count = 0
+        for start in range(n):
+            if label[start] >= 0:
+                continue
+            label[start] = count
+            stack = [start]
+            while stack:
+                u = stack.pop()
+                for slot in range(indptr[u], indptr[u + 1]):
+                    v = indices[slot]
+                    if label[v] < 0:
+                        label[v] = count
+                        stack.append(v)
+            count += 1
+        return count, labels
+
+    def to_community(self, community_id: int, units: Iterable[int]) -> Community:
+        """将 unit 编号还原为 Community（节点名与 (src, dst) 边元组）"""
+        n = self.num_nodes
+        node_ids = self.node_ids
+        edge_src, edge_dst = self._endpoint_views
+        nodes: List[str] = []
+        edges: List[Tuple[str, str]] = []
+        for unit in units:
+            if unit < n:
+                nodes.append(node_ids[unit])
+            else:
+                e = unit - n
+                edges.append((node_ids[edge_src[e]], node_ids[edge_dst[e]]))
+        return Community(id=community_id, nodes=nodes, edges=edges)
+
+
+async def get_snapshot(
+    g: BaseGraphStorage, snapshot: Optional[GraphSnapshot] = None
+) -> GraphSnapshot:
+    """复用调用方传入的快照，否则从存储构建"""
+    if snapshot is not None:
+        return snapshot
+    return await GraphSnapshot.from_storage(g)
@@ -1,8 +1,7 @@
 """Hierarchical partitioner for domain knowledge graphs."""
 
-import networkx as nx
-from collections import defaultdict
-from typing import Any, List, Set, Tuple
+from collections import deque
+from typing import Any, Dict, List, Set, Tuple
 
 from graphgen.bases import BaseGraphStorage, BasePartitioner
 from graphgen.bases.datatypes import Community
@@ -19,6 +18,9 @@ class HierarchicalPartitioner(BasePartitioner):
 
     Hierarchical relations: is_a, subclass_of, part_of, includes, type_of
     Attribute relations: all other relations (included but don't dominate)
+
+    Node ids are interned to integers; cycles in the hierarchy are broken in O(V+E)
+    with Tarjan SCCs and a DFS back-edge feedback arc set.
     """
 
     def __init__(
@@ -59,7 +61,7 @@ class HierarchicalPartitioner(BasePartitioner):
         :return: List of communities
         """
         nodes = await g.get_all_nodes()
-        edges = await g.get_all_edges()
+        edges = await g.get_all_edges() or []
 
         if not nodes:
             logger.warning("No nodes found in graph")
@@ -68,45 +70,57 @@ class HierarchicalPartitioner(BasePartitioner):
         # Build edge classification
         hierarchical_edges, attribute_edges = self._classify_edges(edges)
 
-        # Build parent→children and child→parents maps
-        parent_to_children = defaultdict(set)
-        child_to_parents = defaultdict(set)
-
-        for src, tgt, data in hierarchical_edges:
-            # src is child, tgt is parent (src is_a tgt)
-            parent_to_children[tgt].add(src)
-            child_to_parents[src].add(tgt)
+        # Intern node ids; endpoints missing from the node list are appended
+        names: List[str] = [node_id for node_id, _ in nodes]
+        index: Dict[str, int] = {name: i for i, name in enumerate(names)}
+        for src, tgt, _ in edges:
+            for endpoint in (src, tgt):
+                if endpoint not in index:
+                    index[endpoint] = len(names)
+                    names.append(endpoint)
+        n = len(names)
+
+        # Build child→parents and parent→children maps over integer ids
+        parents_of, children_of, parent_order = self._build_hierarchy(
+            hierarchical_edges, index, n
+        )
 
         # Detect and handle cycles
-        cycles = self._detect_cycles(nodes, parent_to_children)
-        if cycles:
-            logger.warning(f"Detected {len(cycles)} cycles in hierarchy, breaking them")
-            parent_to_children, child_to_parents = self._break_cycles(
-                cycles, parent_to_children, child_to_parents
+        removed = self._break_cycles(parents_of, children_of)
+        if removed:
+            logger.warning(
+                f"Detected cycles in hierarchy, removed {removed} hierarchical edges to break them"
             )
 
+        # Edge lookups shared by all strategies
+        hier_pairs = self._pair_index(hierarchical_edges, index, n)
+        attr_index = self._incident_index(attribute_edges, index, n)
+        has_edges = bytearray(n)
+        for src, tgt, _ in edges:
+            has_edges[index[src]] = has_edges[index[tgt]] = 1
+
         communities: List[Community] = []
-        used_nodes: Set[str] = set()
+        used = bytearray(n)
 
         # Strategy 1: Sibling grouping (horizontal)
         sibling_communities = self._sibling_grouping(
-            nodes, parent_to_children, child_to_parents, hierarchical_edges,
-            attribute_edges, used_nodes
+            names, parent_order, children_of, hier_pairs,
+            attribute_edges, attr_index, used
         )
         communities.extend(sibling_communities)
         logger.info(f"Created {len(sibling_communities)} sibling group communities")
 
         # Strategy 2: Chain sampling (vertical)
         chain_communities = self._chain_sampling(
-            nodes, parent_to_children, child_to_parents, hierarchical_edges,
-            attribute_edges, used_nodes
+            names, len(nodes), parents_of, children_of, hier_pairs,
+            attribute_edges, attr_index, used
         )
         communities.extend(chain_communities)
         logger.info(f"Created {len(chain_communities)} vertical chain communities")
 
         # Handle isolated nodes (no hierarchical edges)
         isolated_communities = self._handle_isolated_nodes(
-            nodes, edges, used_nodes
+            names, len(nodes), has_edges, used
         )
         communities.extend(isolated_communities)
         logger.info(f"Created {len(isolated_communities)} isolated node communities")
@@ -139,72 +153,206 @@ class HierarchicalPartitioner(BasePartitioner):
         )
         return hierarchical, attribute
 
-    def _detect_cycles(
-        self,
-        nodes: List[Tuple[str, dict]],
-        parent_to_children: dict,
-    ) -> List[List[str]]:
-        """Detect cycles in hierarchical structure using NetworkX."""
-        # Build directed graph
-        G = nx.DiGraph()
-        for node_id, _ in nodes:
-            G.add_node(node_id)
-
-        for parent, children in parent_to_children.items():
-            for child in children:
-                G.add_edge(child, parent)  # child → parent direction
-
-        try:
-            cycles = list(nx.simple_cycles(G))
-            return cycles
-        except Exception as e:
-            logger.warning(f"Error detecting cycles: {e}")
-            return []
+    @staticmethod
+    def _build_hierarchy(
+        hierarchical_edges: List[Tuple[str, str, dict]],
+        index: Dict[str, int],
+        n: int,
+    ) -> Tuple[List[List[int]], List[List[int]], List[int]]:
+        """
+        Build deduplicated child→parents and parent→children adjacency lists.
+
+        :return: (parents_of, children_of, parents in order of first appearance)
+        """
+        parents_of: List[List[int]] = [[] for _ in range(n)]
+        children_of: List[List[int]] = [[] for _ in range(n)]
+        parent_order: List[int] = []
+        seen: Set[int] = set()
+        for src, tgt, _ in hierarchical_edges:
+            # src is child, tgt is parent (src is_a tgt)
+            child, parent = index[src], index[tgt]
+            key = child * n + parent
+            if key in seen:
+                continue
+            seen.add(key)
+            if not children_of[parent]:
+                parent_order.append(parent)
+            parents_of[child].append(parent)
+            children_of[parent].append(child)
+        return parents_of, children_of, parent_order
+
+    @staticmethod
+    def _strongly_connected_components(adj: List[List[int]]) -> List[int]:
+        """Iterative Tarjan SCC in O(V+E); returns the component id of every vertex."""
+        n = len(adj)
+        order = [-1] * n
+        low = [0] * n
+        on_stack = bytearray(n)
+        stack: List[int] = []
+        comp = [-1] * n
+        counter = num_comps = 0
+
+        for root in range(n):
+            if order[root] != -1:
+                continue
+            order[root] = low[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack[root] = 1
+            work = [(root, iter(adj[root]))]
+            while work:
+                v, it = work[-1]
+                for w in it:
+                    if order[w] == -1:
+                        order[w] = low[w] = counter
+                        counter += 1
+                        stack.append(w)
+                        on_stack[w] = 1
+                        work.append((w, iter(adj[w])))
+                        break
+                    if on_stack[w] and order[w] < low[v]:
+                        low[v] = order[w]
+                else:
+                    work.pop()
+                    if work:
+                        u = work[-1][0]
+                        if low[v] < low[u]:
+                            low[u] = low[v]
+                    if low[v] == order[v]:
+                        while True:
+                            w = stack.pop()
+                            on_stack[w] = 0
+                            comp[w] = num_comps
+                            if w == v:
+                                break
+                        num_comps += 1
+        return comp
 
     def _break_cycles(
         self,
-        cycles: List[List[str]],
-        parent_to_children: dict,
-        child_to_parents: dict,
-    ) -> Tuple[dict, dict]:
-        """Break cycles by removing first edge in each cycle."""
-        for cycle in cycles:
-            if len(cycle) >= 2:
-                # Remove edge from first to second node in cycle
-                node1, node2 = cycle[0], cycle[1]
-                if node2 in parent_to_children.get(node1, set()):
-                    parent_to_children[node1].discard(node2)
-                    child_to_parents[node2].discard(node1)
-                    logger.debug(f"Broke cycle by removing edge {node1}→{node2}")
-
-        return parent_to_children, child_to_parents
+        parents_of: List[List[int]],
+        children_of: List[List[int]],
+    ) -> int:
+        """
+        Break cycles with a heuristic feedback arc set in O(V+E).
+        Only edges inside a strongly connected component can lie on a cycle; a DFS
+        restricted to each non-trivial SCC removes its back edges, which leaves the
+        hierarchy acyclic.
+
+        :return: number of removed child→parent edges
+        """
+        n = len(parents_of)
+        comp = self._strongly_connected_components(parents_of)
+        sizes = [0] * n
+        for c in comp:
+            sizes[c] += 1
+
+        state = bytearray(n)  # 0 unvisited, 1 on the DFS path, 2 finished
+        back_edges: Dict[int, Set[int]] = {}
+        for root in range(n):
+            if state[root] or (sizes[comp[root]] == 1 and root not in parents_of[root]):
+                continue
+            state[root] = 1
+            work = [(root, iter(parents_of[root]))]
+            while work:
+                v, it = work[-1]
+                for w in it:
+                    if comp[w] != comp[v]:
+                        continue
+                    if state[w] == 1:
+                        back_edges.setdefault(v, set()).add(w)
+                    elif state[w] == 0:
+                        state[w] = 1
+                        work.append((w, iter(parents_of[w])))
+                        break
+                else:
+                    state[v] = 2
+                    work.pop()
+
+        removed = 0
+        reverse: Dict[int, Set[int]] = {}
+        for child, parents in back_edges.items():
+            parents_of[child] = [p for p in parents_of[child] if p not in parents]
+            removed += len(parents)
+            for parent in parents:
+                reverse.setdefault(parent, set()).add(child)
+        for parent, children in reverse.items():
+            children_of[parent] = [c for c in children_of[parent] if c not in children]
+        return removed
+
+    @staticmethod
+    def _pair_index(
+        edges: List[Tuple[str, str, dict]], index: Dict[str, int], n: int
+    ) -> Dict[int, List[Tuple[str, str]]]:
+        """Unordered node pair → edges between them (either direction), in original order."""
+        pairs: Dict[int, List[Tuple[str, str]]] = {}
+        for src, tgt, _ in edges:
+            u, v = index[src], index[tgt]
+            key = u * n + v if u < v else v * n + u
+            pairs.setdefault(key, []).append((src, tgt))
+        return pairs
+
+    @staticmethod
+    def _incident_index(
+        edges: List[Tuple[str, str, dict]], index: Dict[str, int], n: int
+    ) -> Tuple[List[List[int]], List[Tuple[int, int]]]:
+        """:return: (edge positions incident to each node, integer endpoints of each edge)"""
+        incident: List[List[int]] = [[] for _ in range(n)]
+        endpoints: List[Tuple[int, int]] = []
+        for pos, (src, tgt, _) in enumerate(edges):
+            u, v = index[src], index[tgt]
+            endpoints.append((u, v))
+            incident[u].append(pos)
+            if v != u:
+                incident[v].append(pos)
+        return incident, endpoints
+
+    @staticmethod
+    def _internal_edges(
+        members: List[int],
+        edges: List[Tuple[str, str, dict]],
+        edge_index: Tuple[List[List[int]], List[Tuple[int, int]]],
+    ) -> List[Tuple[str, str]]:
+        """Edges with both endpoints in members, in original order; cost is the members' degree."""
+        incident, endpoints = edge_index
+        member_set = set(members)
+        positions = sorted(
+            {
+                pos
+                for v in members
+                for pos in incident[v]
+                if endpoints[pos][0] in member_set and endpoints[pos][1] in member_set
+            }
+        )
+        return [(edges[pos][0], edges[pos][1]) for pos in positions]
 
     def _sibling_grouping(
         self,
-        nodes: List[Tuple[str, dict]],
-        parent_to_children: dict,
-        child_to_parents: dict,
-        hierarchical_edges: List[Tuple[str, str, dict]],
+        names: List[str],
+        parent_order: List[int],
+        children_of: List[List[int]],
+        hier_pairs: Dict[int, List[Tuple[str, str]]],
         attribute_edges: List[Tuple[str, str, dict]],
-        used_nodes: Set[str],
+        attr_index: Tuple[List[List[int]], List[Tuple[int, int]]],
+        used: bytearray,
     ) -> List[Community]:
         """
         Strategy 1: Group parent + children into sibling communities.
         For each parent with ≥2 children, create community [parent] + children[:max_siblings]
         """
         communities = []
-        node_dict = {nid: data for nid, data in nodes}
+        n = len(names)
 
         # Find parents with multiple children
-        for parent, children in parent_to_children.items():
-            if parent in used_nodes:
+        for parent in parent_order:
+            if used[parent]:
                 continue
 
+            children = children_of[parent]
             if len(children) >= 2:
                 # Limit to max_siblings
                 selected_children = [
-                    c for c in list(children)[:self.max_siblings]
-                    if c not in used_nodes
+                    c for c in children[:self.max_siblings] if not used[c]
                 ]
 
                 if len(selected_children) < 2:
@@ -216,65 +364,64 @@ class HierarchicalPartitioner(BasePartitioner):
 
                 # Include hierarchical edges between parent and children
                 for child in selected_children:
-                    for src, tgt, data in hierarchical_edges:
-                        if (src == child and tgt == parent) or (src == parent and tgt == child):
-                            community_edges.append((src, tgt))
+                    key = child * n + parent if child < parent else parent * n + child
+                    community_edges.extend(hier_pairs.get(key, ()))
 
                 # Include attribute edges within community
                 if self.include_attributes:
-                    community_set = set(community_nodes)
-                    for src, tgt, data in attribute_edges:
-                        if src in community_set and tgt in community_set:
-                            community_edges.append((src, tgt))
+                    community_edges.extend(
+                        self._internal_edges(community_nodes, attribute_edges, attr_index)
+                    )
 
                 community = Community(
                     id=len(communities),
-                    nodes=community_nodes,
+                    nodes=[names[v] for v in community_nodes],
                     edges=community_edges,
-                    metadata={"type": "sibling_group", "parent": parent}
+                    metadata={"type": "sibling_group", "parent": names[parent]}
                 )
                 communities.append(community)
 
                 # Mark nodes as used
-                used_nodes.add(parent)
-                used_nodes.update(selected_children)
+                for v in community_nodes:
+                    used[v] = 1
 
         return communities
 
     def _chain_sampling(
         self,
-        nodes: List[Tuple[str, dict]],
-        parent_to_children: dict,
-        child_to_parents: dict,
-        hierarchical_edges: List[Tuple[str, str, dict]],
+        names: List[str],
+        num_listed: int,
+        parents_of: List[List[int]],
+        children_of: List[List[int]],
+        hier_pairs: Dict[int, List[Tuple[str, str]]],
         attribute_edges: List[Tuple[str, str, dict]],
-        used_nodes: Set[str],
+        attr_index: Tuple[List[List[int]], List[Tuple[int, int]]],
+        used: bytearray,
     ) -> List[Community]:
         """
         Strategy 2: Sample vertical chains from roots to descendants.
         For each root (no parents), BFS/DFS down hierarchy up to max_depth.
         """
         communities = []
+        n = len(names)
 
-        # Find roots (nodes with no hierarchical parents)
+        # Find roots (listed nodes with no hierarchical parents)
         roots = [
-            node_id for node_id, _ in nodes
-            if node_id not in child_to_parents and node_id not in used_nodes
+            v for v in range(num_listed) if not parents_of[v] and not used[v]
         ]
 
         for root in roots:
             # BFS down hierarchy
             chain = [root]
             visited = {root}
-            queue = [root]
+            queue = deque([root])
             depth = 0
 
             while queue and depth < self.max_depth:
-                current = queue.pop(0)
-                children = parent_to_children.get(current, set())
+                current = queue.popleft()
 
-                for child in children:
-                    if child not in visited and child not in used_nodes:
+                for child in children_of[current]:
+                    if child not in visited and not used[child]:
                         chain.append(child)
                         visited.add(child)
                         queue.append(child)
@@ -286,58 +433,51 @@ class HierarchicalPartitioner(BasePartitioner):
                 community_edges = []
 
                 # Include hierarchical edges along chain
-                for i in range(len(chain) - 1):
-                    for src, tgt, data in hierarchical_edges:
-                        if (src == chain[i] and tgt == chain[i + 1]) or \
-                           (src == chain[i + 1] and tgt == chain[i]):
-                            community_edges.append((src, tgt))
+                for a, b in zip(chain, chain[1:]):
+                    key = a * n + b if a < b else b * n + a
+                    community_edges.extend(hier_pairs.get(key, ()))
 
                 # Include attribute edges within chain
                 if self.include_attributes:
-                    chain_set = set(chain)
-                    for src, tgt, data in attribute_edges:
-                        if src in chain_set and tgt in chain_set:
-                            community_edges.append((src, tgt))
+                    community_edges.extend(
+                        self._internal_edges(chain, attribute_edges, attr_index)
+                    )
 
                 community = Community(
                     id=len(communities),
-                    nodes=chain,
+                    nodes=[names[v] for v in chain],
                     edges=community_edges,
-                    metadata={"type": "vertical_chain", "root": root}
+                    metadata={"type": "vertical_chain", "root": names[root]}
                 )
                 communities.append(community)
 
                 # Mark nodes as used
-                used_nodes.update(chain)
+                for v in chain:
+                    used[v] = 1
 
         return communities
 
+    @staticmethod
     def _handle_isolated_nodes(
-        self,
-        nodes: List[Tuple[str, dict]],
-        edges: List[Tuple[str, str, dict]],
-        used_nodes: Set[str],
+        names: List[str],
+        num_listed: int,
+        has_edges: bytearray,
+        used: bytearray,
     ) -> List[Community]:
         """Handle nodes with no hierarchical edges as single-node communities."""
         communities = []
 
-        # Find nodes with no hierarchical edges
-        for node_id, data in nodes:
-            if node_id not in used_nodes:
-                # Check if node has any edges at all
-                has_edges = any(
-                    src == node_id or tgt == node_id
-                    for src, tgt, _ in edges
-                )
-
+        # Find listed nodes with no hierarchical edges
+        for v in range(num_listed):
+            if not used[v]:
                 # Create single-node community
                 community = Community(
                     id=len(communities),
-                    nodes=[node_id],
+                    nodes=[names[v]],
                     edges=[],
-                    metadata={"type": "isolated", "has_edges": has_edges}
+                    metadata={"type": "isolated", "has_edges": bool(has_edges[v])}
                 )
                 communities.append(community)
-                used_nodes.add(node_id)
+                used[v] = 1
 
         return communities
@@ -1,8 +1,11 @@
-from collections import defaultdict
-from typing import Any, Dict, List, Set, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
 import igraph as ig
-from leidenalg import ModularityVertexPartition, find_partition
+from leidenalg import (
+    ModularityVertexPartition,
+    RBConfigurationVertexPartition,
+    find_partition,
+)
 
 from graphgen.bases import BaseGraphStorage, BasePartitioner
 from graphgen.bases.datatypes import Community
@@ -19,100 +22,179 @@ class LeidenPartitioner(BasePartitioner):
         max_size: int = 20,
         use_lcc: bool = False,
         random_seed: int = 42,
+        resolution: Optional[float] = None,
+        n_iterations: int = 2,
         **kwargs: Any,
     ) -> List[Community]:
         """
         Leiden Partition follows these steps:
-        1. export the graph from graph storage
-        2. use the leiden algorithm to detect communities, get {node: community_id}
-        3. split large communities if max_size is given
-        4. convert {node: community_id} to List[Community]
+        1. export the graph from graph storage and build a single integer-indexed igraph
+        2. use the leiden algorithm to detect communities, get {vertex: community_id}
+        3. split communities larger than max_size by running leiden again on them
+        4. bucket edges by community in one pass and convert to List[Community]
         :param g
         :param max_size: maximum size of each community, if None or <=0, no limit
         :param use_lcc: whether to use the largest connected component only
         :param random_seed
+        :param resolution: resolution of the RB configuration model, higher values give
+            smaller communities; None optimises plain modularity
+        :param n_iterations: leiden iterations per run, negative runs until stable
         :param kwargs: other parameters for the leiden algorithm
         :return:
         """
         nodes = await g.get_all_nodes()  # List[Tuple[str, dict]]
         edges = await g.get_all_edges()  # List[Tuple[str, str, dict]]
 
-        node2cid: Dict[str, int] = await self._run_leiden(
-            nodes, edges, use_lcc, random_seed
-        )
+        names, pairs = self._index_graph(nodes or [], edges or [])
+        graph = ig.Graph(n=len(names), edges=pairs, directed=False)
 
+        vertex2cid = self._run_leiden(
+            graph, use_lcc, random_seed, resolution, n_iterations
+        )
         if max_size is not None and max_size > 0:
-            node2cid = await self._split_communities(node2cid, max_size)
+            vertex2cid = self._split_communities(
+                graph, vertex2cid, max_size, random_seed, resolution, n_iterations
+            )
+
+        # 社区编号按首个顶点出现顺序重排为 0..k-1
+        cid_map: Dict[int, int] = {}
+        comm_nodes: List[List[str]] = []
+        for v, cid in enumerate(vertex2cid):
+            if cid < 0:
+                continue
+            if cid not in cid_map:
+                cid_map[cid] = len(comm_nodes)
+                comm_nodes.append([])
+            comm_nodes[cid_map[cid]].append(names[v])
 
-        cid2nodes: Dict[int, List[str]] = defaultdict(list)
-        for n, cid in node2cid.items():
-            cid2nodes[cid].append(n)
+        # 单次遍历边表，两端点同属一个社区的边归入该社区
+        comm_edges: List[List[Tuple[str, str]]] = [[] for _ in comm_nodes]
+        for (u, v, _), (ui, vi) in zip(edges or [], pairs):
+            cid = vertex2cid[ui]
+            if cid >= 0 and cid == vertex2cid[vi]:
+                comm_edges[cid_map[cid]].append((u, v))
 
-        communities: List[Community] = []
-        for cid, nodes in cid2nodes.items():
-            node_set: Set[str] = set(nodes)
-            comm_edges: List[Tuple[str, str]] = [
-                (u, v) for u, v, _ in edges if u in node_set and v in node_set
-            ]
-            communities.append(Community(id=cid, nodes=nodes, edges=comm_edges))
-        return communities
+        return [
+            Community(id=i, nodes=comm_nodes[i], edges=comm_edges[i])
+            for i in range(len(comm_nodes))
+        ]
+
+    @staticmethod
+    def _index_graph(
+        nodes: List[Tuple[str, dict]], edges: List[Tuple[str, str, dict]]
+    ) -> Tuple[List[str], List[Tuple[int, int]]]:
+        """节点名驻留为连续整数，返回 (顶点名列表, 与 edges 一一对应的整数端点对)"""
+        names: List[str] = [node_id for node_id, _ in nodes]
+        index: Dict[str, int] = {name: i for i, name in enumerate(names)}
+        pairs: List[Tuple[int, int]] = []
+        for u, v, _ in edges:
+            for endpoint in (u, v):
+                if endpoint not in index:
+                    index[endpoint] = len(names)
+                    names.append(endpoint)
+            pairs.append((index[u], index[v]))
+        return names, pairs
 
     @staticmethod
-    async def _run_leiden(
-        nodes: List[Tuple[str, dict]],
-        edges: List[Tuple[str, str, dict]],
+    def _find_partition(
+        graph: ig.Graph,
+        random_seed: int,
+        resolution: Optional[float],
+        n_iterations: int,
+    ) -> List[int]:
+        """对 graph 运行一次 leiden，返回每个顶点的社区编号"""
+        if resolution is None:
+            partition = find_partition(
+                graph,
+                ModularityVertexPartition,
+                n_iterations=n_iterations,
+                seed=random_seed,
+            )
+        else:
+            partition = find_partition(
+                graph,
+                RBConfigurationVertexPartition,
+                n_iterations=n_iterations,
+                seed=random_seed,
+                resolution_parameter=resolution,
+            )
+        return partition.membership
+
+    @classmethod
+    def _run_leiden(
+        cls,
+        graph: ig.Graph,
         use_lcc: bool = False,
         random_seed: int = 42,
-    ) -> Dict[str, int]:
-        # build igraph
-        ig_graph = ig.Graph.TupleList(((u, v) for u, v, _ in edges), directed=False)
-
-        # remove isolated nodes
-        ig_graph.delete_vertices(ig_graph.vs.select(_degree_eq=0))
-
-        node2cid: Dict[str, int] = {}
-        if use_lcc:
-            lcc = ig_graph.components().giant()
-            partition = find_partition(lcc, ModularityVertexPartition, seed=random_seed)
-            for part_id, cluster in enumerate(partition):
-                for v in cluster:
-                    node2cid[lcc.vs[v]["name"]] = part_id
-        else:
-            offset = 0
-            for component in ig_graph.components():
-                subgraph = ig_graph.induced_subgraph(component)
-                partition = find_partition(
-                    subgraph, ModularityVertexPartition, seed=random_seed
-                )
-                for part_id, cluster in enumerate(partition):
-                    for v in cluster:
-                        original_node = subgraph.vs[v]["name"]
-                        node2cid[original_node] = part_id + offset
-                offset += len(partition)
-        return node2cid
+        resolution: Optional[float] = None,
+        n_iterations: int = 2,
+    ) -> List[int]:
+        """
+        :return: 每个顶点的社区编号；孤立顶点（以及 use_lcc 时最大连通分量以外的顶点）为 -1
+        """
+        # leiden 得到的社区总是连通的，因此整图只需运行一次，无需逐分量建子图
+        keep = [v for v, degree in enumerate(graph.degree()) if degree > 0]
+        if use_lcc and keep:
+            membership = graph.connected_components().membership
+            sizes: Dict[int, int] = {}
+            for v in keep:
+                sizes[membership[v]] = sizes.get(membership[v], 0) + 1
+            giant = max(sizes, key=sizes.__getitem__)
+            keep = [v for v in keep if membership[v] == giant]
 
-    @staticmethod
-    async def _split_communities(
-        node2cid: Dict[str, int], max_size: int
-    ) -> Dict[str, int]:
+        vertex2cid = [-1] * graph.vcount()
+        if not keep:
+            return vertex2cid
+        subgraph = graph if len(keep) == graph.vcount() else graph.induced_subgraph(keep)
+        membership = cls._find_partition(subgraph, random_seed, resolution, n_iterations)
+        for v, cid in zip(keep, membership):
+            vertex2cid[v] = cid
+        return vertex2cid
+
+    @classmethod
+    def _split_communities(
+        cls,
+        graph: ig.Graph,
+        vertex2cid: List[int],
+        max_size: int,
+        random_seed: int = 42,
+        resolution: Optional[float] = None,
+        n_iterations: int = 2,
+    ) -> List[int]:
         """
         Split communities larger than max_size into smaller sub-communities.
+        Oversized communities are re-partitioned recursively with leiden on their
+        induced subgraph; only a community leiden cannot split further is sliced.
         """
-        cid2nodes: Dict[int, List[str]] = defaultdict(list)
-        for n, cid in node2cid.items():
-            cid2nodes[cid].append(n)
-
-        new_mapping: Dict[str, int] = {}
-        new_cid = 0
-        for nodes in cid2nodes.values():
-            if len(nodes) <= max_size:
-                for n in nodes:
-                    new_mapping[n] = new_cid
-                new_cid += 1
+        members: Dict[int, List[int]] = {}
+        for v, cid in enumerate(vertex2cid):
+            if cid >= 0:
+                members.setdefault(cid, []).append(v)
+
+        result = [-1] * len(vertex2cid)
+        next_cid = 0
+        pending = list(members.values())
+        while pending:
+            group = pending.pop()
+            if len(group) <= max_size:
+                for v in group:
+                    result[v] = next_cid
+                next_cid += 1
+                continue
+
+            # group 保持升序，与 induced_subgraph 中顶点的编号顺序一致
+            membership = cls._find_partition(
+                graph.induced_subgraph(group), random_seed, resolution, n_iterations
+            )
+            parts: Dict[int, List[int]] = {}
+            for v, cid in zip(group, membership):
+                parts.setdefault(cid, []).append(v)
+            if len(parts) > 1:
+                pending.extend(parts.values())
             else:
-                for start in range(0, len(nodes), max_size):
-                    chunk = nodes[start : start + max_size]
-                    for n in chunk:
-                        new_mapping[n] = new_cid
-                    new_cid += 1
-        return new_mapping
+                # leiden 无法继续拆分（如稠密团），按顶点顺序切片兜底
+                pending.extend(
+                    group[start : start + max_size]
+                    for start in range(0, len(group), max_size)
+                )
+        return result
@@ -1,12 +1,12 @@
 import html
 import os
 from dataclasses import dataclass
-from typing import Any, Optional, Union
+from typing import Any, Dict, Optional, Union
 
 import networkx as nx
 
 from graphgen.bases.base_storage import BaseGraphStorage
-from graphgen.utils import logger
+from graphgen.utils import compute_unit_hash, logger
 
 
 @dataclass
@@ -105,6 +105,46 @@ class NetworkXStorage(BaseGraphStorage):
                 preloaded_graph.number_of_edges(),
             )
         self._graph = preloaded_graph or nx.Graph()
+        self._reset_fingerprint()
+
+    # ---- 内容指纹：首次调用 fingerprint() 时全量计算，之后随各修改方法增量维护 ----
+    def _reset_fingerprint(self):
+        # unit key -> 已计入指纹的哈希；None 表示尚未建立，修改时无需维护
+        self._unit_hashes: Optional[Dict[tuple, int]] = None
+        self._digest = 0
+
+    def _edge_key(self, source_node_id: str, target_node_id: str) -> tuple:
+        if not self._graph.is_directed() and target_node_id < source_node_id:
+            source_node_id, target_node_id = target_node_id, source_node_id
+        return ("e", source_node_id, target_node_id)
+
+    def _track(self, key: tuple, data: Optional[dict]):
+        """
+        用当前数据重算 key 的哈希；data 为 None 表示已删除。
+        旧值取自记录而非重算，调用方先原地修改属性字典再调用 update_* 时指纹依然正确
+        """
+        if self._unit_hashes is None:
+            return
+        old = self._unit_hashes.pop(key, None)
+        if old is not None:
+            self._digest -= old
+        if data is not None:
+            new = compute_unit_hash(list(key), data)
+            self._unit_hashes[key] = new
+            self._digest += new
+
+    async def fingerprint(self) -> str:
+        """
+        图内容指纹，与节点/边顺序无关；通过本存储的 upsert/update/delete 修改会增量更新，
+        绕过存储直接修改 get_graph() 返回的图则不会被跟踪
+        """
+        if self._unit_hashes is None:
+            self._unit_hashes = {}
+            for node_id, data in self._graph.nodes(data=True):
+                self._track(("n", node_id), data)
+            for src, tgt, data in self._graph.edges(data=True):
+                self._track(self._edge_key(src, tgt), data)
+        return f"{self._digest % (1 << 128):032x}"
 
     async def index_done_callback(self):
         NetworkXStorage.write_nx_graph(self._graph, self._graphml_xml_file)
@@ -118,6 +158,7 @@ class NetworkXStorage(BaseGraphStorage):
         if graph is None:
             return False
         self._graph = graph
+        self._reset_fingerprint()
         return True
 
     async def has_node(self, node_id: str) -> bool:
@@ -160,23 +201,64 @@ class NetworkXStorage(BaseGraphStorage):
 
     async def upsert_node(self, node_id: str, node_data: dict[str, str]):
         self._graph.add_node(node_id, **node_data)
+        self._track(("n", node_id), self._graph.nodes[node_id])
 
     async def update_node(self, node_id: str, node_data: dict[str, str]):
         if self._graph.has_node(node_id):
             self._graph.nodes[node_id].update(node_data)
+            self._track(("n", node_id), self._graph.nodes[node_id])
         else:
             logger.warning("Node %s not found in the graph for update.", node_id)
 
+    async def update_nodes(self, node_updates: dict[str, dict]):
+        nodes = self._graph.nodes
+        missing = 0
+        for node_id, node_data in node_updates.items():
+            if node_id in nodes:
+                nodes[node_id].update(node_data)
+                self._track(("n", node_id), nodes[node_id])
+            else:
+                missing += 1
+        if missing:
+            logger.warning("%d nodes not found in the graph for update.", missing)
+
+    async def update_edges(self, edge_updates: list[tuple[str, str, dict]]):
+        edges = self._graph.edges
+        missing = 0
+        for source_node_id, target_node_id, edge_data in edge_updates:
+            if self._graph.has_edge(source_node_id, target_node_id):
+                data = edges[(source_node_id, target_node_id)]
+                data.update(edge_data)
+                self._track(self._edge_key(source_node_id, target_node_id), data)
+            else:
+                missing += 1
+        if missing:
+            logger.warning("%d edges not found in the graph for update.", missing)
+
     async def upsert_edge(
         self, source_node_id: str, target_node_id: str, edge_data: dict[str, str]
     ):
+        new_nodes = [
+            n for n in (source_node_id, target_node_id) if not self._graph.has_node(n)
+        ]
         self._graph.add_edge(source_node_id, target_node_id, **edge_data)
+        # add_edge 会隐式创建缺失的端点
+        for n in new_nodes:
+            self._track(("n", n), self._graph.nodes[n])
+        self._track(
+            self._edge_key(source_node_id, target_node_id),
+            self._graph.edges[(source_node_id, target_node_id)],
+        )
 
     async def update_edge(
         self, source_node_id: str, target_node_id: str, edge_data: dict[str, str]
     ):
         if self._graph.has_edge(source_node_id, target_node_id):
             self._graph.edges[(source_node_id, target_node_id)].update(edge_data)
+            self._track(
+                self._edge_key(source_node_id, target_node_id),
+                self._graph.edges[(source_node_id, target_node_id)],
+            )
         else:
             logger.warning(
                 "Edge %s -> %s not found in the graph for update.",
@@ -191,14 +273,33 @@ class NetworkXStorage(BaseGraphStorage):
         :param node_id: The node_id to delete
         """
         if self._graph.has_node(node_id):
+            incident = list(self._graph.edges(node_id))
+            if self._graph.is_directed():
+                incident += list(self._graph.in_edges(node_id))
+            for src, tgt in incident:
+                self._track(self._edge_key(src, tgt), None)
+            self._track(("n", node_id), None)
             self._graph.remove_node(node_id)
             logger.info("Node %s deleted from the graph.", node_id)
         else:
             logger.warning("Node %s not found in the graph for deletion.", node_id)
 
+    async def delete_edge(self, source_node_id: str, target_node_id: str):
+        if self._graph.has_edge(source_node_id, target_node_id):
+            self._graph.remove_edge(source_node_id, target_node_id)
+            self._track(self._edge_key(source_node_id, target_node_id), None)
+        else:
+            logger.warning(
+                "Edge %s -> %s not found in the graph for deletion.",
+                source_node_id,
+                target_node_id,
+            )
+
     async def clear(self):
         """
         Clear the graph by removing all nodes and edges.
         """
         self._graph.clear()
+        if self._unit_hashes is not None:
+            self._unit_hashes, self._digest = {}, 0
         logger.info("Graph %s cleared.", self.namespace)
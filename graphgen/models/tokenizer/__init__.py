@@ -70,3 +70,9 @@ class Tokenizer(BaseTokenizer):
 
     def count_tokens(self, text: str) -> int:
         return self._impl.count_tokens(text)
+
+    def count_tokens_batch(self, texts: List[str]) -> List[int]:
+        if isinstance(self._impl, BaseTokenizer):
+            return self._impl.count_tokens_batch(texts)
+        # HuggingFace AutoTokenizer：与 encode 一致地批量编码
+        return [len(ids) for ids in self._impl(texts)["input_ids"]]
@@ -15,3 +15,10 @@ class HFTokenizer(BaseTokenizer):
 
     def decode(self, token_ids: List[int]) -> str:
         return self.enc.decode(token_ids, skip_special_tokens=True)
+
+    def count_tokens_batch(self, texts: List[str]) -> List[int]:
+        # fast tokenizer 的批量编码在 Rust 侧并行
+        return [
+            len(ids)
+            for ids in self.enc(texts, add_special_tokens=False)["input_ids"]
+        ]
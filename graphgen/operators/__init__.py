@@ -1,5 +1,12 @@
 from .build_kg import build_mm_kg, build_text_kg, build_text_kg_with_prompt_merging
-from .generate import generate_qas
+from .generate import (
+    QAContextResolver,
+    QAContextTable,
+    QAResultSink,
+    QualityRuleEngine,
+    estimate_required_batches,
+    generate_qas,
+)
 from .judge import judge_statement
 from .partition import partition_kg
 from .quiz import quiz
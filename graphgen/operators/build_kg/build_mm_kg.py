@@ -4,6 +4,7 @@ from typing import List, Optional, Any
 from graphgen.bases.base_storage import BaseGraphStorage, BaseKVStorage
 from graphgen.bases.datatypes import Chunk
 from graphgen.models import MMKGBuilder, OpenAIClient
+from graphgen.operators.build_kg.provenance import record_chunk_provenance
 from graphgen.utils import run_concurrent
 
 
@@ -17,6 +18,7 @@ async def build_mm_kg(
     enable_batch_requests: bool = True,
     batch_size: int = 10,
     max_wait_time: float = 0.5,
+    provenance_storage: Optional[BaseKVStorage] = None,
 ):
     """
     Build multi-modal KG and merge into kg_instance
@@ -29,6 +31,7 @@ async def build_mm_kg(
     :param enable_batch_requests: Whether to enable batch requests (default: True)
     :param batch_size: Batch size for requests
     :param max_wait_time: Max wait time for batching
+    :param provenance_storage: Optional chunk provenance storage (for incremental document updates)
     :return:
     """
     mm_builder = MMKGBuilder(
@@ -52,6 +55,8 @@ async def build_mm_kg(
     if mm_builder.batch_manager:
         await mm_builder.batch_manager.flush()
 
+    await record_chunk_provenance(chunks, results, provenance_storage)
+
     nodes = defaultdict(list)
     edges = defaultdict(list)
     for n, e in results:
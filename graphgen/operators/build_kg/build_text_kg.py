@@ -4,7 +4,8 @@ from typing import List, Optional, Any
 from graphgen.bases.base_storage import BaseGraphStorage, BaseKVStorage
 from graphgen.bases.datatypes import Chunk
 from graphgen.models import LightRAGKGBuilder, OpenAIClient
-from graphgen.utils import run_concurrent
+from graphgen.operators.build_kg.provenance import record_chunk_provenance
+from graphgen.utils import annotate_chunk_languages, run_concurrent
 
 
 async def build_text_kg(
@@ -17,6 +18,7 @@ async def build_text_kg(
     enable_batch_requests: bool = True,
     batch_size: int = 10,
     max_wait_time: float = 0.5,
+    provenance_storage: Optional[BaseKVStorage] = None,
 ):
     """
     :param llm_client: Synthesizer LLM model to extract entities and relationships
@@ -28,6 +30,7 @@ async def build_text_kg(
     :param enable_batch_requests: Whether to enable batch requests (default: True)
     :param batch_size: Batch size for requests
     :param max_wait_time: Max wait time for batching
+    :param provenance_storage: Optional chunk provenance storage (for incremental document updates)
     :return:
     """
 
@@ -40,6 +43,8 @@ async def build_text_kg(
         batch_size=batch_size,
         max_wait_time=max_wait_time
     )
+    # 一次性标注 chunk 语言，抽取阶段直接读取
+    annotate_chunk_languages(chunks)
 
     results = await run_concurrent(
         kg_builder.extract,
@@ -53,6 +58,8 @@ async def build_text_kg(
     if kg_builder.batch_manager:
         await kg_builder.batch_manager.flush()
 
+    await record_chunk_provenance(chunks, results, provenance_storage)
+
     nodes = defaultdict(list)
     edges = defaultdict(list)
     for n, e in results:
@@ -3,20 +3,17 @@
 将多个chunk的抽取任务合并成一个prompt，显著减少LLM调用次数
 """
 from collections import defaultdict
-from typing import List, Optional, Any
-import re
+from typing import Any, Dict, List, Optional, Tuple
 
 from graphgen.bases.base_storage import BaseGraphStorage, BaseKVStorage
 from graphgen.bases.datatypes import Chunk
 from graphgen.models import LightRAGKGBuilder, OpenAIClient
+from graphgen.operators.build_kg.provenance import record_chunk_provenance
 from graphgen.utils import run_concurrent, logger, compute_content_hash
 from graphgen.templates import KG_EXTRACTION_PROMPT
-from graphgen.utils import (
-    detect_main_language,
-    handle_single_entity_extraction,
-    handle_single_relationship_extraction,
-    split_string_by_multi_markers,
-)
+from graphgen.utils import KGRecordParser, annotate_chunk_languages, chunk_language
+
+_KG_RECORD_PARSER = KGRecordParser.from_format(KG_EXTRACTION_PROMPT["FORMAT"])
 
 
 def batch_chunks(chunks: List[Chunk], batch_size: int) -> List[List[Chunk]]:
@@ -39,7 +36,7 @@ def batch_chunks_by_budget(
     """
     groups = {"zh": [], "en": [], "other": []}
     for c in chunks:
-        lang = detect_main_language(c.content)
+        lang = chunk_language(c)
         groups.setdefault(lang if lang in ("zh", "en") else "other", []).append(c)
 
     batches: List[List[Chunk]] = []
@@ -77,6 +74,7 @@ async def build_text_kg_with_prompt_merging(
     prompt_merge_size: int = 5,
     max_batch_chars: int = 12000,
     merged_max_tokens: int = 8192,
+    provenance_storage: Optional[BaseKVStorage] = None,
 ):
     """
     优化版本的KG构建，支持Prompt合并
@@ -92,6 +90,7 @@ async def build_text_kg_with_prompt_merging(
     :param max_wait_time: 最大等待时间
     :param enable_prompt_merging: 是否启用Prompt合并（关键优化！）
     :param prompt_merge_size: 每次合并的chunk数量
+    :param provenance_storage: chunk 溯源存储（可选，用于增量更新/删除文档）
     :return:
     """
     
@@ -104,6 +103,8 @@ async def build_text_kg_with_prompt_merging(
         batch_size=batch_size,
         max_wait_time=max_wait_time
     )
+    # 一次性标注 chunk 语言，分批与抽取阶段直接读取
+    annotate_chunk_languages(chunks)
     
     if enable_prompt_merging and prompt_merge_size > 1:
         logger.info(
@@ -137,6 +138,8 @@ async def build_text_kg_with_prompt_merging(
     if kg_builder.batch_manager:
         await kg_builder.batch_manager.flush()
 
+    await record_chunk_provenance(chunks, results, provenance_storage)
+
     # 合并节点和边
     nodes = defaultdict(list)
     edges = defaultdict(list)
@@ -178,7 +181,10 @@ async def extract_with_prompt_merging(
     """
     使用Prompt合并的抽取方法
 
-    将多个chunks合并成一个prompt进行抽取，显著减少LLM调用次数
+    将多个chunks合并成一个prompt进行抽取，显著减少LLM调用次数。
+    响应被截断（finish_reason == "length" 或缺少结束标记）或部分 chunk
+    无法归属/解析时，只对失败的 chunks 以更小的合并批次递归重抽，
+    避免尾部实体被静默丢弃。
 
     :param kg_builder: KG构建器
     :param chunks: chunk列表
@@ -198,14 +204,31 @@ async def extract_with_prompt_merging(
         len(chunks), len(chunk_batches), merge_size, max_batch_chars
     )
     
+    split_stats = {"truncated": 0, "bisected": 0, "retried_chunks": 0}
+
+    async def call_merged_extraction(chunk_batch: List[Chunk]) -> str:
+        """对一个合并批次发起一次 LLM 调用"""
+        merged_prompt = build_merged_extraction_prompt(chunk_batch)
+        # 合并批次的输出规模与 chunk 数成正比，使用更高的输出上限避免截断
+        # （默认 4096 下 5 个 chunk 的实体/关系输出很容易超限，尾部静默丢失）。
+        merged_extra = {"max_tokens": merged_max_tokens}
+        if kg_builder.batch_manager:
+            return await kg_builder.batch_manager.add_request(
+                merged_prompt, extra_params=merged_extra
+            )
+        return await kg_builder.llm_client.generate_answer(
+            merged_prompt, **merged_extra
+        )
+
     async def extract_merged_batch(chunk_batch: List[Chunk]):
-        """抽取一个合并批次"""
+        """抽取一个合并批次；截断或部分 chunk 解析失败时对失败部分二分重抽"""
         if len(chunk_batch) == 1:
             # 只有一个chunk，直接使用原始方法
             logger.debug("Single chunk in batch, using original extraction method")
             return [await kg_builder.extract(chunk_batch[0])]
         
         # 检查缓存
+        batch_hash = None
         if enable_cache and cache_storage:
             # 为整个batch生成缓存key
             batch_content = "\n\n".join([c.content for c in chunk_batch])
@@ -215,22 +238,9 @@ async def extract_with_prompt_merging(
                 # 缓存命中时只记录info级别
                 logger.info("Cache hit for merged batch of %d chunks", len(chunk_batch))
                 return cached_result["results"]
-        
-        # 构建合并prompt
-        merged_prompt = build_merged_extraction_prompt(chunk_batch)
 
-        # 调用LLM（一次调用处理多个chunks）。
-        # 合并批次的输出规模与 chunk 数成正比，使用更高的输出上限避免截断
-        # （默认 4096 下 5 个 chunk 的实体/关系输出很容易超限，尾部静默丢失）。
-        merged_extra = {"max_tokens": merged_max_tokens}
-        if kg_builder.batch_manager:
-            response = await kg_builder.batch_manager.add_request(
-                merged_prompt, extra_params=merged_extra
-            )
-        else:
-            response = await kg_builder.llm_client.generate_answer(
-                merged_prompt, **merged_extra
-            )
+        # 调用LLM（一次调用处理多个chunks）
+        response = await call_merged_extraction(chunk_batch)
         
         # 只在有响应时记录摘要信息
         if response:
@@ -238,11 +248,47 @@ async def extract_with_prompt_merging(
                 "Received LLM response for merged batch of %d chunks: length=%d",
                 len(chunk_batch), len(response)
             )
-        
-        # 解析响应，分配给各个chunk（使用await）
-        results = await parse_merged_extraction_response(
-            response, chunk_batch, kg_builder
-        )
+
+        # 解析响应：只保留能归属到具体 chunk 且非空的结果
+        sections = await split_merged_extraction_response(response, chunk_batch)
+
+        # 截断检测：输出被截断时最后一个 section 可能只解析了一半，
+        # 丢弃它并与缺失的 chunk 一起重抽（之前的 section 是完整的，予以保留）
+        truncated = is_truncated_extraction(response)
+        if truncated and sections:
+            sections.pop(max(sections))
+        if truncated:
+            split_stats["truncated"] += 1
+
+        failed = [idx for idx in range(len(chunk_batch)) if idx not in sections]
+        if failed:
+            split_stats["retried_chunks"] += len(failed)
+            if len(failed) < len(chunk_batch):
+                # 部分失败：失败的 chunks 作为更小的合并批次重抽
+                logger.info(
+                    "Merged batch%s: %d/%d chunks unattributable, re-extracting them",
+                    " truncated" if truncated else "", len(failed), len(chunk_batch),
+                )
+                retry_groups = [failed]
+            else:
+                # 整批失败：二分后分别重抽（规模严格递减，单 chunk 时退回独立抽取）
+                split_stats["bisected"] += 1
+                mid = len(chunk_batch) // 2
+                logger.warning(
+                    "Merged batch of %d chunks failed (%s), bisecting into %d + %d",
+                    len(chunk_batch),
+                    "truncated" if truncated else "no parsable sections",
+                    mid, len(chunk_batch) - mid,
+                )
+                retry_groups = [failed[:mid], failed[mid:]]
+            for group in retry_groups:
+                group_results = await extract_merged_batch(
+                    [chunk_batch[idx] for idx in group]
+                )
+                for idx, result in zip(group, group_results):
+                    sections[idx] = result
+
+        results = [sections[idx] for idx in range(len(chunk_batch))]
         
         # 统计结果
         total_nodes = sum(len(nodes) for nodes, _ in results)
@@ -253,7 +299,7 @@ async def extract_with_prompt_merging(
         )
         
         # 缓存结果（空结果不缓存，避免解析失败被固化）
-        if enable_cache and cache_storage and any(n or e for n, e in results):
+        if batch_hash and any(n or e for n, e in results):
             await cache_storage.upsert({
                 batch_hash: {
                     "results": results,
@@ -272,6 +318,14 @@ async def extract_with_prompt_merging(
         progress_bar=progress_bar,
     )
     
+    if any(split_stats.values()):
+        logger.info(
+            "[Prompt Merging] Split-and-retry: %d truncated responses, "
+            "%d bisections, %d chunks re-extracted",
+            split_stats["truncated"], split_stats["bisected"],
+            split_stats["retried_chunks"],
+        )
+
     # 展平结果
     results = []
     for batch_results in all_results:
@@ -280,15 +334,28 @@ async def extract_with_prompt_merging(
     return results
 
 
+def is_truncated_extraction(response: str) -> bool:
+    """
+    判断合并抽取的响应是否被截断
+
+    - finish_reason == "length"：输出触达 max_tokens；
+    - 缺少 completion_delimiter：模型没有按约定输出结束标记，尾部可能不完整。
+    """
+    if not response:
+        return False
+    if getattr(response, "finish_reason", None) == "length":
+        return True
+    return KG_EXTRACTION_PROMPT["FORMAT"]["completion_delimiter"] not in response
+
+
 def build_merged_extraction_prompt(chunk_batch: List[Chunk]) -> str:
     """
     构建合并的抽取prompt
     
     将多个chunks的内容合并到一个prompt中
     """
-    # 检测语言（使用第一个chunk的语言）
-    first_content = chunk_batch[0].content
-    language = detect_main_language(first_content)
+    # 批内 chunk 已按语言分组，使用第一个chunk的语言标注
+    language = chunk_language(chunk_batch[0])
     
     # 构建合并的文本内容
     merged_text_parts = []
@@ -320,20 +387,19 @@ In your output, please label each entity or relationship with the text number it
     return prompt
 
 
-async def parse_merged_extraction_response(
+async def split_merged_extraction_response(
     response: str,
     chunk_batch: List[Chunk],
-    kg_builder: LightRAGKGBuilder
-) -> List:
+) -> Dict[int, Tuple[dict, dict]]:
     """
-    解析合并抽取的响应
-    
-    将响应分配给对应的chunks
-    
+    按文本标记拆分合并抽取的响应，并解析每个 section
+
+    只返回能归属到具体 chunk 且解析出实体/关系的结果；
+    缺失或为空的 chunk 不出现在返回值中，由调用方决定如何重抽。
+
     :param response: LLM响应
     :param chunk_batch: chunk批次
-    :param kg_builder: KG构建器
-    :return: 每个chunk的抽取结果列表
+    :return: {chunk 在批次中的下标: (nodes, edges)}
     """
     logger.debug(
         "Parsing merged response for %d chunks, response length: %d",
@@ -345,7 +411,6 @@ async def parse_merged_extraction_response(
     
     text_markers_zh = [f"[文本{i}]" for i in range(1, len(chunk_batch) + 1)]
     text_markers_en = [f"[Text {i}]" for i in range(1, len(chunk_batch) + 1)]
-    expected_markers = text_markers_zh + text_markers_en
     
     # 使用修复工具预处理响应
     repaired_response = repair_llm_response(
@@ -391,69 +456,73 @@ async def parse_merged_extraction_response(
             if clean_line:  # 只添加非空行
                 text_sections[target_idx].append(clean_line)
     
-    # 转换为列表格式
-    text_sections_list = [(idx, "\n".join(lines)) for idx, lines in sorted(text_sections.items())]
-    
     logger.debug(
         "Split response into %d sections for %d chunks: %s",
-        len(text_sections_list), len(chunk_batch),
+        len(text_sections), len(chunk_batch),
         [f"Section{idx}: {len(lines)} lines" for idx, lines in text_sections.items()]
     )
-    
-    # 如果没有找到标记，退回逐 chunk 独立抽取
-    # （旧实现把整份响应解析一次后复制给全部 chunks，导致同一批实体/关系
-    #   被记为多个 chunk 的来源，污染 source_id 与实体类型频次统计）
-    if not text_sections_list:
+
+    if not text_sections:
         logger.warning(
-            "Failed to split merged response by text markers even after repair, "
-            "falling back to individual extraction for all %d chunks. "
-            "This might indicate that the LLM did not follow the format correctly.",
-            len(chunk_batch)
+            "Failed to split merged response by text markers even after repair. "
+            "This might indicate that the LLM did not follow the format correctly."
         )
         logger.debug("Response markers expected: %s", text_markers_zh[:3])
         logger.debug("Original response preview: %s", response[:500])
+        return {}
 
-        results = []
-        for chunk in chunk_batch:
-            nodes, edges = await kg_builder.extract(chunk)
-            results.append((nodes, edges))
-        return results
+    # 为每个chunk解析其对应的section
+    parsed: Dict[int, Tuple[dict, dict]] = {}
+    for idx, section_lines in sorted(text_sections.items()):
+        chunk = chunk_batch[idx]
+        nodes, edges = await parse_single_extraction("\n".join(section_lines), chunk.id)
+        if not nodes and not edges:
+            # section 存在但没有可解析的记录，视为该 chunk 解析失败
+            logger.debug("Chunk %d (%s): section yielded no records", idx, chunk.id)
+            continue
+        parsed[idx] = (nodes, edges)
+        # 只在前几个或每10个时记录详细信息
+        if len(parsed) <= 3 or len(parsed) % 10 == 0:
+            logger.debug(
+                "Chunk %d (%s): parsed section with %d nodes, %d edges",
+                idx, chunk.id, len(nodes), len(edges)
+            )
+    return parsed
+
+
+async def parse_merged_extraction_response(
+    response: str,
+    chunk_batch: List[Chunk],
+    kg_builder: LightRAGKGBuilder
+) -> List:
+    """
+    解析合并抽取的响应
     
-    # 为每个chunk解析其对应的section（使用await）
+    将响应分配给对应的chunks；无法归属的 chunk 退回独立抽取
+    （旧实现把整份响应解析一次后复制给全部 chunks，导致同一批实体/关系
+    被记为多个 chunk 的来源，污染 source_id 与实体类型频次统计）
+    
+    :param response: LLM响应
+    :param chunk_batch: chunk批次
+    :param kg_builder: KG构建器
+    :return: 每个chunk的抽取结果列表
+    """
+    sections = await split_merged_extraction_response(response, chunk_batch)
+
     results = []
-    parsed_count = 0
     fallback_count = 0
-    
     for idx, chunk in enumerate(chunk_batch):
-        # 找到对应的section
-        section_text = None
-        for text_idx, section in text_sections_list:
-            if text_idx == idx:
-                section_text = section
-                break
-        
-        if section_text:
-            nodes, edges = await parse_single_extraction(section_text, chunk.id)
-            parsed_count += 1
-            # 只在前几个或每10个时记录详细信息
-            if parsed_count <= 3 or parsed_count % 10 == 0:
-                logger.debug(
-                    "Chunk %d (%s): parsed section with %d nodes, %d edges",
-                    idx, chunk.id, len(nodes), len(edges)
-                )
-        else:
-            # 该 chunk 缺少对应 section：退回该 chunk 独立重抽
-            # （旧实现把完整响应当作该 chunk 的结果，造成跨 chunk 重复）
-            fallback_count += 1
-            if fallback_count <= 3:  # 只记录前3个警告
-                logger.warning(
-                    "No section found for chunk %d (%s), falling back to individual extraction",
-                    idx, chunk.id
-                )
-            nodes, edges = await kg_builder.extract(chunk)
-        
-        results.append((nodes, edges))
-    
+        if idx in sections:
+            results.append(sections[idx])
+            continue
+        fallback_count += 1
+        if fallback_count <= 3:  # 只记录前3个警告
+            logger.warning(
+                "No section found for chunk %d (%s), falling back to individual extraction",
+                idx, chunk.id
+            )
+        results.append(await kg_builder.extract(chunk))
+
     # 汇总信息
     if fallback_count > 3:
         logger.warning(
@@ -467,93 +536,17 @@ async def parse_merged_extraction_response(
 async def parse_single_extraction(text: str, chunk_id: str):
     """
     解析单个文本的抽取结果
-    
-    复用LightRAGKGBuilder的解析逻辑
+
+    复用LightRAGKGBuilder的解析器（预编译、单遍、同步）
     """
-    from graphgen.utils import logger as parse_logger
-    
-    records = split_string_by_multi_markers(
-        text,
-        [
-            KG_EXTRACTION_PROMPT["FORMAT"]["record_delimiter"],
-            KG_EXTRACTION_PROMPT["FORMAT"]["completion_delimiter"],
-        ],
+    records = _KG_RECORD_PARSER.split_records(text)
+    nodes, edges = _KG_RECORD_PARSER.parse_records(records, chunk_id)
+    parsed_count = sum(len(v) for v in nodes.values()) + sum(
+        len(v) for v in edges.values()
     )
-    
-    # 只在有records时记录总体信息
-    if records:
-        parse_logger.debug(
-            "Parsing extraction for chunk %s: found %d records",
-            chunk_id, len(records)
-        )
-    
-    nodes = defaultdict(list)
-    edges = defaultdict(list)
-    
-    # 统计信息（减少日志频率）
-    no_match_count = 0
-    entity_count = 0
-    relation_count = 0
-    neither_count = 0
-    
-    for record_idx, record in enumerate(records):
-        # 非贪婪匹配：描述含多个括号时贪婪正则会解析错位
-        match = re.search(r"\((.*?)\)", record, re.DOTALL)
-        if not match:
-            no_match_count += 1
-            # 只记录前几个失败的，或者每100个记录一次
-            if no_match_count <= 3 or record_idx % 100 == 0:
-                parse_logger.debug("Record %d: no match for pattern", record_idx)
-            continue
-        inner = match.group(1)
-        
-        attributes = split_string_by_multi_markers(
-            inner, [KG_EXTRACTION_PROMPT["FORMAT"]["tuple_delimiter"]]
-        )
-        
-        # 只在前几个或每100个时记录详细信息
-        if record_idx < 3 or record_idx % 100 == 0:
-            parse_logger.debug(
-                "Record %d: parsed %d attributes, first attr: %s",
-                record_idx, len(attributes), attributes[0] if attributes else "N/A"
-            )
-        
-        # 使用 await 而不是 asyncio.run()
-        entity = await handle_single_entity_extraction(attributes, chunk_id)
-        if entity is not None:
-            nodes[entity["entity_name"]].append(entity)
-            entity_count += 1
-            # 只在前几个或每100个时记录
-            if entity_count <= 3 or entity_count % 100 == 0:
-                parse_logger.debug("Record %d: extracted entity '%s'", record_idx, entity["entity_name"])
-            continue
-        
-        relation = await handle_single_relationship_extraction(attributes, chunk_id)
-        if relation is not None:
-            key = (relation["src_id"], relation["tgt_id"])
-            edges[key].append(relation)
-            relation_count += 1
-            # 只在前几个或每100个时记录
-            if relation_count <= 3 or relation_count % 100 == 0:
-                parse_logger.debug(
-                    "Record %d: extracted relationship '%s' -> '%s'",
-                    record_idx, relation["src_id"], relation["tgt_id"]
-                )
-            continue
-        
-        neither_count += 1
-        # 只记录前几个失败的
-        if neither_count <= 3:
-            parse_logger.warning(
-                "Record %d: neither entity nor relationship. Attributes: %s",
-                record_idx, attributes[:5] if len(attributes) > 5 else attributes
-            )
-    
-    # 汇总统计信息
-    parse_logger.info(
+    logger.info(
         "Chunk %s extraction complete: %d nodes, %d edges (from %d records, %d failed)",
-        chunk_id, len(nodes), len(edges), len(records), no_match_count + neither_count
+        chunk_id, len(nodes), len(edges), len(records), len(records) - parsed_count
     )
-    
-    return dict(nodes), dict(edges)
+    return nodes, edges
 
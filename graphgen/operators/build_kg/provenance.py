@@ -0,0 +1,261 @@
+"""
+图谱溯源索引（provenance index）
+
+- chunk_id → 该 chunk 抽取出的实体/关系原始记录（合并入图时维护）；
+- doc_id → chunk_ids（切分时维护）。
+
+节点/边的 source_id 是 "<SEP>" 拼接的字符串，没有反向索引，删除或修改文档只能
+clear() 后全量重建。借助溯源索引可以只撤回受影响 chunk 的提及，并按剩余 chunk
+的原始记录重新合并受影响的实体/关系；只有描述集合真正变化时才重新摘要。
+"""
+
+from collections import Counter, defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from graphgen.bases.base_storage import BaseGraphStorage, BaseKVStorage
+from graphgen.bases.datatypes import Chunk
+from graphgen.models import LightRAGKGBuilder
+from graphgen.utils import logger, run_concurrent, split_string_by_multi_markers
+
+
+def _split_source_ids(source_id: Optional[str]) -> List[str]:
+    if not source_id:
+        return []
+    return split_string_by_multi_markers(source_id, ["<SEP>"])
+
+
+def _edge_key(src: str, tgt: str) -> Tuple[str, str]:
+    return tuple(sorted((src, tgt)))
+
+
+async def record_chunk_provenance(
+    chunks: List[Chunk],
+    results: Iterable[Tuple[Dict[str, List[dict]], Dict[Tuple[str, str], List[dict]]]],
+    provenance_storage: Optional[BaseKVStorage],
+) -> None:
+    """
+    将抽取结果按 source_id 归档为 chunk_id → {"nodes": [...], "edges": [...]}
+
+    没有抽取出任何实体的 chunk 也会记录空条目，撤回时据此区分"无提及"与"旧图谱无记录"。
+
+    :param chunks: 本次抽取的 chunk
+    :param results: 各 chunk 的抽取结果 (nodes, edges)，顺序无关
+    :param provenance_storage: chunk 溯源存储
+    """
+    if provenance_storage is None:
+        return
+    per_chunk: Dict[str, Dict[str, list]] = {
+        chunk.id: {"nodes": [], "edges": []} for chunk in chunks
+    }
+    for nodes, edges in results:
+        for records in nodes.values():
+            for record in records:
+                per_chunk.setdefault(record["source_id"], {"nodes": [], "edges": []})[
+                    "nodes"
+                ].append(record)
+        for records in edges.values():
+            for record in records:
+                per_chunk.setdefault(record["source_id"], {"nodes": [], "edges": []})[
+                    "edges"
+                ].append(record)
+    if per_chunk:
+        await provenance_storage.update(per_chunk)
+        logger.info("[Provenance] Recorded mentions for %d chunks", len(per_chunk))
+
+
+async def _legacy_mentions(
+    kg_instance: BaseGraphStorage, chunk_ids: Set[str]
+) -> Tuple[Set[str], Set[Tuple[str, str]]]:
+    """无溯源记录的 chunk（旧图谱）：扫描全图的 source_id 找到其提及"""
+    entities: Set[str] = set()
+    edges: Set[Tuple[str, str]] = set()
+    for node_id, data in await kg_instance.get_all_nodes():
+        if chunk_ids & set(_split_source_ids(data.get("source_id"))):
+            entities.add(node_id)
+    for src, tgt, data in await kg_instance.get_all_edges():
+        if chunk_ids & set(_split_source_ids(data.get("source_id"))):
+            edges.add(_edge_key(src, tgt))
+    return entities, edges
+
+
+async def retract_chunks(
+    chunk_ids: Iterable[str],
+    kg_instance: BaseGraphStorage,
+    provenance_storage: BaseKVStorage,
+    kg_builder: LightRAGKGBuilder,
+) -> Dict[str, int]:
+    """
+    从图谱中撤回一批 chunk 的全部提及
+
+    1. 通过溯源索引找到受影响的实体与关系，删除这些 chunk 的溯源记录；
+    2. 对每个受影响的关系/实体，用剩余 chunk 的原始记录重新合并：
+       没有剩余提及则删除（仍有边相连的实体保留为占位节点，source_id 与描述取自剩余的边）；
+       受影响关系的端点一并检查，撤回后孤立的占位节点随之删除；
+       描述集合未变化时只更新 source_id，否则重新拼接并摘要；
+    3. 剩余 chunk 中若有缺少溯源记录的（旧图谱），无法重建描述，仅更新 source_id。
+
+    :return: 统计信息
+    """
+    removed: Set[str] = set(chunk_ids)
+    stats = {
+        "chunks": len(removed),
+        "nodes_deleted": 0,
+        "nodes_updated": 0,
+        "edges_deleted": 0,
+        "edges_updated": 0,
+        "resummarized": 0,
+    }
+    if not removed:
+        return stats
+
+    removed_list = sorted(removed)
+    provenance = dict(
+        zip(removed_list, await provenance_storage.get_by_ids(removed_list))
+    )
+
+    removed_node_records: Dict[str, List[dict]] = defaultdict(list)
+    removed_edge_records: Dict[Tuple[str, str], List[dict]] = defaultdict(list)
+    for entry in provenance.values():
+        if entry is None:
+            continue
+        for record in entry.get("nodes", []):
+            removed_node_records[record["entity_name"]].append(record)
+        for record in entry.get("edges", []):
+            removed_edge_records[_edge_key(record["src_id"], record["tgt_id"])].append(
+                record
+            )
+
+    affected_nodes: Set[str] = set(removed_node_records)
+    affected_edges: Set[Tuple[str, str]] = set(removed_edge_records)
+    legacy_chunks = {cid for cid, entry in provenance.items() if entry is None}
+    if legacy_chunks:
+        logger.warning(
+            "[Provenance] %d chunks have no provenance record, scanning the graph",
+            len(legacy_chunks),
+        )
+        legacy_nodes, legacy_edges = await _legacy_mentions(kg_instance, legacy_chunks)
+        affected_nodes |= legacy_nodes
+        affected_edges |= legacy_edges
+
+    # merge_edges 为未抽取为实体的端点创建的占位节点只能通过边找到
+    for src, tgt in affected_edges:
+        affected_nodes.update((src, tgt))
+
+    await provenance_storage.delete(removed_list)
+
+    async def _remaining_records(
+        remaining_ids: List[str], kind: str, match
+    ) -> Optional[List[dict]]:
+        """收集剩余 chunk 中匹配的原始记录；任一 chunk 缺少溯源记录时返回 None"""
+        entries = await provenance_storage.get_by_ids(remaining_ids)
+        if any(entry is None for entry in entries):
+            return None
+        return [r for entry in entries for r in entry.get(kind, []) if match(r)]
+
+    async def _rebuild_description(
+        name: str, current: str, kept: List[dict], dropped: List[dict]
+    ) -> str:
+        kept_desc = {r["description"] for r in kept}
+        if {r["description"] for r in dropped} <= kept_desc:
+            # 撤回的提及没有贡献独有描述，保留现有（可能已摘要的）描述
+            return current
+        stats["resummarized"] += 1
+        return await kg_builder._handle_kg_summary(  # pylint: disable=protected-access
+            name, "<SEP>".join(sorted(kept_desc))
+        )
+
+    async def _retract_edge(key: Tuple[str, str]) -> None:
+        src, tgt = key
+        edge = await kg_instance.get_edge(src, tgt)
+        if edge is None:
+            return
+        remaining_ids = [
+            sid for sid in _split_source_ids(edge.get("source_id")) if sid not in removed
+        ]
+        if not remaining_ids:
+            await kg_instance.delete_edge(src, tgt)
+            stats["edges_deleted"] += 1
+            return
+        update = {"source_id": "<SEP>".join(remaining_ids)}
+        kept = await _remaining_records(
+            remaining_ids,
+            "edges",
+            lambda r: _edge_key(r["src_id"], r["tgt_id"]) == key,
+        )
+        if kept:
+            update["description"] = await _rebuild_description(
+                f"({src}, {tgt})",
+                edge.get("description", ""),
+                kept,
+                removed_edge_records.get(key, []),
+            )
+        await kg_instance.update_edge(src, tgt, update)
+        stats["edges_updated"] += 1
+
+    async def _placeholder_update(name: str) -> Dict[str, Any]:
+        """与 merge_edges 一致：占位节点的 source_id 与描述取自相连的（剩余）边"""
+        edge_source_ids: List[str] = []
+        descriptions: Set[str] = set()
+        for src, tgt in await kg_instance.get_node_edges(name) or []:
+            edge = await kg_instance.get_edge(src, tgt) or {}
+            edge_source_ids.extend(_split_source_ids(edge.get("source_id")))
+            if edge.get("description"):
+                descriptions.add(edge["description"])
+        return {
+            "source_id": "<SEP>".join(dict.fromkeys(edge_source_ids)),
+            "description": "<SEP>".join(sorted(descriptions)),
+            "entity_type": "UNKNOWN",
+        }
+
+    async def _retract_node(name: str) -> None:
+        node = await kg_instance.get_node(name)
+        if node is None:
+            return
+        source_ids = _split_source_ids(node.get("source_id"))
+        remaining_ids = [sid for sid in source_ids if sid not in removed]
+        kept = (
+            await _remaining_records(
+                remaining_ids, "nodes", lambda r: r["entity_name"] == name
+            )
+            if remaining_ids
+            else []
+        )
+        if kept is not None and not kept:
+            # 剩余 chunk 中没有该实体的提及：没有边相连则删除，
+            # 否则与 merge_edges 一致保留为占位节点，按剩余的边重建 source_id 与描述
+            if await kg_instance.node_degree(name) == 0:
+                await kg_instance.delete_node(name)
+                stats["nodes_deleted"] += 1
+                return
+            await kg_instance.update_node(name, await _placeholder_update(name))
+            stats["nodes_updated"] += 1
+            return
+        if len(remaining_ids) == len(source_ids):
+            # 只因相连的边被撤回而检查，自身的提及没有变化
+            return
+        update: Dict[str, Any] = {"source_id": "<SEP>".join(remaining_ids)}
+        if kept:
+            update["entity_type"] = Counter(
+                r["entity_type"] for r in kept
+            ).most_common(1)[0][0]
+            update["description"] = await _rebuild_description(
+                name,
+                node.get("description", ""),
+                kept,
+                removed_node_records.get(name, []),
+            )
+        await kg_instance.update_node(name, update)
+        stats["nodes_updated"] += 1
+
+    # 先处理边：实体是否可删除取决于其剩余度数
+    await run_concurrent(
+        _retract_edge, sorted(affected_edges), desc="Retracting relationships"
+    )
+    await run_concurrent(
+        _retract_node, sorted(affected_nodes), desc="Retracting entities"
+    )
+    if kg_builder.batch_manager:
+        await kg_builder.batch_manager.flush()
+
+    logger.info("[Provenance] Retraction finished: %s", stats)
+    return stats
@@ -1,7 +1,7 @@
 """Generate evaluation dataset from knowledge graph batches"""
 
 import asyncio
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 from collections import defaultdict
 
 from graphgen.bases.base_llm_client import BaseLLMClient
@@ -12,7 +12,7 @@ from graphgen.models.eval_generator import (
     FactualAccuracyGenerator,
     ComprehensiveEvalGenerator,
 )
-from graphgen.utils import logger, run_concurrent
+from graphgen.utils import NearDuplicateIndex, logger, run_concurrent
 
 
 async def generate_eval_dataset(
@@ -155,7 +155,9 @@ async def generate_eval_dataset(
     logger.info(f"Total items before deduplication: {len(all_eval_items)}")
     
     # Remove duplicates based on question similarity
-    unique_items = _deduplicate_eval_items(all_eval_items)
+    unique_items = _deduplicate_eval_items(
+        all_eval_items, evaluation_config.get("near_duplicate_threshold")
+    )
     
     logger.info(
         f"Items after deduplication: {len(unique_items)} "
@@ -187,22 +189,37 @@ async def generate_eval_dataset(
     return dataset
 
 
-def _deduplicate_eval_items(items: List[EvaluationItem]) -> List[EvaluationItem]:
+def _deduplicate_eval_items(
+    items: List[EvaluationItem],
+    near_duplicate_threshold: Optional[float] = None,
+) -> List[EvaluationItem]:
     """
     Remove duplicate evaluation items based on question similarity.
     
     :param items: list of evaluation items
+    :param near_duplicate_threshold: also drop near-duplicate questions whose estimated
+        Jaccard similarity (MinHash) reaches this value; None keeps exact matching only
     :return: deduplicated list
     """
     seen_questions = set()
     unique_items = []
+    near_index = (
+        NearDuplicateIndex(threshold=float(near_duplicate_threshold))
+        if near_duplicate_threshold
+        else None
+    )
     
     for item in items:
         # Simple deduplication based on question text
         question_lower = item.question.lower().strip()
-        if question_lower not in seen_questions:
-            seen_questions.add(question_lower)
-            unique_items.append(item)
+        if question_lower in seen_questions:
+            continue
+        if near_index is not None and near_index.add(
+            question_lower, item.question, namespace=item.type
+        ) is not None:
+            continue
+        seen_questions.add(question_lower)
+        unique_items.append(item)
     
     return unique_items
 
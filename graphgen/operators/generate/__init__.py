@@ -1 +1,5 @@
-from .generate_qas import generate_qas
+from .batch_fingerprint import BatchFingerprintLog, batch_fingerprint
+from .generate_qas import estimate_required_batches, generate_qas
+from .result_sink import QAResultSink
+from .qa_context import QAContextResolver, QAContextTable, context_table_path
+from .quality_rules import QualityRuleEngine, register_quality_rule
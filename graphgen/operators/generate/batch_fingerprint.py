@@ -0,0 +1,48 @@
+from typing import Any
+
+from graphgen.bases.base_storage import BaseKVStorage
+from graphgen.utils import compute_content_hash
+
+
+def batch_fingerprint(batch: Any, mode: str, template_id: str = "") -> str:
+    """
+    批次指纹：排序后的节点 id 与边端点 + 生成模式 + 模板标识
+
+    节点/边的顺序与边的方向不影响指纹；同一批次在不同模式或模板配置下生成的内容不同，
+    指纹也不同。
+
+    :param batch: (nodes, edges)，nodes 为 (id, data)，edges 为 (src, tgt, data)
+    :param template_id: 生成器与模板配置的标识
+    """
+    nodes, edges = batch
+    node_ids = sorted(str(node[0]) for node in nodes)
+    edge_ids = sorted("->".join(sorted((str(edge[0]), str(edge[1])))) for edge in edges)
+    key = "\n".join([mode, template_id, "|".join(node_ids), "|".join(edge_ids)])
+    return compute_content_hash(key, prefix="batch-")
+
+
+class BatchFingerprintLog:
+    """
+    已生成批次指纹的增量持久化
+
+    批次的结果写出后立即登记到存储，每 flush_every 个新指纹落盘一次；调用方在 finally 中
+    flush，运行中断或出错时已完成批次的指纹不会丢失，续跑只为未完成的批次调用 LLM。
+    """
+
+    def __init__(self, storage: BaseKVStorage, flush_every: int = 20):
+        self.storage = storage
+        self.flush_every = max(int(flush_every or 1), 1)
+        self.recorded = 0
+        self._unsaved = 0
+
+    async def record(self, fingerprint: str, mode: str) -> None:
+        await self.storage.upsert({fingerprint: {"mode": mode}})
+        self.recorded += 1
+        self._unsaved += 1
+        if self._unsaved >= self.flush_every:
+            await self.flush()
+
+    async def flush(self) -> None:
+        if self._unsaved:
+            await self.storage.index_done_callback()
+            self._unsaved = 0
@@ -1,8 +1,9 @@
-import asyncio
+import itertools
 import re
 from typing import Any, Optional, Dict
 
 from graphgen.bases import BaseLLMClient
+from graphgen.bases.base_generator import hierarchy_context_kind
 from graphgen.models import (
     AggregatedGenerator,
     AtomicGenerator,
@@ -13,8 +14,26 @@ from graphgen.models import (
     TreeStructureGenerator,
 )
 from graphgen.models.llm.batch_llm_wrapper import BatchLLMWrapper
+from graphgen.models.llm.packed_llm_wrapper import PackedLLMWrapper
+from graphgen.operators.partition.batch_stream import BatchStream
+from .batch_fingerprint import BatchFingerprintLog, batch_fingerprint
+from .generation_scheduler import GenerationLane, GenerationScheduler
+from .qa_context import QAContextTable
+from .quality_rules import (
+    QualityRuleEngine,
+    _answer_text,
+    _question_field,
+    clean_question_text,
+)
+from .result_sink import QAResultSink
 from graphgen.templates import ATOMIC_ANSWER_PROMPT
-from graphgen.utils import compute_content_hash, detect_main_language, logger, run_concurrent
+from graphgen.utils import (
+    ContextCache,
+    NearDuplicateIndex,
+    compute_content_hash,
+    detect_main_language,
+    logger,
+)
 from graphgen.utils.hierarchy_utils import HierarchySerializer
 
 
@@ -22,16 +41,9 @@ def _extract_question_from_formatted_result(result: dict[str, Any]) -> str:
     """Extract question text from different output formats."""
     if not isinstance(result, dict):
         return ""
-    if "instruction" in result:
-        return result.get("instruction", "")
-    if "conversations" in result:
-        for msg in result.get("conversations", []):
-            if msg.get("from") == "human":
-                return msg.get("value", "")
-    if "messages" in result:
-        for msg in result.get("messages", []):
-            if msg.get("role") == "user":
-                return msg.get("content", "")
+    field = _question_field(result)
+    if field is not None:
+        return field[0].get(field[1], "")
     return result.get("question") or result.get("input", "")
 
 
@@ -259,13 +271,8 @@ def _build_question_hash(question: str, mode: Optional[str] = None) -> str:
     return compute_content_hash(key)
 
 
-def _build_hierarchical_context(
-    context_block: dict[str, Any],
-    hierarchical_relations: Optional[list[str]] = None,
-) -> str:
-    """Rebuild hierarchical context text from stored context metadata (nodes/edges dicts)."""
-    if not isinstance(context_block, dict):
-        return ""
+def _context_block_batch(context_block: dict[str, Any]) -> tuple[list, list]:
+    """把存储的 context（nodes/edges 字典）还原为 (nodes, edges) 批次"""
     nodes = [
         (
             n.get("name", ""),
@@ -290,39 +297,98 @@ def _build_hierarchical_context(
         for e in context_block.get("edges", [])
         if isinstance(e, dict)
     ]
-    if not edges:
+    return nodes, edges
+
+
+def _build_atomic_context(
+    context_block: dict[str, Any],
+    context_cache: Optional[ContextCache] = None,
+) -> tuple[str, str]:
+    """
+    答案阶段的上下文文本及语言；没有上下文时均为空字符串
+
+    与问题阶段按同一批次缓存，命中时直接复用问题阶段序列化的结果。
+    """
+    if not isinstance(context_block, dict):
+        return "", ""
+
+    def build() -> tuple[str, str]:
+        text = _build_context_text(context_block)
+        return text, detect_main_language(text) if text else ""
+
+    if context_cache is None:
+        return build()
+    text, language = context_cache.get(_context_block_batch(context_block), "atomic", build)
+    return text.rstrip("\n"), language
+
+
+def _build_hierarchical_context(
+    context_block: dict[str, Any],
+    hierarchical_relations: Optional[list[str]] = None,
+    context_cache: Optional[ContextCache] = None,
+    serializer: Optional[HierarchySerializer] = None,
+) -> str:
+    """Rebuild hierarchical context text from stored context metadata (nodes/edges dicts)."""
+    if not isinstance(context_block, dict):
         return ""
-    try:
-        serializer = HierarchySerializer(hierarchical_relations)
-        return serializer.serialize(
-            nodes, edges, structure_format="markdown", require_hierarchy=True
-        )
-    except Exception as exc:
-        logger.debug("Failed to rebuild hierarchical context: %s", exc)
+    batch = _context_block_batch(context_block)
+    nodes, edges = batch
+    if not edges:
         return ""
+    serializer = serializer or HierarchySerializer(hierarchical_relations)
+
+    def build() -> str:
+        try:
+            return serializer.serialize(
+                nodes, edges, structure_format="markdown", require_hierarchy=True
+            )
+        except Exception as exc:
+            logger.debug("Failed to rebuild hierarchical context: %s", exc)
+            return ""
+
+    if context_cache is None:
+        return build()
+    kind = hierarchy_context_kind(serializer.hierarchical_relations, "markdown", True)
+    return context_cache.get(batch, kind, build)
 
 
 def deduplicate_formatted_items(
     items: list[dict[str, Any]],
     seen_hashes: set[str],
     persist_seen: Optional[set[str]] = None,
+    near_index: Optional[NearDuplicateIndex] = None,
 ) -> list[dict[str, Any]]:
+    """
+    按归一化问题 hash 去重；传入 near_index 时同一模式下的近重复问题也被去除
+
+    :param near_index: 近重复索引，判定的同时插入新问题，由调用方在整个会话中复用
+    """
     deduplicated = []
+    near_duplicates = 0
     for result in items:
         question = _extract_question_from_formatted_result(result)
         if not question:
             deduplicated.append(result)
             continue
-        question_hash = _build_question_hash(question, result.get("mode"))
+        mode = result.get("mode")
+        question_hash = _build_question_hash(question, mode)
         if question_hash in seen_hashes:
             continue
+        if near_index is not None and near_index.add(
+            question_hash, question, namespace=mode or ""
+        ) is not None:
+            near_duplicates += 1
+            continue
         seen_hashes.add(question_hash)
         if persist_seen is not None:
             persist_seen.add(question_hash)
         deduplicated.append(result)
     removed = len(items) - len(deduplicated)
     if removed > 0:
-        logger.info("Deduplication removed %d duplicated results", removed)
+        logger.debug(
+            "Deduplication removed %d duplicated results (%d near-duplicates)",
+            removed, near_duplicates,
+        )
     return deduplicated
 
 
@@ -330,73 +396,20 @@ def _extract_answer_from_formatted_result(result: dict[str, Any]) -> str:
     """Extract answer text from different output formats."""
     if not isinstance(result, dict):
         return ""
-    if "output" in result:
-        return result.get("output", "")
-    if "conversations" in result:
-        for msg in result.get("conversations", []):
-            if msg.get("from") == "gpt":
-                return msg.get("value", "")
-    if "messages" in result:
-        for msg in result.get("messages", []):
-            if msg.get("role") == "assistant":
-                return msg.get("content", "")
-    return result.get("answer", "")
-
-
-# 问题文本开头的元前导语（LLM 有时输出"根据答案内容，可以生成如下问题：**问题：**..."之类）
-_QUESTION_PREAMBLE_PATTERNS = [
-    re.compile(r"^(?:根据|基于|按照)[^\n]{0,60}?(?:生成|提出|设计|构造|给出|如下)[^\n]{0,20}[：:]?\s*\n*", re.IGNORECASE),
-    re.compile(r"^以下[是为][^\n]{0,30}[：:]\s*\n*"),
-    re.compile(r"^\*\*问题[：:]\*\*\s*", re.IGNORECASE),
-    re.compile(r"^\*\*[Qq]uestion[：:]\*\*\s*"),
-    re.compile(r"^问题[：:]\s*"),
-    re.compile(r"^(?:Question|Q)[：:]\s*", re.IGNORECASE),
-]
+    return _answer_text(result)
 
 
 def _clean_question_text(question: str) -> str:
     """剥离问题开头的元前导语与标记，返回干净的问题文本。"""
-    q = question.strip()
-    changed = True
-    while changed:
-        changed = False
-        for pattern in _QUESTION_PREAMBLE_PATTERNS:
-            new_q = pattern.sub("", q, count=1).strip()
-            if new_q != q:
-                q = new_q
-                changed = True
-    return q
+    return clean_question_text(question)
 
 
 def _clean_formatted_questions(items: list[dict[str, Any]]) -> list[dict[str, Any]]:
     """对格式化结果中的问题文本统一清洗（原地修改并返回）。"""
-    cleaned = 0
-    for result in items:
-        if not isinstance(result, dict):
-            continue
-        if "instruction" in result:
-            new_q = _clean_question_text(result["instruction"])
-            if new_q != result["instruction"]:
-                result["instruction"] = new_q
-                cleaned += 1
-        elif "conversations" in result:
-            for msg in result.get("conversations", []):
-                if msg.get("from") == "human":
-                    new_q = _clean_question_text(msg.get("value", ""))
-                    if new_q != msg.get("value", ""):
-                        msg["value"] = new_q
-                        cleaned += 1
-                    break
-        elif "messages" in result:
-            for msg in result.get("messages", []):
-                if msg.get("role") == "user":
-                    new_q = _clean_question_text(msg.get("content", ""))
-                    if new_q != msg.get("content", ""):
-                        msg["content"] = new_q
-                        cleaned += 1
-                    break
-    if cleaned:
-        logger.info("Question cleanup: stripped meta-preamble from %d questions", cleaned)
+    engine = QualityRuleEngine(rules=[])
+    items, _ = engine.apply(items)
+    if engine.cleaned:
+        logger.debug("Question cleanup: stripped meta-preamble from %d questions", engine.cleaned)
     return items
 
 
@@ -407,30 +420,42 @@ def apply_basic_quality_filter(
 
     :return: (过滤后列表, 各规则剔除计数)
     """
-    kept: list[dict[str, Any]] = []
-    removed = {"empty_question": 0, "empty_answer": 0, "identical_qa": 0}
-    for result in items:
-        question = _extract_question_from_formatted_result(result).strip()
-        answer = _extract_answer_from_formatted_result(result).strip()
-        if not question or len(question) < 2:
-            removed["empty_question"] += 1
-            continue
-        if not answer:
-            removed["empty_answer"] += 1
-            continue
-        if question == answer:
-            removed["identical_qa"] += 1
-            continue
-        kept.append(result)
-    total_removed = sum(removed.values())
-    if total_removed:
-        logger.info("Quality filter removed %d items: %s", total_removed, removed)
-    return kept, removed
+    return QualityRuleEngine(clean_questions=False).apply(items)
+
+
+# 不同模式每个batch平均生成的QA对数量估算值（可以根据实际情况调整）
+_ESTIMATED_QA_PER_BATCH = {
+    "atomic": 1.5,      # atomic模式每个batch约1-2个QA对
+    "aggregated": 2.0,  # aggregated模式每个batch约2个QA对
+    "multi_hop": 1.5,   # multi_hop模式每个batch约1-2个QA对
+    "cot": 1.5,         # cot模式每个batch约1-2个QA对
+}
+
+# 所有生成模式合计同时在途的批次数默认上限（配置 max_concurrent_batches: null 表示不限）
+_DEFAULT_MAX_CONCURRENT_BATCHES = 64
+
+
+def estimate_required_batches(mode: str, target_qa_pairs: int) -> tuple[int, float]:
+    """
+    估算达到目标QA数量所需的batch数
+
+    :return: (required_batches, avg_qa_per_batch)
+    """
+    if mode == "all":
+        # 对于all模式，使用各子模式的平均估算值
+        avg_qa_per_batch = sum(_ESTIMATED_QA_PER_BATCH.values()) / len(
+            _ESTIMATED_QA_PER_BATCH
+        )
+    else:
+        avg_qa_per_batch = _ESTIMATED_QA_PER_BATCH.get(mode, 1.5)
+    # 考虑去重和失败率，使用1.5倍缓冲
+    return int(target_qa_pairs / avg_qa_per_batch * 1.5), avg_qa_per_batch
 
 
 async def generate_qas(
     llm_client: BaseLLMClient,
-    batches: list[
+    batches: BatchStream
+    | list[
         tuple[
             list[tuple[str, dict]], list[tuple[Any, Any, dict] | tuple[Any, Any, Any]]
         ]
@@ -440,16 +465,29 @@ async def generate_qas(
     chunks_storage=None,
     full_docs_storage=None,
     qa_storage=None,
+    sink: Optional[QAResultSink] = None,
+    fingerprint_storage=None,
+    context_table: Optional[QAContextTable] = None,
+    question_llm_client: Optional[BaseLLMClient] = None,
 ) -> list[dict[str, Any]]:
     """
     Generate question-answer pairs based on nodes and edges.
     :param llm_client: LLM client
-    :param batches
+    :param batches: batch list, or a lazy BatchStream of which only the batches needed
+        for target_qa_pairs are materialised
     :param generation_config
     :param progress_bar
     :param chunks_storage: chunks storage instance
     :param full_docs_storage: full documents storage instance
-    :return: QA pairs
+    :param sink: optional streaming sink; every batch's accepted QA pairs are appended to it
+        as soon as the batch completes instead of being kept in memory
+    :param fingerprint_storage: KV storage of fingerprints of batches generated in earlier
+        runs; batches seen before are skipped instead of being sent to the LLM again
+    :param context_table: compact output; context / graph / source chunks / documents of the
+        accepted QA pairs are stored once in this side table and replaced by ids
+    :param question_llm_client: optional (cheaper) client for the question stage of the
+        two-stage atomic pipeline; answers are still generated by llm_client
+    :return: QA pairs (empty when a sink is given; read them from the sink)
     """
     mode = generation_config["mode"]
     data_format = generation_config["data_format"]
@@ -497,6 +535,13 @@ async def generate_qas(
 
     question_first_enabled = generation_config.get("question_first", mode == "atomic")
     persistent_deduplication = generation_config.get("persistent_deduplication", True)
+    # 近重复检测阈值（估计 Jaccard 相似度），None 表示只去除完全相同的问题
+    near_duplicate_threshold = generation_config.get("near_duplicate_threshold")
+    near_index = (
+        NearDuplicateIndex(threshold=float(near_duplicate_threshold))
+        if near_duplicate_threshold and generation_config.get("enable_deduplication", True)
+        else None
+    )
     persistent_question_hashes: set[str] = set()
     if persistent_deduplication and qa_storage:
         try:
@@ -504,9 +549,12 @@ async def generate_qas(
             for item in existing_items or []:
                 question_text = _extract_question_from_formatted_result(item)
                 if question_text:
-                    persistent_question_hashes.add(
-                        _build_question_hash(question_text, item.get("mode"))
-                    )
+                    question_hash = _build_question_hash(question_text, item.get("mode"))
+                    persistent_question_hashes.add(question_hash)
+                    if near_index is not None:
+                        near_index.insert(
+                            question_hash, question_text, namespace=item.get("mode") or ""
+                        )
             logger.info(
                 "[Generation] Loaded %d persisted questions for deduplication",
                 len(persistent_question_hashes),
@@ -514,6 +562,25 @@ async def generate_qas(
         except Exception as exc:
             logger.warning("Failed to load persisted QA for deduplication: %s", exc)
     session_seen_hashes: set[str] = set(persistent_question_hashes)
+
+    # 批次指纹：此前已生成过的（批次, 模式, 模板配置）在派发前跳过，不再为重复内容付费
+    skip_seen_batches = generation_config.get("skip_seen_batches", persistent_deduplication)
+    seen_fingerprints: set[str] = set()
+    # 批次结果写出后立即登记指纹并分批落盘，中断的运行续跑时不再为已完成的批次付费
+    fingerprint_log = (
+        BatchFingerprintLog(
+            fingerprint_storage,
+            flush_every=generation_config.get("fingerprint_flush_interval", 20),
+        )
+        if fingerprint_storage is not None
+        else None
+    )
+    if skip_seen_batches and fingerprint_storage is not None:
+        seen_fingerprints.update(await fingerprint_storage.all_keys())
+        logger.info(
+            "[Generation] Loaded %d fingerprints of previously generated batches",
+            len(seen_fingerprints),
+        )
     
     # 获取优化配置
     use_multi_template = generation_config.get("use_multi_template", True)
@@ -541,80 +608,198 @@ async def generate_qas(
     else:
         logger.info("[Generation] No target QA pairs limit (unlimited generation)")
     
-    # 动态调整batches数量（如果设置了目标数量）
-    # 估算每个batch平均生成多少个QA对，然后调整batches数量
-    if target_qa_pairs and batches:
-        # 不同模式的估算值（可以根据实际情况调整）
-        estimated_qa_per_batch = {
-            "atomic": 1.5,      # atomic模式每个batch约1-2个QA对
-            "aggregated": 2.0,  # aggregated模式每个batch约2个QA对
-            "multi_hop": 1.5,   # multi_hop模式每个batch约1-2个QA对
-            "cot": 1.5,         # cot模式每个batch约1-2个QA对
-        }
-        
-        if mode == "all":
-            # 对于all模式，需要为每个子模式分别计算
-            # 使用平均估算值
-            avg_qa_per_batch = sum(estimated_qa_per_batch.values()) / len(estimated_qa_per_batch)
-            # 考虑去重和失败率，使用1.5倍缓冲
-            required_batches = int(target_qa_pairs / avg_qa_per_batch * 1.5)
-        else:
-            # 单个模式
-            avg_qa_per_batch = estimated_qa_per_batch.get(mode, 1.5)
-            # 考虑去重和失败率，使用1.5倍缓冲
-            required_batches = int(target_qa_pairs / avg_qa_per_batch * 1.5)
-        
-        # 如果需要的batches数量超过实际batches，考虑重复使用或拆分
+    # 批次按需派发：由调度器根据实测产出率决定实际使用多少批次，惰性批次流只物化派发的部分
+    if target_qa_pairs and len(batches):
+        required_batches, avg_qa_per_batch = estimate_required_batches(
+            mode, target_qa_pairs
+        )
         if required_batches > len(batches):
-            original_batch_count = len(batches)
-            # 如果batches数量不足，重复使用batches直到达到目标
-            # 使用循环方式重复batches，确保覆盖所有原始batches
-            repeat_times = (required_batches + len(batches) - 1) // len(batches)  # 向上取整
-            extended_batches = []
-            for i in range(repeat_times):
-                extended_batches.extend(batches)
-            batches = extended_batches[:required_batches]
             logger.warning(
-                "[Generation] Batches数量不足: 实际 %d 个, 需要 %d 个. "
-                "已重复使用batches %d 次, 扩展到 %d 个 (target: %d QA pairs, estimated %.1f QA per batch). "
-                "建议减小分区参数 max_units_per_community 以生成更多batches.",
-                original_batch_count, required_batches, repeat_times, len(batches), 
-                target_qa_pairs, avg_qa_per_batch
-            )
-        elif required_batches < len(batches):
-            original_batch_count = len(batches)
-            batches = batches[:required_batches]
-            logger.info(
-                "[Generation] Dynamically adjusted batches: %d -> %d (target: %d QA pairs, estimated %.1f QA per batch)",
-                original_batch_count, len(batches), target_qa_pairs, avg_qa_per_batch
+                "[Generation] Batches数量不足: 实际 %d 个, 预计需要 %d 个 (target: %d QA pairs, estimated %.1f QA per batch). "
+                "建议使用分区方法 coverage（按目标数量生成重叠但不重复的社区）或减小 max_units_per_community.",
+                len(batches), required_batches, target_qa_pairs, avg_qa_per_batch
             )
         else:
             logger.info(
-                "[Generation] Using all %d batches (target: %d QA pairs, estimated %.1f QA per batch, required: %d batches)",
-                len(batches), target_qa_pairs, avg_qa_per_batch, required_batches
+                "[Generation] %d batches available, about %d expected for target %d QA pairs "
+                "(estimated %.1f QA per batch); dispatching on demand",
+                len(batches), required_batches, target_qa_pairs, avg_qa_per_batch
             )
     
+    # 打包生成：多个小社区的 prompt 打包进一次请求（pack_size > 1 时启用）
+    # 包装在缓存/批量层之内，缓存仍按单个 prompt 命中
+    pack_size = int(generation_config.get("pack_size") or 1)
+
+    def wrap_client(
+        client: BaseLLMClient,
+    ) -> tuple[BaseLLMClient, Optional[PackedLLMWrapper], Optional[BatchLLMWrapper]]:
+        """按配置为客户端套上打包层与批量/缓存层，返回 (最外层客户端, 打包层, 批量层)"""
+        packed: Optional[PackedLLMWrapper] = None
+        if pack_size > 1:
+            packed = PackedLLMWrapper(
+                client,
+                max_pack_size=pack_size,
+                max_pack_tokens=generation_config.get("pack_max_tokens", 6000),
+                max_wait_time=generation_config.get("pack_max_wait_time", 0.2),
+            )
+        wrapped = packed or client
+        batched: Optional[BatchLLMWrapper] = None
+        if enable_batch_requests or enable_cache:
+            batched = BatchLLMWrapper(
+                llm_client=wrapped,
+                batch_size=batch_size,
+                max_wait_time=max_wait_time,
+                enable_batching=enable_batch_requests,
+                enable_cache=enable_cache,
+                cache_max_size=cache_max_size,
+                cache_ttl=cache_ttl,
+                use_adaptive_batching=use_adaptive_batching,
+                min_batch_size=min_batch_size,
+                max_batch_size=max_batch_size,
+            )
+            wrapped = batched
+        return wrapped, packed, batched
+
     # 创建批量LLM包装器（如果启用批量请求或缓存）
-    actual_llm_client = llm_client
-    batch_wrapper: Optional[BatchLLMWrapper] = None
-    if enable_batch_requests or enable_cache:
-        batch_wrapper = BatchLLMWrapper(
-            llm_client=llm_client,
-            batch_size=batch_size,
-            max_wait_time=max_wait_time,
-            enable_batching=enable_batch_requests,
-            enable_cache=enable_cache,
-            cache_max_size=cache_max_size,
-            cache_ttl=cache_ttl,
-            use_adaptive_batching=use_adaptive_batching,
-            min_batch_size=min_batch_size,
-            max_batch_size=max_batch_size,
-        )
-        actual_llm_client = batch_wrapper
+    actual_llm_client, packed_client, batch_wrapper = wrap_client(llm_client)
+    # atomic 问题阶段可使用更便宜的模型，答案仍由主合成模型生成
+    question_client, question_packed, question_batch_wrapper = (
+        wrap_client(question_llm_client)
+        if question_llm_client is not None
+        else (actual_llm_client, None, None)
+    )
     
     # 获取合并模式配置
     use_combined_mode = generation_config.get("use_combined_mode", False)
-    
+    enable_deduplication = generation_config.get("enable_deduplication", True)
+    enable_quality_filter = generation_config.get("enable_quality_filter", True)
+    max_in_flight = generation_config.get("max_in_flight_batches")
+    # 所有模式共享的在途批次预算，批次只在有空位时才创建任务
+    max_concurrency = generation_config.get(
+        "max_concurrent_batches", _DEFAULT_MAX_CONCURRENT_BATCHES
+    )
+    # atomic 两级流水线中答案队列（排队 + 在途）的积压上限，达到后问题阶段暂停派发
+    answer_queue_size = generation_config.get(
+        "answer_queue_size", 2 * max_concurrency if max_concurrency else None
+    )
+    accept_stats = {"generated": 0, "duplicates": 0, "filtered": 0}
+    # 按模式配置的零成本质量规则（quality_rules.default 为公共设置，模式名下的设置覆盖之）
+    quality_rules_config = generation_config.get("quality_rules") or {}
+    quality_engines: Dict[str, QualityRuleEngine] = {}
+
+    def quality_engine(gen_mode: str) -> QualityRuleEngine:
+        if gen_mode not in quality_engines:
+            quality_engines[gen_mode] = QualityRuleEngine.for_mode(quality_rules_config, gen_mode)
+        return quality_engines[gen_mode]
+
+    if enable_quality_filter:
+        # 配置中的未知规则在生成开始前报错
+        quality_engine(mode)
+
+    # 本次运行内各生成器共享的上下文序列化缓存
+    context_cache = ContextCache()
+
+    def template_id(generator) -> str:
+        """生成器与模板配置的标识，计入批次指纹"""
+        return ":".join(
+            [
+                type(generator).__name__,
+                "multi" if use_multi_template else "single",
+                "zh" if chinese_only else "any",
+            ]
+        )
+
+    def make_skip(generator, gen_mode: str):
+        """派发前跳过此前已生成过的批次；未启用时返回 None"""
+        if not skip_seen_batches or fingerprint_storage is None:
+            return None
+        tid = template_id(generator)
+        return lambda batch: batch_fingerprint(batch, gen_mode, tid) in seen_fingerprints
+
+    def make_generate(generator, one_hop: bool = False, gen_mode: Optional[str] = None):
+        """单个批次的生成函数；atomic 模式先把批次裁剪为一跳信息"""
+        async def generate_batch(batch):
+            fingerprint = None
+            if fingerprint_log is not None and gen_mode:
+                fingerprint = batch_fingerprint(batch, gen_mode, template_id(generator))
+            if one_hop:
+                batch = _filter_one_hop_batch(batch)
+            result = await generator.generate(
+                batch,
+                chunks_storage=chunks_storage,
+                full_docs_storage=full_docs_storage,
+            )
+            # 本次运行内不再派发同一批次；持久化等结果写出后由 make_done 完成
+            if fingerprint is not None:
+                seen_fingerprints.add(fingerprint)
+            return result
+        return generate_batch
+
+    def make_done(generator, gen_mode: str):
+        """批次结果写出后持久化其指纹；只记录成功完成的批次，失败的批次下次运行仍会重试"""
+        if fingerprint_log is None:
+            return None
+        tid = template_id(generator)
+
+        async def done(batch, _items) -> None:
+            await fingerprint_log.record(batch_fingerprint(batch, gen_mode, tid), gen_mode)
+        return done
+
+    async def run_lanes(lanes: list[GenerationLane], desc: str) -> Dict[str, list[Any]]:
+        """按共享配置运行调度器；结束或中断时把已登记的指纹落盘"""
+        try:
+            return await GenerationScheduler(
+                lanes,
+                max_in_flight=max_in_flight,
+                max_concurrency=max_concurrency,
+                desc=desc,
+                progress_bar=progress_bar,
+                sink=sink,
+            ).run()
+        finally:
+            if fingerprint_log is not None:
+                await fingerprint_log.flush()
+
+    def make_accept(generator, gen_mode: str, deduplicate: bool = True):
+        """
+        单个批次结果的格式化、去重与质量过滤，返回被接受的条目
+
+        :param deduplicate: 为 False 时跳过去重（atomic 答案阶段的问题已在问题阶段去重）
+        """
+        def accept(raw_result) -> list[dict[str, Any]]:
+            if not raw_result:
+                return []
+            items = generator.format_generation_results(
+                [raw_result], output_data_format=data_format
+            )
+            for result in items:
+                # 强制设置 mode 为当前生成模式，确保正确性
+                old_mode = result.get("mode")
+                result["mode"] = gen_mode
+                if old_mode and old_mode != gen_mode:
+                    logger.warning(
+                        "[Generation] Mode mismatch: expected %s, found %s in result, corrected to %s",
+                        gen_mode, old_mode, gen_mode
+                    )
+            accept_stats["generated"] += len(items)
+            if enable_deduplication and deduplicate:
+                before = len(items)
+                items = deduplicate_formatted_items(
+                    items,
+                    session_seen_hashes,
+                    persistent_question_hashes if persistent_deduplication else None,
+                    near_index,
+                )
+                accept_stats["duplicates"] += before - len(items)
+            if enable_quality_filter:
+                before = len(items)
+                items, _filter_stats = quality_engine(gen_mode).apply(items)
+                accept_stats["filtered"] += before - len(items)
+            if context_table is not None:
+                items = context_table.compact_all(items)
+            return items
+        return accept
+
     if mode == "all":
         # 创建所有生成器的列表，并记录对应的 mode
         # 注意：各 generator 构造签名不同，统一在此处按各自签名传参
@@ -669,6 +854,9 @@ async def generate_qas(
             ),
         ]
 
+        for generator, _ in generators:
+            generator.context_cache = context_cache
+
         all_results = []
         
         # 计算每个模式的目标QA数量
@@ -683,194 +871,54 @@ async def generate_qas(
                 mode_targets, target_qa_pairs
             )
 
-        tasks = []
-        for idx, (generator, gen_mode) in enumerate(generators):
-            # 计算当前模式需要的批次数量
-            batches_to_use = batches
-            
-            # 如果设置了目标数量，根据模式目标动态分配批次
-            if target_qa_pairs and gen_mode in mode_targets:
-                mode_target = mode_targets[gen_mode]
-                if mode_target > 0:
-                    # 估算每个batch平均生成多少个QA对
-                    estimated_qa_per_batch_mode = {
-                        "atomic": 1.0,      # atomic模式每个batch约1个QA对
-                        "aggregated": 1.5,  # aggregated模式每个batch约1-2个QA对
-                        "multi_hop": 1.0,   # multi_hop模式每个batch约1个QA对
-                        "cot": 1.0,         # cot模式每个batch约1个QA对
-                        "hierarchical": 1.0, # hierarchical模式每个batch约1个QA对
-                    }
-                    avg_qa_per_batch = estimated_qa_per_batch_mode.get(gen_mode, 1.0)
-                    # 考虑去重和失败率，使用1.3倍缓冲（降低缓冲比例，更接近目标）
-                    required_batches_for_mode = int(mode_target / avg_qa_per_batch * 1.3)
-                    
-                    # 限制批次数量不超过总批次数
-                    required_batches_for_mode = min(required_batches_for_mode, len(batches))
-                    
-                    # 如果需要的批次数小于总批次数，取前N个批次
-                    if required_batches_for_mode < len(batches):
-                        batches_to_use = batches[:required_batches_for_mode]
-                        logger.info(
-                            "[Generation] Mode %s: allocated %d batches (target: %d QA, estimated %.1f QA per batch)",
-                            gen_mode, len(batches_to_use), mode_target, avg_qa_per_batch
-                        )
-                    else:
-                        logger.info(
-                            "[Generation] Mode %s: using all %d batches (target: %d QA, estimated %.1f QA per batch)",
-                            gen_mode, len(batches), mode_target, avg_qa_per_batch
-                        )
-                else:
-                    # 目标为0，跳过此模式
-                    batches_to_use = []
-                    logger.info(
-                        "[Generation] Mode %s: skipped (target: 0)",
-                        gen_mode
-                    )
-            
-            # 如果没有批次可处理，跳过此模式
-            if not batches_to_use:
-                logger.info("[Generation] Mode %s: no batches to process, skipping", gen_mode)
-                # 创建一个空任务，返回空列表
-                async def return_empty():
-                    return []
-                task = asyncio.create_task(return_empty())
-                tasks.append(task)
+        # 每个模式一条调度通道，共享同一批次来源；达到各自目标后停止派发
+        lanes = []
+        for generator, gen_mode in generators:
+            mode_target = mode_targets.get(gen_mode) if target_qa_pairs else None
+            if mode_target == 0:
+                logger.info("[Generation] Mode %s: skipped (target: 0)", gen_mode)
                 continue
-            
-            # 对于atomic模式，过滤批次为一跳信息
-            if gen_mode == "atomic":
-                batches_to_use = [
-                    _filter_one_hop_batch(batch) for batch in batches_to_use
-                ]
-                logger.info(
-                    "[Generation] Filtered batches for atomic mode to one-hop information. "
-                    "Batch count: %d",
-                    len(batches_to_use)
-                )
-            
-            # 创建包装函数，传递chunks_storage和full_docs_storage
-            async def generate_with_storage(
-                batch,
-                current_generator=generator,
-            ):
-                return await current_generator.generate(
-                    batch,
-                    chunks_storage=chunks_storage,
-                    full_docs_storage=full_docs_storage,
-                )
-            
-            # 创建动态描述回调函数
-            def create_desc_callback(mode_name, mode_idx, total_modes):
-                def desc_callback(completed_batches, total_batches, results):
-                    # 计算当前已生成的QA数量
-                    # results 是 generator.generate() 返回的 dict 列表
-                    # 每个 dict 的键数量 = QA 对数量
-                    current_qa_count = sum(len(r) if isinstance(r, dict) else 0 for r in results)
-                    
-                    # 构建描述字符串
-                    desc_parts = [f"[类型 {mode_idx + 1}/{total_modes}: {mode_name}]"]
-                    desc_parts.append(f"批次: {completed_batches}/{total_batches}")
-                    
-                    if target_qa_pairs and mode_name in mode_targets:
-                        mode_target = mode_targets[mode_name]
-                        desc_parts.append(f"| 已生成: {current_qa_count} QA (目标: {mode_target})")
-                        desc_parts.append(f"| 总目标: {target_qa_pairs} QA")
-                    else:
-                        desc_parts.append(f"| 已生成: {current_qa_count} QA")
-                    
-                    return " ".join(desc_parts)
-                return desc_callback
-
-            task = asyncio.create_task(
-                run_concurrent(
-                    generate_with_storage,
-                    batches_to_use,
-                    desc=f"[类型 {idx + 1}/{len(generators)}: {gen_mode}]",
-                    unit="batch",
-                    progress_bar=progress_bar,
-                    desc_callback=create_desc_callback(gen_mode, idx, len(generators)),
+            lanes.append(
+                GenerationLane(
+                    mode=gen_mode,
+                    generate=make_generate(
+                        generator, one_hop=gen_mode == "atomic", gen_mode=gen_mode
+                    ),
+                    batches=batches,
+                    accept=make_accept(generator, gen_mode),
+                    target=mode_target,
+                    prior_yield=_ESTIMATED_QA_PER_BATCH.get(gen_mode, 1.0),
+                    skip=make_skip(generator, gen_mode),
+                    on_done=make_done(generator, gen_mode),
                 )
             )
-            tasks.append(task)
-
-        # 并发执行所有任务
-        results_list = await asyncio.gather(*tasks)
 
-        # 处理结果（不应用每个模式的限制，允许超过目标）
-        all_results = []
-        for results, (generator, gen_mode) in zip(results_list, generators):
-            formatted_results = generator.format_generation_results(
-                results,
-                output_data_format=data_format
-            )
-            for result in formatted_results:
-                # 强制设置 mode 为当前生成模式，确保正确性
-                old_mode = result.get("mode")
-                result["mode"] = gen_mode
-                if old_mode and old_mode != gen_mode:
-                    logger.warning(
-                        "[Generation] Mode mismatch: expected %s, found %s in result, corrected to %s",
-                        gen_mode, old_mode, gen_mode
-                    )
-            all_results.extend(formatted_results)
-            logger.info(
-                "[Generation] Mode %s generated %d QA pairs",
-                gen_mode, len(formatted_results)
-            )
-        
-        # 结果去重（基于内容hash）
-        enable_deduplication = generation_config.get("enable_deduplication", True)
-        if enable_deduplication:
-            original_before_dedup = len(all_results)
-            all_results = deduplicate_formatted_items(
-                all_results,
-                session_seen_hashes,
-                persistent_question_hashes if persistent_deduplication else None,
-            )
-            if original_before_dedup != len(all_results):
-                logger.info(
-                    "[Generation] After deduplication: %d -> %d results",
-                    original_before_dedup, len(all_results)
-                )
-
-        # 基础质量过滤（空问题/空答案/答案与问题相同）
-        if generation_config.get("enable_quality_filter", True):
-            all_results, _filter_stats = apply_basic_quality_filter(all_results)
-            all_results = _clean_formatted_questions(all_results)
+        accepted = await run_lanes(lanes, "[4/4]Generating QAs")
+        all_results = [item for lane in lanes for item in accepted[lane.mode]]
+        total_accepted = sum(lane.num_accepted for lane in lanes)
+        logger.info(
+            "[Generation] Accepted %d of %d generated results "
+            "(%d duplicates, %d removed by quality filter)",
+            total_accepted, accept_stats["generated"],
+            accept_stats["duplicates"], accept_stats["filtered"],
+        )
 
-        # 统计各模式的数量（不应用限制，允许超过目标）
+        # 统计各模式的数量（不截断到目标，已完成批次的结果全部保留）
+        mode_counts: Dict[str, int] = {lane.mode: lane.num_accepted for lane in lanes}
         if target_qa_pairs:
-            mode_counts: Dict[str, int] = {}
-            for result in all_results:
-                mode = result.get("mode", "unknown")
-                mode_counts[mode] = mode_counts.get(mode, 0) + 1
             logger.info(
                 "[Generation] Final results: %d (target: %d, per-mode counts: %s)",
-                len(all_results), target_qa_pairs, mode_counts
+                total_accepted, target_qa_pairs, mode_counts
             )
         else:
-            mode_counts: Dict[str, int] = {}
-            for result in all_results:
-                mode = result.get("mode", "unknown")
-                mode_counts[mode] = mode_counts.get(mode, 0) + 1
             logger.info(
                 "[Generation] Final results: %d (no limit, per-mode counts: %s)",
-                len(all_results), mode_counts
+                total_accepted, mode_counts
             )
-
-        return all_results
+        results = all_results
     else:
         if mode == "atomic":
-            # Filter batches to contain only one-hop information for atomic mode
-            filtered_batches = [
-                _filter_one_hop_batch(batch) for batch in batches
-            ]
-            batches = filtered_batches
-            logger.info(
-                "[Generation] Filtered batches for atomic mode to one-hop information. "
-                "Original batch count: %d, Filtered batch count: %d",
-                len(batches), len(filtered_batches)
-            )
+            # atomic 模式的批次在派发时裁剪为一跳信息（见 make_generate）
             generator = AtomicGenerator(
                 actual_llm_client,
                 use_multi_template=use_multi_template,
@@ -909,49 +957,36 @@ async def generate_qas(
             )
         else:
             raise ValueError(f"Unsupported generation mode: {mode}")
+        generator.context_cache = context_cache
 
-        # 创建包装函数，传递chunks_storage和full_docs_storage
-        async def generate_with_storage(batch):
-            return await generator.generate(
-                batch,
-                chunks_storage=chunks_storage,
-                full_docs_storage=full_docs_storage,
-            )
-
-        async def run_atomic_two_stage() -> list[dict[str, Any]]:
+        async def run_atomic_two_stage() -> tuple[list[dict[str, Any]], int]:
             question_generator = AtomicQuestionGenerator(
-                actual_llm_client,
+                question_client,
                 use_multi_template=use_multi_template,
                 template_seed=template_seed,
                 chinese_only=chinese_only,
             )
+            question_generator.context_cache = context_cache
+            answer_serializer = HierarchySerializer(hierarchical_relations)
 
-            async def generate_questions_with_storage(batch):
-                return await question_generator.generate(
-                    batch,
-                    chunks_storage=chunks_storage,
-                    full_docs_storage=full_docs_storage,
-                )
-
-            question_results = await run_concurrent(
-                generate_questions_with_storage,
-                batches,
-                desc="[4/4]Generating atomic questions",
-                unit="batch",
-                progress_bar=progress_bar,
-            )
-
-            pending_questions: list[dict[str, Any]] = []
-            for batch_result in question_results:
-                for key, payload in batch_result.items():
+            def collect_questions(batch_result) -> list[dict[str, Any]]:
+                """单个批次的问题按 hash 去重后转为待回答条目"""
+                entries = []
+                for key, payload in (batch_result or {}).items():
                     question = payload.get("question")
                     if not question:
                         continue
                     question_hash = key or _build_question_hash(question, "atomic")
-                    if question_hash in session_seen_hashes:
+                    # 与 deduplicate_formatted_items 使用同一键，持久化的历史问题也能命中
+                    dedup_hash = _build_question_hash(question, "atomic")
+                    if dedup_hash in session_seen_hashes:
+                        continue
+                    if near_index is not None and near_index.add(
+                        dedup_hash, question, namespace="atomic"
+                    ) is not None:
                         continue
-                    session_seen_hashes.add(question_hash)
-                    pending_questions.append(
+                    session_seen_hashes.add(dedup_hash)
+                    entries.append(
                         {
                             "hash": question_hash,
                             "question": question,
@@ -963,24 +998,14 @@ async def generate_qas(
                             "reasoning_path": payload.get("reasoning_path", ""),
                         }
                     )
-
-            # 记录问题数量（不应用限制，允许超过目标）
-            if target_qa_pairs:
-                logger.info(
-                    "[Generation] Generated %d questions (target: %d QA pairs)",
-                    len(pending_questions), target_qa_pairs
-                )
-
-            if not pending_questions:
-                logger.warning(
-                    "No new atomic questions available after deduplication. Skipping answer stage."
-                )
-                return []
+                return entries
 
             async def answer_question(entry: dict[str, Any]) -> dict[str, Any]:
                 try:
-                    # 1. 构建上下文 - 分析为什么可能为空
-                    context_text = _build_context_text(entry.get("context", {}))
+                    # 1. 构建上下文（复用问题阶段缓存的序列化结果）- 分析为什么可能为空
+                    context_text, language = _build_atomic_context(
+                        entry.get("context", {}), context_cache
+                    )
                     if not context_text:
                         # 如果上下文为空，尝试从 graph 中重建
                         graph = entry.get("graph", {})
@@ -1009,7 +1034,8 @@ async def generate_qas(
                             )
                     
                     # 2. 检测语言并选择模板
-                    language = detect_main_language(context_text or entry["question"])
+                    if not language:
+                        language = detect_main_language(context_text or entry["question"])
                     
                     # 3. 选择模板（考虑chinese_only配置）
                     if chinese_only:
@@ -1022,7 +1048,10 @@ async def generate_qas(
                     
                     # 3. 构建 prompt（附带层级上下文，模板中的 {hierarchical_context} 占位符）
                     hierarchical_context = _build_hierarchical_context(
-                        entry.get("context", {}), hierarchical_relations
+                        entry.get("context", {}),
+                        hierarchical_relations,
+                        context_cache=context_cache,
+                        serializer=answer_serializer,
                     )
                     try:
                         prompt = template.format(
@@ -1221,76 +1250,131 @@ async def generate_qas(
                         }
                     }
 
-            answer_results = await run_concurrent(
-                answer_question,
-                pending_questions,
-                desc="[4/4]Answering atomic questions",
-                unit="question",
-                progress_bar=progress_bar,
+            # 两级流水线：问题阶段按目标数量调度（去重后的新问题数达到目标即停止派发），
+            # 每个通过去重的问题立即进入答案队列，与后续问题批次并发执行；
+            # 答案队列积压达到 answer_queue_size 时问题阶段暂停派发
+            # 问题批次的指纹等其全部答案写出后才持久化，中断时未答完的批次续跑会重新生成
+            question_batch_done = make_done(question_generator, "atomic")
+            # 批次键 -> [批次, 未完成的答案数, 答案是否全部生成成功]
+            unanswered: dict[int, list] = {}
+            batch_keys = itertools.count()
+
+            async def questions_done(batch, entries) -> None:
+                if not entries:
+                    await question_batch_done(batch, entries)
+                    return
+                key = next(batch_keys)
+                unanswered[key] = [batch, len(entries), True]
+                for entry in entries:
+                    entry["batch_key"] = key
+
+            async def answer_and_track(entry: dict[str, Any]) -> dict[str, Any]:
+                result = await answer_question(entry)
+                # answer_question 把 LLM 异常/解析失败转为带标记的条目返回，这里记下失败
+                if any(
+                    (payload.get("metadata") or {}).get("answer_generation_failed")
+                    for payload in result.values()
+                ):
+                    unanswered[entry["batch_key"]][2] = False
+                return result
+
+            async def answer_done(entry, _items) -> None:
+                pending_batch = unanswered[entry["batch_key"]]
+                pending_batch[1] -= 1
+                if not pending_batch[1]:
+                    del unanswered[entry["batch_key"]]
+                    # 有答案生成失败的批次不登记，续跑时重新生成
+                    if pending_batch[2]:
+                        await question_batch_done(pending_batch[0], [])
+
+            answer_lane = GenerationLane(
+                mode=mode,
+                generate=answer_and_track if question_batch_done else answer_question,
+                batches=[],
+                accept=make_accept(generator, mode, deduplicate=False),
+                on_done=answer_done if question_batch_done else None,
             )
-            filtered = [res for res in answer_results if res]
+            question_lane = GenerationLane(
+                mode="atomic_question",
+                generate=make_generate(question_generator, one_hop=True, gen_mode="atomic"),
+                batches=batches,
+                accept=collect_questions,
+                target=target_qa_pairs,
+                prior_yield=_ESTIMATED_QA_PER_BATCH["atomic"],
+                skip=make_skip(question_generator, "atomic"),
+                downstream=answer_lane,
+                downstream_backlog=answer_queue_size,
+                on_done=questions_done if question_batch_done else None,
+            )
+            answered = await run_lanes(
+                [question_lane, answer_lane], "[4/4]Generating atomic questions and answers"
+            )
+
+            if not question_lane.num_accepted:
+                logger.warning(
+                    "No new atomic questions available after deduplication."
+                )
             logger.info(
-                "[Generation] Two-stage atomic pipeline produced %d answered questions",
-                len(filtered),
+                "[Generation] Two-stage atomic pipeline produced %d answered questions "
+                "from %d questions (target: %s QA pairs)",
+                answer_lane.num_accepted, question_lane.num_accepted, target_qa_pairs,
             )
-            return filtered
+            return answered[mode], answer_lane.num_accepted
 
         if mode == "atomic" and question_first_enabled:
-            raw_generation_results = await run_atomic_two_stage()
+            results, total_accepted = await run_atomic_two_stage()
         else:
-            raw_generation_results = await run_concurrent(
-                generate_with_storage,
-                batches,
-                desc="[4/4]Generating QAs",
-                unit="batch",
-                progress_bar=progress_bar,
+            # 逐批次格式化、去重、过滤，被接受的数量达到目标后停止派发
+            lane = GenerationLane(
+                mode=mode,
+                generate=make_generate(generator, one_hop=mode == "atomic", gen_mode=mode),
+                batches=batches,
+                accept=make_accept(generator, mode),
+                target=target_qa_pairs,
+                prior_yield=_ESTIMATED_QA_PER_BATCH.get(mode, 1.0),
+                skip=make_skip(generator, mode),
+                on_done=make_done(generator, mode),
             )
-
-        # format
-        logger.debug("Output data format: %s", data_format)
-
-        results = generator.format_generation_results(
-            raw_generation_results, output_data_format=data_format
-        )
-        
-        # 为单个模式添加 mode 字段（如果还没有或与预期不符）
-        if mode != "all":
-            for result in results:
-                old_mode = result.get("mode")
-                # 如果 mode 不存在或与预期不符，强制设置为当前模式
-                if not old_mode or old_mode != mode:
-                    result["mode"] = mode
-                    if old_mode and old_mode != mode:
-                        logger.warning(
-                            "[Generation] Mode mismatch in single mode: expected %s, found %s in result, corrected to %s",
-                            mode, old_mode, mode
-                        )
-        
-        # 结果去重（基于内容hash）
-        enable_deduplication = generation_config.get("enable_deduplication", True)
-        if enable_deduplication:
-            results = deduplicate_formatted_items(
-                results,
-                session_seen_hashes,
-                persistent_question_hashes if persistent_deduplication else None,
+            results = (await run_lanes([lane], "[4/4]Generating QAs"))[mode]
+            total_accepted = lane.num_accepted
+            logger.info(
+                "[Generation] Accepted %d of %d generated results "
+                "(%d duplicates, %d removed by quality filter)",
+                total_accepted, accept_stats["generated"],
+                accept_stats["duplicates"], accept_stats["filtered"],
             )
 
-        # 基础质量过滤（空问题/空答案/答案与问题相同）
-        if generation_config.get("enable_quality_filter", True):
-            results, _filter_stats = apply_basic_quality_filter(results)
-            results = _clean_formatted_questions(results)
-
         # 记录最终结果（不应用限制，允许超过目标）
         if target_qa_pairs:
             logger.info(
                 "[Generation] Final results: %d (target: %d, mode: %s)",
-                len(results), target_qa_pairs, mode
+                total_accepted, target_qa_pairs, mode
             )
         else:
-            logger.info("[Generation] Final results: %d (no limit, mode: %s)", len(results), mode)
+            logger.info("[Generation] Final results: %d (no limit, mode: %s)", total_accepted, mode)
     
     # 刷新批量包装器，确保所有请求完成
-    if batch_wrapper:
-        await batch_wrapper.flush()
+    for wrapper in (batch_wrapper, question_batch_wrapper):
+        if wrapper:
+            await wrapper.flush()
+    for gen_mode, engine in quality_engines.items():
+        if any(engine.rejected.values()):
+            logger.info(
+                "[Generation] Quality rules (%s): rejected %s, cleaned %d questions",
+                gen_mode, engine.rejected, engine.cleaned,
+            )
+    logger.info(
+        "[Generation] Context cache: %d hits, %d misses",
+        context_cache.hits, context_cache.misses,
+    )
+    for label, packed in (("", packed_client), (" (questions)", question_packed)):
+        if packed:
+            await packed.flush()
+            logger.info(
+                "[Generation] Packed generation%s: %d prompts sent in %d requests "
+                "(%d packed, %d tasks retried individually)",
+                label, packed.stats["requests"], packed.stats["calls"],
+                packed.stats["packed_calls"], packed.stats["retried"],
+            )
 
     return results
@@ -0,0 +1,284 @@
+import asyncio
+import math
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+from graphgen.operators.partition.batch_stream import BatchStream
+from graphgen.utils import logger
+
+from .result_sink import QAResultSink
+
+
+@dataclass
+class GenerationLane:
+    """
+    一个生成模式的批次来源与接受结果
+
+    :param generate: 单个批次 -> 原始生成结果
+    :param accept: 单个批次的原始结果 -> 被接受的条目（已格式化、去重、质量过滤）
+    :param target: 需要接受的条目数；None 表示处理全部批次
+    :param prior_yield: 每批次被接受条目数的先验估计，实测产出率在其基础上平滑修正
+    :param skip: 派发前判定批次是否跳过（如此前已生成过），被跳过的批次不计入产出率
+    :param downstream: 下游通道；被接受的条目不作为结果输出，而是立即追加为下游的批次
+        （下游 batches 须为列表），两级在同一调度器内流水线推进
+    :param downstream_backlog: 下游排队与在途的条目合计达到该值时暂停本通道派发，
+        None 表示不限
+    :param on_done: 批次完成且被接受的条目已写出（或交给下游）后调用，参数为
+        (批次, 被接受的条目)；失败或被取消的批次不调用
+    """
+
+    mode: str
+    generate: Callable[[Any], Awaitable[Any]]
+    batches: Sequence[Any] | BatchStream
+    accept: Callable[[Any], List[Any]]
+    target: Optional[int] = None
+    prior_yield: float = 1.0
+    skip: Optional[Callable[[Any], bool]] = None
+    downstream: Optional["GenerationLane"] = None
+    downstream_backlog: Optional[int] = None
+    on_done: Optional[Callable[[Any, List[Any]], Awaitable[None]]] = None
+    accepted: List[Any] = field(default_factory=list)
+    num_accepted: int = 0
+    dispatched: int = 0
+    completed: int = 0
+    failed: int = 0
+    cancelled: int = 0
+    skipped: int = 0
+
+    @property
+    def satisfied(self) -> bool:
+        return self.target is not None and self.num_accepted >= self.target
+
+    @property
+    def in_flight(self) -> int:
+        return self.dispatched - self.completed - self.failed - self.cancelled
+
+    @property
+    def consumed(self) -> int:
+        """已从批次来源中取出的批次数（派发 + 跳过）"""
+        return self.dispatched + self.skipped
+
+    @property
+    def backlog(self) -> int:
+        """已入队但尚未完成的批次数（排队 + 在途）"""
+        return len(self.batches) - self.consumed + self.in_flight
+
+    def estimated_yield(self, prior_weight: float = 2.0) -> float:
+        # 先验按 prior_weight 个虚拟批次计入，避免前几个批次的偶然结果左右派发量
+        observed = self.completed + self.failed
+        return (self.num_accepted + self.prior_yield * prior_weight) / (
+            observed + prior_weight
+        )
+
+
+class GenerationScheduler:
+    """
+    目标驱动的生成调度器
+
+    按需增量派发批次：每个批次完成后立即格式化、去重、过滤，按模式累计被接受的条目数。
+    有目标的模式先按先验产出率派发首轮批次，之后根据实测产出率补足缺口；达到目标后
+    停止派发并取消在途的多余批次。没有目标的模式一次派发全部批次，与 run_concurrent 等价。
+    传入 sink 时被接受的条目直接写入 sink，通道只保留计数。
+
+    设置了 downstream 的通道构成两级流水线：上游接受的条目立即成为下游的批次并在同一轮
+    补派中派发，两级重叠执行；下游积压达到 downstream_backlog 时上游暂停派发，积压的
+    条目数因此有界。
+
+    设置 max_concurrency 时所有模式共享同一在途批次预算：只在有空位时才取出批次、创建
+    任务，空位按各模式剩余需求（折算为批次数）加权公平分配，剩余需求大的模式分得更多，
+    各模式进度大致同步推进，内存占用与批次总数无关。
+    """
+
+    def __init__(
+        self,
+        lanes: List[GenerationLane],
+        *,
+        max_in_flight: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+        min_yield: float = 0.05,
+        desc: str = "Generating",
+        progress_bar=None,
+        log_interval: int = 50,
+        sink: Optional[QAResultSink] = None,
+    ):
+        """
+        :param max_in_flight: 每个模式同时在途的批次数上限，None 表示不限
+        :param max_concurrency: 所有模式合计同时在途的批次数上限，None 表示不限
+        :param min_yield: 估算补充批次数时产出率的下限，避免产出率趋近 0 时派发量失控
+        """
+        self.lanes = lanes
+        self.max_in_flight = max_in_flight
+        self.max_concurrency = max_concurrency
+        self.min_yield = min_yield
+        self.desc = desc
+        self.progress_bar = progress_bar
+        self.log_interval = log_interval
+        self.sink = sink
+        self._task_batches: Dict[asyncio.Task, Any] = {}
+
+    async def run(self) -> Dict[str, List[Any]]:
+        """:return: 模式 -> 被接受的条目（按完成顺序）；有 sink 时为空列表"""
+        pending: Dict[asyncio.Task, GenerationLane] = {}
+        await self._fill(pending)
+
+        finished = 0
+        last_logged = 0
+        while pending:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                lane = pending.pop(task)
+                batch = self._task_batches.pop(task, None)
+                finished += 1
+                if task.cancelled():
+                    lane.cancelled += 1
+                    continue
+                exc = task.exception()
+                if exc is not None:
+                    lane.failed += 1
+                    logger.error("[Generation] Mode %s batch failed: %s", lane.mode, exc)
+                    continue
+                lane.completed += 1
+                # 已在途并完成的批次照常接受，LLM 成本已经付出
+                items = lane.accept(task.result())
+                lane.num_accepted += len(items)
+                if lane.downstream is not None:
+                    lane.downstream.batches.extend(items)
+                elif self.sink is not None:
+                    self.sink.write(lane.mode, items)
+                else:
+                    lane.accepted.extend(items)
+                if lane.on_done is not None:
+                    await lane.on_done(batch, items)
+
+            for lane in self.lanes:
+                if lane.satisfied:
+                    self._cancel_surplus(lane, pending)
+            await self._fill(pending)
+
+            if finished - last_logged >= self.log_interval or not pending:
+                last_logged = finished
+                self._report()
+
+        for lane in self.lanes:
+            if lane.target is not None and not lane.satisfied:
+                logger.warning(
+                    "[Generation] Mode %s reached %d of %d target after all %d batches",
+                    lane.mode, lane.num_accepted, lane.target, len(lane.batches),
+                )
+            logger.info(
+                "[Generation] Mode %s: accepted %d from %d batches "
+                "(dispatched %d, failed %d, cancelled %d, skipped %d, available %d)",
+                lane.mode, lane.num_accepted, lane.completed, lane.dispatched,
+                lane.failed, lane.cancelled, lane.skipped, len(lane.batches),
+            )
+        return {lane.mode: lane.accepted for lane in self.lanes}
+
+    def _wanted(self, lane: GenerationLane) -> int:
+        """本次应补派的批次数"""
+        remaining = len(lane.batches) - lane.consumed
+        if remaining <= 0 or lane.satisfied:
+            return 0
+        if (
+            lane.downstream is not None
+            and lane.downstream_backlog is not None
+            and lane.downstream.backlog >= lane.downstream_backlog
+        ):
+            # 下游积压已满，等下游消化后再派发
+            return 0
+        if lane.target is None:
+            wanted = remaining
+        else:
+            rate = max(lane.estimated_yield(), self.min_yield)
+            # 在途批次按当前产出率计入预期，只补足剩余缺口
+            deficit = lane.target - lane.num_accepted - lane.in_flight * rate
+            if deficit <= 0:
+                return 0
+            wanted = math.ceil(deficit / rate)
+        if self.max_in_flight:
+            wanted = min(wanted, self.max_in_flight - lane.in_flight)
+        return max(min(wanted, remaining), 0)
+
+    def _remaining_need(self, lane: GenerationLane) -> float:
+        """模式剩余需求折算的批次数（含在途批次），作为共享预算的分配权重"""
+        if lane.target is None:
+            return len(lane.batches) - lane.consumed + lane.in_flight
+        rate = max(lane.estimated_yield(), self.min_yield)
+        return max(lane.target - lane.num_accepted, 0) / rate
+
+    def _allocate(self, free: int) -> Dict[int, int]:
+        """把 free 个空位逐个分给 在途数 / 剩余需求 最小的模式，返回 通道下标 -> 派发数"""
+        wanted = [self._wanted(lane) for lane in self.lanes]
+        weights = [max(self._remaining_need(lane), 1e-9) for lane in self.lanes]
+        quotas = [0] * len(self.lanes)
+        for _ in range(free):
+            candidates = [i for i in range(len(self.lanes)) if quotas[i] < wanted[i]]
+            if not candidates:
+                break
+            i = min(
+                candidates,
+                key=lambda i: (self.lanes[i].in_flight + quotas[i]) / weights[i],
+            )
+            quotas[i] += 1
+        return {i: quota for i, quota in enumerate(quotas) if quota}
+
+    async def _fill(self, pending: Dict[asyncio.Task, GenerationLane]) -> None:
+        if not self.max_concurrency:
+            for lane in self.lanes:
+                if not lane.satisfied:
+                    await self._top_up(lane, self._wanted(lane), pending)
+            return
+        free = self.max_concurrency - len(pending)
+        if free <= 0:
+            return
+        for i, quota in self._allocate(free).items():
+            await self._top_up(self.lanes[i], quota, pending)
+
+    async def _top_up(
+        self, lane: GenerationLane, wanted: int, pending: Dict[asyncio.Task, GenerationLane]
+    ) -> None:
+        # 被跳过的批次由后续批次补上，直到凑够本次派发量或批次取尽
+        while wanted > 0:
+            start = lane.consumed
+            if isinstance(lane.batches, BatchStream):
+                # 惰性批次流只物化本次派发的批次
+                batches = await lane.batches.take(wanted, start=start)
+            else:
+                batches = lane.batches[start : start + wanted]
+            if not batches:
+                return
+            for batch in batches:
+                if lane.skip is not None and lane.skip(batch):
+                    lane.skipped += 1
+                    continue
+                task = asyncio.create_task(lane.generate(batch))
+                pending[task] = lane
+                self._task_batches[task] = batch
+                lane.dispatched += 1
+                wanted -= 1
+
+    @staticmethod
+    def _cancel_surplus(
+        lane: GenerationLane, pending: Dict[asyncio.Task, GenerationLane]
+    ) -> None:
+        for task, owner in pending.items():
+            if owner is lane and not task.done():
+                task.cancel()
+
+    def _report(self) -> None:
+        parts = []
+        progress = []
+        for lane in self.lanes:
+            accepted = lane.num_accepted
+            if lane.target is not None:
+                parts.append(f"{lane.mode}: {accepted}/{lane.target} QA")
+                progress.append(min(accepted / lane.target, 1.0) if lane.target else 1.0)
+            else:
+                total = len(lane.batches)
+                parts.append(f"{lane.mode}: {accepted} QA, 批次 {lane.completed}/{total}")
+                progress.append(
+                    (lane.completed + lane.failed + lane.skipped) / total if total else 1.0
+                )
+        desc = f"{self.desc} | " + " | ".join(parts)
+        logger.info(desc)
+        if self.progress_bar is not None and progress:
+            self.progress_bar(sum(progress) / len(progress), desc=desc)
@@ -0,0 +1,178 @@
+import json
+import os
+from typing import Any, Dict, Iterable, List, Optional
+
+from graphgen.utils import compute_content_hash, logger
+
+def context_table_path(output_path: str) -> str:
+    """QA 输出文件对应的附表路径：<output>.context.jsonl"""
+    return os.path.splitext(output_path)[0] + ".context.jsonl"
+
+
+def is_compact_record(item: Any) -> bool:
+    return isinstance(item, dict) and any(
+        key in item for key in ("context_id", "chunk_ids", "doc_ids")
+    )
+
+
+class QAContextTable:
+    """
+    QA 上下文的规范化附表
+
+    内联模式下同一批次生成的每条 QA 都带一份完整的 context / graph / source_chunks /
+    source_documents。紧凑模式把它们按批次、chunk、文档各存一份到附表，QA 记录中只保留
+    context_id / chunk_ids / doc_ids，需要时再由 resolve 拼回原有字段。
+
+    附表是追加写入的 JSONL（每行 {"kind", "id", "data"}），与结果 sink 一样逐批次落盘，
+    进程中断时已写入的 QA 引用的条目不会丢失。
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        """:param path: 附表 JSONL 路径，已存在时加载；None 表示只在内存中"""
+        self.path = path
+        self.batches: Dict[str, Dict[str, Any]] = {}
+        self.chunks: Dict[str, Dict[str, Any]] = {}
+        self.documents: Dict[str, Dict[str, Any]] = {}
+        self._file = None
+        if path and os.path.exists(path):
+            self._load()
+
+    def _tables(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        return {"batch": self.batches, "chunk": self.chunks, "document": self.documents}
+
+    def __len__(self) -> int:
+        return len(self.batches) + len(self.chunks) + len(self.documents)
+
+    def compact(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        """把单条 QA 的内联上下文移入附表（原地修改并返回）"""
+        if not isinstance(item, dict) or is_compact_record(item):
+            return item
+        new_entries = []
+        context = item.pop("context", None) or {}
+        graph = item.pop("graph", None) or {}
+        if context or graph:
+            batch = {"context": context, "graph": graph}
+            batch_id = compute_content_hash(
+                json.dumps(batch, sort_keys=True, ensure_ascii=False), prefix="ctx-"
+            )
+            new_entries.append(("batch", batch_id, batch))
+            item["context_id"] = batch_id
+        item["chunk_ids"] = self._register(
+            item.pop("source_chunks", None), "chunk", "chunk_id", new_entries
+        )
+        item["doc_ids"] = self._register(
+            item.pop("source_documents", None), "document", "doc_id", new_entries
+        )
+        self._append(new_entries)
+        return item
+
+    def compact_all(self, items: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return [self.compact(item) for item in items]
+
+    def resolve(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        """拼回内联字段，返回新字典；非紧凑记录原样返回"""
+        if not is_compact_record(item):
+            return item
+        resolved = {
+            key: value
+            for key, value in item.items()
+            if key not in ("context_id", "chunk_ids", "doc_ids")
+        }
+        batch = self.batches.get(item.get("context_id"), {})
+        resolved["context"] = batch.get("context", {})
+        resolved["graph"] = batch.get("graph", {})
+        resolved["source_chunks"] = [
+            self.chunks[cid] for cid in item.get("chunk_ids") or [] if cid in self.chunks
+        ]
+        resolved["source_documents"] = [
+            self.documents[did] for did in item.get("doc_ids") or [] if did in self.documents
+        ]
+        return resolved
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def clear(self) -> None:
+        self.close()
+        if self.path and os.path.exists(self.path):
+            os.remove(self.path)
+        for table in self._tables().values():
+            table.clear()
+
+    def _register(self, entries, kind: str, id_field: str, new_entries: list) -> List[str]:
+        ids = []
+        for entry in entries or []:
+            if not isinstance(entry, dict) or not entry.get(id_field):
+                continue
+            entry_id = str(entry[id_field])
+            ids.append(entry_id)
+            new_entries.append((kind, entry_id, entry))
+        return ids
+
+    def _append(self, entries) -> None:
+        tables = self._tables()
+        lines = []
+        for kind, entry_id, data in entries:
+            table = tables[kind]
+            if entry_id in table:
+                continue
+            table[entry_id] = data
+            lines.append(
+                json.dumps({"kind": kind, "id": entry_id, "data": data}, ensure_ascii=False)
+                + "\n"
+            )
+        if not lines or not self.path:
+            return
+        if self._file is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._file = open(self.path, "a", encoding="utf-8")
+        self._file.write("".join(lines))
+        self._file.flush()
+
+    def _load(self) -> None:
+        tables = self._tables()
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning("Skipping truncated line in %s", self.path)
+                    continue
+                table = tables.get(entry.get("kind"))
+                if table is not None:
+                    table[entry["id"]] = entry.get("data")
+
+
+class QAContextResolver:
+    """
+    按需拼回紧凑 QA 记录的上下文
+
+    附表在第一次遇到紧凑记录时才加载；内联记录原样返回，不读取附表。
+    """
+
+    def __init__(self, table_path: str):
+        self.table_path = table_path
+        self._table: Optional[QAContextTable] = None
+
+    @classmethod
+    def for_output(cls, output_path: str) -> "QAContextResolver":
+        return cls(context_table_path(output_path))
+
+    @property
+    def table(self) -> QAContextTable:
+        if self._table is None:
+            if not os.path.exists(self.table_path):
+                logger.warning("QA context table not found: %s", self.table_path)
+            self._table = QAContextTable(self.table_path)
+        return self._table
+
+    def resolve(self, item: Any) -> Any:
+        return self.table.resolve(item) if is_compact_record(item) else item
+
+    def resolve_all(self, items: Iterable[Any]) -> List[Any]:
+        return [self.resolve(item) for item in items]
@@ -0,0 +1,199 @@
+"""
+零 LLM 成本的质量规则引擎
+规则与问题前导语模式在构造时编译，逐条目只提取一次问题/答案并依次执行启用的规则；
+各生成模式可单独配置启用的规则与阈值，引擎按规则累计剔除计数
+"""
+
+import re
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from graphgen.utils import detect_main_language, logger
+
+
+# 问题文本开头的元前导语（LLM 有时输出"根据答案内容，可以生成如下问题：**问题：**..."之类）
+QUESTION_PREAMBLE_PATTERNS = [
+    re.compile(r"^(?:根据|基于|按照)[^\n]{0,60}?(?:生成|提出|设计|构造|给出|如下)[^\n]{0,20}[：:]?\s*\n*", re.IGNORECASE),
+    re.compile(r"^以下[是为][^\n]{0,30}[：:]\s*\n*"),
+    re.compile(r"^\*\*问题[：:]\*\*\s*", re.IGNORECASE),
+    re.compile(r"^\*\*[Qq]uestion[：:]\*\*\s*"),
+    re.compile(r"^问题[：:]\s*"),
+    re.compile(r"^(?:Question|Q)[：:]\s*", re.IGNORECASE),
+]
+
+
+def _combine_patterns(patterns: Sequence[re.Pattern]) -> re.Pattern:
+    """把若干锚定开头的模式合并为一个分支，各分支保留自己的 IGNORECASE 标志"""
+    branches = []
+    for pattern in patterns:
+        body = pattern.pattern[1:] if pattern.pattern.startswith("^") else pattern.pattern
+        flag = "i" if pattern.flags & re.IGNORECASE else "-i"
+        branches.append(f"(?{flag}:{body})")
+    return re.compile("^(?:" + "|".join(branches) + ")")
+
+
+_QUESTION_PREAMBLE_RE = _combine_patterns(QUESTION_PREAMBLE_PATTERNS)
+# 前导语只可能以这些字符开头，其余问题无需进入正则
+_PREAMBLE_FIRST_CHARS = frozenset("根基按以*问Qq")
+
+
+def clean_question_text(question: str) -> str:
+    """剥离问题开头的元前导语与标记，返回干净的问题文本。"""
+    q = question.strip()
+    while q and q[0] in _PREAMBLE_FIRST_CHARS:
+        new_q = _QUESTION_PREAMBLE_RE.sub("", q, count=1).strip()
+        if new_q == q:
+            break
+        q = new_q
+    return q
+
+
+def _question_field(result: Dict[str, Any]) -> Optional[Tuple[Dict[str, Any], str]]:
+    """格式化结果中问题文本所在的 (字典, 键)"""
+    if "instruction" in result:
+        return result, "instruction"
+    if "conversations" in result:
+        for msg in result.get("conversations", []):
+            if msg.get("from") == "human":
+                return msg, "value"
+    if "messages" in result:
+        for msg in result.get("messages", []):
+            if msg.get("role") == "user":
+                return msg, "content"
+    return None
+
+
+def _answer_text(result: Dict[str, Any]) -> str:
+    if "output" in result:
+        return result.get("output", "")
+    if "conversations" in result:
+        for msg in result.get("conversations", []):
+            if msg.get("from") == "gpt":
+                return msg.get("value", "")
+    if "messages" in result:
+        for msg in result.get("messages", []):
+            if msg.get("role") == "assistant":
+                return msg.get("content", "")
+    return result.get("answer", "")
+
+
+# 规则名 -> 判定函数 (question, answer, options) -> 是否剔除；问题/答案已去除首尾空白
+QualityRule = Callable[[str, str, Mapping[str, Any]], bool]
+
+QUALITY_RULES: Dict[str, QualityRule] = {
+    "empty_question": lambda q, a, o: len(q) < o["min_question_length"],
+    "empty_answer": lambda q, a, o: len(a) < o["min_answer_length"],
+    "identical_qa": lambda q, a, o: q == a,
+    "question_too_long": lambda q, a, o: (
+        o["max_question_length"] is not None and len(q) > o["max_question_length"]
+    ),
+    "answer_too_long": lambda q, a, o: (
+        o["max_answer_length"] is not None and len(a) > o["max_answer_length"]
+    ),
+    "language_mismatch": lambda q, a, o: (
+        o["language"] is not None and detect_main_language(q) != o["language"]
+    ),
+}
+
+DEFAULT_QUALITY_RULES = ("empty_question", "empty_answer", "identical_qa")
+
+DEFAULT_RULE_OPTIONS: Dict[str, Any] = {
+    "min_question_length": 2,
+    "min_answer_length": 1,
+    "max_question_length": None,
+    "max_answer_length": None,
+    "language": None,
+}
+
+
+def register_quality_rule(name: str, rule: QualityRule) -> None:
+    """注册自定义规则，之后可在 quality_rules 配置的 rules 中按名称启用"""
+    QUALITY_RULES[name] = rule
+
+
+class QualityRuleEngine:
+    """
+    质量规则引擎
+
+    条目依次执行启用的规则，命中第一条即剔除并计入该规则；保留的条目再剥离问题前导语。
+    默认规则与阈值与原基础过滤一致（空问题/空答案/问答相同）。
+    """
+
+    def __init__(
+        self,
+        rules: Optional[Sequence[str]] = None,
+        clean_questions: bool = True,
+        **options: Any,
+    ):
+        """
+        :param rules: 启用的规则名，按顺序执行；None 表示默认规则
+        :param clean_questions: 是否剥离保留条目的问题前导语
+        :param options: 规则阈值，见 DEFAULT_RULE_OPTIONS；自定义规则可读取额外的键
+        """
+        names = list(DEFAULT_QUALITY_RULES if rules is None else rules)
+        unknown = [name for name in names if name not in QUALITY_RULES]
+        if unknown:
+            raise ValueError(f"Unknown quality rules: {unknown}")
+        self.options = {**DEFAULT_RULE_OPTIONS, **options}
+        self._rules = [(name, QUALITY_RULES[name]) for name in names]
+        self.clean_questions = clean_questions
+        self.rejected: Dict[str, int] = {name: 0 for name in names}
+        self.cleaned = 0
+
+    @classmethod
+    def for_mode(
+        cls, config: Optional[Mapping[str, Any]], mode: str
+    ) -> "QualityRuleEngine":
+        """
+        按模式构造引擎：config 中 default 为公共设置，模式名下的设置覆盖之
+
+        :param config: 如 {"default": {"rules": [...], "min_question_length": 5},
+                        "cot": {"max_answer_length": 4000}}
+        """
+        config = config or {}
+        settings = {**(config.get("default") or {}), **(config.get(mode) or {})}
+        return cls(**settings)
+
+    def check(self, question: str, answer: str) -> Optional[str]:
+        """:return: 命中的第一条规则名，全部通过时为 None"""
+        for name, rule in self._rules:
+            if rule(question, answer, self.options):
+                return name
+        return None
+
+    def apply(
+        self, items: List[Dict[str, Any]]
+    ) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+        """
+        过滤并清洗问题文本（保留的条目原地修改）
+
+        :return: (保留的条目, 本次各规则剔除计数)
+        """
+        kept: List[Dict[str, Any]] = []
+        removed = {name: 0 for name in self.rejected}
+        for result in items:
+            if not isinstance(result, dict):
+                field, question, answer = None, "", ""
+            else:
+                field = _question_field(result)
+                if field is not None:
+                    question = field[0].get(field[1], "")
+                else:
+                    question = result.get("question") or result.get("input", "")
+                answer = _answer_text(result)
+            rule = self.check(question.strip(), answer.strip())
+            if rule is not None:
+                removed[rule] += 1
+                continue
+            if self.clean_questions and field is not None:
+                holder, key = field
+                cleaned = clean_question_text(holder.get(key, ""))
+                if cleaned != holder.get(key, ""):
+                    holder[key] = cleaned
+                    self.cleaned += 1
+            kept.append(result)
+        for name, count in removed.items():
+            self.rejected[name] += count
+        total_removed = sum(removed.values())
+        if total_removed:
+            logger.debug("Quality filter removed %d items: %s", total_removed, removed)
+        return kept, removed
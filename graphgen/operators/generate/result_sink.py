@@ -0,0 +1,94 @@
+import json
+import os
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from graphgen.utils import logger
+
+
+class QAResultSink:
+    """
+    生成结果的流式输出
+
+    每个批次被接受的条目立即以 JSONL 追加写入并 flush，进程崩溃时已写入的条目不会丢失，
+    内存中也不再保留全部结果；各模式的计数实时更新，并按 progress_interval 节流推送给
+    on_progress 回调（如后端任务进度）。
+    """
+
+    def __init__(
+        self,
+        path: str,
+        on_progress: Optional[Callable[[Dict[str, int]], None]] = None,
+        progress_interval: float = 2.0,
+    ):
+        """
+        :param path: JSONL 文件路径，已存在时在末尾追加
+        :param on_progress: 计数回调，参数为 模式 -> 已写入条目数
+        :param progress_interval: 两次回调之间的最短间隔（秒），close 时总会回调一次
+        """
+        self.path = path
+        self.counts: Dict[str, int] = {}
+        self._on_progress = on_progress
+        self._progress_interval = progress_interval
+        self._last_notified: Optional[float] = None
+        self._file = None
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts.values())
+
+    def write(self, mode: str, items: List[dict[str, Any]]) -> None:
+        if not items:
+            return
+        if self._file is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._file = open(self.path, "a", encoding="utf-8")
+        self._file.write(
+            "".join(json.dumps(item, ensure_ascii=False) + "\n" for item in items)
+        )
+        self._file.flush()
+        self.counts[mode] = self.counts.get(mode, 0) + len(items)
+        self._notify()
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._notify(force=True)
+
+    def iter_items(self) -> Iterator[dict[str, Any]]:
+        """按写入顺序读出文件中的条目；崩溃时写了一半的末行被跳过"""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning("Skipping truncated line in %s", self.path)
+
+    def clear(self) -> None:
+        """结果已提交到存储后删除文件并清零计数"""
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        self.counts = {}
+
+    def _notify(self, force: bool = False) -> None:
+        if self._on_progress is None:
+            return
+        now = time.monotonic()
+        if (
+            not force
+            and self._last_notified is not None
+            and now - self._last_notified < self._progress_interval
+        ):
+            return
+        self._last_notified = now
+        try:
+            self._on_progress(dict(self.counts))
+        except Exception as exc:  # pylint: disable=broad-except
+            logger.warning("QA progress callback failed: %s", exc)
@@ -1 +1,2 @@
+from .batch_stream import BatchStream
 from .partition_kg import partition_kg
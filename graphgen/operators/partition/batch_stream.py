@@ -0,0 +1,61 @@
+from typing import Any, AsyncIterator, List, Optional
+
+from graphgen.bases import BaseGraphStorage, BaseKVStorage, BasePartitioner
+from graphgen.bases.datatypes import Community
+
+Batch = tuple[
+    list[tuple[str, dict]], list[tuple[Any, Any, dict] | tuple[Any, Any, Any]]
+]
+
+
+class BatchStream:
+    """
+    分区结果的惰性批次流
+
+    只持有社区（节点名与边端点），按需从图存储取出 (nodes_data, edges_data)，
+    图像节点的 images 在同一遍中附加；len() 为社区数，不触发物化。
+    """
+
+    def __init__(
+        self,
+        communities: List[Community],
+        g: BaseGraphStorage,
+        chunk_storage: Optional[BaseKVStorage] = None,
+    ):
+        self.communities = communities
+        self._g = g
+        self._chunk_storage = chunk_storage
+
+    def __len__(self) -> int:
+        return len(self.communities)
+
+    async def __aiter__(self) -> AsyncIterator[Batch]:
+        async for batch in BasePartitioner.iter_batches(self.communities, self._g):
+            yield await self._attach_images(batch)
+
+    async def take(self, n: Optional[int] = None, start: int = 0) -> List[Batch]:
+        """物化从 start 开始的 n 个批次；n 为 None 时物化到末尾"""
+        stop = None if n is None else start + max(n, 0)
+        communities = self.communities[start:stop]
+        return [
+            await self._attach_images(await BasePartitioner.community_to_batch(c, self._g))
+            for c in communities
+        ]
+
+    async def to_list(self) -> List[Batch]:
+        return await self.take(None)
+
+    async def _attach_images(self, batch: Batch) -> Batch:
+        if self._chunk_storage is None:
+            return batch
+        nodes, _ = batch
+        for i, (node_id, node_data) in enumerate(nodes):
+            entity_type = node_data.get("entity_type")
+            if entity_type and "image" in entity_type.lower():
+                image_data = await self._chunk_storage.get_by_id(
+                    node_id.strip('"').lower()
+                )
+                if image_data:
+                    # 复制后再附加，避免改动存储中的节点属性（及图指纹）
+                    nodes[i] = (node_id, {**node_data, "images": image_data})
+        return batch
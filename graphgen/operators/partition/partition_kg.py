@@ -1,67 +1,76 @@
-from typing import Any
+import json
+from dataclasses import asdict
+from typing import Any, List, Optional
 
-from graphgen.bases import BaseGraphStorage, BaseKVStorage, BaseTokenizer
+from graphgen.bases import (
+    BaseGraphStorage,
+    BaseKVStorage,
+    BasePartitioner,
+    BaseTokenizer,
+)
 from graphgen.bases.datatypes import Community
 from graphgen.models import (
     AnchorBFSPartitioner,
     BFSPartitioner,
+    ComponentShardedPartitioner,
+    CoveragePartitioner,
     DFSPartitioner,
     ECEPartitioner,
     HierarchicalPartitioner,
     LeidenPartitioner,
 )
-from graphgen.utils import logger
+from graphgen.utils import compute_args_hash, logger
 
+from .batch_stream import BatchStream
 from .pre_tokenize import pre_tokenize
 
+# 分区缓存保留的条目数，超出后淘汰最早写入的（图变化后旧指纹的条目不会再命中）
+PARTITION_CACHE_MAX_ENTRIES = 8
 
-async def partition_kg(
-    kg_instance: BaseGraphStorage,
-    chunk_storage: BaseKVStorage,
-    tokenizer: Any = BaseTokenizer,
-    partition_config: dict = None,
-) -> list[
-    tuple[list[tuple[str, dict]], list[tuple[Any, Any, dict] | tuple[Any, Any, Any]]]
-]:
-    method = partition_config["method"]
+
+async def _partition_cache_key(
+    kg_instance: BaseGraphStorage, partition_config: dict
+) -> str:
     method_params = partition_config["method_params"]
-    if method == "bfs":
-        logger.info("Partitioning knowledge graph using BFS method.")
-        partitioner = BFSPartitioner()
-    elif method == "dfs":
-        logger.info("Partitioning knowledge graph using DFS method.")
-        partitioner = DFSPartitioner()
-    elif method == "ece":
-        logger.info("Partitioning knowledge graph using ECE method.")
-        # TODO： before ECE partitioning, we need to:
-        # 1. 'quiz and judge' to get the comprehension loss if unit_sampling is not random
-        # 2. pre-tokenize nodes and edges to get the token length
-        edges = await kg_instance.get_all_edges()
-        nodes = await kg_instance.get_all_nodes()
-        await pre_tokenize(kg_instance, tokenizer, edges, nodes)
-        partitioner = ECEPartitioner()
-    elif method == "leiden":
-        logger.info("Partitioning knowledge graph using Leiden method.")
-        partitioner = LeidenPartitioner()
-    elif method == "anchor_bfs":
-        logger.info("Partitioning knowledge graph using Anchor BFS method.")
-        partitioner = AnchorBFSPartitioner(
-            anchor_type=method_params.get("anchor_type"),
-            anchor_ids=set(method_params.get("anchor_ids", []))
-            if method_params.get("anchor_ids")
-            else None,
-        )
-    elif method == "hierarchical":
-        logger.info("Partitioning knowledge graph using Hierarchical method.")
-        partitioner = HierarchicalPartitioner(
-            hierarchical_relations=method_params.get("hierarchical_relations"),
-            max_depth=method_params.get("max_hierarchical_depth", 3),
-            max_siblings=method_params.get("max_siblings_per_community", 10),
-            include_attributes=method_params.get("include_attributes", True),
-        )
-    else:
-        raise ValueError(f"Unsupported partition method: {method}")
+    seed = partition_config.get(
+        "seed", method_params.get("seed", method_params.get("random_seed"))
+    )
+    return compute_args_hash(
+        await kg_instance.fingerprint(),
+        partition_config["method"],
+        json.dumps(method_params, sort_keys=True, ensure_ascii=False, default=str),
+        seed,
+    )
+
 
+def _community_from_dict(data: dict) -> Community:
+    # JSON 中的边元组会变成列表，还原为元组以便 community2batch 解包与比较
+    return Community(
+        id=data["id"],
+        nodes=data["nodes"],
+        edges=[tuple(edge) for edge in data["edges"]],
+        metadata=data.get("metadata") or {},
+    )
+
+
+async def _store_partition(
+    partition_cache: BaseKVStorage, cache_key: str, communities: List[Community]
+) -> None:
+    await partition_cache.upsert(
+        {cache_key: {"communities": [asdict(c) for c in communities]}}
+    )
+    keys = await partition_cache.all_keys()
+    if len(keys) > PARTITION_CACHE_MAX_ENTRIES:
+        await partition_cache.delete(keys[: len(keys) - PARTITION_CACHE_MAX_ENTRIES])
+
+
+async def _run_partitioner(
+    partitioner: BasePartitioner,
+    kg_instance: BaseGraphStorage,
+    method: str,
+    method_params: dict,
+) -> List[Community]:
+    """运行分区器；没有得到任何社区时按节点构造兜底社区"""
     communities = await partitioner.partition(g=kg_instance, **method_params)
     logger.info("Partitioned the graph into %d communities.", len(communities))
     
@@ -101,16 +110,106 @@ async def partition_kg(
                     for i, node in enumerate(nodes)
                 ]
                 logger.info("Created %d single-node communities", len(communities))
-    
-    batches = await partitioner.community2batch(communities, g=kg_instance)
-
-    for _, batch in enumerate(batches):
-        nodes, edges = batch
-        for node_id, node_data in nodes:
-            entity_type = node_data.get("entity_type")
-            if entity_type and "image" in entity_type.lower():
-                node_id = node_id.strip('"').lower()
-                image_data = await chunk_storage.get_by_id(node_id)
-                if image_data:
-                    node_data["images"] = image_data
-    return batches
+    return communities
+
+
+async def partition_kg(
+    kg_instance: BaseGraphStorage,
+    chunk_storage: BaseKVStorage,
+    tokenizer: Any = BaseTokenizer,
+    partition_config: dict = None,
+    partition_cache: Optional[BaseKVStorage] = None,
+    length_cache: Optional[BaseKVStorage] = None,
+    target_batches: Optional[int] = None,
+) -> BatchStream:
+    """
+    :return: 惰性批次流，len() 为社区数；通过 take(n)/to_list()/async for 取得批次
+    :param partition_cache: 可选，持久化的分区缓存；以 (图指纹, method, method_params, seed)
+        为键，图未变化时直接复用上次的社区，跳过预分词与分区
+    :param length_cache: 可选，持久化的 token 长度缓存，预分词只处理新增或变化的描述
+    :param target_batches: 可选，生成阶段需要的批次数（由目标 QA 数与各模式产出估算）；
+        coverage 方法据此生成足够多的互不相同的社区，method_params 中显式给出的
+        target_communities 优先
+    """
+    method = partition_config["method"]
+    method_params = partition_config["method_params"]
+    if method == "bfs":
+        logger.info("Partitioning knowledge graph using BFS method.")
+        partitioner = BFSPartitioner()
+    elif method == "dfs":
+        logger.info("Partitioning knowledge graph using DFS method.")
+        partitioner = DFSPartitioner()
+    elif method == "ece":
+        logger.info("Partitioning knowledge graph using ECE method.")
+        partitioner = ECEPartitioner()
+    elif method == "coverage":
+        logger.info("Partitioning knowledge graph using Coverage method.")
+        partitioner = CoveragePartitioner()
+        if target_batches and "target_communities" not in method_params:
+            method_params = {**method_params, "target_communities": target_batches}
+            # 目标批次数参与分区缓存的键
+            partition_config = {**partition_config, "method_params": method_params}
+    elif method == "leiden":
+        logger.info("Partitioning knowledge graph using Leiden method.")
+        partitioner = LeidenPartitioner()
+    elif method == "anchor_bfs":
+        logger.info("Partitioning knowledge graph using Anchor BFS method.")
+        partitioner = AnchorBFSPartitioner(
+            anchor_type=method_params.get("anchor_type"),
+            anchor_ids=set(method_params.get("anchor_ids", []))
+            if method_params.get("anchor_ids")
+            else None,
+        )
+    elif method == "hierarchical":
+        logger.info("Partitioning knowledge graph using Hierarchical method.")
+        partitioner = HierarchicalPartitioner(
+            hierarchical_relations=method_params.get("hierarchical_relations"),
+            max_depth=method_params.get("max_hierarchical_depth", 3),
+            max_siblings=method_params.get("max_siblings_per_community", 10),
+            include_attributes=method_params.get("include_attributes", True),
+        )
+    else:
+        raise ValueError(f"Unsupported partition method: {method}")
+
+    num_workers = partition_config.get("num_workers", 1)
+    # coverage 的后续轮次依赖全图的覆盖计数，不按分量分片
+    if num_workers > 1 and method != "coverage":
+        # 按连通分量分片，在进程池中并行运行上面选定的分区器
+        partitioner = ComponentShardedPartitioner(partitioner, num_workers=num_workers)
+
+    cache_key = None
+    communities = None
+    if partition_cache is not None and partition_config.get("enable_cache", True):
+        cache_key = await _partition_cache_key(kg_instance, partition_config)
+        cached = await partition_cache.get_by_id(cache_key)
+        if cached is not None:
+            communities = [_community_from_dict(c) for c in cached["communities"]]
+            logger.info(
+                "Reusing cached partition of the unchanged graph (%d communities).",
+                len(communities),
+            )
+
+    if communities is None:
+        if method == "ece":
+            # TODO： before ECE partitioning, we need to:
+            # 1. 'quiz and judge' to get the comprehension loss if unit_sampling is not random
+            # 2. pre-tokenize nodes and edges to get the token length
+            edges = await kg_instance.get_all_edges()
+            nodes = await kg_instance.get_all_nodes()
+            await pre_tokenize(
+                kg_instance, tokenizer, edges, nodes, length_cache=length_cache
+            )
+
+        communities = await _run_partitioner(
+            partitioner, kg_instance, method, method_params
+        )
+        if cache_key is not None:
+            # 预分词会写回 length，按写回后的指纹缓存，下次运行即可命中
+            await _store_partition(
+                partition_cache,
+                await _partition_cache_key(kg_instance, partition_config),
+                communities,
+            )
+
+    # 批次按需物化：生成阶段只取实际需要的批次，图像数据在同一遍附加
+    return BatchStream(communities, kg_instance, chunk_storage)
@@ -1,8 +1,15 @@
 import asyncio
-from typing import List, Tuple
+from typing import Dict, List, Optional, Tuple
 
-from graphgen.bases import BaseGraphStorage, BaseTokenizer
-from graphgen.utils import run_concurrent
+from tqdm.asyncio import tqdm as tqdm_async
+
+from graphgen.bases import BaseGraphStorage, BaseKVStorage, BaseTokenizer
+from graphgen.utils import compute_content_hash, logger
+
+
+def _length_key(model_name: str, description: str) -> str:
+    # 长度取决于分词器，键中带上模型名，切换分词器后不会误用旧长度
+    return compute_content_hash(f"{model_name}\n{description}", prefix="len-")
 
 
 async def pre_tokenize(
@@ -10,38 +17,83 @@ async def pre_tokenize(
     tokenizer: BaseTokenizer,
     edges: List[Tuple],
     nodes: List[Tuple],
+    length_cache: Optional[BaseKVStorage] = None,
+    batch_size: int = 2048,
 ) -> Tuple[List, List]:
-    """为 edges/nodes 补 token-length 并回写存储，并发 1000，带进度条。"""
-    sem = asyncio.Semaphore(1000)
-
-    async def _patch_and_write(obj: Tuple, *, is_node: bool) -> Tuple:
-        async with sem:
-            data = obj[1] if is_node else obj[2]
-            if "length" not in data:
-                loop = asyncio.get_event_loop()
-                data["length"] = len(
-                    await loop.run_in_executor(
-                        None, tokenizer.encode, data["description"]
-                    )
+    """
+    为 edges/nodes 补 token-length 并批量回写存储
+
+    相同描述只分词一次，按 batch_size 调用分词器的批量编码（在线程池中执行，不阻塞事件循环）；
+    只有长度发生变化的节点/边才回写，没有变化时不重写图文件。
+
+    :param length_cache: 可选，持久化的 (分词器, 描述哈希) → 长度缓存；提供时描述被修改的
+        节点/边也会重新计算，之后的运行只对新增或变化的描述分词。未提供时沿用已有的 length 字段
+    :param batch_size: 每次批量编码的描述数
+    :return: (edges, nodes)，其属性字典已包含 length
+    """
+    model_name = getattr(tokenizer, "model_name", "") or ""
+    entries = [(True, node[0], node[1]) for node in nodes] + [
+        (False, (edge[0], edge[1]), edge[2]) for edge in edges
+    ]
+    descriptions = [data.get("description", "") or "" for _, _, data in entries]
+
+    # 描述 → 长度：先取持久化缓存，余下的去重后批量分词
+    lengths: Dict[str, int] = {}
+    keys: Dict[str, str] = {}
+    if length_cache is not None:
+        for text in descriptions:
+            if text not in keys:
+                keys[text] = _length_key(model_name, text)
+        unique_texts = list(keys)
+        cached = await length_cache.get_by_ids([keys[t] for t in unique_texts])
+        for text, value in zip(unique_texts, cached):
+            if value is not None:
+                lengths[text] = value
+        pending = [t for t in unique_texts if t not in lengths]
+    else:
+        pending = list(
+            dict.fromkeys(
+                text
+                for text, (_, _, data) in zip(descriptions, entries)
+                if "length" not in data
+            )
+        )
+
+    if pending:
+        loop = asyncio.get_running_loop()
+        with tqdm_async(total=len(pending), desc="Pre-tokenizing", unit="text") as pbar:
+            for start in range(0, len(pending), batch_size):
+                chunk = pending[start : start + batch_size]
+                counts = await loop.run_in_executor(
+                    None, tokenizer.count_tokens_batch, chunk
                 )
-            if is_node:
-                await graph_storage.update_node(obj[0], obj[1])
-            else:
-                await graph_storage.update_edge(obj[0], obj[1], obj[2])
-            return obj
-
-    new_edges, new_nodes = await asyncio.gather(
-        run_concurrent(
-            lambda e: _patch_and_write(e, is_node=False),
-            edges,
-            desc="Pre-tokenizing edges",
-        ),
-        run_concurrent(
-            lambda n: _patch_and_write(n, is_node=True),
-            nodes,
-            desc="Pre-tokenizing nodes",
-        ),
-    )
+                lengths.update(zip(chunk, counts))
+                pbar.update(len(chunk))
+        if length_cache is not None:
+            await length_cache.upsert({keys[t]: lengths[t] for t in pending})
+            await length_cache.index_done_callback()
 
-    await graph_storage.index_done_callback()
-    return new_edges, new_nodes
+    node_updates: Dict[str, dict] = {}
+    edge_updates: List[Tuple[str, str, dict]] = []
+    for (is_node, ident, data), text in zip(entries, descriptions):
+        if length_cache is None and "length" in data:
+            continue
+        length = lengths.get(text)
+        if length is None or data.get("length") == length:
+            continue
+        if is_node:
+            node_updates[ident] = {"length": length}
+        else:
+            edge_updates.append((ident[0], ident[1], {"length": length}))
+
+    logger.info(
+        "Pre-tokenized %d distinct descriptions, updated length of %d nodes and %d edges",
+        len(pending),
+        len(node_updates),
+        len(edge_updates),
+    )
+    if node_updates or edge_updates:
+        await graph_storage.update_nodes(node_updates)
+        await graph_storage.update_edges(edge_updates)
+        await graph_storage.index_done_callback()
+    return edges, nodes
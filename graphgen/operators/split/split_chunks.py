@@ -1,8 +1,11 @@
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
 from functools import lru_cache
-from typing import Union
+from typing import Dict, List, Optional, Tuple, Union
 
 from tqdm.asyncio import tqdm as tqdm_async
 
+from graphgen.bases import BaseTokenizer
 from graphgen.models import (
     ChineseRecursiveTextSplitter,
     RecursiveCharacterSplitter,
@@ -91,6 +94,145 @@ def estimate_complexity(text: str) -> float:
     return min(1.0, complexity)
 
 
+def _chunk_document(
+    doc_key: str,
+    doc: dict,
+    chunk_size: int,
+    chunk_overlap: int,
+    tokenizer_instance: Optional[BaseTokenizer],
+    dynamic_chunk_size: bool,
+) -> dict:
+    """切分单个文档，返回 chunk_id → chunk（纯同步，可在子进程中执行）"""
+    doc_type = doc.get("type")
+    if doc_type != "text":
+        return {doc_key.replace("doc-", f"{doc_type}-"): {**doc, "full_doc_id": doc_key}}
+
+    doc_language = detect_main_language(doc["content"])
+
+    # Dynamic chunk size adjustment if enabled
+    actual_chunk_size = chunk_size
+    if dynamic_chunk_size:
+        complexity = estimate_complexity(doc["content"])
+        actual_chunk_size = calculate_optimal_chunk_size(
+            len(doc["content"]),
+            complexity,
+            chunk_size
+        )
+        if actual_chunk_size != chunk_size:
+            logger.debug(
+                "Adjusted chunk_size from %d to %d for doc %s (complexity: %.2f)",
+                chunk_size, actual_chunk_size, doc_key, complexity
+            )
+
+    text_chunks = split_chunks(
+        doc["content"],
+        language=doc_language,
+        chunk_size=actual_chunk_size,
+        chunk_overlap=chunk_overlap,
+    )
+
+    return {
+        compute_content_hash(txt, prefix="chunk-"): {
+            "content": txt,
+            "type": "text",
+            "full_doc_id": doc_key,
+            "length": len(tokenizer_instance.encode(txt))
+            if tokenizer_instance
+            else len(txt),
+            # 按 chunk 检测：混合语言文档的各 chunk 使用各自语言的抽取 prompt
+            "language": detect_main_language(txt),
+        }
+        for txt in text_chunks
+    }
+
+
+# ---- 进程池切分：每个 worker 只初始化一次 tokenizer ----
+_WORKER_TOKENIZER: Optional[BaseTokenizer] = None
+
+
+def _tokenizer_spec(tokenizer_instance: Optional[BaseTokenizer]):
+    # Tokenizer 内部持有 tiktoken/HF 实现，按模型名在 worker 内重建；
+    # 其他 BaseTokenizer 实现直接 pickle 传入（每个 worker 只传一次）
+    if isinstance(tokenizer_instance, Tokenizer):
+        return ("name", tokenizer_instance.model_name)
+    return ("instance", tokenizer_instance)
+
+
+def _init_chunk_worker(tokenizer_spec) -> None:
+    global _WORKER_TOKENIZER  # pylint: disable=global-statement
+    kind, value = tokenizer_spec
+    _WORKER_TOKENIZER = Tokenizer(model_name=value) if kind == "name" else value
+
+
+def _chunk_shard(
+    shard: List[Tuple[str, dict]],
+    chunk_size: int,
+    chunk_overlap: int,
+    dynamic_chunk_size: bool,
+) -> List[Tuple[str, dict]]:
+    return [
+        (
+            doc_key,
+            _chunk_document(
+                doc_key,
+                doc,
+                chunk_size,
+                chunk_overlap,
+                _WORKER_TOKENIZER,
+                dynamic_chunk_size,
+            ),
+        )
+        for doc_key, doc in shard
+    ]
+
+
+async def _chunk_documents_parallel(
+    items: List[Tuple[str, dict]],
+    chunk_size: int,
+    chunk_overlap: int,
+    tokenizer_instance: Optional[BaseTokenizer],
+    progress_bar,
+    dynamic_chunk_size: bool,
+    num_workers: int,
+    shard_size: int,
+) -> List[Tuple[str, dict]]:
+    shards = [items[i : i + shard_size] for i in range(0, len(items), shard_size)]
+    results: List[Optional[List[Tuple[str, dict]]]] = [None] * len(shards)
+    loop = asyncio.get_running_loop()
+    with ProcessPoolExecutor(
+        max_workers=min(num_workers, len(shards)),
+        initializer=_init_chunk_worker,
+        initargs=(_tokenizer_spec(tokenizer_instance),),
+    ) as executor:
+        async def _run_shard(idx: int, shard: List[Tuple[str, dict]]):
+            return idx, await loop.run_in_executor(
+                executor,
+                _chunk_shard,
+                shard,
+                chunk_size,
+                chunk_overlap,
+                dynamic_chunk_size,
+            )
+
+        done_docs = 0
+        with tqdm_async(
+            total=len(items), desc="[1/4]Chunking documents", unit="doc"
+        ) as pbar:
+            for coro in asyncio.as_completed(
+                [_run_shard(idx, shard) for idx, shard in enumerate(shards)]
+            ):
+                idx, shard_result = await coro
+                results[idx] = shard_result
+                done_docs += len(shard_result)
+                pbar.update(len(shard_result))
+                if progress_bar is not None:
+                    progress_bar(
+                        done_docs / len(items), f"Chunking {done_docs}/{len(items)}"
+                    )
+    # 按文档原始顺序拼接，保证与串行路径结果一致
+    return [pair for shard_result in results for pair in shard_result]
+
+
 async def chunk_documents(
     new_docs: dict,
     chunk_size: int = 1024,
@@ -98,58 +240,54 @@ async def chunk_documents(
     tokenizer_instance: Tokenizer = None,
     progress_bar=None,
     dynamic_chunk_size: bool = False,
+    doc_chunk_index: Optional[Dict[str, List[str]]] = None,
+    num_workers: int = 1,
+    shard_size: int = 64,
 ) -> dict:
-    inserting_chunks = {}
-    cur_index = 1
-    doc_number = len(new_docs)
-    async for doc_key, doc in tqdm_async(
-        new_docs.items(), desc="[1/4]Chunking documents", unit="doc"
-    ):
-        doc_type = doc.get("type")
-        if doc_type == "text":
-            doc_language = detect_main_language(doc["content"])
-            
-            # Dynamic chunk size adjustment if enabled
-            actual_chunk_size = chunk_size
-            if dynamic_chunk_size:
-                complexity = estimate_complexity(doc["content"])
-                actual_chunk_size = calculate_optimal_chunk_size(
-                    len(doc["content"]),
-                    complexity,
-                    chunk_size
+    """
+    :param doc_chunk_index: 可选，回填 doc_id → chunk_ids（同一 chunk 可能被多个文档共享，
+        不能只依赖 chunk 的 full_doc_id 字段）
+    :param num_workers: 切分进程数；>1 且文档数超过一个 shard 时按 shard 分发到进程池，
+        结果按文档顺序合并，与串行路径完全一致
+    :param shard_size: 每个进程池任务包含的文档数
+    """
+    items = list(new_docs.items())
+    if num_workers > 1 and len(items) > shard_size:
+        chunked = await _chunk_documents_parallel(
+            items,
+            chunk_size,
+            chunk_overlap,
+            tokenizer_instance,
+            progress_bar,
+            dynamic_chunk_size,
+            num_workers,
+            shard_size,
+        )
+    else:
+        chunked = []
+        doc_number = len(items)
+        async for doc_key, doc in tqdm_async(
+            items, desc="[1/4]Chunking documents", unit="doc"
+        ):
+            chunked.append(
+                (
+                    doc_key,
+                    _chunk_document(
+                        doc_key,
+                        doc,
+                        chunk_size,
+                        chunk_overlap,
+                        tokenizer_instance,
+                        dynamic_chunk_size,
+                    ),
                 )
-                if actual_chunk_size != chunk_size:
-                    logger.debug(
-                        "Adjusted chunk_size from %d to %d for doc %s (complexity: %.2f)",
-                        chunk_size, actual_chunk_size, doc_key, complexity
-                    )
-            
-            text_chunks = split_chunks(
-                doc["content"],
-                language=doc_language,
-                chunk_size=actual_chunk_size,
-                chunk_overlap=chunk_overlap,
             )
+            if progress_bar is not None:
+                progress_bar(len(chunked) / doc_number, f"Chunking {doc_key}")
 
-            chunks = {
-                compute_content_hash(txt, prefix="chunk-"): {
-                    "content": txt,
-                    "type": "text",
-                    "full_doc_id": doc_key,
-                    "length": len(tokenizer_instance.encode(txt))
-                    if tokenizer_instance
-                    else len(txt),
-                    "language": doc_language,
-                }
-                for txt in text_chunks
-            }
-        else:
-            chunks = {doc_key.replace("doc-", f"{doc_type}-"): {**doc}}
-
+    inserting_chunks = {}
+    for doc_key, chunks in chunked:
         inserting_chunks.update(chunks)
-
-        if progress_bar is not None:
-            progress_bar(cur_index / doc_number, f"Chunking {doc_key}")
-            cur_index += 1
-
+        if doc_chunk_index is not None:
+            doc_chunk_index[doc_key] = list(chunks.keys())
     return inserting_chunks
@@ -0,0 +1,36 @@
+# pylint: disable=C0301
+
+# 多个独立生成任务打包为一次请求；每个任务的输出用 TASK 标记包裹，便于逐个拆回
+PACKED_HEADER_EN = """You will receive {count} independent tasks. Complete every task separately, following that task's own instructions and output format exactly, as if it were the only request. Do not let tasks refer to or influence each other.
+
+Wrap the output of each task between its markers, with nothing outside the markers:
+<<<TASK 1>>>
+(output of task 1)
+<<<END 1>>>
+<<<TASK 2>>>
+(output of task 2)
+<<<END 2>>>
+...
+"""
+
+PACKED_HEADER_ZH = """你将收到 {count} 个相互独立的任务。请逐个完成每个任务，严格遵循该任务自身的要求和输出格式，就像它是唯一的请求一样，任务之间不得相互引用或影响。
+
+每个任务的输出用对应标记包裹，标记之外不要输出任何内容：
+<<<TASK 1>>>
+（任务 1 的输出）
+<<<END 1>>>
+<<<TASK 2>>>
+（任务 2 的输出）
+<<<END 2>>>
+...
+"""
+
+PACKED_TASK = """
+==================== TASK {index} ====================
+{prompt}
+"""
+
+PACKED_GENERATION_PROMPT = {
+    "en": {"HEADER": PACKED_HEADER_EN, "TASK": PACKED_TASK},
+    "zh": {"HEADER": PACKED_HEADER_ZH, "TASK": PACKED_TASK},
+}
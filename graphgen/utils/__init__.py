@@ -2,7 +2,13 @@
 from .log import logger, parse_log, set_logger
 
 from .calculate_confidence import yes_no_loss_entropy
-from .detect_lang import detect_if_chinese, detect_main_language
+from .detect_lang import (
+    annotate_chunk_languages,
+    chunk_language,
+    count_language_chars,
+    detect_if_chinese,
+    detect_main_language,
+)
 from .device import pick_device
 from .format import (
     handle_single_entity_extraction,
@@ -12,8 +18,16 @@ from .format import (
     split_string_by_multi_markers,
     write_json,
 )
-from .hash import compute_args_hash, compute_content_hash, compute_mm_hash
+from .hash import (
+    compute_args_hash,
+    compute_content_hash,
+    compute_mm_hash,
+    compute_unit_hash,
+)
+from .kg_record_parser import EntityRecord, KGRecordParser, RelationRecord
+from .context_cache import ContextCache, context_batch_key
 from .loop import create_event_loop
+from .near_duplicate import NearDuplicateIndex, question_shingles
 from .batch_request_manager import BatchRequestManager, batch_generate_answers
 from .prompt_cache import PromptCache
 from .adaptive_batch_manager import AdaptiveBatchRequestManager
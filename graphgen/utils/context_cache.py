@@ -0,0 +1,62 @@
+"""
+社区上下文序列化缓存
+同一社区在一次运行中会被多个生成模式、重复批次以及 atomic 答案阶段反复序列化，
+按批次与序列化格式缓存结果，各生成器共享
+"""
+
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional, TypeVar
+
+from .hash import compute_content_hash
+
+T = TypeVar("T")
+
+
+def context_batch_key(batch: Any) -> str:
+    """
+    序列化缓存的批次标识：按原顺序的节点 id 与有向边端点
+
+    与批次指纹不同，节点顺序与边方向都会影响序列化文本，因此计入标识。
+    """
+    nodes, edges = batch
+    node_ids = "|".join(str(node[0]) for node in nodes)
+    edge_ids = "|".join(f"{edge[0]}->{edge[1]}" for edge in edges)
+    return compute_content_hash(f"{node_ids}\n{edge_ids}", prefix="ctx-")
+
+
+class ContextCache:
+    """
+    单次运行内的上下文序列化缓存
+
+    key 为 (批次标识, 格式)，格式区分实体/关系列表、atomic 上下文、不同参数的层级序列化等，
+    value 为序列化文本及检测出的语言。图在一次运行内不变，因此批次标识只取节点与边的 id；
+    缓存只在 generate_qas 的一次调用内有效，不跨运行复用。超过 max_entries 时淘汰最久未用的条目。
+    """
+
+    def __init__(self, max_entries: Optional[int] = 50000):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[tuple[str, Hashable], Any]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, batch: Any, kind: Hashable, build: Callable[[], T]) -> T:
+        """返回缓存的序列化结果，不存在时调用 build 构建并缓存"""
+        key = (context_batch_key(batch), kind)
+        if key in self._entries:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return self._entries[key]
+        self.misses += 1
+        value = build()
+        self._entries[key] = value
+        if self.max_entries is not None and len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return value
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
@@ -1,32 +1,108 @@
+import hashlib
+import re
+from collections import OrderedDict
+from typing import Iterable, Tuple
+
+# 中文按 CJK 统一表意文字基本区计数，英文按 ASCII 字母计数（与旧实现口径一致）
+_ZH_RE = re.compile(r"[\u4e00-\u9fff]+")
+_EN_RE = re.compile(r"[A-Za-z]+")
+
+# 超过该长度的文本只抽样若干等距窗口统计（语言判定只需要比例）
+SAMPLE_THRESHOLD = 8192
+_SAMPLE_WINDOWS = 8
+_SAMPLE_WINDOW_SIZE = 1024
+
+# 短文本直接计数比计算哈希更快，只缓存较长文本的结果
+_CACHE_MIN_LENGTH = 512
+_CACHE_MAX_SIZE = 65536
+_language_cache: "OrderedDict[bytes, str]" = OrderedDict()
+
+
+def count_language_chars(text: str) -> Tuple[int, int]:
+    """
+    Count Chinese and English (ASCII letter) characters of the text
+
+    用正则删除后的长度差计数，扫描在 C 层完成，无逐字符 Python 循环。
+
+    :param text:
+    :return: (chinese_count, english_count)
+    """
+    length = len(text)
+    chinese_count = length - len(_ZH_RE.sub("", text))
+    english_count = length - len(_EN_RE.sub("", text))
+    return chinese_count, english_count
+
+
+def _sample_text(text: str) -> str:
+    if len(text) <= SAMPLE_THRESHOLD:
+        return text
+    step = (len(text) - _SAMPLE_WINDOW_SIZE) // (_SAMPLE_WINDOWS - 1)
+    return "".join(
+        text[i * step : i * step + _SAMPLE_WINDOW_SIZE] for i in range(_SAMPLE_WINDOWS)
+    )
+
+
+def _detect(text: str) -> str:
+    chinese_count, english_count = count_language_chars(_sample_text(text))
+    total = chinese_count + english_count
+    if total == 0:
+        return "en"
+    return "zh" if chinese_count / total >= 0.5 else "en"
+
+
 def detect_main_language(text):
     """
     Detect the main language of the text, 'zh' for Chinese, 'en' for English
 
+    长文本按等距窗口抽样统计；较长文本的结果按内容哈希缓存，
+    同一段描述/chunk 在抽取、摘要、quiz 等阶段重复判定时不再重新扫描。
+
     :param text:
     :return:
     """
     assert isinstance(text, str)
 
-    def is_chinese_char(char):
-        return "\u4e00" <= char <= "\u9fff"
+    if len(text) < _CACHE_MIN_LENGTH:
+        return _detect(text)
 
-    def is_english_char(char):
-        return char.isascii() and char.isalpha()
+    key = hashlib.md5(text.encode("utf-8", "surrogatepass")).digest()
+    language = _language_cache.get(key)
+    if language is not None:
+        _language_cache.move_to_end(key)
+        return language
 
-    text = "".join(char for char in text if char.strip())
+    language = _detect(text)
+    _language_cache[key] = language
+    if len(_language_cache) > _CACHE_MAX_SIZE:
+        _language_cache.popitem(last=False)
+    return language
 
-    chinese_count = sum(1 for char in text if is_chinese_char(char))
-    english_count = sum(1 for char in text if is_english_char(char))
 
-    total = chinese_count + english_count
-    if total == 0:
-        return "en"
+def chunk_language(chunk) -> str:
+    """
+    Language of a chunk, read from its annotation when available
+
+    支持 Chunk（metadata["language"]）和 chunk 字典（chunk["language"]）；
+    未标注时检测一次并写回。
+    """
+    metadata = chunk if isinstance(chunk, dict) else chunk.metadata
+    language = metadata.get("language")
+    if language is None:
+        language = detect_main_language(
+            chunk["content"] if isinstance(chunk, dict) else chunk.content
+        )
+        metadata["language"] = language
+    return language
 
-    chinese_ratio = chinese_count / total
 
-    if chinese_ratio >= 0.5:
-        return "zh"
-    return "en"
+def annotate_chunk_languages(chunks: Iterable) -> None:
+    """
+    Annotate a batch of chunks with their main language in place
+
+    下游阶段通过 chunk_language() 读取标注，不再对同一 chunk 重复检测。
+    """
+    for chunk in chunks:
+        chunk_language(chunk)
 
 
 def detect_if_chinese(text):
@@ -38,4 +114,4 @@ def detect_if_chinese(text):
     """
 
     assert isinstance(text, str)
-    return any("\u4e00" <= char <= "\u9fff" for char in text)
+    return _ZH_RE.search(text) is not None
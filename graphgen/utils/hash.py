@@ -1,3 +1,4 @@
+import json
 from hashlib import md5
 
 
@@ -21,3 +22,12 @@ def compute_mm_hash(item, prefix: str = ""):
     else:
         content = str(item)
     return prefix + md5(content.encode()).hexdigest()
+
+
+def compute_unit_hash(key, data: dict) -> int:
+    """
+    单个节点/边的内容哈希（128 位整数），各 unit 哈希之和即为与顺序无关的图指纹，
+    可随增删改逐项加减维护
+    """
+    payload = json.dumps([key, data], sort_keys=True, ensure_ascii=False, default=str)
+    return int(md5(payload.encode()).hexdigest(), 16)
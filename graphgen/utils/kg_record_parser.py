@@ -0,0 +1,153 @@
+"""
+知识图谱抽取结果解析器
+
+抽取输出格式：("entity"<|>name<|>type<|>desc)##("relationship"<|>src<|>tgt<|>desc)##<|COMPLETE|>
+
+旧路径对每条记录：按分隔符动态拼正则切分 → re.search 取括号内容 → 再动态拼正则切分属性
+→ await 异步的 handle_single_*_extraction。解析是纯 CPU 工作，这里把正则预编译一次，
+单属性分隔符用 str.split，并同步产出类型化记录；解析结果与旧路径逐条一致。
+"""
+
+import html
+import re
+from collections import defaultdict
+from typing import Dict, Iterator, List, NamedTuple, Tuple, Union
+
+_CONTROL_CHARS = re.compile(r"[\x00-\x1f\x7f-\x9f]")
+# 非贪婪匹配：描述含多个括号时贪婪正则会解析错位
+_RECORD_BODY = re.compile(r"\((.*?)\)", re.DOTALL)
+
+
+class EntityRecord(NamedTuple):
+    entity_name: str
+    entity_type: str
+    description: str
+    source_id: str
+
+
+class RelationRecord(NamedTuple):
+    src_id: str
+    tgt_id: str
+    description: str
+    source_id: str
+
+
+KGRecord = Union[EntityRecord, RelationRecord]
+
+
+def _clean(value: str) -> str:
+    # 与 format.clean_str 一致；绝大多数字段不含实体转义和控制字符，走快速路径
+    value = value.strip()
+    if "&" in value:
+        value = html.unescape(value)
+    return value if value.isprintable() else _CONTROL_CHARS.sub("", value)
+
+
+class KGRecordParser:
+    def __init__(
+        self,
+        tuple_delimiter: str = "<|>",
+        record_delimiter: str = "##",
+        completion_delimiter: str = "<|COMPLETE|>",
+    ):
+        self.tuple_delimiter = tuple_delimiter
+        self._record_split = re.compile(
+            f"{re.escape(record_delimiter)}|{re.escape(completion_delimiter)}"
+        )
+
+    @classmethod
+    def from_format(cls, fmt: dict) -> "KGRecordParser":
+        """从模板的 FORMAT 配置构建（KG_EXTRACTION_PROMPT / MMKG_EXTRACTION_PROMPT）"""
+        return cls(
+            fmt["tuple_delimiter"], fmt["record_delimiter"], fmt["completion_delimiter"]
+        )
+
+    def split_records(self, text: str) -> List[str]:
+        return [r.strip() for r in self._record_split.split(text) if r.strip()]
+
+    def parse_record(self, record: str, chunk_id: str) -> Union[KGRecord, None]:
+        match = _RECORD_BODY.search(record)
+        if not match:
+            return None
+        attributes = [
+            a for a in map(str.strip, match.group(1).split(self.tuple_delimiter)) if a
+        ]
+        if len(attributes) < 4:
+            return None
+        kind = attributes[0]
+        if kind == '"entity"':
+            entity_name = _clean(attributes[1].upper())
+            if not entity_name.strip():
+                return None
+            return EntityRecord(
+                entity_name,
+                _clean(attributes[2].upper()),
+                _clean(attributes[3]),
+                chunk_id,
+            )
+        if kind == '"relationship"':
+            return RelationRecord(
+                _clean(attributes[1].upper()),
+                _clean(attributes[2].upper()),
+                _clean(attributes[3]),
+                chunk_id,
+            )
+        return None
+
+    def iter_records(self, text: str, chunk_id: str) -> Iterator[KGRecord]:
+        for record in self.split_records(text):
+            parsed = self.parse_record(record, chunk_id)
+            if parsed is not None:
+                yield parsed
+
+    def parse_records(
+        self, records: List[str], chunk_id: str
+    ) -> Tuple[Dict[str, List[dict]], Dict[Tuple[str, str], List[dict]]]:
+        # 热路径：与 parse_record 逻辑相同，但直接构建 dict，省去中间记录对象
+        nodes = defaultdict(list)
+        edges = defaultdict(list)
+        search = _RECORD_BODY.search
+        delimiter = self.tuple_delimiter
+        for record in records:
+            match = search(record)
+            if match is None:
+                continue
+            attributes = [a for a in map(str.strip, match.group(1).split(delimiter)) if a]
+            if len(attributes) < 4:
+                continue
+            kind = attributes[0]
+            if kind == '"entity"':
+                entity_name = _clean(attributes[1].upper())
+                if not entity_name.strip():
+                    continue
+                nodes[entity_name].append(
+                    {
+                        "entity_name": entity_name,
+                        "entity_type": _clean(attributes[2].upper()),
+                        "description": _clean(attributes[3]),
+                        "source_id": chunk_id,
+                    }
+                )
+            elif kind == '"relationship"':
+                src_id = _clean(attributes[1].upper())
+                tgt_id = _clean(attributes[2].upper())
+                edges[(src_id, tgt_id)].append(
+                    {
+                        "src_id": src_id,
+                        "tgt_id": tgt_id,
+                        "description": _clean(attributes[3]),
+                        "source_id": chunk_id,
+                    }
+                )
+        return dict(nodes), dict(edges)
+
+    def parse(
+        self, text: str, chunk_id: str
+    ) -> Tuple[Dict[str, List[dict]], Dict[Tuple[str, str], List[dict]]]:
+        """
+        解析为 (nodes, edges)，结构与 LightRAGKGBuilder.extract 的返回值一致
+
+        :param text: LLM 原始（或修复后的）输出
+        :param chunk_id: 记录的 source_id
+        """
+        return self.parse_records(self.split_records(text), chunk_id)
@@ -0,0 +1,142 @@
+"""
+近重复问题检测
+MinHash 签名 + LSH 分桶的增量索引，用于识别措辞不同但内容几乎相同的问题
+"""
+
+import re
+import zlib
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+# 中文按单字切分，英文/数字按词切分
+_TOKEN_RE = re.compile(r"[\u4e00-\u9fff]|[a-z0-9]+")
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+
+def question_shingles(text: str, char_ngram: int = 3, word_ngram: int = 2) -> Set[str]:
+    """
+    把问题文本切分为 shingle 集合：以中文为主的文本取字符 n-gram，否则取词 n-gram
+
+    :param text: 问题文本
+    :param char_ngram: 中文字符 n-gram 长度
+    :param word_ngram: 英文词 n-gram 长度
+    :return: shingle 集合；文本中没有可用字符时为空
+    """
+    tokens = _TOKEN_RE.findall(text.lower())
+    if not tokens:
+        return set()
+    cjk = sum(1 for token in tokens if "\u4e00" <= token <= "\u9fff")
+    n = char_ngram if cjk * 2 >= len(tokens) else word_ngram
+    if len(tokens) <= n:
+        return {" ".join(tokens)}
+    return {" ".join(tokens[i : i + n]) for i in range(len(tokens) - n + 1)}
+
+
+class NearDuplicateIndex:
+    """
+    增量 MinHash-LSH 近重复索引
+
+    每条文本计算 num_perm 维 MinHash 签名，按 bands 段分桶；同一命名空间下任一段完全相同
+    的已有条目作为候选，签名一致比例（Jaccard 相似度的估计）不低于 threshold 即判为近重复。
+    每次插入/查询只查 bands 个桶，均摊 O(1)，可在单次遍历中边判定边建索引。
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.8,
+        num_perm: int = 128,
+        bands: int = 32,
+        seed: int = 1,
+        char_ngram: int = 3,
+        word_ngram: int = 2,
+    ):
+        """
+        :param threshold: 判为近重复的最低估计 Jaccard 相似度
+        :param num_perm: 签名维数，必须能被 bands 整除
+        :param bands: LSH 分段数；段越多候选召回越高（默认相似度 0.7 以上几乎必然成为候选）
+        :param seed: 哈希置换的随机种子，固定后签名在不同进程间可复现
+        """
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be divisible by bands ({bands})")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.char_ngram = char_ngram
+        self.word_ngram = word_ngram
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, (1 << 61) - 1, size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, (1 << 61) - 1, size=num_perm, dtype=np.uint64)
+        self._buckets: Dict[Tuple[str, int, bytes], List[str]] = {}
+        self._signatures: Dict[str, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        """文本的 MinHash 签名；没有可用 shingle 时为 None"""
+        shingles = question_shingles(text, self.char_ngram, self.word_ngram)
+        if not shingles:
+            return None
+        hashes = np.fromiter(
+            (zlib.crc32(s.encode("utf-8")) for s in shingles),
+            dtype=np.uint64,
+            count=len(shingles),
+        )
+        # (a * h + b) mod p 的 uint64 乘法允许回绕，只取低 32 位
+        permuted = (hashes[:, None] * self._a + self._b) % _MERSENNE_PRIME & _MAX_HASH
+        return permuted.min(axis=0)
+
+    def query(self, text: str, namespace: str = "") -> Optional[str]:
+        """:return: 同一命名空间内近重复的已有条目 key，没有时为 None"""
+        sig = self.signature(text)
+        if sig is None:
+            return None
+        return self._match(sig, namespace)
+
+    def add(self, key: str, text: str, namespace: str = "") -> Optional[str]:
+        """
+        判定并插入：已有近重复条目时返回其 key 且不插入，否则插入并返回 None
+
+        :param key: 条目标识（如问题 hash）
+        :param namespace: 命名空间（如生成模式），不同命名空间之间互不判重
+        """
+        sig = self.signature(text)
+        if sig is None:
+            return None
+        match = self._match(sig, namespace)
+        if match is None:
+            self._insert(key, sig, namespace)
+        return match
+
+    def insert(self, key: str, text: str, namespace: str = "") -> None:
+        """无条件插入（加载已有结果时使用）"""
+        sig = self.signature(text)
+        if sig is not None:
+            self._insert(key, sig, namespace)
+
+    def _band_keys(self, sig: np.ndarray, namespace: str):
+        for band in range(self.bands):
+            start = band * self.rows
+            yield namespace, band, sig[start : start + self.rows].tobytes()
+
+    def _match(self, sig: np.ndarray, namespace: str) -> Optional[str]:
+        checked = set()
+        for band_key in self._band_keys(sig, namespace):
+            for key in self._buckets.get(band_key, ()):
+                if key in checked:
+                    continue
+                checked.add(key)
+                if np.count_nonzero(self._signatures[key] == sig) >= self.threshold * self.num_perm:
+                    return key
+        return None
+
+    def _insert(self, key: str, sig: np.ndarray, namespace: str) -> None:
+        if key in self._signatures:
+            return
+        self._signatures[key] = sig
+        for band_key in self._band_keys(sig, namespace):
+            self._buckets.setdefault(band_key, []).append(key)
@@ -0,0 +1,114 @@
+"""
+抽取结果解析基准测试脚本
+对比旧解析路径（split_string_by_multi_markers + re.search + 异步 handle_single_*）
+与预编译单遍解析器 KGRecordParser，并校验两者解析结果一致
+
+用法:
+    python scripts/benchmark_kg_parser.py --responses recorded.jsonl
+    python scripts/benchmark_kg_parser.py --repeat 2000   # 使用抽取模板中的示例输出
+
+recorded.jsonl 每行一个 LLM 原始输出：JSON 字符串，或含 "response" 字段的对象
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import sys
+import time
+from collections import defaultdict
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from graphgen.templates import KG_EXTRACTION_PROMPT
+from graphgen.utils import (
+    KGRecordParser,
+    handle_single_entity_extraction,
+    handle_single_relationship_extraction,
+    split_string_by_multi_markers,
+)
+
+FORMAT = KG_EXTRACTION_PROMPT["FORMAT"]
+
+
+async def legacy_parse(text: str, chunk_id: str):
+    """改造前 LightRAGKGBuilder.extract 的解析路径"""
+    records = split_string_by_multi_markers(
+        text, [FORMAT["record_delimiter"], FORMAT["completion_delimiter"]]
+    )
+    nodes = defaultdict(list)
+    edges = defaultdict(list)
+    for record in records:
+        match = re.search(r"\((.*?)\)", record, re.DOTALL)
+        if not match:
+            continue
+        attributes = split_string_by_multi_markers(
+            match.group(1), [FORMAT["tuple_delimiter"]]
+        )
+        entity = await handle_single_entity_extraction(attributes, chunk_id)
+        if entity is not None:
+            nodes[entity["entity_name"]].append(entity)
+            continue
+        relation = await handle_single_relationship_extraction(attributes, chunk_id)
+        if relation is not None:
+            edges[(relation["src_id"], relation["tgt_id"])].append(relation)
+    return dict(nodes), dict(edges)
+
+
+def template_outputs() -> list:
+    """抽取模板中的示例输出（与线上 LLM 输出同一格式）"""
+    outputs = []
+    for language in ("en", "zh"):
+        template = KG_EXTRACTION_PROMPT[language]["TEMPLATE"]
+        for block in re.findall(r"(?:Output|输出)[:：]\n(.*?\{completion_delimiter\})", template, re.DOTALL):
+            outputs.append(block.format(**FORMAT))
+    return outputs
+
+
+def load_responses(path: str) -> list:
+    responses = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            responses.append(item["response"] if isinstance(item, dict) else item)
+    return responses
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark KG extraction parsing")
+    parser.add_argument("--responses", help="JSONL file with recorded LLM outputs")
+    parser.add_argument("--repeat", type=int, default=1000, help="重复解析轮数")
+    args = parser.parse_args()
+
+    responses = load_responses(args.responses) if args.responses else template_outputs()
+    if not responses:
+        raise SystemExit("no responses to parse")
+    record_parser = KGRecordParser.from_format(FORMAT)
+    workload = [(text, f"chunk-{i}") for i, text in enumerate(responses)] * args.repeat
+    total_records = sum(len(record_parser.split_records(t)) for t, _ in workload)
+    print(f"Workload: {len(workload)} responses, {total_records} records")
+
+    async def run_legacy():
+        return [await legacy_parse(text, cid) for text, cid in workload]
+
+    start = time.perf_counter()
+    legacy_results = asyncio.run(run_legacy())
+    legacy_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    new_results = [record_parser.parse(text, cid) for text, cid in workload]
+    new_time = time.perf_counter() - start
+
+    assert legacy_results == new_results, "parser output diverged from the legacy path"
+    print("Results: identical")
+    print(f"Legacy path:     {legacy_time:8.3f}s ({total_records / legacy_time:,.0f} records/s)")
+    print(f"KGRecordParser:  {new_time:8.3f}s ({total_records / new_time:,.0f} records/s)")
+    print(f"Speed-up:        {legacy_time / new_time:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,349 @@
+"""
+分区器基准测试脚本
+在合成图上运行各分区器，记录耗时、峰值内存与分区质量（社区大小分布、unit 覆盖率、
+token 预算超限数）。每个分区器在独立子进程中运行，峰值互不干扰
+
+用法:
+    python scripts/benchmark_partitioners.py --nodes 300000 --edges 1000000
+    python scripts/benchmark_partitioners.py --methods bfs ece --max-units 20
+    python scripts/benchmark_partitioners.py --methods ece --workers 8 --components 5000
+    python scripts/benchmark_partitioners.py --degree uniform --hierarchy-depth 4 --branching 5
+    # 保存结果，调参后与之对比；耗时/内存超出容差或质量下降时以非零状态退出
+    python scripts/benchmark_partitioners.py --output base.json
+    python scripts/benchmark_partitioners.py --baseline base.json --tolerance 0.2
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import time
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+METHODS = ["bfs", "dfs", "ece", "anchor_bfs", "coverage", "leiden", "hierarchical"]
+
+
+class InMemoryGraph:
+    """只实现分区器用到的读接口，避免 NetworkX 本身的内存开销干扰测量"""
+
+    def __init__(self, nodes, edges):
+        self._nodes = nodes
+        self._edges = edges
+
+    async def get_all_nodes(self):
+        return self._nodes
+
+    async def get_all_edges(self):
+        return self._edges
+
+
+def synthetic_graph(
+    num_nodes: int,
+    num_edges: int,
+    seed: int = 42,
+    num_components: int = 1,
+    degree: str = "powerlaw",
+    alpha: float = 0.8,
+    hierarchy_depth: int = 0,
+    branching: int = 4,
+):
+    """
+    合成 KG
+    degree="powerlaw" 时端点按 1/(i+1)^alpha 加权：少量枢纽实体 + 大量长尾实体，接近抽取得到的 KG；
+    degree="uniform" 时端点均匀随机
+    num_components > 1 时节点按编号取模分成互不相连的若干块，模拟多文档抽取的碎片化 KG
+    hierarchy_depth > 0 时在前若干节点上叠加一棵 is_a 分类树（每个父节点 branching 个子节点）
+    """
+    rng = random.Random(seed)
+    nodes = [
+        (
+            f"E{i}",
+            {
+                "entity_type": "IMAGE" if i % 1000 == 0 else "CONCEPT",
+                "length": rng.randint(20, 200),
+                "loss": rng.random(),
+            },
+        )
+        for i in range(num_nodes)
+    ]
+    if degree == "powerlaw":
+        weights = [1.0 / (i + 1) ** alpha for i in range(num_nodes)]
+        endpoints = rng.choices(range(num_nodes), weights=weights, k=2 * num_edges)
+    elif degree == "uniform":
+        endpoints = [rng.randrange(num_nodes) for _ in range(2 * num_edges)]
+    else:
+        raise ValueError(f"Unsupported degree distribution: {degree}")
+    seen = set()
+    edges = []
+
+    def add_edge(u, v, **data):
+        key = (min(u, v), max(u, v))
+        if key in seen:
+            return
+        seen.add(key)
+        edges.append(
+            (
+                f"E{u}",
+                f"E{v}",
+                {"length": rng.randint(20, 200), "loss": rng.random(), **data},
+            )
+        )
+
+    # 分类树：节点 i 的父节点为 (i - 1) // branching，共 hierarchy_depth 层
+    taxonomy_size = sum(branching**level for level in range(hierarchy_depth + 1))
+    if hierarchy_depth > 0:
+        for child in range(1, min(taxonomy_size, num_nodes)):
+            parent = (child - 1) // branching
+            if num_components > 1 and (child - parent) % num_components:
+                continue
+            add_edge(child, parent, relation_type="is_a")
+
+    for k in range(num_edges):
+        u, v = endpoints[2 * k], endpoints[2 * k + 1]
+        if num_components > 1:
+            # 把 v 移到 u 所在的块内
+            v -= (v - u) % num_components
+            if v < 0:
+                v += num_components
+        if u == v:
+            v = (v + num_components) % num_nodes
+        add_edge(u, v)
+    return nodes, edges
+
+
+def build_partitioner(method: str, workers: int = 1):
+    from graphgen.models import (
+        AnchorBFSPartitioner,
+        BFSPartitioner,
+        ComponentShardedPartitioner,
+        CoveragePartitioner,
+        DFSPartitioner,
+        ECEPartitioner,
+        HierarchicalPartitioner,
+        LeidenPartitioner,
+    )
+
+    if method == "bfs":
+        partitioner = BFSPartitioner()
+    elif method == "dfs":
+        partitioner = DFSPartitioner()
+    elif method == "ece":
+        partitioner = ECEPartitioner()
+    elif method == "anchor_bfs":
+        partitioner = AnchorBFSPartitioner(anchor_type="image")
+    elif method == "coverage":
+        partitioner = CoveragePartitioner()
+    elif method == "leiden":
+        partitioner = LeidenPartitioner()
+    elif method == "hierarchical":
+        partitioner = HierarchicalPartitioner(hierarchical_relations=["is_a"])
+    else:
+        raise ValueError(f"Unsupported partition method: {method}")
+    if workers > 1:
+        return ComponentShardedPartitioner(partitioner, num_workers=workers)
+    return partitioner
+
+
+def evaluate(communities, nodes, edges, max_tokens: int) -> dict:
+    """
+    分区质量：社区大小分布（unit 数）、unit 覆盖率、重叠度与 token 预算超限数
+    覆盖率 = 至少出现在一个社区中的 unit / 全部 unit；重叠度 = 社区 unit 总数 / 被覆盖的 unit 数
+    """
+    node_length = {name: data.get("length", 0) for name, data in nodes}
+    edge_length = {}
+    for u, v, data in edges:
+        edge_length[(u, v)] = edge_length[(v, u)] = data.get("length", 0)
+
+    sizes = []
+    covered_nodes = set()
+    covered_edges = set()
+    over_budget = 0
+    for community in communities:
+        sizes.append(len(community.nodes) + len(community.edges))
+        covered_nodes.update(community.nodes)
+        tokens = sum(node_length.get(n, 0) for n in community.nodes)
+        for edge in community.edges:
+            u, v = edge[0], edge[1]
+            covered_edges.add((u, v) if u <= v else (v, u))
+            tokens += edge_length.get((u, v), 0)
+        if tokens > max_tokens:
+            over_budget += 1
+
+    sizes.sort()
+    total_units = len(nodes) + len(edges)
+    covered = len(covered_nodes) + len(covered_edges)
+
+    def percentile(q):
+        return sizes[int(q * (len(sizes) - 1))] if sizes else 0
+
+    return {
+        "size_min": sizes[0] if sizes else 0,
+        "size_p50": percentile(0.5),
+        "size_p90": percentile(0.9),
+        "size_max": sizes[-1] if sizes else 0,
+        "size_mean": round(sum(sizes) / len(sizes), 2) if sizes else 0,
+        "coverage": round(covered / total_units, 4) if total_units else 0,
+        "overlap": round(sum(sizes) / covered, 3) if covered else 0,
+        "over_budget": over_budget,
+    }
+
+
+def run_single(args) -> dict:
+    """在当前进程中运行单个分区器并输出 JSON 结果"""
+    random.seed(args.seed)
+    nodes, edges = synthetic_graph(
+        args.nodes,
+        args.edges,
+        args.seed,
+        args.components,
+        degree=args.degree,
+        alpha=args.alpha,
+        hierarchy_depth=args.hierarchy_depth,
+        branching=args.branching,
+    )
+    graph = InMemoryGraph(nodes, edges)
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    partitioner = build_partitioner(args.method, args.workers)
+    params = {
+        "max_units_per_community": args.max_units,
+        "min_units_per_community": 1,
+        "max_tokens_per_community": args.max_tokens,
+        "unit_sampling": args.unit_sampling,
+        "max_size": args.max_units,
+        "random_seed": args.seed,
+        "seed": args.seed,
+    }
+    start = time.perf_counter()
+    communities = asyncio.run(partitioner.partition(graph, **params))
+    elapsed = time.perf_counter() - start
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {
+        "method": args.method,
+        "nodes": len(nodes),
+        "edges": len(edges),
+        "communities": len(communities),
+        "seconds": round(elapsed, 2),
+        # ru_maxrss 在 Linux 上单位为 KB
+        "peak_rss_mb": round(rss_after / 1024, 1),
+        "partition_rss_mb": round((rss_after - rss_before) / 1024, 1),
+        **evaluate(communities, nodes, edges, args.max_tokens),
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """与基线对比，返回回归项：耗时/峰值内存超出容差、覆盖率下降或预算超限增多"""
+    regressions = []
+    for method, result in results.items():
+        base = baseline.get(method)
+        if not base or "error" in result or "error" in base:
+            continue
+        for key in ("seconds", "peak_rss_mb"):
+            if result[key] > base[key] * (1 + tolerance):
+                regressions.append(f"{method}: {key} {base[key]} -> {result[key]}")
+        if result["coverage"] < base["coverage"]:
+            regressions.append(
+                f"{method}: coverage {base['coverage']} -> {result['coverage']}"
+            )
+        if result["over_budget"] > base["over_budget"]:
+            regressions.append(
+                f"{method}: over_budget {base['over_budget']} -> {result['over_budget']}"
+            )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark graph partitioners")
+    parser.add_argument("--nodes", type=int, default=300000)
+    parser.add_argument("--edges", type=int, default=1000000)
+    parser.add_argument("--methods", nargs="+", default=METHODS, choices=METHODS)
+    parser.add_argument("--max-units", type=int, default=20)
+    parser.add_argument("--max-tokens", type=int, default=10240)
+    parser.add_argument("--unit-sampling", default="max_loss")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--components", type=int, default=1, help="split the graph into N disjoint blocks"
+    )
+    parser.add_argument(
+        "--degree", default="powerlaw", choices=["powerlaw", "uniform"],
+        help="degree distribution of the synthetic graph",
+    )
+    parser.add_argument(
+        "--alpha", type=float, default=0.8, help="power-law exponent of endpoint weights"
+    )
+    parser.add_argument(
+        "--hierarchy-depth", type=int, default=3, help="depth of the is_a taxonomy, 0 for none"
+    )
+    parser.add_argument("--branching", type=int, default=4, help="children per taxonomy node")
+    parser.add_argument(
+        "--workers", type=int, default=1, help="partition processes (component sharding)"
+    )
+    parser.add_argument("--output", help="write the results to a JSON file")
+    parser.add_argument("--baseline", help="JSON file from a previous --output run to compare against")
+    parser.add_argument(
+        "--tolerance", type=float, default=0.2,
+        help="allowed relative increase of seconds / peak RSS over the baseline",
+    )
+    parser.add_argument("--method", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.method:
+        print(json.dumps(run_single(args)))
+        return
+
+    print(
+        f"{'method':<14}{'communities':>12}{'seconds':>10}{'peak MB':>10}"
+        f"{'size p50/p90/max':>18}{'coverage':>10}{'overlap':>9}{'over budget':>13}"
+    )
+    results = {}
+    for method in args.methods:
+        cmd = [sys.executable, __file__, "--method", method] + [
+            f"--nodes={args.nodes}",
+            f"--edges={args.edges}",
+            f"--max-units={args.max_units}",
+            f"--max-tokens={args.max_tokens}",
+            f"--unit-sampling={args.unit_sampling}",
+            f"--seed={args.seed}",
+            f"--components={args.components}",
+            f"--degree={args.degree}",
+            f"--alpha={args.alpha}",
+            f"--hierarchy-depth={args.hierarchy_depth}",
+            f"--branching={args.branching}",
+            f"--workers={args.workers}",
+        ]
+        proc = subprocess.run(cmd, capture_output=True, text=True, check=False)
+        if proc.returncode != 0:
+            # 缺少可选依赖（如 leiden 的 igraph/leidenalg）等情况下只跳过该方法
+            error = (proc.stderr.strip().splitlines() or ["failed"])[-1]
+            results[method] = {"method": method, "error": error}
+            print(f"{method:<14}{'error: ' + error}")
+            continue
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+        results[method] = result
+        sizes = f"{result['size_p50']}/{result['size_p90']}/{result['size_max']}"
+        print(
+            f"{method:<14}{result['communities']:>12}{result['seconds']:>10}"
+            f"{result['peak_rss_mb']:>10}{sizes:>18}{result['coverage']:>10.2%}"
+            f"{result['overlap']:>9}{result['over_budget']:>13}"
+        )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""
+零成本质量过滤基准测试脚本
+对比改造前的逐条目过滤 + 逐模式正则清洗与预编译的 QualityRuleEngine，并校验两者结果一致
+
+用法:
+    python scripts/benchmark_quality_filter.py --count 1000000
+    python scripts/benchmark_quality_filter.py --items cache/data/graphgen/123/qa.json --repeat 20
+
+--items 为 QA 输出（JSON 列表/字典或 JSONL），未指定时按 --count 合成条目
+"""
+
+import argparse
+import copy
+import os
+import random
+import sys
+import time
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from graphgen.operators.generate.generate_qas import (  # noqa: E402
+    _extract_answer_from_formatted_result,
+    _extract_question_from_formatted_result,
+)
+from graphgen.operators.generate.quality_rules import (  # noqa: E402
+    QUESTION_PREAMBLE_PATTERNS,
+    QualityRuleEngine,
+)
+from scripts.dedup_near_duplicates import load_items  # noqa: E402
+
+
+def legacy_clean_question(question: str) -> str:
+    """改造前的 _clean_question_text：逐个模式反复替换直到不再变化"""
+    q = question.strip()
+    changed = True
+    while changed:
+        changed = False
+        for pattern in QUESTION_PREAMBLE_PATTERNS:
+            new_q = pattern.sub("", q, count=1).strip()
+            if new_q != q:
+                q = new_q
+                changed = True
+    return q
+
+
+def legacy_filter(items):
+    """改造前的 apply_basic_quality_filter + _clean_formatted_questions"""
+    kept = []
+    removed = {"empty_question": 0, "empty_answer": 0, "identical_qa": 0}
+    for result in items:
+        question = _extract_question_from_formatted_result(result).strip()
+        answer = _extract_answer_from_formatted_result(result).strip()
+        if not question or len(question) < 2:
+            removed["empty_question"] += 1
+            continue
+        if not answer:
+            removed["empty_answer"] += 1
+            continue
+        if question == answer:
+            removed["identical_qa"] += 1
+            continue
+        kept.append(result)
+    for result in kept:
+        if "instruction" in result:
+            result["instruction"] = legacy_clean_question(result["instruction"])
+        elif "conversations" in result:
+            for msg in result.get("conversations", []):
+                if msg.get("from") == "human":
+                    msg["value"] = legacy_clean_question(msg.get("value", ""))
+                    break
+        elif "messages" in result:
+            for msg in result.get("messages", []):
+                if msg.get("role") == "user":
+                    msg["content"] = legacy_clean_question(msg.get("content", ""))
+                    break
+    return kept, removed
+
+
+_QUESTIONS = [
+    "水稻的主要种植区域有哪些？",
+    "问题：云粳26号是什么品种？",
+    "根据答案内容，可以生成如下问题：\n\n**问题：**\n圣丰家庭农场位于哪个村庄？",
+    "What is the relationship between rice blast and humidity?",
+    "Question: Which pathogen causes rice blast?",
+    "以下是生成的问题：水稻的种植范围？",
+    "",
+    "q",
+]
+_ANSWERS = [
+    "水稻主要种植于长江流域及以南地区，东北也有大面积粳稻种植。",
+    "Rice blast is favoured by high humidity and moderate temperatures.",
+    "",
+    "same",
+]
+
+
+def synthetic_items(count: int, seed: int = 0):
+    rng = random.Random(seed)
+    items = []
+    for i in range(count):
+        question = rng.choice(_QUESTIONS)
+        answer = rng.choice(_ANSWERS)
+        # 附加序号，避免所有条目字面相同；约 1% 为问答相同的条目
+        suffix = f" #{i}" if question else ""
+        if rng.random() < 0.01:
+            question, answer, suffix = "same", "same", ""
+        if i % 3 == 0:
+            items.append({"instruction": question + suffix, "input": "", "output": answer})
+        elif i % 3 == 1:
+            items.append(
+                {
+                    "conversations": [
+                        {"from": "human", "value": question + suffix},
+                        {"from": "gpt", "value": answer},
+                    ]
+                }
+            )
+        else:
+            items.append(
+                {
+                    "messages": [
+                        {"role": "user", "content": question + suffix},
+                        {"role": "assistant", "content": answer},
+                    ]
+                }
+            )
+    return items
+
+
+def _timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the zero-cost quality filter stage")
+    parser.add_argument("--items", help="recorded QA outputs (.json/.jsonl) or a directory")
+    parser.add_argument("--count", type=int, default=200000, help="合成条目数（未指定 --items 时）")
+    parser.add_argument("--repeat", type=int, default=1, help="重复录制条目的轮数")
+    args = parser.parse_args()
+
+    items = load_items(args.items) * args.repeat if args.items else synthetic_items(args.count)
+    if not items:
+        raise SystemExit("no items to filter")
+    legacy_items = copy.deepcopy(items)
+    print(f"Workload: {len(items)} formatted items")
+
+    (legacy_kept, legacy_removed), legacy_time = _timed(legacy_filter, legacy_items)
+    (new_kept, new_removed), new_time = _timed(QualityRuleEngine().apply, items)
+    assert legacy_removed == new_removed, (legacy_removed, new_removed)
+    assert legacy_kept == new_kept, "rule engine output diverged from the legacy path"
+    print(f"Results: identical (removed {new_removed})")
+    print(f"Legacy filter:      {legacy_time:8.3f}s ({len(items) / legacy_time:,.0f} items/s)")
+    print(f"QualityRuleEngine:  {new_time:8.3f}s ({len(items) / new_time:,.0f} items/s)")
+    print(f"Speed-up:           {legacy_time / new_time:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+已有输出的近重复问题去重脚本
+对 QA 输出（JSON 列表/字典或 JSONL）单次遍历：先按归一化问题 hash 去除完全重复，再用
+MinHash-LSH 去除同一生成模式下的近重复问题，可输出被去除的问题及其保留的对应问题
+
+用法:
+    python scripts/dedup_near_duplicates.py cache/data/graphgen/123/qa.json
+    python scripts/dedup_near_duplicates.py outputs/ --threshold 0.7 --output qa.dedup.jsonl
+    python scripts/dedup_near_duplicates.py qa.json --report removed.jsonl --dry-run
+"""
+
+import argparse
+import json
+import os
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from graphgen.operators.generate.generate_qas import (  # noqa: E402
+    _build_question_hash,
+    _extract_question_from_formatted_result,
+)
+from graphgen.utils import NearDuplicateIndex  # noqa: E402
+
+
+def load_items(path: str) -> List[Dict[str, Any]]:
+    """读取单个文件或目录下全部 .json/.jsonl 文件中的 QA 条目"""
+    if os.path.isdir(path):
+        items = []
+        for name in sorted(os.listdir(path)):
+            if name.endswith((".json", ".jsonl")):
+                items.extend(load_items(os.path.join(path, name)))
+        return items
+    with open(path, encoding="utf-8") as f:
+        if path.endswith(".jsonl"):
+            return [json.loads(line) for line in f if line.strip()]
+        data = json.load(f)
+    if isinstance(data, dict):
+        # JsonKVStorage 格式：key -> 条目
+        return [value for value in data.values() if isinstance(value, dict)]
+    return [item for item in data if isinstance(item, dict)]
+
+
+def dedup_items(
+    items: List[Dict[str, Any]],
+    threshold: float = 0.8,
+    num_perm: int = 128,
+    bands: int = 32,
+    by_mode: bool = True,
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, str]]]:
+    """
+    :return: (保留的条目, 被去除的问题与其保留的对应问题)
+    """
+    index = NearDuplicateIndex(threshold=threshold, num_perm=num_perm, bands=bands)
+    questions: Dict[str, str] = {}
+    kept: List[Dict[str, Any]] = []
+    removed: List[Dict[str, str]] = []
+    for item in items:
+        question = _extract_question_from_formatted_result(item)
+        if not question:
+            kept.append(item)
+            continue
+        mode = (item.get("mode") or "") if by_mode else ""
+        question_hash = _build_question_hash(question, mode)
+        match: Optional[str] = question_hash if question_hash in questions else None
+        if match is None:
+            match = index.add(question_hash, question, namespace=mode)
+        if match is not None:
+            removed.append({"mode": mode, "question": question, "kept": questions[match]})
+            continue
+        questions[question_hash] = question
+        kept.append(item)
+    return kept, removed
+
+
+def write_items(path: str, items: List[Dict[str, Any]]) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        if path.endswith(".jsonl"):
+            f.writelines(json.dumps(item, ensure_ascii=False) + "\n" for item in items)
+        else:
+            json.dump(items, f, ensure_ascii=False, indent=2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Remove near-duplicate questions from QA outputs")
+    parser.add_argument("inputs", nargs="+", help="QA output files (.json/.jsonl) or directories")
+    parser.add_argument("--output", help="deduplicated output (default: <first input>.dedup.json)")
+    parser.add_argument(
+        "--threshold", type=float, default=0.8,
+        help="minimum estimated Jaccard similarity of question shingles",
+    )
+    parser.add_argument("--num-perm", type=int, default=128)
+    parser.add_argument("--bands", type=int, default=32)
+    parser.add_argument(
+        "--across-modes", action="store_true", help="also compare questions of different modes"
+    )
+    parser.add_argument(
+        "--report", help="write removed questions with their kept match (.json/.jsonl)"
+    )
+    parser.add_argument("--dry-run", action="store_true", help="only print statistics")
+    args = parser.parse_args()
+
+    items = []
+    for path in args.inputs:
+        items.extend(load_items(path))
+    kept, removed = dedup_items(
+        items, args.threshold, args.num_perm, args.bands, by_mode=not args.across_modes
+    )
+    print(f"items: {len(items)}, kept: {len(kept)}, removed: {len(removed)}")
+    for pair in removed[:5]:
+        print(f"  - {pair['question']}\n    ~ {pair['kept']}")
+
+    if args.report:
+        write_items(args.report, removed)
+    if args.dry_run:
+        return
+    output = args.output
+    if not output:
+        base = args.inputs[0].rstrip("/")
+        output = (base[: -len(".json")] if base.endswith(".json") else base) + ".dedup.json"
+    write_items(output, kept)
+    print(f"written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""批次指纹与重复批次跳过测试。"""
+
+import asyncio
+import tempfile
+
+from graphgen.models import JsonKVStorage
+from graphgen.operators.generate import batch_fingerprint, generate_qas
+from graphgen.operators.generate.generation_scheduler import (
+    GenerationLane,
+    GenerationScheduler,
+)
+
+from test_generation_scheduler import DistinctQuestionLLM
+
+
+def _batch(i):
+    return (
+        [(f"X{i}", {"description": f"X{i} is a concept", "entity_type": "concept"}),
+         (f"Y{i}", {"description": f"Y{i} is a concept", "entity_type": "concept"})],
+        [(f"X{i}", f"Y{i}", {"description": f"X{i} relates to Y{i}"})],
+    )
+
+
+def test_fingerprint_ignores_order_and_direction():
+    nodes, edges = _batch(1)
+    reordered = (list(reversed(nodes)), [("Y1", "X1", {})])
+    assert batch_fingerprint(_batch(1), "cot") == batch_fingerprint(reordered, "cot")
+    assert batch_fingerprint(_batch(1), "cot") != batch_fingerprint(_batch(1), "atomic")
+    assert batch_fingerprint(_batch(1), "cot", "a") != batch_fingerprint(_batch(1), "cot", "b")
+
+
+def test_scheduler_replaces_skipped_batches():
+    async def generate(batch):
+        return batch
+
+    lane = GenerationLane(
+        mode="m",
+        generate=generate,
+        batches=list(range(100)),
+        accept=lambda batch: [batch],
+        target=10,
+        skip=lambda batch: batch % 2 == 0,
+    )
+    accepted = asyncio.run(GenerationScheduler([lane]).run())["m"]
+    # 被跳过的偶数批次由后续批次补上，且不计入产出率
+    assert sorted(accepted) == list(range(1, 20, 2))
+    assert lane.skipped == 10 and lane.dispatched == 10
+
+
+def test_rerun_skips_batches_generated_before():
+    batches = [_batch(i) for i in range(10)]
+    config = {
+        "mode": "multi_hop",
+        "data_format": "Alpaca",
+        "enable_batch_requests": False,
+        "enable_prompt_cache": False,
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = JsonKVStorage(tmp, namespace="batch_fingerprints")
+        client = DistinctQuestionLLM()
+        first = asyncio.run(
+            generate_qas(client, batches[:6], config, fingerprint_storage=storage)
+        )
+        assert len(first) == 6 and client.calls == 6
+
+        # 新进程重新加载指纹，只为新增的 4 个批次调用 LLM
+        storage = JsonKVStorage(tmp, namespace="batch_fingerprints")
+        second = asyncio.run(
+            generate_qas(client, batches, config, fingerprint_storage=storage)
+        )
+        assert len(second) == 4 and client.calls == 10
+
+        # 关闭后重新生成全部批次
+        asyncio.run(
+            generate_qas(
+                client, batches, {**config, "skip_seen_batches": False},
+                fingerprint_storage=storage,
+            )
+        )
+        assert client.calls == 20
+
+
+class StallingLLM(DistinctQuestionLLM):
+    """前 limit 次调用正常返回，之后一直挂起，模拟运行中途被中断"""
+
+    def __init__(self, limit):
+        super().__init__()
+        self.limit = limit
+
+    async def generate_answer(self, prompt: str, history=None, **extra):
+        if self.calls >= self.limit:
+            await asyncio.Event().wait()
+        return await super().generate_answer(prompt, history, **extra)
+
+
+def _interrupted(coro):
+    async def run():
+        try:
+            await asyncio.wait_for(coro, timeout=0.5)
+        except asyncio.TimeoutError:
+            pass
+    asyncio.run(run())
+
+
+def test_interrupted_run_keeps_fingerprints_of_completed_batches():
+    batches = [_batch(i) for i in range(10)]
+    config = {
+        "mode": "multi_hop",
+        "data_format": "Alpaca",
+        "enable_batch_requests": False,
+        "enable_prompt_cache": False,
+        "max_concurrent_batches": 1,
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = JsonKVStorage(tmp, namespace="batch_fingerprints")
+        _interrupted(generate_qas(StallingLLM(4), batches, config, fingerprint_storage=storage))
+
+        # 续跑只为中断前未完成的批次调用 LLM
+        storage = JsonKVStorage(tmp, namespace="batch_fingerprints")
+        client = DistinctQuestionLLM()
+        asyncio.run(generate_qas(client, batches, config, fingerprint_storage=storage))
+        assert client.calls == 6
+
+
+def test_interrupted_atomic_run_regenerates_unanswered_batches():
+    batches = [_batch(i) for i in range(10)]
+    config = {
+        "mode": "atomic",
+        "data_format": "Alpaca",
+        "question_first": True,
+        "enable_batch_requests": False,
+        "enable_prompt_cache": False,
+        "max_concurrent_batches": 2,
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = JsonKVStorage(tmp, namespace="batch_fingerprints")
+        question_client = DistinctQuestionLLM()
+        _interrupted(
+            generate_qas(
+                StallingLLM(3), batches, config,
+                fingerprint_storage=storage, question_llm_client=question_client,
+            )
+        )
+        # 已生成问题但答案未写出的批次不登记指纹
+        assert question_client.calls > 3
+        assert len(storage.data) == 3
+
+        storage = JsonKVStorage(tmp, namespace="batch_fingerprints")
+        question_client = DistinctQuestionLLM()
+        results = asyncio.run(
+            generate_qas(
+                DistinctQuestionLLM(), batches, config,
+                fingerprint_storage=storage, question_llm_client=question_client,
+            )
+        )
+        assert question_client.calls == len(results) == 7
+
+
+class FailingLLM(DistinctQuestionLLM):
+    async def generate_answer(self, prompt: str, history=None, **extra):
+        raise RuntimeError("service unavailable")
+
+
+def test_failed_answers_do_not_mark_batches_generated():
+    batches = [_batch(i) for i in range(5)]
+    config = {
+        "mode": "atomic",
+        "data_format": "Alpaca",
+        "question_first": True,
+        "enable_batch_requests": False,
+        "enable_prompt_cache": False,
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = JsonKVStorage(tmp, namespace="batch_fingerprints")
+        results = asyncio.run(
+            generate_qas(
+                FailingLLM(), batches, config,
+                fingerprint_storage=storage, question_llm_client=DistinctQuestionLLM(),
+            )
+        )
+        assert results == [] and not storage.data
+
+        # 答案阶段故障恢复后，续跑重新生成这些批次
+        storage = JsonKVStorage(tmp, namespace="batch_fingerprints")
+        question_client = DistinctQuestionLLM()
+        results = asyncio.run(
+            generate_qas(
+                DistinctQuestionLLM(), batches, config,
+                fingerprint_storage=storage, question_llm_client=question_client,
+            )
+        )
+        assert question_client.calls == len(results) == 5
+        assert len(storage.data) == 5
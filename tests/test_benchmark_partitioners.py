@@ -0,0 +1,48 @@
+"""分区基准脚本中的合成图与质量指标测试。"""
+
+import sys
+from pathlib import Path
+
+from graphgen.bases.datatypes import Community
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+# benchmark_partitioners 位于 scripts/ 目录
+sys.path.insert(0, str(PROJECT_ROOT / "scripts"))
+
+from benchmark_partitioners import compare, evaluate, synthetic_graph  # noqa: E402
+
+
+def test_synthetic_graph_hierarchy_and_degree():
+    nodes, edges = synthetic_graph(
+        500, 1000, seed=1, degree="uniform", hierarchy_depth=2, branching=3
+    )
+    assert len(nodes) == 500
+    is_a = [(u, v) for u, v, data in edges if data.get("relation_type") == "is_a"]
+    # 1 + 3 + 9 个分类节点，除根外各有一条指向父节点的 is_a 边
+    assert sorted(is_a) == sorted(
+        (f"E{c}", f"E{(c - 1) // 3}") for c in range(1, 13)
+    )
+    pairs = [tuple(sorted((u, v))) for u, v, _ in edges]
+    assert len(pairs) == len(set(pairs))
+
+
+def test_evaluate_reports_sizes_coverage_and_budget():
+    nodes = [("A", {"length": 10}), ("B", {"length": 10}), ("C", {"length": 10})]
+    edges = [("A", "B", {"length": 5}), ("B", "C", {"length": 5})]
+    communities = [
+        Community(id=0, nodes=["A", "B"], edges=[("B", "A")]),
+        Community(id=1, nodes=["B"], edges=[]),
+    ]
+    metrics = evaluate(communities, nodes, edges, max_tokens=20)
+    assert (metrics["size_min"], metrics["size_max"]) == (1, 3)
+    assert metrics["coverage"] == 0.6
+    assert metrics["overlap"] == round(4 / 3, 3)
+    assert metrics["over_budget"] == 1
+
+
+def test_compare_flags_regressions_only_beyond_tolerance():
+    base = {"bfs": {"seconds": 1.0, "peak_rss_mb": 100, "coverage": 1.0, "over_budget": 0}}
+    ok = {"bfs": {"seconds": 1.1, "peak_rss_mb": 100, "coverage": 1.0, "over_budget": 0}}
+    slow = {"bfs": {"seconds": 2.0, "peak_rss_mb": 100, "coverage": 0.9, "over_budget": 0}}
+    assert compare(ok, base, tolerance=0.2) == []
+    assert len(compare(slow, base, tolerance=0.2)) == 2
@@ -0,0 +1,126 @@
+"""按连通分量分片的并行分区驱动测试。"""
+
+import asyncio
+import random
+
+import networkx as nx
+
+from graphgen.models import (
+    BFSPartitioner,
+    ComponentShardedPartitioner,
+    ECEPartitioner,
+    GraphSnapshot,
+    LeidenPartitioner,
+)
+
+
+class InMemoryGraph:
+    def __init__(self, nodes, edges):
+        self._nodes = nodes
+        self._edges = edges
+
+    async def get_all_nodes(self):
+        return self._nodes
+
+    async def get_all_edges(self):
+        return self._edges
+
+
+def _fragmented_graph(num_components=12, size=8, seed=5):
+    """多个互不相连的小图 + 若干孤立节点，模拟由大量独立文档抽取得到的 KG"""
+    rng = random.Random(seed)
+    nodes, edges = [], []
+    for c in range(num_components):
+        ids = [f"C{c}N{i}" for i in range(size)]
+        nodes += [(n, {"length": rng.randint(1, 20), "loss": rng.random()}) for n in ids]
+        for i in range(1, size):
+            edges.append(
+                (ids[rng.randrange(i)], ids[i], {"length": 5, "loss": rng.random()})
+            )
+    nodes += [(f"ISO{i}", {"length": 3, "loss": 0.5}) for i in range(5)]
+    return nodes, edges
+
+
+def _component_of(nodes, edges):
+    g = nx.Graph()
+    g.add_nodes_from(n for n, _ in nodes)
+    g.add_edges_from((u, v) for u, v, _ in edges)
+    return {n: i for i, comp in enumerate(nx.connected_components(g)) for n in comp}
+
+
+def test_connected_components_match_networkx():
+    nodes, edges = _fragmented_graph()
+    snap = GraphSnapshot(nodes, edges)
+    count, labels = snap.connected_components()
+    expected = _component_of(nodes, edges)
+    assert count == len(set(expected.values()))
+    for u, v, _ in edges:
+        assert labels[snap.node_index[u]] == labels[snap.node_index[v]]
+    for a, _ in nodes:
+        for b, _ in nodes[:20]:
+            same = labels[snap.node_index[a]] == labels[snap.node_index[b]]
+            assert same == (expected[a] == expected[b])
+
+
+def test_sharded_partition_covers_all_units_with_global_ids():
+    nodes, edges = _fragmented_graph()
+    graph = InMemoryGraph(nodes, edges)
+    component = _component_of(nodes, edges)
+    driver = ComponentShardedPartitioner(
+        BFSPartitioner(), num_workers=2, min_shard_units=20
+    )
+    assert len(driver._build_shards(GraphSnapshot(nodes, edges), nodes, edges)) > 1
+
+    communities = asyncio.run(driver.partition(graph, max_units_per_community=4))
+    assert [c.id for c in communities] == list(range(len(communities)))
+    assert sorted(n for c in communities for n in c.nodes) == sorted(n for n, _ in nodes)
+    assert sorted(e for c in communities for e in c.edges) == sorted(
+        (u, v) for u, v, _ in edges
+    )
+    for c in communities:
+        members = list(c.nodes) + [u for u, _ in c.edges]
+        assert len({component[n] for n in members}) == 1
+
+
+def test_sharded_ece_and_leiden_match_serial_shape():
+    nodes, edges = _fragmented_graph()
+    graph = InMemoryGraph(nodes, edges)
+    params = {"max_units_per_community": 5, "unit_sampling": "max_loss"}
+
+    serial = asyncio.run(ECEPartitioner().partition(graph, **params))
+    sharded = asyncio.run(
+        ComponentShardedPartitioner(
+            ECEPartitioner(), num_workers=2, min_shard_units=20
+        ).partition(graph, **params)
+    )
+    # max_loss 的顺序是确定的，分片只改变社区的排列顺序
+    assert sorted((c.nodes, c.edges) for c in sharded) == sorted(
+        (c.nodes, c.edges) for c in serial
+    )
+
+    leiden = asyncio.run(
+        ComponentShardedPartitioner(
+            LeidenPartitioner(), num_workers=2, min_shard_units=20
+        ).partition(graph, max_size=4)
+    )
+    assert [c.id for c in leiden] == list(range(len(leiden)))
+    assert all(len(c.nodes) <= 4 for c in leiden)
+
+
+def test_sharded_leiden_with_lcc_matches_unsharded():
+    nodes, edges = _fragmented_graph()
+    # 额外加入一个更大的连通分量，作为全图唯一的最大连通分量
+    big = [f"BIG{i}" for i in range(20)]
+    nodes = nodes + [(n, {"length": 1, "loss": 0.5}) for n in big]
+    edges = edges + [(big[i - 1], big[i], {"length": 5, "loss": 0.5}) for i in range(1, 20)]
+    graph = InMemoryGraph(nodes, edges)
+    params = {"max_size": 6, "use_lcc": True}
+
+    serial = asyncio.run(LeidenPartitioner().partition(graph, **params))
+    sharded = asyncio.run(
+        ComponentShardedPartitioner(
+            LeidenPartitioner(), num_workers=2, min_shard_units=20
+        ).partition(graph, **params)
+    )
+    assert [(c.nodes, c.edges) for c in sharded] == [(c.nodes, c.edges) for c in serial]
+    assert {n for c in sharded for n in c.nodes} == set(big)
@@ -0,0 +1,91 @@
+"""上下文序列化缓存测试。"""
+
+from graphgen.models import (
+    AggregatedGenerator,
+    AtomicQuestionGenerator,
+    CoTGenerator,
+    MultiHopGenerator,
+)
+from graphgen.operators.generate.generate_qas import (
+    _build_atomic_context,
+    _build_context_text,
+    _build_hierarchical_context,
+)
+from graphgen.utils import ContextCache
+
+BATCH = (
+    [
+        ("水稻", {"description": "一种禾本科粮食作物", "entity_type": "crop"}),
+        ("作物", {"description": "人类栽培的植物", "entity_type": "concept"}),
+    ],
+    [("水稻", "作物", {"description": "水稻属于作物", "relation_type": "is_a"})],
+)
+
+
+def _context_block(batch):
+    nodes, edges = batch
+    return {
+        "nodes": [
+            {"name": n, "description": d["description"], "entity_type": d["entity_type"]}
+            for n, d in nodes
+        ],
+        "edges": [
+            {
+                "source": s,
+                "target": t,
+                "description": d["description"],
+                "relation_type": d["relation_type"],
+            }
+            for s, t, d in edges
+        ],
+    }
+
+
+def test_cache_hits_and_evicts():
+    cache = ContextCache(max_entries=2)
+    calls = []
+
+    def build(value):
+        calls.append(value)
+        return value
+
+    assert cache.get(BATCH, "a", lambda: build(1)) == 1
+    assert cache.get(BATCH, "a", lambda: build(2)) == 1
+    assert cache.get(BATCH, "b", lambda: build(3)) == 3
+    # 节点顺序影响序列化文本，不共用缓存
+    reordered = (list(reversed(BATCH[0])), BATCH[1])
+    assert cache.get(reordered, "a", lambda: build(4)) == 4
+    assert (cache.hits, cache.misses, len(cache)) == (1, 3, 2)
+    assert cache.get(BATCH, "a", lambda: build(5)) == 5
+    assert calls == [1, 3, 4, 5]
+
+
+def test_generators_share_serialized_context():
+    uncached = [
+        AggregatedGenerator(None).build_prompt(BATCH),
+        CoTGenerator(None).build_prompt(BATCH),
+        MultiHopGenerator(None).build_prompt(BATCH),
+    ]
+    cache = ContextCache()
+    generators = [AggregatedGenerator(None), CoTGenerator(None), MultiHopGenerator(None)]
+    for generator in generators:
+        generator.context_cache = cache
+    assert [g.build_prompt(BATCH) for g in generators] == uncached
+    assert [g.build_prompt(BATCH) for g in generators] == uncached
+    # 实体/关系列表与层级上下文各序列化一次
+    assert cache.misses == 2
+
+
+def test_answer_stage_reuses_question_stage_context():
+    cache = ContextCache()
+    generator = AtomicQuestionGenerator(None)
+    generator.context_cache = cache
+    generator.build_prompt(BATCH)
+    misses = cache.misses
+
+    block = _context_block(BATCH)
+    text, language = _build_atomic_context(block, cache)
+    hierarchical = _build_hierarchical_context(block, None, context_cache=cache)
+    assert cache.misses == misses
+    assert text == _build_context_text(block) and language == "zh"
+    assert hierarchical == _build_hierarchical_context(block) and "水稻" in hierarchical
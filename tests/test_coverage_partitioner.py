@@ -0,0 +1,87 @@
+"""CoveragePartitioner 按目标数量补充社区的测试。"""
+
+import asyncio
+import tempfile
+
+from graphgen.models import BFSPartitioner, CoveragePartitioner, NetworkXStorage
+from graphgen.operators import partition_kg
+
+
+class MockGraphStorage:
+    def __init__(self, nodes, edges):
+        self._nodes = nodes
+        self._edges = edges
+
+    async def get_all_nodes(self):
+        return self._nodes
+
+    async def get_all_edges(self):
+        return self._edges
+
+
+def _chain(n):
+    nodes = [(f"N{i}", {}) for i in range(n)]
+    edges = [(f"N{i}", f"N{i + 1}", {}) for i in range(n - 1)]
+    return MockGraphStorage(nodes, edges)
+
+
+def _units(community):
+    return frozenset(community.nodes) | frozenset(community.edges)
+
+
+def test_without_target_is_a_disjoint_cover():
+    g = _chain(30)
+    communities = asyncio.run(
+        CoveragePartitioner().partition(g, max_units_per_community=4, seed=1)
+    )
+    units = [u for c in communities for u in _units(c)]
+    assert len(units) == len(set(units)) == 30 + 29
+    assert all(c.metadata["round"] == 0 for c in communities)
+    # 与普通 BFS 分区的社区数量级一致
+    bfs = asyncio.run(BFSPartitioner().partition(g, max_units_per_community=4))
+    assert abs(len(communities) - len(bfs)) <= len(bfs) // 2
+
+
+def test_target_adds_distinct_overlapping_communities():
+    g = _chain(30)
+    base = asyncio.run(
+        CoveragePartitioner().partition(g, max_units_per_community=4, seed=1)
+    )
+    target = 3 * len(base)
+    communities = asyncio.run(
+        CoveragePartitioner().partition(
+            g, max_units_per_community=4, target_communities=target, seed=1
+        )
+    )
+    assert len(communities) == target
+    assert [c.id for c in communities] == list(range(target))
+    # 第 0 轮排在最前，按目标数量截取时先覆盖全图
+    assert [c.metadata["round"] for c in communities[: len(base)]] == [0] * len(base)
+    sets = [_units(c) for c in communities]
+    assert len(set(sets)) == target
+    assert all(1 <= len(s) <= 4 for s in sets)
+
+
+def test_stops_when_no_distinct_window_exists():
+    # 每个社区只有一个 unit 时，最多只有 unit 个数个不同的社区
+    g = _chain(5)
+    communities = asyncio.run(
+        CoveragePartitioner().partition(
+            g, max_units_per_community=1, target_communities=100, seed=3
+        )
+    )
+    assert len(communities) == 9
+
+
+def test_partition_kg_passes_target_batches():
+    async def run(tmp):
+        graph = NetworkXStorage(tmp, namespace="graph")
+        for i in range(20):
+            await graph.upsert_edge(f"N{i}", f"N{i + 1}", {"description": str(i)})
+        config = {"method": "coverage", "method_params": {"max_units_per_community": 5, "seed": 0}}
+        plain = await partition_kg(graph, None, None, config)
+        stream = await partition_kg(graph, None, None, config, target_batches=3 * len(plain))
+        assert len(stream) == 3 * len(plain)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        asyncio.run(run(tmp))
@@ -0,0 +1,62 @@
+"""语言检测快速路径与 chunk 语言标注测试。"""
+
+import random
+
+from graphgen.bases.datatypes import Chunk
+from graphgen.utils import (
+    annotate_chunk_languages,
+    chunk_language,
+    count_language_chars,
+    detect_main_language,
+)
+
+
+def _reference_detect(text):
+    text = "".join(char for char in text if char.strip())
+    chinese = sum(1 for char in text if "一" <= char <= "鿿")
+    english = sum(1 for char in text if char.isascii() and char.isalpha())
+    if chinese + english == 0:
+        return "en"
+    return "zh" if chinese / (chinese + english) >= 0.5 else "en"
+
+
+def test_matches_reference_on_short_texts():
+    rng = random.Random(0)
+    alphabet = "中文知识图谱abcXYZ 12，。!\n\t"
+    for _ in range(2000):
+        text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 800)))
+        assert detect_main_language(text) == _reference_detect(text)
+    assert count_language_chars("知识graph 图谱!") == (4, 5)
+
+
+def test_long_text_is_sampled_and_cached():
+    text = ("知识图谱用于合成训练数据。" * 400) + ("English tail. " * 100)
+    assert detect_main_language(text) == "zh"
+    assert detect_main_language(text) == "zh"
+    assert detect_main_language("plain english words " * 1000) == "en"
+
+
+def test_annotate_chunk_languages_reads_existing_annotation():
+    chunks = [
+        Chunk(id="a", content="中文内容", type="text"),
+        Chunk(id="b", content="中文内容", type="text", metadata={"language": "en"}),
+        {"content": "english content"},
+    ]
+    annotate_chunk_languages(chunks)
+    assert chunks[0].metadata["language"] == "zh"
+    assert chunk_language(chunks[1]) == "en"
+    assert chunks[2]["language"] == "en"
+
+
+def test_mixed_language_document_chunks_get_their_own_language():
+    from graphgen.operators.split.split_chunks import _chunk_document
+
+    zh = "水稻是重要的粮食作物，主要种植在亚洲地区。" * 20
+    en = "Rice blast is a fungal disease that damages rice leaves and panicles. " * 10
+    chunks = _chunk_document(
+        "doc-1", {"type": "text", "content": zh + "\n\n" + en}, 300, 0, None, False
+    )
+    languages = {chunk["content"][:4]: chunk["language"] for chunk in chunks.values()}
+    assert languages["水稻是重"] == "zh" and languages["Rice"] == "en"
+    annotated = [Chunk.from_dict(k, v) for k, v in chunks.items()]
+    assert {chunk_language(c) for c in annotated} == {"zh", "en"}
@@ -0,0 +1,231 @@
+"""目标驱动生成调度器测试。"""
+
+import asyncio
+
+from graphgen.operators.generate.generate_qas import generate_qas
+from graphgen.operators.generate.generation_scheduler import (
+    GenerationLane,
+    GenerationScheduler,
+)
+
+
+def _lane(num_batches, target, prior_yield, accepted_per_batch=1, delay=0.001):
+    async def generate(batch):
+        # 批次完成时间错开，模拟 LLM 调用耗时不同
+        await asyncio.sleep(delay * (batch % 7 + 1))
+        return batch
+
+    def accept(batch):
+        if isinstance(accepted_per_batch, float):
+            return [batch] if batch % round(1 / accepted_per_batch) == 0 else []
+        return [batch] * accepted_per_batch
+
+    return GenerationLane(
+        mode="m",
+        generate=generate,
+        batches=list(range(num_batches)),
+        accept=accept,
+        target=target,
+        prior_yield=prior_yield,
+    )
+
+
+def _run(*lanes, **kwargs):
+    return asyncio.run(GenerationScheduler(list(lanes), **kwargs).run())
+
+
+def test_dispatches_only_what_the_target_needs():
+    lane = _lane(1000, target=20, prior_yield=1.0)
+    accepted = _run(lane)
+    assert len(accepted["m"]) == 20
+    assert lane.dispatched == 20 and lane.cancelled == 0
+
+
+def test_tops_up_under_yielding_mode():
+    # 实际每两个批次才接受一个，先验估计偏高
+    lane = _lane(1000, target=20, prior_yield=1.0, accepted_per_batch=0.5)
+    accepted = _run(lane)
+    assert len(accepted["m"]) >= 20
+    assert 40 <= lane.dispatched < 80
+
+
+def test_cancels_in_flight_surplus():
+    # 先验估计偏低时首轮派发过多，达到目标后取消其余在途批次
+    lane = _lane(1000, target=10, prior_yield=0.1, accepted_per_batch=1)
+    accepted = _run(lane)
+    assert lane.dispatched == 100
+    assert lane.cancelled > 0
+    assert lane.completed + lane.cancelled == 100
+    assert len(accepted["m"]) == lane.completed < 100
+
+
+def test_unlimited_lane_and_in_flight_cap():
+    unlimited = _lane(30, target=None, prior_yield=1.0)
+    unlimited.mode = "u"
+    capped = _lane(30, target=25, prior_yield=1.0)
+    capped.mode = "c"
+    peak = 0
+    generate = capped.generate
+
+    async def tracked(batch):
+        nonlocal peak
+        peak = max(peak, capped.in_flight)
+        return await generate(batch)
+
+    capped.generate = tracked
+    accepted = _run(unlimited, capped, max_in_flight=4)
+    assert len(accepted["u"]) == 30 and len(accepted["c"]) == 25
+    assert peak <= 4
+
+
+def test_shared_budget_creates_tasks_lazily_and_shares_fairly():
+    big = _lane(100_000, target=200, prior_yield=1.0)
+    big.mode = "big"
+    small = _lane(100_000, target=50, prior_yield=1.0)
+    small.mode = "small"
+    unlimited = _lane(300, target=None, prior_yield=1.0)
+    unlimited.mode = "u"
+    lanes = [big, small, unlimited]
+    peak = 0
+    progress = []
+
+    def track(lane):
+        generate = lane.generate
+
+        async def tracked(batch):
+            nonlocal peak
+            peak = max(peak, sum(l.in_flight for l in lanes))
+            if lane is small and small.num_accepted == 25:
+                progress.append(big.num_accepted / big.target)
+            return await generate(batch)
+
+        lane.generate = tracked
+
+    for lane in lanes:
+        track(lane)
+    accepted = _run(*lanes, max_concurrency=8)
+    assert len(accepted["big"]) == 200 and len(accepted["small"]) == 50
+    assert len(accepted["u"]) == 300
+    # 无论批次总数多少，在途任务不超过共享预算
+    assert peak <= 8
+    assert big.dispatched + small.dispatched < 300
+    # 小目标模式完成一半时，大目标模式的进度也接近一半
+    assert progress and all(0.3 <= p <= 0.7 for p in progress)
+
+
+class DistinctQuestionLLM:
+    """每次返回不同问题的 mock LLM"""
+
+    def __init__(self):
+        self.calls = 0
+        self.system_prompt = ""
+        self.temperature = 0.0
+        self.max_tokens = 4096
+        self.repetition_penalty = 1.0
+        self.top_p = 0.95
+        self.top_k = 50
+        self.tokenizer = None
+        self.token_usage = []
+
+    async def generate_answer(self, prompt: str, history=None, **extra):
+        self.calls += 1
+        return (
+            f"Question: What is concept number {self.calls}?\n\n"
+            f"Answer: It is the concept described as number {self.calls}."
+        )
+
+
+def test_generate_qas_stops_at_target():
+    batches = [
+        (
+            [(f"X{i}", {"description": f"X{i} is a concept", "entity_type": "concept"})],
+            [],
+        )
+        for i in range(200)
+    ]
+    client = DistinctQuestionLLM()
+    config = {
+        "mode": "multi_hop",
+        "data_format": "Alpaca",
+        "target_qa_pairs": 5,
+        "enable_batch_requests": False,
+        "enable_prompt_cache": False,
+    }
+    results = asyncio.run(generate_qas(client, batches, config))
+    assert len(results) >= 5
+    assert client.calls < 50
+
+
+def test_downstream_lane_pipelines_with_bounded_backlog():
+    answers = _lane(0, target=None, prior_yield=1.0)
+    answers.mode = "answer"
+    questions = _lane(200, target=None, prior_yield=1.0, accepted_per_batch=3)
+    questions.mode = "question"
+    questions.downstream = answers
+    questions.downstream_backlog = 10
+    backlog_at_dispatch = []
+    answered_before_last_question = []
+    generate = questions.generate
+
+    async def tracked(batch):
+        backlog_at_dispatch.append(answers.backlog)
+        result = await generate(batch)
+        answered_before_last_question.append(answers.completed)
+        return result
+
+    questions.generate = tracked
+    accepted = _run(questions, answers, max_concurrency=6)
+    # 上游接受的条目全部交给下游，不作为上游结果输出
+    assert accepted["question"] == [] and len(accepted["answer"]) == 600
+    assert answers.dispatched == questions.num_accepted == 600
+    # 下游积压满时上游不再派发
+    assert max(backlog_at_dispatch) < 10
+    # 两级重叠执行：最后一个问题批次完成前已有答案完成
+    assert answered_before_last_question[-1] > 0
+
+
+class RecordingLLM(DistinctQuestionLLM):
+    """按调用顺序把 (标签, 序号) 记入共享日志的 mock LLM"""
+
+    def __init__(self, label, log, response):
+        super().__init__()
+        self.label = label
+        self.log = log
+        self.response = response
+
+    async def generate_answer(self, prompt: str, history=None, **extra):
+        self.calls += 1
+        call = self.calls
+        self.log.append(self.label)
+        await asyncio.sleep(0.002)
+        return self.response.format(n=call)
+
+
+def test_atomic_pipeline_overlaps_stages_with_question_model():
+    batches = [
+        (
+            [(f"X{i}", {"description": f"X{i} is a concept", "entity_type": "concept"})],
+            [],
+        )
+        for i in range(30)
+    ]
+    log = []
+    question_client = RecordingLLM("q", log, "Question: What is concept number {n}?")
+    answer_client = RecordingLLM("a", log, "Answer: It is the concept numbered {n}.")
+    config = {
+        "mode": "atomic",
+        "data_format": "Alpaca",
+        "question_first": True,
+        "enable_batch_requests": False,
+        "enable_prompt_cache": False,
+        "max_concurrent_batches": 4,
+        "answer_queue_size": 4,
+    }
+    results = asyncio.run(
+        generate_qas(answer_client, batches, config, question_llm_client=question_client)
+    )
+    # 问题全部由问题模型生成，答案全部由主模型生成
+    assert question_client.calls == 30
+    assert answer_client.calls == len(results) == 30
+    # 第一个答案在最后一个问题之前开始
+    assert log.index("a") < len(log) - 1 - log[::-1].index("q")
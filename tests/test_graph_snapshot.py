@@ -0,0 +1,160 @@
+"""整数 CSR 图快照与基于快照的分区器测试。"""
+
+import asyncio
+import random
+
+import numpy as np
+import pytest
+
+from graphgen.models import (
+    AnchorBFSPartitioner,
+    BFSPartitioner,
+    DFSPartitioner,
+    ECEPartitioner,
+    GraphSnapshot,
+)
+
+
+class InMemoryGraph:
+    def __init__(self, nodes, edges):
+        self._nodes = nodes
+        self._edges = edges
+
+    async def get_all_nodes(self):
+        return self._nodes
+
+    async def get_all_edges(self):
+        return self._edges
+
+
+def _random_graph(num_nodes=60, num_edges=150, seed=7):
+    rng = random.Random(seed)
+    nodes = [
+        (
+            f"N{i}",
+            {
+                "entity_type": "IMAGE" if i % 10 == 0 else "CONCEPT",
+                "length": rng.randint(1, 50),
+                "loss": rng.random(),
+            },
+        )
+        for i in range(num_nodes)
+    ]
+    pairs = set()
+    while len(pairs) < num_edges:
+        u, v = rng.sample(range(num_nodes), 2)
+        pairs.add((min(u, v), max(u, v)))
+    edges = [
+        (f"N{u}", f"N{v}", {"length": rng.randint(1, 50), "loss": rng.random()})
+        for u, v in sorted(pairs)
+    ]
+    return nodes, edges
+
+
+def test_csr_matches_edge_list():
+    nodes, edges = _random_graph()
+    snap = GraphSnapshot(nodes, edges)
+    assert snap.num_nodes == len(nodes) and snap.num_edges == len(edges)
+
+    for i, node_id in enumerate(snap.node_ids):
+        start, end = snap.indptr[i], snap.indptr[i + 1]
+        expected = [
+            (j, v if u == node_id else u)
+            for j, (u, v, _) in enumerate(edges)
+            if node_id in (u, v)
+        ]
+        got = [
+            (int(e), snap.node_ids[t])
+            for e, t in zip(snap.edge_ids[start:end], snap.indices[start:end])
+        ]
+        assert got == expected
+
+    assert snap.unit_length.tolist() == [d["length"] for _, d in nodes] + [
+        d["length"] for _, _, d in edges
+    ]
+
+
+def test_missing_endpoint_and_loss():
+    snap = GraphSnapshot([("A", {"length": 3})], [("A", "B", {"length": 2})])
+    assert snap.node_ids == ["A", "B"]
+    assert snap.unit_length.tolist() == [3, 0, 2]
+    assert np.isnan(snap.unit_loss).all()
+    with pytest.raises(ValueError):
+        asyncio.run(
+            ECEPartitioner().partition(
+                InMemoryGraph([("A", {})], []), unit_sampling="max_loss"
+            )
+        )
+
+
+@pytest.mark.parametrize(
+    "partitioner, params",
+    [
+        (BFSPartitioner(), {}),
+        (DFSPartitioner(), {}),
+        (ECEPartitioner(), {"unit_sampling": "max_loss", "max_tokens_per_community": 80}),
+        (ECEPartitioner(), {"unit_sampling": "random"}),
+    ],
+)
+def test_partitions_cover_every_unit_once(partitioner, params):
+    nodes, edges = _random_graph()
+    edge_keys = {frozenset((u, v)) for u, v, _ in edges}
+    random.seed(0)
+    communities = asyncio.run(
+        partitioner.partition(
+            InMemoryGraph(nodes, edges), max_units_per_community=6, **params
+        )
+    )
+
+    seen_nodes = [n for c in communities for n in c.nodes]
+    seen_edges = [frozenset(e) for c in communities for e in c.edges]
+    assert sorted(seen_nodes) == sorted(n for n, _ in nodes)
+    assert len(seen_edges) == len(edges) and set(seen_edges) == edge_keys
+    assert all(0 < len(c.nodes) + len(c.edges) <= 6 for c in communities)
+    assert [c.id for c in communities] == list(range(len(communities)))
+
+
+def test_shared_snapshot_and_anchor_seeds():
+    nodes, edges = _random_graph()
+    graph = InMemoryGraph(nodes, edges)
+    snap = GraphSnapshot(nodes, edges)
+
+    random.seed(1)
+    first = asyncio.run(BFSPartitioner().partition(graph, 5))
+    random.seed(1)
+    second = asyncio.run(BFSPartitioner().partition(graph, 5, snapshot=snap))
+    assert [(c.nodes, c.edges) for c in first] == [(c.nodes, c.edges) for c in second]
+
+    communities = asyncio.run(
+        AnchorBFSPartitioner(anchor_type="image").partition(
+            graph, max_units_per_community=4, snapshot=snap
+        )
+    )
+    anchors = {n for n, d in nodes if d["entity_type"] == "IMAGE"}
+    assert communities and all(c.nodes[0] in anchors for c in communities)
+
+
+def test_ece_is_deterministic_per_seed_and_follows_loss():
+    nodes, edges = _random_graph()
+    graph = InMemoryGraph(nodes, edges)
+
+    def run(**params):
+        communities = asyncio.run(
+            ECEPartitioner().partition(graph, max_units_per_community=5, **params)
+        )
+        return [(c.nodes, c.edges) for c in communities]
+
+    assert run(unit_sampling="random", seed=3) == run(unit_sampling="random", seed=3)
+    assert run(unit_sampling="random", seed=3) != run(unit_sampling="random", seed=4)
+
+    # 星形图：中心节点的前沿中 loss 最大的边应最先加入
+    star_nodes = [("C", {"loss": 0.0})] + [(f"L{i}", {"loss": 0.0}) for i in range(4)]
+    star_edges = [("C", f"L{i}", {"loss": i / 10}) for i in range(4)]
+    communities = asyncio.run(
+        ECEPartitioner().partition(
+            InMemoryGraph(star_nodes, star_edges),
+            max_units_per_community=3,
+            unit_sampling="max_loss",
+        )
+    )
+    assert communities[0].edges == [("C", "L3"), ("C", "L2")]
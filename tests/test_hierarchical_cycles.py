@@ -0,0 +1,90 @@
+"""HierarchicalPartitioner 的 SCC 断环测试。"""
+
+import asyncio
+import random
+
+import networkx as nx
+
+from graphgen.models import HierarchicalPartitioner
+
+
+class MockGraphStorage:
+    def __init__(self, nodes, edges):
+        self._nodes = nodes
+        self._edges = edges
+
+    async def get_all_nodes(self):
+        return self._nodes
+
+    async def get_all_edges(self):
+        return self._edges
+
+
+def _is_a(child, parent):
+    return (child, parent, {"relation_type": "is_a"})
+
+
+def test_tarjan_matches_networkx():
+    rng = random.Random(11)
+    n = 200
+    adj = [[] for _ in range(n)]
+    g = nx.DiGraph()
+    g.add_nodes_from(range(n))
+    for _ in range(400):
+        u, v = rng.randrange(n), rng.randrange(n)
+        adj[u].append(v)
+        g.add_edge(u, v)
+
+    comp = HierarchicalPartitioner._strongly_connected_components(adj)
+    expected = sorted(sorted(c) for c in nx.strongly_connected_components(g))
+    groups = {}
+    for v, c in enumerate(comp):
+        groups.setdefault(c, []).append(v)
+    assert sorted(groups.values()) == expected
+
+
+def test_break_cycles_leaves_acyclic_hierarchy():
+    rng = random.Random(5)
+    n = 300
+    partitioner = HierarchicalPartitioner()
+    parents_of = [[] for _ in range(n)]
+    children_of = [[] for _ in range(n)]
+    for _ in range(1500):
+        child, parent = rng.randrange(n), rng.randrange(n)
+        if parent not in parents_of[child]:
+            parents_of[child].append(parent)
+            children_of[parent].append(child)
+    total = sum(map(len, parents_of))
+
+    removed = partitioner._break_cycles(parents_of, children_of)
+    g = nx.DiGraph((c, p) for c in range(n) for p in parents_of[c])
+    assert nx.is_directed_acyclic_graph(g)
+    assert sum(map(len, parents_of)) == total - removed
+    assert sorted((c, p) for c in range(n) for p in parents_of[c]) == sorted(
+        (c, p) for p in range(n) for c in children_of[p]
+    )
+
+
+def test_partition_with_noisy_cycles():
+    # 层级中混入 Cat is_a Animal is_a Mammal is_a Cat 这样的噪声环
+    nodes = [(name, {}) for name in ["Animal", "Mammal", "Bird", "Cat", "Dog"]]
+    edges = [
+        _is_a("Mammal", "Animal"),
+        _is_a("Bird", "Animal"),
+        _is_a("Cat", "Mammal"),
+        _is_a("Dog", "Mammal"),
+        _is_a("Animal", "Cat"),
+        _is_a("Dog", "Dog"),
+    ]
+    communities = asyncio.run(
+        HierarchicalPartitioner(hierarchical_relations=["is_a"]).partition(
+            MockGraphStorage(nodes, edges)
+        )
+    )
+    assert sorted(n for c in communities for n in c.nodes) == sorted(
+        name for name, _ in nodes
+    )
+    # 每个环只去掉一条边：自环 Dog→Dog 与环上的一条边，其余层级仍可分组
+    siblings = [c for c in communities if c.metadata["type"] == "sibling_group"]
+    assert len(siblings) == 1
+    assert all(("Dog", "Dog") not in c.edges for c in communities)
@@ -0,0 +1,192 @@
+"""溯源索引与增量更新/删除文档测试（mock LLM，零 API 成本）。"""
+
+import asyncio
+import os
+import re
+import tempfile
+
+from graphgen.bases import BaseTokenizer
+from graphgen.graphgen import GraphGen
+from graphgen.utils import compute_mm_hash
+
+SPLIT_CONFIG = {
+    "chunk_size": 12,
+    "chunk_overlap": 0,
+    "enable_prompt_merging": False,
+    "enable_batch_requests": False,
+    "enable_extraction_cache": False,
+}
+
+
+class CharTokenizer(BaseTokenizer):
+    def encode(self, text):
+        return [ord(c) for c in text]
+
+    def decode(self, token_ids):
+        return "".join(chr(i) for i in token_ids)
+
+
+class SentenceClient:
+    """把 "X与Y合作。" 抽取为两个实体和一条关系，描述带上原句以区分来源。"""
+
+    def __init__(self):
+        self.tokenizer = CharTokenizer()
+        self.extract_calls = 0
+
+    async def generate_answer(self, prompt, history=None, **extra):
+        self.extract_calls += 1
+        text = prompt.split("-真实数据-")[-1]
+        records = []
+        for src, tgt in re.findall(r"(\w)与(\w)合作", text):
+            sentence = f"{src}与{tgt}合作"
+            records += [
+                f'("entity"<|>"{src}"<|>"organization"<|>"{src}出现在{sentence}")',
+                f'("entity"<|>"{tgt}"<|>"organization"<|>"{tgt}出现在{sentence}")',
+                f'("relationship"<|>"{src}"<|>"{tgt}"<|>"{sentence}"<|>"合作"<|>1)',
+            ]
+        return "##".join(records) + "##<|COMPLETE|>"
+
+
+def _doc(content):
+    return {"type": "text", "content": content}
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+def _graph(graph_gen):
+    nodes = {
+        name.strip('"'): data
+        for name, data in _run(graph_gen.graph_storage.get_all_nodes())
+    }
+    edges = {
+        tuple(sorted((u.strip('"'), v.strip('"'))))
+        for u, v, _ in _run(graph_gen.graph_storage.get_all_edges())
+    }
+    return nodes, edges
+
+
+def _make_graph_gen(tmpdir):
+    client = SentenceClient()
+    return (
+        GraphGen(
+            working_dir=os.path.join(tmpdir, "work"),
+            tokenizer_instance=client.tokenizer,
+            synthesizer_llm_client=client,
+            trainee_llm_client=client,
+        ),
+        client,
+    )
+
+
+def _insert(graph_gen, docs):
+    _run(
+        graph_gen._insert_documents(  # pylint: disable=protected-access
+            {compute_mm_hash(doc, prefix="doc-"): doc for doc in docs}, SPLIT_CONFIG
+        )
+    )
+
+
+def test_delete_document_retracts_only_its_mentions():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        graph_gen, _ = _make_graph_gen(tmpdir)
+        doc_a, doc_b = _doc("甲与乙合作。"), _doc("乙与丙合作。")
+        _insert(graph_gen, [doc_a, doc_b])
+        nodes, edges = _graph(graph_gen)
+        assert set(nodes) == {"甲", "乙", "丙"}
+        assert "甲与乙合作" in nodes["乙"]["description"]
+
+        doc_a_id = compute_mm_hash(doc_a, prefix="doc-")
+        stats = _run(graph_gen.delete_documents.__wrapped__(graph_gen, [doc_a_id]))
+
+        nodes, edges = _graph(graph_gen)
+        assert set(nodes) == {"乙", "丙"}
+        assert edges == {("丙", "乙")}
+        assert nodes["乙"]["description"].strip('"') == "乙出现在乙与丙合作"
+        assert "<SEP>" not in nodes["乙"]["source_id"]
+        assert stats["nodes_deleted"] == 1 and stats["edges_deleted"] == 1
+        assert _run(graph_gen.full_docs_storage.get_by_id(doc_a_id)) is None
+        assert len(graph_gen.chunks_storage.data) == 1
+        assert len(graph_gen.chunk_provenance_storage.data) == 1
+
+
+def test_update_document_reextracts_only_changed_chunks():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        graph_gen, client = _make_graph_gen(tmpdir)
+        old_doc = _doc("甲与乙合作。\n\n乙与丙合作。")
+        _insert(graph_gen, [old_doc])
+        assert client.extract_calls == 2
+
+        new_doc = _doc("甲与乙合作。\n\n乙与丁合作。")
+        old_doc_id = compute_mm_hash(old_doc, prefix="doc-")
+        _run(
+            graph_gen.update_documents.__wrapped__(
+                graph_gen, {old_doc_id: new_doc}, SPLIT_CONFIG
+            )
+        )
+
+        # 未变化的段落 chunk 哈希不变，不会重新抽取
+        assert client.extract_calls == 3
+        nodes, edges = _graph(graph_gen)
+        assert set(nodes) == {"甲", "乙", "丁"}
+        assert edges == {("乙", "甲"), ("丁", "乙")}
+        assert "乙与丙合作" not in nodes["乙"]["description"]
+        assert set(graph_gen.doc_provenance_storage.data) == {
+            compute_mm_hash(new_doc, prefix="doc-")
+        }
+        assert len(graph_gen.chunks_storage.data) == 2
+
+
+class PartialEntityClient(SentenceClient):
+    """omitted 中的名称只出现在关系里，不抽取为实体（由 merge_edges 创建占位节点）"""
+
+    def __init__(self, omitted):
+        super().__init__()
+        self.omitted = omitted
+
+    async def generate_answer(self, prompt, history=None, **extra):
+        response = await super().generate_answer(prompt, history, **extra)
+        return "##".join(
+            record
+            for record in response.split("##")
+            if not any(record.startswith(f'("entity"<|>"{name}"') for name in self.omitted)
+        )
+
+
+def test_delete_document_removes_orphaned_placeholders():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        client = PartialEntityClient({"乙"})
+        graph_gen = GraphGen(
+            working_dir=os.path.join(tmpdir, "work"),
+            tokenizer_instance=client.tokenizer,
+            synthesizer_llm_client=client,
+            trainee_llm_client=client,
+        )
+        doc_a, doc_b, doc_c = _doc("甲与乙合作。"), _doc("乙与丙合作。"), _doc("丁与戊合作。")
+        _insert(graph_gen, [doc_a, doc_b, doc_c])
+        nodes, _ = _graph(graph_gen)
+        assert nodes["乙"]["entity_type"] == "UNKNOWN"
+
+        # 占位节点 乙 仍与 丙 相连：source_id 与描述只保留剩余的边
+        _run(
+            graph_gen.delete_documents.__wrapped__(
+                graph_gen, [compute_mm_hash(doc_a, prefix="doc-")]
+            )
+        )
+        nodes, edges = _graph(graph_gen)
+        assert set(nodes) == {"乙", "丙", "丁", "戊"}
+        assert edges == {("丙", "乙"), ("丁", "戊")}
+        assert "甲与乙合作" not in nodes["乙"]["description"]
+        assert "乙与丙合作" in nodes["乙"]["description"]
+        assert nodes["乙"]["source_id"] == nodes["丙"]["source_id"]
+
+        # 最后一条边撤回后，占位节点不再作为孤立节点残留
+        _run(
+            graph_gen.delete_documents.__wrapped__(
+                graph_gen, [compute_mm_hash(doc_b, prefix="doc-")]
+            )
+        )
+        nodes, edges = _graph(graph_gen)
+        assert set(nodes) == {"丁", "戊"}
+        assert edges == {("丁", "戊")}
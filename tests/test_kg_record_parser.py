@@ -0,0 +1,63 @@
+"""预编译抽取结果解析器与旧解析路径的一致性测试。"""
+
+import asyncio
+import re
+from collections import defaultdict
+
+from graphgen.utils import (
+    EntityRecord,
+    KGRecordParser,
+    RelationRecord,
+    handle_single_entity_extraction,
+    handle_single_relationship_extraction,
+    split_string_by_multi_markers,
+)
+
+RESPONSE = (
+    '("entity"<|>"Rice (Oryza)"<|>"nature"<|>"A crop (staple) food.")##\n'
+    '("entity"<|>"  "<|>"concept"<|>"empty name")##\n'
+    '("entity"<|>"AT&amp;T"<|>"organization"<|>"Tele\x07com &lt;US&gt;")##\n'
+    '("relationship"<|>"Rice"<|>"云南"<|>"种植于　云南。"<|>"grow"<|>0.9)##\n'
+    '("relationship"<|>"A"<|>"B")##\n'
+    "not a record##\n"
+    '("unknown"<|>"x"<|>"y"<|>"z")##\n'
+    '  ( "entity" <|> "稻瘟病" <|> "concept" <|> "一种病害" )##<|COMPLETE|>'
+)
+
+
+async def _legacy_parse(text, chunk_id):
+    records = split_string_by_multi_markers(text, ["##", "<|COMPLETE|>"])
+    nodes, edges = defaultdict(list), defaultdict(list)
+    for record in records:
+        match = re.search(r"\((.*?)\)", record, re.DOTALL)
+        if not match:
+            continue
+        attributes = split_string_by_multi_markers(match.group(1), ["<|>"])
+        entity = await handle_single_entity_extraction(attributes, chunk_id)
+        if entity is not None:
+            nodes[entity["entity_name"]].append(entity)
+            continue
+        relation = await handle_single_relationship_extraction(attributes, chunk_id)
+        if relation is not None:
+            edges[(relation["src_id"], relation["tgt_id"])].append(relation)
+    return dict(nodes), dict(edges)
+
+
+def test_parser_matches_legacy_path():
+    parser = KGRecordParser()
+    assert parser.parse(RESPONSE, "chunk-1") == asyncio.run(
+        _legacy_parse(RESPONSE, "chunk-1")
+    )
+
+
+def test_iter_records_yields_typed_records():
+    records = list(KGRecordParser().iter_records(RESPONSE, "chunk-1"))
+    assert [type(r) for r in records] == [
+        EntityRecord,
+        EntityRecord,
+        RelationRecord,
+        EntityRecord,
+    ]
+    assert records[1].entity_name == '"AT&T"'
+    assert records[1].description == '"Telecom <US>"'
+    assert records[2].src_id == '"RICE"'
@@ -0,0 +1,73 @@
+"""Leiden 分区器：单次建图、单次分桶与递归拆分测试。"""
+
+import asyncio
+import itertools
+import random
+
+from graphgen.models import LeidenPartitioner
+
+
+class InMemoryGraph:
+    def __init__(self, nodes, edges):
+        self._nodes = nodes
+        self._edges = edges
+
+    async def get_all_nodes(self):
+        return self._nodes
+
+    async def get_all_edges(self):
+        return self._edges
+
+
+def _cliques(num_cliques=6, size=6, seed=3):
+    """若干团，相邻团之间由一条桥边相连，外加孤立节点"""
+    rng = random.Random(seed)
+    nodes, edges = [], []
+    for c in range(num_cliques):
+        ids = [f"K{c}_{i}" for i in range(size)]
+        nodes += [(n, {}) for n in ids]
+        edges += [(u, v, {}) for u, v in itertools.combinations(ids, 2)]
+        if c:
+            edges.append((f"K{c - 1}_{rng.randrange(size)}", ids[0], {}))
+    nodes.append(("LONELY", {}))
+    return nodes, edges
+
+
+def _run(nodes, edges, **params):
+    return asyncio.run(LeidenPartitioner().partition(InMemoryGraph(nodes, edges), **params))
+
+
+def test_edges_bucketed_by_community():
+    nodes, edges = _cliques()
+    communities = _run(nodes, edges, max_size=0)
+    assert [c.id for c in communities] == list(range(len(communities)))
+
+    node2cid = {n: c.id for c in communities for n in c.nodes}
+    assert "LONELY" not in node2cid
+    expected = {
+        (u, v) for u, v, _ in edges if node2cid[u] == node2cid[v]
+    }
+    assert sorted(e for c in communities for e in c.edges) == sorted(expected)
+    # 每个团恰好成为一个社区
+    assert sorted(len(c.nodes) for c in communities) == [6] * 6
+
+
+def test_oversized_communities_split_by_leiden_and_deterministic():
+    nodes, edges = _cliques()
+    # 一个低分辨率的大社区，拆分应沿团边界进行而不是任意切片
+    communities = _run(nodes, edges, max_size=12, resolution=0.01)
+    assert all(len(c.nodes) <= 12 for c in communities)
+    for c in communities:
+        assert len({n.split("_")[0] for n in c.nodes}) * 6 == len(c.nodes)
+
+    first = [(c.nodes, c.edges) for c in _run(nodes, edges, random_seed=7, n_iterations=-1)]
+    second = [(c.nodes, c.edges) for c in _run(nodes, edges, random_seed=7, n_iterations=-1)]
+    assert first == second
+
+
+def test_use_lcc_keeps_largest_component():
+    nodes, edges = _cliques(num_cliques=1)
+    nodes += [("A", {}), ("B", {})]
+    edges.append(("A", "B", {}))
+    communities = _run(nodes, edges, use_lcc=True)
+    assert {n for c in communities for n in c.nodes} == {f"K0_{i}" for i in range(6)}
@@ -68,6 +68,22 @@ class TestLoadLLMConfig:
         )
         assert cfg.trainee.enabled is False
 
+    def test_question_model_optional_and_inherits_connection(self, monkeypatch):
+        monkeypatch.delenv("QUESTION_MODEL", raising=False)
+        monkeypatch.delenv("QUESTION_BASE_URL", raising=False)
+        monkeypatch.delenv("QUESTION_API_KEY", raising=False)
+        synthesizer = {"model": "big", "base_url": "https://s.example/v1", "api_key": "k"}
+        cfg = load_llm_config({"llm": {"synthesizer": synthesizer}}, load_env_file=False)
+        assert not cfg.question.is_ready()
+
+        cfg = load_llm_config(
+            {"llm": {"synthesizer": synthesizer, "question": {"model": "small"}}},
+            load_env_file=False,
+        )
+        assert cfg.question.model == "small"
+        assert cfg.question.base_url == "https://s.example/v1"
+        assert cfg.question.api_key == "k"
+
     def test_int_fields_coerced(self):
         cfg = load_llm_config(
             {"llm": {"synthesizer": {"rpm": "2000", "tpm": "99999", "temperature": "0.7"}}},
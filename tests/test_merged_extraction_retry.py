@@ -0,0 +1,92 @@
+"""合并抽取的截断检测与二分重抽测试（mock LLM，零 API 成本）。"""
+
+import asyncio
+import re
+
+from graphgen.bases.datatypes import Chunk, CompletionText
+from graphgen.models import LightRAGKGBuilder
+from graphgen.operators.build_kg.build_text_kg_optimized import (
+    extract_with_prompt_merging,
+    is_truncated_extraction,
+)
+
+
+def _record(name: str) -> str:
+    return f'("entity"<|>"{name}"<|>"concept"<|>"{name} 的描述。")'
+
+
+class MergedExtractionClient:
+    """按 prompt 中的文本片段回答；片段数超过 capacity 时模拟输出截断。"""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.merged_sizes = []
+        self.single_calls = 0
+        self.tokenizer = None
+
+    async def generate_answer(self, prompt, history=None, **extra):
+        names = re.findall(r"实体(\w+)是一个概念", prompt.split("-真实数据-")[-1])
+        match = re.search(r"你将看到(\d+)个文本片段", prompt)
+        if not match:
+            self.single_calls += 1
+            return CompletionText(
+                "##".join(_record(n) for n in names) + "##<|COMPLETE|>", "stop"
+            )
+        self.merged_sizes.append(int(match.group(1)))
+        lines = [
+            f"[文本{i}]\n{_record(name)}##"
+            for i, name in enumerate(names[: self.capacity], 1)
+        ]
+        if len(names) <= self.capacity:
+            return CompletionText("\n".join(lines) + "\n<|COMPLETE|>", "stop")
+        # 截断：最后一个 section 只输出了一半
+        return CompletionText("\n".join(lines)[:-12], "length")
+
+
+def _chunks(n: int):
+    return [
+        Chunk(id=f"chunk-{i}", content=f"实体E{i}是一个概念。", type="text")
+        for i in range(n)
+    ]
+
+
+def _run(client, chunks, merge_size):
+    builder = LightRAGKGBuilder(
+        llm_client=client, enable_cache=False, enable_batch_requests=False
+    )
+    return asyncio.run(
+        extract_with_prompt_merging(
+            builder, chunks, merge_size, cache_storage=None, enable_cache=False
+        )
+    )
+
+
+def _entity_names(results):
+    return [{name.strip('"') for name in nodes} for nodes, _ in results]
+
+
+def test_is_truncated_extraction():
+    assert is_truncated_extraction(CompletionText("a##<|COMPLETE|>", "length"))
+    assert is_truncated_extraction('("entity"<|>"A"<|>"x"<|>"y")##')
+    assert not is_truncated_extraction(CompletionText("a##<|COMPLETE|>", "stop"))
+    assert not is_truncated_extraction("")
+
+
+def test_truncated_merged_batch_recovers_every_chunk():
+    client = MergedExtractionClient(capacity=3)
+    results = _run(client, _chunks(8), merge_size=8)
+
+    assert _entity_names(results) == [{f"E{i}"} for i in range(8)]
+    # 截断后保留完整的 section，剩余 chunk 仍以合并方式重抽
+    assert client.merged_sizes[0] == 8
+    assert max(client.merged_sizes[1:]) < 8
+    assert client.single_calls < 8
+
+
+def test_unparsable_merged_batch_is_bisected():
+    client = MergedExtractionClient(capacity=0)
+    results = _run(client, _chunks(4), merge_size=4)
+
+    assert _entity_names(results) == [{f"E{i}"} for i in range(4)]
+    assert client.merged_sizes == [4, 2, 2]
+    assert client.single_calls == 4
@@ -0,0 +1,116 @@
+"""MinHash-LSH 近重复问题检测测试。"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+from graphgen.operators.generate.generate_qas import (
+    deduplicate_formatted_items,
+    generate_qas,
+)
+from graphgen.utils import NearDuplicateIndex, question_shingles
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT / "scripts"))
+
+from dedup_near_duplicates import dedup_items  # noqa: E402
+from test_generation_scheduler import DistinctQuestionLLM  # noqa: E402
+
+LONG_EN = (
+    "How does the activation of protein kinase A by cyclic AMP regulate "
+    "glycogen metabolism in liver cells during fasting?"
+)
+LONG_EN_PARAPHRASE = (
+    "How does activation of protein kinase A by cyclic AMP regulate "
+    "the glycogen metabolism in liver cells during fasting?"
+)
+LONG_ZH = "稻瘟病菌侵染水稻叶片后，在高温高湿条件下病斑会如何扩展并影响产量？"
+LONG_ZH_PARAPHRASE = "稻瘟病菌侵染水稻叶片之后，在高温高湿条件下病斑会如何扩展并影响产量？"
+
+
+def test_shingles_use_characters_for_chinese_and_words_for_english():
+    assert "稻 瘟 病" in question_shingles("稻瘟病的症状")
+    assert "kinase a" in question_shingles("What is protein kinase A?")
+
+
+def test_index_flags_paraphrases_within_namespace():
+    index = NearDuplicateIndex(threshold=0.7)
+    assert index.add("en", LONG_EN, namespace="cot") is None
+    assert index.add("zh", LONG_ZH, namespace="cot") is None
+    assert index.add("en2", LONG_EN_PARAPHRASE, namespace="cot") == "en"
+    assert index.query(LONG_ZH_PARAPHRASE, namespace="cot") == "zh"
+    # 其他命名空间与无关问题不受影响
+    assert index.add("en3", LONG_EN_PARAPHRASE, namespace="atomic") is None
+    assert index.add("other", "What are the symptoms of wheat rust on leaves?") is None
+    assert index.add("empty", "？！") is None
+    assert len(index) == 4
+
+
+def test_deduplicate_formatted_items_with_near_index():
+    items = [
+        {"instruction": LONG_EN, "output": "a", "mode": "cot"},
+        {"instruction": LONG_EN_PARAPHRASE, "output": "b", "mode": "cot"},
+        {"instruction": LONG_EN_PARAPHRASE, "output": "c", "mode": "atomic"},
+    ]
+    seen = set()
+    kept = deduplicate_formatted_items(
+        [dict(item) for item in items], seen, near_index=NearDuplicateIndex(threshold=0.7)
+    )
+    assert [item["output"] for item in kept] == ["a", "c"]
+    # 未传入索引时仍只去除完全相同的问题
+    assert len(deduplicate_formatted_items([dict(item) for item in items], set())) == 3
+
+
+def test_dedup_script_reports_removed_pairs():
+    items = [
+        {"question": LONG_ZH, "answer": "1", "mode": "atomic"},
+        {"question": LONG_ZH + " ", "answer": "2", "mode": "atomic"},
+        {"question": LONG_ZH_PARAPHRASE, "answer": "3", "mode": "atomic"},
+        {"question": "小麦锈病有哪些典型症状？", "answer": "4", "mode": "atomic"},
+    ]
+    kept, removed = dedup_items(items, threshold=0.7)
+    assert [item["answer"] for item in kept] == ["1", "4"]
+    assert all(pair["kept"] == LONG_ZH for pair in removed) and len(removed) == 2
+
+
+class ScriptedQuestionLLM(DistinctQuestionLLM):
+    """依次返回给定问题的 mock LLM"""
+
+    def __init__(self, questions):
+        super().__init__()
+        self.questions = questions
+
+    async def generate_answer(self, prompt: str, history=None, **extra):
+        self.calls += 1
+        return f"Question: {self.questions[self.calls - 1]}"
+
+
+def test_two_stage_atomic_keeps_answers_with_near_dedup():
+    questions = [
+        LONG_EN,
+        LONG_ZH,
+        "What are the symptoms of wheat rust on leaves?",
+        LONG_EN_PARAPHRASE,
+    ]
+    batches = [
+        ([(f"X{i}", {"description": f"X{i} is a concept", "entity_type": "concept"})], [])
+        for i in range(len(questions))
+    ]
+    config = {
+        "mode": "atomic",
+        "data_format": "Alpaca",
+        "question_first": True,
+        "near_duplicate_threshold": 0.7,
+        "enable_batch_requests": False,
+        "enable_prompt_cache": False,
+        "max_concurrent_batches": 1,
+    }
+    answer_client = DistinctQuestionLLM()
+    results = asyncio.run(
+        generate_qas(
+            answer_client, batches, config,
+            question_llm_client=ScriptedQuestionLLM(questions),
+        )
+    )
+    # 问题阶段去除近重复的改写问题，答案阶段不再把已放行的问题判为自身的近重复
+    assert len(results) == answer_client.calls == 3
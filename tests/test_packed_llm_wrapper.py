@@ -0,0 +1,128 @@
+"""打包生成包装器测试。"""
+
+import asyncio
+import re
+
+from graphgen.models import PackedLLMWrapper
+from graphgen.operators.generate.generate_qas import generate_qas
+
+_TASK_RE = re.compile(r"=+ TASK (\d+) =+")
+
+
+class EchoLLM:
+    """打包请求按任务逐段回显，单条请求直接回显；drop 中的任务序号在打包响应中缺失"""
+
+    def __init__(self, drop=(), fail_packed=False):
+        self.prompts = []
+        self.drop = set(drop)
+        self.fail_packed = fail_packed
+        self.system_prompt = ""
+        self.temperature = 0.0
+        self.max_tokens = 4096
+        self.repetition_penalty = 1.0
+        self.top_p = 0.95
+        self.top_k = 50
+        self.tokenizer = None
+        self.token_usage = []
+
+    async def generate_answer(self, prompt: str, history=None, **extra):
+        self.prompts.append(prompt)
+        await asyncio.sleep(0.001)
+        if "<<<TASK" not in prompt:
+            return f"answer to {prompt.strip()}"
+        if self.fail_packed:
+            raise RuntimeError("packed request failed")
+        indices = [int(i) for i in _TASK_RE.findall(prompt)]
+        return "\n".join(
+            f"<<<TASK {i}>>>\nanswer {i}\n<<<END {i}>>>" for i in indices if i not in self.drop
+        )
+
+
+def _generate(wrapper, prompts, **kwargs):
+    async def run():
+        results = await asyncio.gather(*(wrapper.generate_answer(p, **kwargs) for p in prompts))
+        await wrapper.flush()
+        return results
+
+    return asyncio.run(run())
+
+
+def test_packs_concurrent_prompts_into_one_call():
+    client = EchoLLM()
+    wrapper = PackedLLMWrapper(client, max_pack_size=4, max_wait_time=0.01)
+    results = _generate(wrapper, ["p1", "p2", "p3", "p4"])
+    assert results == ["answer 1", "answer 2", "answer 3", "answer 4"]
+    assert len(client.prompts) == 1
+    assert wrapper.stats == {"requests": 4, "calls": 1, "packed_calls": 1, "retried": 0}
+
+
+def test_retries_only_missing_sections():
+    client = EchoLLM(drop={2})
+    wrapper = PackedLLMWrapper(client, max_pack_size=3, max_wait_time=0.01)
+    results = _generate(wrapper, ["p1", "p2", "p3"])
+    assert results == ["answer 1", "answer to p2", "answer 3"]
+    assert wrapper.stats["calls"] == 2 and wrapper.stats["retried"] == 1
+
+    # 打包请求整体失败时全部单独重试
+    client = EchoLLM(fail_packed=True)
+    wrapper = PackedLLMWrapper(client, max_pack_size=2, max_wait_time=0.01)
+    assert _generate(wrapper, ["p1", "p2"]) == ["answer to p1", "answer to p2"]
+    assert wrapper.stats["retried"] == 2
+
+
+def test_truncated_section_is_missing():
+    response = "<<<TASK 1>>>a<<<END 1>>>\n<<<TASK 2>>>b"
+    assert PackedLLMWrapper.split_packed_response(response, 2) == ["a", ""]
+
+
+def test_token_budget_splits_packs():
+    client = EchoLLM()
+    # 没有 tokenizer 时按字符数估计：每包最多两个 10 字符的 prompt
+    wrapper = PackedLLMWrapper(client, max_pack_size=8, max_pack_tokens=25, max_wait_time=0.01)
+    results = _generate(wrapper, [f"prompt-{i:03d}" for i in range(6)])
+    assert results == ["answer 1", "answer 2"] * 3
+    assert len(client.prompts) == 3
+
+
+def test_history_and_single_prompts_bypass_packing():
+    client = EchoLLM()
+    wrapper = PackedLLMWrapper(client, max_pack_size=4, max_wait_time=0.01)
+    assert _generate(wrapper, ["p1", "p2"], history=["h"]) == ["answer to p1", "answer to p2"]
+    assert _generate(wrapper, ["p3"]) == ["answer to p3"]
+    assert wrapper.stats["packed_calls"] == 0
+
+
+class PackedQuestionLLM(EchoLLM):
+    """打包请求中每个任务返回不同的问答对"""
+
+    async def generate_answer(self, prompt: str, history=None, **extra):
+        self.prompts.append(prompt)
+        call = len(self.prompts)
+        await asyncio.sleep(0.001)
+        indices = [int(i) for i in _TASK_RE.findall(prompt)] or [0]
+        sections = []
+        for i in indices:
+            n = call * 10 + i
+            qa = f"Question: What is concept number {n}?\n\nAnswer: It is concept {n}."
+            sections.append(f"<<<TASK {i}>>>\n{qa}\n<<<END {i}>>>" if i else qa)
+        return "\n".join(sections)
+
+
+def test_generate_qas_packs_prompts():
+    batches = [
+        ([(f"X{i}", {"description": f"X{i} is a concept", "entity_type": "concept"})], [])
+        for i in range(8)
+    ]
+    config = {
+        "mode": "multi_hop",
+        "data_format": "Alpaca",
+        "enable_batch_requests": False,
+        "enable_prompt_cache": False,
+        "pack_size": 4,
+        "pack_max_tokens": 20000,
+        "pack_max_wait_time": 0.05,
+    }
+    client = PackedQuestionLLM()
+    results = asyncio.run(generate_qas(client, batches, config))
+    assert len(results) == 8
+    assert len(client.prompts) < 8
@@ -0,0 +1,56 @@
+"""进程池切分与串行切分结果一致性测试。"""
+
+import asyncio
+
+from graphgen.bases import BaseTokenizer
+from graphgen.operators import chunk_documents
+
+
+class CharTokenizer(BaseTokenizer):
+    def encode(self, text):
+        return [ord(c) for c in text]
+
+    def decode(self, token_ids):
+        return "".join(chr(i) for i in token_ids)
+
+
+def _docs():
+    docs = {}
+    for i in range(9):
+        docs[f"doc-{i}"] = {
+            "type": "text",
+            "content": f"第{i}段：实体{i}是一个概念。" * 20
+            if i % 2
+            else f"Paragraph {i}. Entity {i} is a concept. " * 20,
+        }
+    docs["doc-img"] = {"type": "image", "content": "", "img_path": "a.png"}
+    return docs
+
+
+def _chunk(num_workers, doc_chunk_index=None):
+    return asyncio.run(
+        chunk_documents(
+            _docs(),
+            chunk_size=64,
+            chunk_overlap=8,
+            tokenizer_instance=CharTokenizer(),
+            doc_chunk_index=doc_chunk_index,
+            num_workers=num_workers,
+            shard_size=2,
+        )
+    )
+
+
+def test_parallel_chunking_matches_serial_order():
+    serial_index, parallel_index = {}, {}
+    serial = _chunk(1, serial_index)
+    parallel = _chunk(3, parallel_index)
+
+    assert list(serial.items()) == list(parallel.items())
+    assert serial_index == parallel_index
+    assert parallel["image-img"]["full_doc_id"] == "doc-img"
+    assert all(
+        chunk["length"] == len(chunk["content"])
+        for chunk in parallel.values()
+        if chunk["type"] == "text"
+    )
@@ -0,0 +1,133 @@
+"""图内容指纹与分区结果缓存测试。"""
+
+import asyncio
+import tempfile
+
+from graphgen.models import BFSPartitioner, JsonKVStorage, NetworkXStorage
+from graphgen.operators import partition_kg
+
+
+async def _fill(storage):
+    await storage.upsert_node("A", {"description": "a", "entity_type": "CONCEPT"})
+    await storage.upsert_node("B", {"description": "b", "entity_type": "CONCEPT"})
+    await storage.upsert_edge("A", "B", {"description": "a-b"})
+    await storage.upsert_edge("B", "C", {"description": "b-c"})
+
+
+async def _recomputed(storage):
+    """同一张图由新实例全量计算的指纹"""
+    fresh = NetworkXStorage(storage.working_dir, namespace="fresh")
+    fresh._graph = storage._graph.copy()
+    return await fresh.fingerprint()
+
+
+def test_incremental_fingerprint_matches_full_recompute():
+    async def run(tmp):
+        storage = NetworkXStorage(tmp, namespace="graph")
+        await _fill(storage)
+        before = await storage.fingerprint()
+
+        # 与插入顺序无关
+        other = NetworkXStorage(tmp, namespace="other")
+        await other.upsert_edge("C", "B", {"description": "b-c"})
+        await other.upsert_node("B", {"description": "b", "entity_type": "CONCEPT"})
+        await other.upsert_edge("B", "A", {"description": "a-b"})
+        await other.upsert_node("A", {"description": "a", "entity_type": "CONCEPT"})
+        assert await other.fingerprint() == before
+
+        # 先原地修改再 update（pre_tokenize / judge 的写法）也要正确跟踪
+        node = await storage.get_node("A")
+        node["length"] = 3
+        await storage.update_node("A", node)
+        await storage.update_edge("A", "B", {"loss": 0.5})
+        await storage.delete_node("C")
+        after = await storage.fingerprint()
+        assert after != before
+        assert after == await _recomputed(storage)
+
+        await storage.upsert_node("C", {})
+        await storage.upsert_edge("B", "C", {"description": "b-c"})
+        await storage.update_edge("A", "B", {"loss": 0.5})
+        assert await storage.fingerprint() == await _recomputed(storage)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        asyncio.run(run(tmp))
+
+
+def test_partition_cache_skips_unchanged_graph(monkeypatch):
+    calls = []
+    original = BFSPartitioner.partition
+
+    async def counting_partition(self, g, **kwargs):
+        calls.append(1)
+        return await original(self, g, **kwargs)
+
+    monkeypatch.setattr(BFSPartitioner, "partition", counting_partition)
+    config = {"method": "bfs", "method_params": {"max_units_per_community": 2}}
+
+    async def run(tmp):
+        graph = NetworkXStorage(tmp, namespace="graph")
+        chunks = JsonKVStorage(tmp, namespace="chunks")
+        cache = JsonKVStorage(tmp, namespace="partition_cache")
+        await _fill(graph)
+
+        first = await partition_kg(graph, chunks, None, config, partition_cache=cache)
+        second = await partition_kg(graph, chunks, None, config, partition_cache=cache)
+        assert len(calls) == 1
+        assert await first.to_list() == await second.to_list()
+
+        # 分区参数变化或图内容变化都不能命中旧缓存
+        other = {"method": "bfs", "method_params": {"max_units_per_community": 3}}
+        await partition_kg(graph, chunks, None, other, partition_cache=cache)
+        assert len(calls) == 2
+        await graph.upsert_node("D", {"description": "d"})
+        await partition_kg(graph, chunks, None, config, partition_cache=cache)
+        assert len(calls) == 3
+
+        # 持久化后由新的存储实例重新加载，仍可命中
+        await graph.index_done_callback()
+        await cache.index_done_callback()
+        reloaded = await partition_kg(
+            NetworkXStorage(tmp, namespace="graph"),
+            chunks,
+            None,
+            config,
+            partition_cache=JsonKVStorage(tmp, namespace="partition_cache"),
+        )
+        assert len(calls) == 3 and reloaded
+
+    with tempfile.TemporaryDirectory() as tmp:
+        asyncio.run(run(tmp))
+
+
+def test_batch_stream_materialises_on_demand():
+    class CountingGraph(NetworkXStorage):
+        node_reads = 0
+
+        async def get_node(self, node_id):
+            CountingGraph.node_reads += 1
+            return await super().get_node(node_id)
+
+    async def run(tmp):
+        graph = CountingGraph(tmp, namespace="graph")
+        chunks = JsonKVStorage(tmp, namespace="chunks")
+        for i in range(50):
+            await graph.upsert_node(f"N{i}", {"description": str(i), "entity_type": "CONCEPT"})
+        await graph.upsert_node("IMG", {"description": "img", "entity_type": "IMAGE"})
+        await chunks.upsert({"img": {"content": "picture"}})
+
+        config = {"method": "bfs", "method_params": {"max_units_per_community": 1}}
+        stream = await partition_kg(graph, chunks, None, config)
+        assert len(stream) == 51 and CountingGraph.node_reads == 0
+
+        assert len(await stream.take(5)) == 5
+        assert CountingGraph.node_reads == 5
+
+        batches = [batch async for batch in stream]
+        image_nodes = [n for nodes, _ in batches for n in nodes if n[0] == "IMG"]
+        assert image_nodes[0][1]["images"] == {"content": "picture"}
+        # 图像数据只附加在批次副本上，不写回图存储
+        assert "images" not in await graph.get_node("IMG")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        asyncio.run(run(tmp))
@@ -0,0 +1,97 @@
+"""批量 token 长度预计算测试。"""
+
+import asyncio
+import tempfile
+
+from graphgen.bases import BaseTokenizer
+from graphgen.models import JsonKVStorage, NetworkXStorage
+from graphgen.operators.partition.pre_tokenize import pre_tokenize
+
+
+class CountingTokenizer(BaseTokenizer):
+    def __init__(self):
+        super().__init__("char")
+        self.batch_calls = []
+
+    def encode(self, text):
+        return [ord(c) for c in text]
+
+    def decode(self, token_ids):
+        return "".join(chr(i) for i in token_ids)
+
+    def count_tokens_batch(self, texts):
+        self.batch_calls.append(list(texts))
+        return super().count_tokens_batch(texts)
+
+
+async def _graph(tmp):
+    graph = NetworkXStorage(tmp, namespace="graph")
+    await graph.upsert_node("A", {"description": "alpha"})
+    await graph.upsert_node("B", {"description": "beta"})
+    await graph.upsert_node("C", {"description": "alpha"})
+    await graph.upsert_edge("A", "B", {"description": "alpha beta"})
+    return graph
+
+
+async def _run(graph, tokenizer, cache=None, batch_size=2048):
+    return await pre_tokenize(
+        graph,
+        tokenizer,
+        await graph.get_all_edges(),
+        await graph.get_all_nodes(),
+        length_cache=cache,
+        batch_size=batch_size,
+    )
+
+
+def test_lengths_batched_deduplicated_and_cached():
+    async def run(tmp):
+        graph = await _graph(tmp)
+        cache = JsonKVStorage(tmp, namespace="token_length_cache")
+        tokenizer = CountingTokenizer()
+
+        await _run(graph, tokenizer, cache, batch_size=2)
+        # 三个不同描述，按 batch_size=2 分两批，相同描述只分词一次
+        assert sorted(t for call in tokenizer.batch_calls for t in call) == [
+            "alpha",
+            "alpha beta",
+            "beta",
+        ]
+        assert [len(call) for call in tokenizer.batch_calls] == [2, 1]
+        assert (await graph.get_node("C"))["length"] == 5
+        assert (await graph.get_edge("A", "B"))["length"] == 10
+
+        # 再次运行不再分词，也不改动图
+        fingerprint = await graph.fingerprint()
+        tokenizer.batch_calls.clear()
+        await _run(graph, tokenizer, JsonKVStorage(tmp, namespace="token_length_cache"))
+        assert tokenizer.batch_calls == []
+        assert await graph.fingerprint() == fingerprint
+
+        # 描述变化后只重新计算变化的那一个
+        await graph.update_node("B", {"description": "beta-two"})
+        await _run(graph, tokenizer, cache)
+        assert tokenizer.batch_calls == [["beta-two"]]
+        assert (await graph.get_node("B"))["length"] == 8
+
+    with tempfile.TemporaryDirectory() as tmp:
+        asyncio.run(run(tmp))
+
+
+def test_without_cache_only_missing_lengths_are_computed():
+    async def run(tmp):
+        graph = await _graph(tmp)
+        await graph.update_node("A", {"length": 99})
+        tokenizer = CountingTokenizer()
+        await _run(graph, tokenizer)
+        assert sorted(t for call in tokenizer.batch_calls for t in call) == [
+            "alpha",
+            "alpha beta",
+            "beta",
+        ]
+        # 已有长度保持不变（未提供缓存时无法判断描述是否变化）
+        assert (await graph.get_node("A"))["length"] == 99
+        assert (await graph.get_node("C"))["length"] == 5
+
+    with tempfile.TemporaryDirectory() as tmp:
+        asyncio.run(run(tmp))
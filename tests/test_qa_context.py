@@ -0,0 +1,78 @@
+"""紧凑 QA 输出（上下文附表）测试。"""
+
+import asyncio
+import json
+import os
+import tempfile
+
+from graphgen.operators.generate import (
+    QAContextResolver,
+    QAContextTable,
+    context_table_path,
+    generate_qas,
+)
+
+from test_generation_scheduler import DistinctQuestionLLM
+
+
+def _qa(question, batch_no=0):
+    return {
+        "instruction": question,
+        "output": "answer",
+        "mode": "atomic",
+        "context": {
+            "nodes": [{"name": f"N{batch_no}", "description": "d" * 200}],
+            "edges": [],
+        },
+        "graph": {"entities": [f"N{batch_no}"], "relationships": []},
+        "source_chunks": [{"chunk_id": "chunk-1", "content": "c" * 500}],
+        "source_documents": [{"doc_id": "doc-1", "type": "text"}],
+        "metadata": {"generation_mode": "atomic"},
+    }
+
+
+def test_compact_and_resolve_round_trip():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "qa_context.jsonl")
+        table = QAContextTable(path)
+        originals = [_qa("q1"), _qa("q2"), _qa("q3", batch_no=1)]
+        records = table.compact_all([json.loads(json.dumps(qa)) for qa in originals])
+        table.close()
+
+        assert records[0]["context_id"] == records[1]["context_id"] != records[2]["context_id"]
+        assert records[0]["chunk_ids"] == ["chunk-1"] and records[0]["doc_ids"] == ["doc-1"]
+        assert "context" not in records[0] and "source_chunks" not in records[0]
+        # 两个批次 + 一个 chunk + 一个文档，各只存一份
+        assert len(table) == 4
+        with open(path, encoding="utf-8") as f:
+            assert len(f.readlines()) == 4
+
+        # 新进程从附表文件按需拼回，内联记录原样返回
+        resolver = QAContextResolver(path)
+        assert resolver.resolve(originals[0]) is originals[0] and resolver._table is None
+        assert resolver.resolve_all(records) == originals
+
+
+def test_context_table_path_sits_next_to_output():
+    assert context_table_path("/data/t1_output.json") == "/data/t1_output.context.jsonl"
+
+
+def test_generate_qas_writes_compact_records():
+    batches = [
+        ([(f"X{i}", {"description": f"X{i} is a concept", "entity_type": "concept"})], [])
+        for i in range(5)
+    ]
+    config = {
+        "mode": "multi_hop",
+        "data_format": "Alpaca",
+        "enable_batch_requests": False,
+        "enable_prompt_cache": False,
+    }
+    table = QAContextTable()
+    results = asyncio.run(
+        generate_qas(DistinctQuestionLLM(), batches, config, context_table=table)
+    )
+    assert len(results) == 5
+    assert all("context_id" in item and "context" not in item for item in results)
+    resolved = [table.resolve(item) for item in results]
+    assert sorted(item["graph"]["entities"][0] for item in resolved) == [f"X{i}" for i in range(5)]
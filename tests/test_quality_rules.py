@@ -0,0 +1,82 @@
+"""零成本质量规则引擎测试。"""
+
+import pytest
+
+from graphgen.operators.generate.generate_qas import apply_basic_quality_filter
+from graphgen.operators.generate.quality_rules import (
+    QUALITY_RULES,
+    QualityRuleEngine,
+    clean_question_text,
+    register_quality_rule,
+)
+
+
+def _item(question, answer):
+    return {"instruction": question, "input": "", "output": answer}
+
+
+def test_default_rules_match_basic_filter():
+    items = [
+        _item("问题：水稻属于什么科？", "禾本科"),
+        _item("", "无问题"),
+        _item("q", "太短的问题"),
+        _item("What is rice?", "  "),
+        _item("same", "same"),
+        {"conversations": [{"from": "human", "value": "Q: 多跳问题？"}, {"from": "gpt", "value": "答"}]},
+        "not a dict",
+    ]
+    kept, removed = QualityRuleEngine().apply(items)
+    assert removed == {"empty_question": 3, "empty_answer": 1, "identical_qa": 1}
+    # 保留的条目同时剥离问题前导语
+    assert [k.get("instruction") for k in kept] == ["水稻属于什么科？", None]
+    assert kept[1]["conversations"][0]["value"] == "多跳问题？"
+    assert apply_basic_quality_filter(items)[1] == removed
+
+
+def test_per_mode_rules_and_counts():
+    config = {
+        "default": {
+            "rules": ["empty_question", "empty_answer", "answer_too_long", "language_mismatch"],
+            "max_answer_length": 10,
+        },
+        "cot": {"max_answer_length": 100, "language": "zh"},
+    }
+    items = [
+        _item("水稻属于什么科？", "禾本科植物，广泛种植于亚洲"),
+        _item("What family is rice in?", "Poaceae"),
+    ]
+    atomic = QualityRuleEngine.for_mode(config, "atomic")
+    kept, _ = atomic.apply([dict(i) for i in items])
+    assert len(kept) == 1 and atomic.rejected["answer_too_long"] == 1
+
+    cot = QualityRuleEngine.for_mode(config, "cot")
+    kept, _ = cot.apply([dict(i) for i in items])
+    assert [k["instruction"] for k in kept] == ["水稻属于什么科？"]
+    cot.apply([dict(items[1])])
+    assert cot.rejected == {
+        "empty_question": 0,
+        "empty_answer": 0,
+        "answer_too_long": 0,
+        "language_mismatch": 2,
+    }
+
+
+def test_custom_and_unknown_rules():
+    with pytest.raises(ValueError):
+        QualityRuleEngine(rules=["no_such_rule"])
+    register_quality_rule("placeholder_answer", lambda q, a, o: a in o["placeholders"])
+    try:
+        engine = QualityRuleEngine(
+            rules=["empty_answer", "placeholder_answer"], placeholders={"N/A", "无"}
+        )
+        kept, removed = engine.apply([_item("问题一？", "无"), _item("问题二？", "有答案")])
+        assert len(kept) == 1 and removed["placeholder_answer"] == 1
+    finally:
+        QUALITY_RULES.pop("placeholder_answer")
+
+
+def test_clean_question_text():
+    assert clean_question_text("根据文本，生成如下问题：\n**问题：**\n真正的问题？") == "真正的问题？"
+    assert clean_question_text("**Question:** q: What is X?") == "What is X?"
+    # 以前导语首字符开头但不是前导语的问题保持不变
+    assert clean_question_text("Quick question?") == "Quick question?"
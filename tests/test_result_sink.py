@@ -0,0 +1,56 @@
+"""生成结果流式落盘测试。"""
+
+import asyncio
+import os
+import tempfile
+
+from graphgen.operators import QAResultSink, generate_qas
+
+from test_generation_scheduler import DistinctQuestionLLM
+
+
+def test_sink_appends_jsonl_and_reports_counts():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "out", "qa.jsonl")
+        updates = []
+        sink = QAResultSink(path, on_progress=updates.append, progress_interval=3600)
+        sink.write("atomic", [{"instruction": "q1", "output": "a1"}])
+        sink.write("cot", [{"instruction": "q2", "output": "a2"}, {"instruction": "q3", "output": "a3"}])
+        sink.write("cot", [])
+        # 写入即落盘，不需要等 close
+        assert [item["instruction"] for item in sink.iter_items()] == ["q1", "q2", "q3"]
+        sink.close()
+        assert sink.counts == {"atomic": 1, "cot": 2} and sink.total == 3
+        # 首次写入立即回调，之后按间隔节流，close 时总会回调最终计数
+        assert updates == [{"atomic": 1}, {"atomic": 1, "cot": 2}]
+
+        # 崩溃时写了一半的末行被跳过，已写入的条目仍可读出
+        with open(path, "a", encoding="utf-8") as f:
+            f.write('{"instruction": "q4", "out')
+        assert len(list(QAResultSink(path).iter_items())) == 3
+
+        sink.clear()
+        assert not os.path.exists(path) and sink.total == 0
+
+
+def test_generate_qas_streams_into_sink():
+    batches = [
+        ([(f"X{i}", {"description": f"X{i} is a concept", "entity_type": "concept"})], [])
+        for i in range(20)
+    ]
+    config = {
+        "mode": "multi_hop",
+        "data_format": "Alpaca",
+        "enable_batch_requests": False,
+        "enable_prompt_cache": False,
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        sink = QAResultSink(os.path.join(tmp, "qa.jsonl"))
+        results = asyncio.run(
+            generate_qas(DistinctQuestionLLM(), batches, config, sink=sink)
+        )
+        sink.close()
+        items = list(sink.iter_items())
+        assert results == []
+        assert len(items) == sink.counts["multi_hop"] == 20
+        assert all(item["mode"] == "multi_hop" for item in items)
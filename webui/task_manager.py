@@ -249,6 +249,13 @@ class TaskManager:
                 
                 self._save_tasks()
     
+    def update_task_progress(self, task_id: str, qa_count: int):
+        """生成过程中更新已写入的问答对数量，不改变任务状态与计时"""
+        with self.lock:
+            if task_id in self.tasks:
+                self.tasks[task_id].qa_count = qa_count
+                self._save_tasks()
+
     def has_new_files_to_process(self, task_id: str) -> bool:
         """检查任务是否有新文件需要处理"""
         task = self.tasks.get(task_id)